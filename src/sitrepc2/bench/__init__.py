@@ -0,0 +1,63 @@
+# src/sitrepc2/bench/__init__.py
+"""
+Reproducible micro-benchmarks for sitrepc2 hot paths.
+
+Each submodule is runnable with `python -m sitrepc2.bench.<name>` and
+writes a JSON report (stdout or --out) so runs can be diffed across
+releases.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+def percentiles(samples: Sequence[float], points: Sequence[int] = (50, 90, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles plus mean/min/max, in the samples' unit."""
+    if not samples:
+        return {}
+    xs = sorted(samples)
+    out = {f"p{p}": xs[min(len(xs) - 1, max(0, round(p / 100 * len(xs)) - 1))] for p in points}
+    out["mean"] = sum(xs) / len(xs)
+    out["min"] = xs[0]
+    out["max"] = xs[-1]
+    out["n"] = len(xs)
+    return out
+
+
+def time_once(fn: Callable[[], Any]) -> tuple[float, Any]:
+    """Wall time (seconds) of a single call, and its return value."""
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def time_each(fn: Callable[[Any], Any], items: Sequence[Any]) -> List[float]:
+    """Per-item wall times in microseconds."""
+    out: List[float] = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        out.append((time.perf_counter() - t0) * 1e6)
+    return out
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def write_report(report: Dict[str, Any], out: Optional[Path]) -> None:
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if out is None:
+        print(text)
+    else:
+        Path(out).write_text(text + "\n", encoding="utf-8")
@@ -0,0 +1,234 @@
+# src/sitrepc2/bench/gazetteer.py
+"""
+Gazetteer hot paths: CSV loading, GazetteerIndex construction and lookup
+latency, on the shipped reference CSVs and on synthetic gazetteers scaled
+from them.
+
+    python -m sitrepc2.bench.gazetteer [--scales 1,10,100] [--n-queries 2000]
+                                       [--seed 0] [--out report.json]
+
+For scale k > 1, every reference locale is kept and k - 1 jittered copies
+are added with distinct names, aliases and cids, so alias maps, region
+buckets and grid cells all grow roughly k-fold. Region, group and
+direction CSVs are copied unchanged (direction anchors stay valid).
+
+Per scale the report records:
+    load_s      seconds per `gazetteer.io.load_*` call
+    build_s     GazetteerIndex construction (from entries and from a store)
+    lookup_us   latency percentiles for exact / miss / constrained alias
+                lookups, nearest, k-NN and radius queries, plus hit rates
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from sitrepc2.bench import environment, percentiles, time_each, time_once, write_report
+from sitrepc2.config.paths import ref_path
+from sitrepc2.gazetteer.index import GazetteerIndex
+from sitrepc2.gazetteer.io import (
+    load_directions,
+    load_groups,
+    load_locale_store,
+    load_locales,
+    load_patch,
+    load_regions,
+)
+from sitrepc2.util.encoding import encode_coord_u64
+
+REFERENCE_CSVS = ("locale_lookup.csv", "region_lookup.csv", "group_lookup.csv", "direction_lookup.csv")
+
+# Spread of synthetic copies around their source locale, in degrees.
+_JITTER_DEG = 0.5
+_SYLLABLES = ("ka", "no", "vi", "ra", "le", "to", "mu", "sy", "he", "do", "pi", "zo")
+
+
+# ===========================================================================
+# Synthetic gazetteers
+# ===========================================================================
+
+def _tag(k: int) -> str:
+    """Deterministic pseudo-word for copy k (k >= 1)."""
+    out = []
+    while k:
+        k, r = divmod(k, len(_SYLLABLES))
+        out.append(_SYLLABLES[r])
+    return "".join(out)
+
+
+def write_scaled_gazetteer(src_dir: Path, dst_dir: Path, scale: int, seed: int = 0) -> Path:
+    """
+    Write a reference-shaped gazetteer `scale` times the size of the one in
+    `src_dir` into `dst_dir` and return `dst_dir`.
+    """
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    for name in REFERENCE_CSVS[1:]:
+        shutil.copyfile(src_dir / name, dst_dir / name)
+
+    rng = random.Random(seed)
+    with (src_dir / "locale_lookup.csv").open("r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        fields = list(reader.fieldnames or ())
+        rows = list(reader)
+
+    seen_cids = {int(r["cid"]) for r in rows}
+    with (dst_dir / "locale_lookup.csv").open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+        for k in range(1, scale):
+            tag = _tag(k)
+            for row in rows:
+                lat = float(row["lat"]) + rng.uniform(-_JITTER_DEG, _JITTER_DEG)
+                lon = float(row["lon"]) + rng.uniform(-_JITTER_DEG, _JITTER_DEG)
+                cid = encode_coord_u64(lat, lon)
+                while cid in seen_cids:
+                    lat += 1e-5
+                    cid = encode_coord_u64(lat, lon)
+                seen_cids.add(cid)
+
+                copy = dict(row)
+                copy["name"] = f"{row['name']} {tag}"
+                copy["aliases"] = ";".join(
+                    f"{a.strip()} {tag}" for a in (row.get("aliases") or "").split(";") if a.strip()
+                )
+                copy["lat"] = f"{lat:.6f}"
+                copy["lon"] = f"{lon:.6f}"
+                copy["cid"] = str(cid)
+                writer.writerow(copy)
+    return dst_dir
+
+
+# ===========================================================================
+# Measurements
+# ===========================================================================
+
+def bench_load(csv_dir: Path):
+    """Time every loader once; returns (timings, loaded gazetteer parts)."""
+    loc_path = csv_dir / "locale_lookup.csv"
+    timings: Dict[str, float] = {}
+    loaded: Dict[str, object] = {}
+    timings["load_locales"], loaded["locales"] = time_once(lambda: load_locales(loc_path))
+    timings["load_locale_store"], loaded["store"] = time_once(lambda: load_locale_store(loc_path))
+    timings["load_patch"], _ = time_once(lambda: load_patch(loc_path))
+    timings["load_regions"], loaded["regions"] = time_once(
+        lambda: load_regions(csv_dir / "region_lookup.csv")
+    )
+    timings["load_groups"], loaded["groups"] = time_once(
+        lambda: load_groups(csv_dir / "group_lookup.csv")
+    )
+    timings["load_directions"], loaded["directions"] = time_once(
+        lambda: load_directions(csv_dir / "direction_lookup.csv", loaded["locales"])
+    )
+    return timings, loaded
+
+
+def _timed_with_hits(fn, items) -> dict:
+    """time_each, also counting calls that returned a non-empty result."""
+    hits = 0
+
+    def call(item):
+        nonlocal hits
+        if fn(item):
+            hits += 1
+
+    stats = percentiles(time_each(call, items))
+    stats["hit_rate"] = hits / len(items) if items else 0.0
+    return stats
+
+
+def bench_lookups(gaz: GazetteerIndex, locales, n_queries: int, seed: int) -> Dict[str, dict]:
+    rng = random.Random(seed)
+    sample = [locales[rng.randrange(len(locales))] for _ in range(n_queries)]
+
+    exact = [rng.choice(e.aliases + [e.name]) for e in sample]
+    miss = [f"{a}q{rng.randrange(10**6)}" for a in exact]
+    in_region = [(a, e.region) for a, e in zip(exact, sample) if e.region]
+    region_names = sorted({e.region for e in locales if e.region}) or ["none"]
+    other_region = [(a, rng.choice(region_names)) for a in exact]
+    group_names = [g.name for g in gaz.groups] or ["none"]
+    in_group = [(a, e.ru_group or rng.choice(group_names)) for a, e in zip(exact, sample)]
+    points = [
+        (e.lat + rng.uniform(-0.05, 0.05), e.lon + rng.uniform(-0.05, 0.05))
+        for e in sample
+    ]
+
+    # Build lazily constructed structures (grid, fold map) before timing.
+    gaz.nearest_locale(*points[0])
+
+    cases = {
+        "search_locale": (lambda a: gaz.search_locale(a), exact),
+        "search_locale_miss": (lambda a: gaz.search_locale(a), miss),
+        "search_locale_in_region": (lambda q: gaz.search_locale_in_region(*q), in_region),
+        "search_locale_in_region_random": (lambda q: gaz.search_locale_in_region(*q), other_region),
+        "search_locale_in_ru_group": (lambda q: gaz.search_locale_in_ru_group(*q), in_group),
+        "nearest_locale": (lambda p: gaz.nearest_locale(*p)[0], points),
+        "nearest_locales_k5": (lambda p: gaz.nearest_locales(p[0], p[1], 5), points),
+        "nearest_locales_k25": (lambda p: gaz.nearest_locales(p[0], p[1], 25), points),
+        "nearest_locales_within_10km": (lambda p: gaz.nearest_locales_within(p[0], p[1], 10.0), points),
+        "nearest_locales_within_25km": (lambda p: gaz.nearest_locales_within(p[0], p[1], 25.0), points),
+    }
+
+    return {name: _timed_with_hits(fn, items) for name, (fn, items) in cases.items()}
+
+
+def run_scale(csv_dir: Path, n_queries: int, seed: int) -> dict:
+    load_s, loaded = bench_load(csv_dir)
+    locales, store = loaded["locales"], loaded["store"]
+    regions, groups, directions = loaded["regions"], loaded["groups"], loaded["directions"]
+
+    build_s: Dict[str, float] = {}
+    build_s["from_entries"], gaz = time_once(lambda: GazetteerIndex(locales, regions, groups, directions))
+    build_s["from_store"], _ = time_once(lambda: GazetteerIndex(store, regions, groups, directions))
+    build_s["grid"], _ = time_once(lambda: gaz._state.grid)
+
+    return {
+        "n_locales": len(locales),
+        "n_alias_keys": len(gaz._locale_by_alias),
+        "load_s": load_s,
+        "build_s": build_s,
+        "lookup_us": bench_lookups(gaz, locales, n_queries, seed),
+    }
+
+
+def run(scales: Sequence[int], n_queries: int, seed: int) -> dict:
+    src_dir = ref_path("locale_lookup.csv").parent
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix="sitrepc2-bench-") as tmp:
+        for scale in scales:
+            if scale == 1:
+                csv_dir = src_dir
+            else:
+                csv_dir = write_scaled_gazetteer(src_dir, Path(tmp) / f"x{scale}", scale, seed)
+            results[f"x{scale}"] = run_scale(csv_dir, n_queries, seed)
+    return {"scales": results, "n_queries": n_queries, "seed": seed}
+
+
+def _parse_scales(text: str) -> List[int]:
+    scales = [int(s) for s in text.split(",") if s.strip()]
+    if not scales or any(s < 1 for s in scales):
+        raise argparse.ArgumentTypeError("scales must be positive integers")
+    return scales
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scales", type=_parse_scales, default=[1, 10, 100])
+    ap.add_argument("--n-queries", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, default=None)
+    args = ap.parse_args(argv)
+
+    report = run(args.scales, args.n_queries, args.seed)
+    report["environment"] = environment()
+    write_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# src/sitrepc2/bench/matcher.py
+"""
+Holmes vs DependencyMatcher backend: start-up time, parse / register /
+match throughput and match parity for the war_lexicon.json search phrases.
+
+    python -m sitrepc2.bench.matcher [--model en_core_web_lg] [--texts posts.txt]
+                                     [--n-docs 500] [--seed 0] [--workers 1]
+                                     [--batch-size 64] [--out report.json]
+
+--texts is a UTF-8 file with one document per line; without it, synthetic
+sitrep-style sentences are generated from the gazetteer aliases (see
+bench.ruler). Both backends get the reference gazetteer ruler.
+
+Parity compares, per document, matches by (label, phrase text, character
+offsets of the matched tokens); precision and recall are those of the
+dependency backend taking Holmes as the reference.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set
+
+from sitrepc2.bench import environment, time_once, write_report
+from sitrepc2.bench.ruler import load_reference_gazetteer, synthetic_texts
+from sitrepc2.lss.bootstrap import HolmesSettings
+from sitrepc2.lss.dependency_backend import register_documents
+from sitrepc2.lss.pipeline import _match_signature, build_holmes_and_nlp
+
+BACKENDS = ("holmes", "dependency")
+
+
+def run_backend(manager, texts: Sequence[str], batch_size: int) -> dict:
+    """Parse, register and match `texts` with one manager."""
+    labels = [f"doc{i}" for i in range(len(texts))]
+    parse_s, docs = time_once(lambda: list(manager.nlp.pipe(texts, batch_size=batch_size)))
+    register_s, _ = time_once(lambda: register_documents(manager, dict(zip(labels, docs))))
+    match_s, matches = time_once(manager.match)
+    manager.remove_all_documents()
+
+    by_label = dict(zip(labels, docs))
+    signatures: Dict[str, Set[tuple]] = defaultdict(set)
+    for m in matches:
+        doc = by_label.get(m.get("document"))
+        if doc is not None:
+            signatures[m["document"]].add(_match_signature(doc, m))
+
+    n = len(texts)
+    return {
+        "parse_s": parse_s,
+        "register_s": register_s,
+        "match_s": match_s,
+        # Throughput of matching parsed Docs, and of the whole path.
+        "docs_per_s": n / (register_s + match_s) if register_s + match_s else 0.0,
+        "end_to_end_docs_per_s": n / (parse_s + register_s + match_s) if parse_s + register_s + match_s else 0.0,
+        "matches": len(matches),
+        "signatures": signatures,
+    }
+
+
+def parity(holmes: Dict[str, Set[tuple]], dep: Dict[str, Set[tuple]], max_examples: int = 10) -> dict:
+    shared = holmes_only = dep_only = 0
+    by_label: Dict[str, Counter] = defaultdict(Counter)
+    examples: List[dict] = []
+    for label in sorted(set(holmes) | set(dep), key=lambda l: int(l[3:])):
+        h, d = holmes.get(label, set()), dep.get(label, set())
+        for side, sigs in (("shared", h & d), ("holmes_only", h - d), ("dependency_only", d - h)):
+            for sig in sigs:
+                by_label[sig[0]][side] += 1
+            if side != "shared" and sigs and len(examples) < max_examples:
+                examples.append({"document": label, "side": side, "matches": sorted(sigs)[:3]})
+        shared += len(h & d)
+        holmes_only += len(h - d)
+        dep_only += len(d - h)
+    return {
+        "shared": shared,
+        "holmes_only": holmes_only,
+        "dependency_only": dep_only,
+        "recall": shared / (shared + holmes_only) if shared + holmes_only else 1.0,
+        "precision": shared / (shared + dep_only) if shared + dep_only else 1.0,
+        "by_label": {label: dict(c) for label, c in sorted(by_label.items())},
+        "first_mismatches": examples,
+    }
+
+
+def run(model: str, texts: Sequence[str], *, workers: int = 1, batch_size: int = 64) -> dict:
+    report: dict = {"model": model, "n_docs": len(texts), "build_s": {}, "throughput": {}}
+    signatures = {}
+    for backend in BACKENDS:
+        settings = HolmesSettings(model=model, number_of_workers=workers, backend=backend)
+        build_s, manager = time_once(
+            lambda: build_holmes_and_nlp(settings)
+        )
+        result = run_backend(manager, texts, batch_size)
+        signatures[backend] = result.pop("signatures")
+        report["build_s"][backend] = build_s
+        report["throughput"][backend] = result
+        if hasattr(manager, "close"):
+            manager.close()
+
+    report["parity"] = parity(signatures["holmes"], signatures["dependency"])
+    h, d = report["throughput"]["holmes"], report["throughput"]["dependency"]
+    report["speedup"] = {
+        "match": d["docs_per_s"] / h["docs_per_s"] if h["docs_per_s"] else None,
+        "end_to_end": (
+            d["end_to_end_docs_per_s"] / h["end_to_end_docs_per_s"]
+            if h["end_to_end_docs_per_s"] else None
+        ),
+    }
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--model", default="en_core_web_lg")
+    ap.add_argument("--texts", type=Path, default=None)
+    ap.add_argument("--n-docs", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1, help="Holmes matching processes")
+    ap.add_argument("--batch-size", type=int, default=64)
+    ap.add_argument("--out", type=Path, default=None)
+    args = ap.parse_args(argv)
+
+    if args.texts:
+        texts = [l for l in args.texts.read_text(encoding="utf-8").splitlines() if l.strip()]
+    else:
+        texts = synthetic_texts(load_reference_gazetteer(), args.n_docs, args.seed)
+
+    report = run(args.model, texts, workers=args.workers, batch_size=args.batch_size)
+    report["environment"] = environment()
+    write_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
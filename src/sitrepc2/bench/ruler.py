@@ -0,0 +1,133 @@
+# src/sitrepc2/bench/ruler.py
+"""
+EntityRuler vs AliasScanner: construction time, per-doc latency and span
+parity over the shipped reference gazetteer.
+
+    python -m sitrepc2.bench.ruler [--model blank:en] [--texts posts.txt]
+                                   [--n-docs 500] [--seed 0] [--out report.json]
+
+--texts is a UTF-8 file with one document per line; without it, synthetic
+sitrep-style sentences are generated from the gazetteer aliases.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import spacy
+from spacy.language import Language
+
+from sitrepc2.bench import environment, percentiles, time_each, time_once, write_report
+from sitrepc2.config.paths import ref_path
+from sitrepc2.gazetteer.aliases import gather_aliases
+from sitrepc2.gazetteer.io import load_directions, load_groups, load_locales, load_regions
+from sitrepc2.lss.ruler import add_alias_scanner, add_entity_rulers
+
+
+def load_reference_gazetteer():
+    locales = load_locales(ref_path("locale_lookup.csv"))
+    regions = load_regions(ref_path("region_lookup.csv"))
+    groups = load_groups(ref_path("group_lookup.csv"))
+    directions = load_directions(ref_path("direction_lookup.csv"), locales)
+    return locales, regions, groups, directions
+
+
+def synthetic_texts(gaz, n: int, seed: int = 0) -> List[str]:
+    """Sitrep-like sentences seeded with real aliases (normalized form)."""
+    loc, reg, grp, dirs = gather_aliases(*gaz)
+    rng = random.Random(seed)
+    templates = [
+        "Units of the {g} continued to advance near {l1}, {l2} and {l3} ({r}).",
+        "The enemy shelled {l1} and {l2} in the direction of {d}.",
+        "Fighting continues towards {d}; {l1} was struck by artillery.",
+        "In the {d} direction, defenders repelled 12 attacks near {l1}, {l2}, {l3} and {l4}.",
+        "Air defence units shot down drones over {r} near {l1}.",
+        "The {d} sector saw assaults on {l1} while {g} units regrouped.",
+    ]
+    out = []
+    for _ in range(n):
+        t = rng.choice(templates)
+        out.append(t.format(
+            g=rng.choice(grp) if grp else "group",
+            r=rng.choice(reg) if reg else "region",
+            d=rng.choice(dirs) if dirs else "direction",
+            l1=rng.choice(loc), l2=rng.choice(loc), l3=rng.choice(loc), l4=rng.choice(loc),
+        ))
+    return out
+
+
+def _blank(model: str) -> Language:
+    if model.startswith("blank:"):
+        return spacy.blank(model.split(":", 1)[1])
+    return spacy.load(model, exclude=["ner"])
+
+
+def _spans(doc):
+    return [(e.start, e.end, e.label_) for e in doc.ents]
+
+
+def run(model: str, texts: Sequence[str], gaz) -> dict:
+    locales, regions, groups, directions = gaz
+    kwargs = dict(locales=locales, regions=regions, groups=groups, directions=directions)
+
+    nlp_ruler = _blank(model)
+    nlp_scan = _blank(model)
+
+    build_ruler, _ = time_once(lambda: add_entity_rulers(nlp_ruler, **kwargs))
+    build_scan, _ = time_once(lambda: add_alias_scanner(nlp_scan, **kwargs))
+
+    ruler = nlp_ruler.get_pipe("entity_ruler")
+    scanner = nlp_scan.get_pipe("alias_scanner")
+
+    # Time the component alone, on freshly tokenized docs.
+    docs_r = [nlp_ruler.make_doc(t) for t in texts]
+    docs_s = [nlp_scan.make_doc(t) for t in texts]
+    lat_ruler = time_each(ruler, docs_r)
+    lat_scan = time_each(scanner, docs_s)
+
+    mismatches = [
+        i for i, (a, b) in enumerate(zip(docs_r, docs_s))
+        if _spans(a) != _spans(b)
+    ]
+
+    return {
+        "model": model,
+        "n_docs": len(texts),
+        "n_tokens": sum(len(d) for d in docs_s),
+        "build_s": {"entity_ruler": build_ruler, "alias_scanner": build_scan},
+        "per_doc_us": {
+            "entity_ruler": percentiles(lat_ruler),
+            "alias_scanner": percentiles(lat_scan),
+        },
+        "parity": {
+            "mismatched_docs": len(mismatches),
+            "first_mismatches": mismatches[:10],
+        },
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--model", default="blank:en")
+    ap.add_argument("--texts", type=Path, default=None)
+    ap.add_argument("--n-docs", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, default=None)
+    args = ap.parse_args(argv)
+
+    gaz = load_reference_gazetteer()
+    if args.texts:
+        texts = [l for l in args.texts.read_text(encoding="utf-8").splitlines() if l.strip()]
+    else:
+        texts = synthetic_texts(gaz, args.n_docs, args.seed)
+
+    report = run(args.model, texts, gaz)
+    report["environment"] = environment()
+    write_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
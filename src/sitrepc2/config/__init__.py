@@ -3,21 +3,33 @@ Configuration and path helpers for sitrepc2.
 """
 
 from .paths import (
+    alias_index_path,
+    doc_cache_path,
     find_repo_root,
     get_dotpath,
-    gazetteer_paths,
-    get_lexicon,
+    gazetteer_snapshot_path,
+    match_store_path,
+    ref_path,
     reference_root,
+    ruler_cache_path,
+    search_phrase_cache_path,
+    sentence_cache_path,
     source_gazetteer_paths,
     source_lexicon_path,
 )
 
 __all__ = [
+    "alias_index_path",
+    "doc_cache_path",
     "find_repo_root",
     "get_dotpath",
-    "gazetteer_paths",
-    "get_lexicon",
+    "gazetteer_snapshot_path",
+    "match_store_path",
+    "ref_path",
     "reference_root",
+    "ruler_cache_path",
+    "search_phrase_cache_path",
+    "sentence_cache_path",
     "source_gazetteer_paths",
     "source_lexicon_path",
-]
\ No newline at end of file
+]
@@ -49,9 +49,17 @@ def dot_path(root: Path, path: str | Path) -> Path:
 GAZ_LOCALE = "locale_lookup.csv"
 GAZ_REGION = "region_lookup.csv"
 GAZ_GROUPS = "group_lookup.csv"
+GAZ_DIRECTIONS = "direction_lookup.csv"
 # GAZ_FEATURES = "features_expanded.csv"
 LEX_JSON = "war_lexicon.json"
 TGM_SOURCES = "tg_channels.jsonl"
+GAZ_SNAPSHOT = "gazetteer.snapshot"
+DOC_CACHE = "doc_cache"
+SENTENCE_CACHE = "sentence_cache.jsonl"
+RULER_CACHE = "ruler_cache"
+SEARCH_PHRASE_CACHE = "search_phrases.pickle"
+MATCH_STORE = "match_store.sqlite"
+ALIAS_INDEX = "alias_index.sqlite"
 GAZ_PATHS = (
     GAZ_LOCALE,
     GAZ_REGION,
@@ -71,6 +79,34 @@ def tg_channels_path(root: Path) -> Path:
     """Return workspace Telegram channel list path in `.sitrepc2/`."""
     return dot_path(root, TGM_SOURCES)
 
+def gazetteer_snapshot_path(root: Path) -> Path:
+    """Return workspace compiled gazetteer snapshot directory in `.sitrepc2/`."""
+    return dot_path(root, GAZ_SNAPSHOT)
+
+def doc_cache_path(root: Path) -> Path:
+    """Return workspace parsed-Doc cache directory in `.sitrepc2/`."""
+    return dot_path(root, DOC_CACHE)
+
+def sentence_cache_path(root: Path) -> Path:
+    """Return workspace sentence-level match cache path in `.sitrepc2/`."""
+    return dot_path(root, SENTENCE_CACHE)
+
+def ruler_cache_path(root: Path) -> Path:
+    """Return workspace compiled entity-ruler pattern directory in `.sitrepc2/`."""
+    return dot_path(root, RULER_CACHE)
+
+def search_phrase_cache_path(root: Path) -> Path:
+    """Return workspace built Holmes search-phrase cache path in `.sitrepc2/`."""
+    return dot_path(root, SEARCH_PHRASE_CACHE)
+
+def match_store_path(root: Path) -> Path:
+    """Return workspace per-post raw Holmes match store path in `.sitrepc2/`."""
+    return dot_path(root, MATCH_STORE)
+
+def alias_index_path(root: Path) -> Path:
+    """Return workspace gazetteer alias → post/event index path in `.sitrepc2/`."""
+    return dot_path(root, ALIAS_INDEX)
+
 # ---------------------------------------------------------------------------
 # 3. Canonical reference files (read-only inside installed package)
 # ---------------------------------------------------------------------------
@@ -91,6 +127,10 @@ def source_gazetteer_paths() -> Tuple[Path, Path, Path]:
     """Return canonical gazetteer paths inside the installed package."""
     return tuple(ref_path(gaz) for gaz in GAZ_PATHS)
 
+def source_ruler_gazetteer_paths() -> Tuple[Path, Path, Path, Path]:
+    """Return the canonical locale, region, group and direction CSVs the entity ruler is built from."""
+    return tuple(ref_path(gaz) for gaz in (GAZ_LOCALE, GAZ_REGION, GAZ_GROUPS, GAZ_DIRECTIONS))
+
 def source_op_groups_path() -> Path:
     return ref_path(GAZ_GROUPS)
 
@@ -3,10 +3,10 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, List, Union, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Tuple, Dict, Any
 
 if TYPE_CHECKING:
-    from gazetteer.typedefs.import LocaleEntry, RegionEntry, OpGroupEntry, DirectionEntry
+    from sitrepc2.gazetteer.typedefs import LocaleEntry
 
 
 # ---------------------------------------------------------------------------
@@ -163,6 +163,10 @@ class Event:
     locations: List[Location] = field(default_factory=list)
     contexts: List[SitRepContext] = field(default_factory=list)
 
+    negated: bool = False
+    uncertain: bool = False
+    involves_coreference: bool = False
+
 
 @dataclass
 class Section:
@@ -0,0 +1,228 @@
+# src/sitrepc2/gazetteer/fuzzy.py
+"""
+Approximate alias lookup (SymSpell-style deletion dictionary).
+
+Every alias key contributes all strings obtainable by deleting up to
+`max_distance` characters from its first `prefix_length` characters.
+A query generates the same deletions of its own prefix; aliases sharing
+any deletion are verified with a banded Damerau-Levenshtein (OSA)
+distance on the full strings.
+
+Per-query work is bounded by the query length, not the gazetteer size:
+at most Σ C(prefix_length, d) dictionary probes, followed by at most
+`max_candidates` verifications of ≤ (2·max_distance + 1)·len cells each.
+Candidates whose length alone rules them out are skipped for free.
+
+A patched index (FuzzyAliasIndex.patched) shares the deletion dictionary
+and marks removed keys dead; lookup skips them before they cost budget.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+def osa_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal-string-alignment distance between `a` and `b`, or
+    `max_distance + 1` as soon as it is known to exceed `max_distance`.
+    The shared prefix and suffix are stripped first, and only the
+    diagonal band |i - j| <= max_distance is evaluated.
+    """
+    if a == b:
+        return 0
+    big = max_distance + 1
+    la, lb = len(a), len(b)
+    if abs(la - lb) > max_distance:
+        return big
+
+    # Strip common suffix, then common prefix.
+    while la and lb and a[la - 1] == b[lb - 1]:
+        la -= 1
+        lb -= 1
+    p = 0
+    while p < la and p < lb and a[p] == b[p]:
+        p += 1
+    a, b = a[p:la], b[p:lb]
+    la, lb = la - p, lb - p
+
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+    if la == 0:
+        return lb if lb <= max_distance else big
+
+    prev2: List[int] = []
+    prev = [j if j <= max_distance else big for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        lo = i - max_distance if i > max_distance else 1
+        hi = i + max_distance if i + max_distance < lb else lb
+        cur = [big] * (lb + 1)
+        cur[0] = i if i <= max_distance else big
+        ca = a[i - 1]
+        ca_prev = a[i - 2] if i > 1 else None
+        row_min = big
+        left = cur[lo - 1]
+        for j in range(lo, hi + 1):
+            cb = b[j - 1]
+            v = prev[j - 1] if ca == cb else prev[j - 1] + 1
+            t = prev[j] + 1
+            if t < v:
+                v = t
+            t = left + 1
+            if t < v:
+                v = t
+            if j > 1 and ca == b[j - 2] and ca_prev == cb:
+                t = prev2[j - 2] + 1
+                if t < v:
+                    v = t
+            cur[j] = v
+            left = v
+            if v < row_min:
+                row_min = v
+        if row_min > max_distance:
+            return big
+        prev2, prev = prev, cur
+
+    return prev[lb] if prev[lb] <= max_distance else big
+
+
+def _deletes(s: str, max_distance: int) -> Set[str]:
+    """`s` plus every string reachable by deleting up to `max_distance` chars."""
+    out = {s}
+    frontier = {s}
+    for _ in range(max_distance):
+        nxt: Set[str] = set()
+        for w in frontier:
+            for k in range(len(w)):
+                nxt.add(w[:k] + w[k + 1:])
+        nxt -= out
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+# ======================================================================
+# FuzzyAliasIndex
+# ======================================================================
+
+class FuzzyAliasIndex:
+    """
+    Deletion dictionary over normalized alias keys.
+
+    `lookup` returns (distance, key) pairs with distance <= the cap,
+    ranked by distance, then by length difference, then alphabetically.
+
+    Keys are never taken out of the deletion dictionary: `patched` marks
+    them dead instead, so indexes over older alias sets keep sharing it.
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[str] = (),
+        *,
+        max_distance: int = 2,
+        prefix_length: int = 7,
+        max_candidates: int = 128,
+    ):
+        if prefix_length <= max_distance:
+            raise ValueError("prefix_length must exceed max_distance")
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.max_candidates = max_candidates
+
+        self._keys: List[str] = []
+        self._key_ids: Dict[str, int] = {}
+        self._deletes: Dict[str, List[int]] = {}
+        # ids of removed keys, skipped by lookup
+        self._dead: FrozenSet[int] = frozenset()
+
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self._key_ids) - len(self._dead)
+
+    def __contains__(self, key: object) -> bool:
+        kid = self._key_ids.get(key)  # type: ignore[arg-type]
+        return kid is not None and kid not in self._dead
+
+    @property
+    def dead(self) -> int:
+        """Number of removed keys still in the deletion dictionary."""
+        return len(self._dead)
+
+    def patched(self, add: Iterable[str] = (), remove: Iterable[str] = ()) -> "FuzzyAliasIndex":
+        """
+        Index over this one's keys plus `add`, minus `remove`. The deletion
+        dictionary is shared, so `self` keeps its results (it may see the
+        added keys, as any reader of a shared dictionary does).
+        """
+        new = copy.copy(self)
+        dead = set(self._dead)
+        for key in remove:
+            kid = self._key_ids.get(key)
+            if kid is not None:
+                dead.add(kid)
+        new._dead = frozenset(dead)
+        for key in add:
+            new.add(key)
+        return new
+
+    def add(self, key: str) -> None:
+        if not key:
+            return
+        kid = self._key_ids.get(key)
+        if kid is not None:
+            if kid in self._dead:
+                self._dead = self._dead - {kid}
+            return
+        kid = len(self._keys)
+        self._keys.append(key)
+        self._key_ids[key] = kid
+        for d in _deletes(key[:self.prefix_length], self.max_distance):
+            self._deletes.setdefault(d, []).append(kid)
+
+    def lookup(
+        self,
+        key: str,
+        max_distance: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, str]]:
+        if not key:
+            return []
+        cap = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+
+        seen: Set[int] = set()
+        dead = self._dead
+        budget = self.max_candidates
+        deletes = self._deletes
+        keys = self._keys
+        n = len(key)
+        scored: List[Tuple[int, int, str]] = []
+
+        # Probe the smallest deletions last: exact and near-exact prefixes
+        # are the likeliest hits, so they are verified before the budget
+        # runs out.
+        probes = sorted(_deletes(key[:self.prefix_length], cap), key=len, reverse=True)
+        for probe in probes:
+            for kid in deletes.get(probe, ()):
+                if kid in seen or kid in dead:
+                    continue
+                seen.add(kid)
+                cand = keys[kid]
+                if abs(len(cand) - n) > cap:
+                    continue
+                d = osa_distance(key, cand, cap)
+                if d <= cap:
+                    scored.append((d, abs(len(cand) - n), cand))
+                budget -= 1
+                if budget <= 0:
+                    break
+            if budget <= 0:
+                break
+
+        scored.sort()
+        if limit is not None:
+            scored = scored[:limit]
+        return [(d, cand) for d, _, cand in scored]
@@ -1,11 +1,19 @@
 # src/sitrepc2/gazetteer/index.py
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Iterable
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterator, List, Mapping, MutableMapping, Optional, Iterable, Sequence, Set, Tuple
 import math
+import threading
+
+import numpy as np
 
 from sitrepc2.util.normalize import normalize_location_key
 from sitrepc2.util.encoding import decode_coord_u64
+from sitrepc2.spatial.grid import LatLonGrid
+from sitrepc2.gazetteer.store import LocaleStore
+from sitrepc2.gazetteer.fuzzy import FuzzyAliasIndex
+from sitrepc2.gazetteer.translit import fold_location_key
 
 from sitrepc2.gazetteer.typedefs import (
     LocaleEntry,
@@ -15,6 +23,475 @@ from sitrepc2.gazetteer.typedefs import (
 )
 
 
+def _haversine_km(lat1, lon1, lat2, lon2) -> float:
+    R = 6371.0
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    )
+    return R * 2 * math.asin(math.sqrt(a))
+
+
+def _row_alias_keys(store: LocaleStore, i: int) -> List[str]:
+    """Normalized alias keys of row i (aliases + name, duplicates kept)."""
+    return [normalize_location_key(a) for a in store.aliases_of(i) + [store.names[i]]]
+
+
+def composite_key(key: str, code: int) -> str:
+    """Key of the (alias, region/group code) maps."""
+    return f"{key}\x1f{code}"
+
+
+def _composite(by_key: Mapping[str, List[int]], codes: List[int]) -> Dict[str, List[int]]:
+    out: Dict[str, List[int]] = {}
+    for key, rows in by_key.items():
+        for i in rows:
+            c = codes[i]
+            if c >= 0:
+                out.setdefault(composite_key(key, c), []).append(i)
+    return out
+
+
+def _recompose(
+    comp: MutableMapping[str, List[int]],
+    key: str,
+    old_rows: Sequence[int],
+    new_rows: Sequence[int],
+    codes: np.ndarray,
+) -> None:
+    """Rebuild every (key, code) entry of `comp` from `new_rows`."""
+    for c in {int(codes[i]) for i in old_rows}:
+        comp.pop(composite_key(key, c), None)
+    for i in new_rows:
+        c = int(codes[i])
+        if c >= 0:
+            ck = composite_key(key, c)
+            comp[ck] = list(comp.get(ck, ())) + [i]
+
+
+# ======================================================================
+# Layered maps (patched states)
+# ======================================================================
+
+# A layered map whose overlay outgrows this fraction of its base is folded
+# into a plain dict on the next patch.
+_FOLD_FRACTION = 0.25
+
+
+class _LayeredMap(MutableMapping):
+    """
+    Read-only base map plus a small overlay: keys set since the base was
+    built live in `overlay`, keys deleted from the base in `removed`. The
+    base is never written, so a snapshot-loaded HashedRowsMap stays on its
+    memory map across patches.
+    """
+
+    __slots__ = ("base", "overlay", "removed")
+
+    def __init__(self, base: Mapping, overlay: Optional[dict] = None, removed: Optional[Set] = None):
+        self.base = base
+        self.overlay = {} if overlay is None else overlay
+        self.removed = set() if removed is None else removed
+
+    def __getitem__(self, key):
+        try:
+            return self.overlay[key]
+        except KeyError:
+            pass
+        if key in self.removed:
+            raise KeyError(key)
+        return self.base[key]
+
+    def get(self, key, default=None):
+        value = self.overlay.get(key)
+        if value is not None:
+            return value
+        if key in self.removed:
+            return default
+        return self.base.get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key in self.overlay or (key not in self.removed and key in self.base)
+
+    def __iter__(self) -> Iterator:
+        overlay, removed = self.overlay, self.removed
+        yield from overlay
+        for key in self.base:
+            if key not in overlay and key not in removed:
+                yield key
+
+    def __len__(self) -> int:
+        new = sum(1 for key in self.overlay if key not in self.base)
+        return len(self.base) - len(self.removed) + new
+
+    def __setitem__(self, key, value) -> None:
+        self.overlay[key] = value
+        self.removed.discard(key)
+
+    def __delitem__(self, key) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self.overlay.pop(key, None)
+        if key in self.base:
+            self.removed.add(key)
+
+    def pop(self, key, *default):
+        # MutableMapping.pop goes through __getitem__ and __delitem__; the
+        # hot path in _recompose mostly misses, so check membership once.
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+
+def _layered(m: Mapping) -> _LayeredMap:
+    """
+    Writable copy of `m` for a patch: copies only the overlay and removed
+    markers of a layered map, or layers over any other map as-is. An
+    overlay past _FOLD_FRACTION of its base is folded into a dict first.
+    """
+    if isinstance(m, _LayeredMap):
+        if len(m.overlay) + len(m.removed) <= _FOLD_FRACTION * len(m.base):
+            return _LayeredMap(m.base, dict(m.overlay), set(m.removed))
+        m = dict(m.items())
+    return _LayeredMap(m)
+
+
+# ======================================================================
+# Patch result
+# ======================================================================
+
+@dataclass(frozen=True)
+class GazetteerDelta:
+    """
+    What a locale patch changed, in terms downstream caches care about.
+
+      - added_aliases:   alias keys that resolve now and did not before
+      - removed_aliases: alias keys that no longer resolve
+      - changed_aliases: every alias key whose locale set changed
+                         (superset of the two above)
+      - added_cids / removed_cids: locale identities added / dropped
+                         (a replace shows up in both)
+    """
+    added_aliases: FrozenSet[str] = frozenset()
+    removed_aliases: FrozenSet[str] = frozenset()
+    changed_aliases: FrozenSet[str] = frozenset()
+    added_cids: FrozenSet[int] = frozenset()
+    removed_cids: FrozenSet[int] = frozenset()
+
+    def __bool__(self) -> bool:
+        return bool(self.changed_aliases or self.added_cids or self.removed_cids)
+
+
+# ======================================================================
+# Locale state (swapped atomically)
+# ======================================================================
+
+class _LocaleState:
+    """
+    Everything derived from the locale rows. A GazetteerIndex holds exactly
+    one of these and replaces it with a single reference assignment, so a
+    reader that grabs `index._state` once sees a consistent snapshot even
+    while a patch is being applied.
+
+    Rows are never renumbered: removed rows stay in the store and are
+    cleared in `alive`; added rows are appended.
+    """
+
+    def __init__(
+        self,
+        store: LocaleStore,
+        by_alias: Mapping[str, List[int]],
+        by_fold: Mapping[str, List[int]],
+        by_cid: Mapping[int, int],
+        region_codes_by_key: Dict[str, List[int]],
+        group_codes_by_key: Dict[str, List[int]],
+        by_alias_region: Mapping[str, List[int]],
+        by_alias_group: Mapping[str, List[int]],
+        by_fold_region: Mapping[str, List[int]],
+        by_fold_group: Mapping[str, List[int]],
+        alive: Optional[np.ndarray] = None,
+        grid: Optional[LatLonGrid] = None,
+        fuzzy: Optional[FuzzyAliasIndex] = None,
+    ):
+        self.store = store
+        self.by_alias = by_alias
+        self.by_fold = by_fold
+        self.by_cid = by_cid
+        self.region_codes_by_key = region_codes_by_key
+        self.group_codes_by_key = group_codes_by_key
+        # (alias key, region / group code) → rows; see composite_key
+        self.by_alias_region = by_alias_region
+        self.by_alias_group = by_alias_group
+        self.by_fold_region = by_fold_region
+        self.by_fold_group = by_fold_group
+        self.alive = alive
+        self._grid = grid
+        self._fuzzy = fuzzy
+        self._lazy_lock = threading.Lock()
+        # (kind, raw constraint text) → codes; constraint strings repeat a lot
+        self._constraint_codes: Dict[Tuple[str, str], Tuple[int, ...]] = {}
+
+    # ---------------------- Construction -----------------------------------
+
+    @classmethod
+    def build(cls, store: LocaleStore) -> "_LocaleState":
+        by_alias: Dict[str, List[int]] = {}
+        by_cid: Dict[int, int] = {}
+
+        for i, cid in enumerate(store.cid.tolist()):
+            # CID lookup
+            by_cid[cid] = i
+
+            # aliases & name → rows
+            for key in _row_alias_keys(store, i):
+                by_alias.setdefault(key, []).append(i)
+
+        # Secondary key: transliteration-folded alias → rows, consulted
+        # only when the exact alias key misses.
+        by_fold: Dict[str, List[int]] = {}
+        for key, rows in by_alias.items():
+            bucket = by_fold.setdefault(fold_location_key(key), [])
+            for i in rows:
+                if i not in bucket:
+                    bucket.append(i)
+        for bucket in by_fold.values():
+            bucket.sort()
+
+        region_code = store.region_code.tolist()
+        group_code = store.group_code.tolist()
+
+        return cls(
+            store,
+            by_alias,
+            by_fold,
+            by_cid,
+            _codes_by_key(store.regions),
+            _codes_by_key(store.groups),
+            _composite(by_alias, region_code),
+            _composite(by_alias, group_code),
+            _composite(by_fold, region_code),
+            _composite(by_fold, group_code),
+        )
+
+    # ---------------------- Lazy indexes ------------------------------------
+
+    @property
+    def grid(self) -> LatLonGrid:
+        # Built on first spatial query; snapshot-loaded indexes that only
+        # do alias lookups never pay for it.
+        if self._grid is None:
+            with self._lazy_lock:
+                if self._grid is None:
+                    st = self.store
+                    points = list(zip(st.lat.tolist(), st.lon.tolist()))
+                    # Same distance function as the query API, so grid results
+                    # match a linear scan exactly.
+                    grid = LatLonGrid(points, _haversine_km)
+                    if self.alive is not None:
+                        grid = grid.patched(remove=np.flatnonzero(~self.alive).tolist())
+                    self._grid = grid
+        return self._grid
+
+    @property
+    def fuzzy(self) -> FuzzyAliasIndex:
+        # Built on first fuzzy query, like the spatial grid.
+        if self._fuzzy is None:
+            with self._lazy_lock:
+                if self._fuzzy is None:
+                    self._fuzzy = FuzzyAliasIndex(self.by_alias)
+        return self._fuzzy
+
+    # ---------------------- Row helpers -------------------------------------
+
+    def live_rows(self, rows: np.ndarray) -> np.ndarray:
+        return rows if self.alive is None else rows[self.alive[rows]]
+
+    def entries(self, rows: Iterable[int]) -> List[LocaleEntry]:
+        entry = self.store.entry
+        return [entry(int(i)) for i in rows]
+
+    def alias_rows(self, text: str) -> Sequence[int]:
+        """Rows for an alias: exact key first, then its folded key."""
+        key = normalize_location_key(text)
+        rows = self.by_alias.get(key)
+        if rows:
+            return rows
+        return self.by_fold.get(fold_location_key(key), ())
+
+    def constraint_codes(self, kind: str, text: str) -> Tuple[int, ...]:
+        codes = self._constraint_codes.get((kind, text))
+        if codes is None:
+            by_key = self.region_codes_by_key if kind == "region" else self.group_codes_by_key
+            codes = tuple(by_key.get(normalize_location_key(text), ()))
+            if len(self._constraint_codes) >= 4096:
+                self._constraint_codes.clear()
+            self._constraint_codes[(kind, text)] = codes
+        return codes
+
+    def constrained_rows(self, text: str, kind: str, constraint: str) -> Sequence[int]:
+        """
+        alias_rows(text) restricted to rows whose region (kind="region") or
+        ru_group (kind="group") matches `constraint`: one composite-map
+        probe per matching code.
+        """
+        codes = self.constraint_codes(kind, constraint)
+        if not codes:
+            return ()
+        key = normalize_location_key(text)
+        if key in self.by_alias:
+            comp = self.by_alias_region if kind == "region" else self.by_alias_group
+        else:
+            key = fold_location_key(key)
+            comp = self.by_fold_region if kind == "region" else self.by_fold_group
+        if len(codes) == 1:
+            return comp.get(composite_key(key, codes[0]), ())
+        return sorted(i for c in codes for i in comp.get(composite_key(key, c), ()))
+
+    # ---------------------- Patching ----------------------------------------
+
+    def patched(
+        self,
+        remove_rows: Sequence[int],
+        add: Sequence[LocaleEntry],
+    ) -> Tuple["_LocaleState", GazetteerDelta]:
+        """
+        New state with `remove_rows` dropped and `add` appended; `self` is
+        not modified. The new maps layer the entries of touched keys over
+        this state's maps (see _LayeredMap) rather than copying them, so a
+        patch costs the touched keys plus the overlay carried from earlier
+        patches; `GazetteerIndex.compacted` builds flat maps again. The
+        store arrays and `alive` are still copied.
+        """
+        old_store = self.store
+        store = old_store.appended(add)
+        base = len(old_store)
+        added_rows = list(range(base, base + len(add)))
+
+        by_alias: MutableMapping[str, List[int]] = _layered(self.by_alias)
+        by_fold: MutableMapping[str, List[int]] = _layered(self.by_fold)
+        by_cid: MutableMapping[int, int] = _layered(self.by_cid)
+        by_alias_region: MutableMapping[str, List[int]] = _layered(self.by_alias_region)
+        by_alias_group: MutableMapping[str, List[int]] = _layered(self.by_alias_group)
+        by_fold_region: MutableMapping[str, List[int]] = _layered(self.by_fold_region)
+        by_fold_group: MutableMapping[str, List[int]] = _layered(self.by_fold_group)
+
+        alive = np.ones(len(store), dtype=bool)
+        if self.alive is not None:
+            alive[:base] = self.alive
+
+        touched: set = set()
+        removed_cids: set = set()
+        added_cids: set = set()
+
+        # --- removals ---
+        drop = set(remove_rows)
+        for i in drop:
+            alive[i] = False
+            cid = int(old_store.cid[i])
+            if by_cid.get(cid) == i:
+                del by_cid[cid]
+            removed_cids.add(cid)
+            touched.update(_row_alias_keys(old_store, i))
+
+        for key in touched:
+            rows = [r for r in by_alias.get(key, ()) if r not in drop]
+            if rows:
+                by_alias[key] = rows
+            else:
+                by_alias.pop(key, None)
+            fkey = fold_location_key(key)
+            frows = [r for r in by_fold.get(fkey, ()) if r not in drop]
+            if frows:
+                by_fold[fkey] = frows
+            else:
+                by_fold.pop(fkey, None)
+
+        # --- additions (appended rows keep every list in ascending order) ---
+        for i in added_rows:
+            cid = int(store.cid[i])
+            by_cid[cid] = i
+            added_cids.add(cid)
+            keys = _row_alias_keys(store, i)
+            touched.update(keys)
+            for key in keys:
+                by_alias[key] = list(by_alias.get(key, ())) + [i]
+                fkey = fold_location_key(key)
+                frows = list(by_fold.get(fkey, ()))
+                if i not in frows:
+                    by_fold[fkey] = frows + [i]
+
+        region_code, group_code = store.region_code, store.group_code
+        for key in touched:
+            old, new = self.by_alias.get(key, ()), by_alias.get(key, ())
+            _recompose(by_alias_region, key, old, new, region_code)
+            _recompose(by_alias_group, key, old, new, group_code)
+        for fkey in {fold_location_key(k) for k in touched}:
+            old, new = self.by_fold.get(fkey, ()), by_fold.get(fkey, ())
+            _recompose(by_fold_region, fkey, old, new, region_code)
+            _recompose(by_fold_group, fkey, old, new, group_code)
+
+        before = self.by_alias
+        added_aliases = frozenset(k for k in touched if k in by_alias and k not in before)
+        removed_aliases = frozenset(k for k in touched if k not in by_alias and k in before)
+        changed_aliases = frozenset(
+            k for k in touched if list(by_alias.get(k, ())) != list(before.get(k, ()))
+        )
+
+        grid = None
+        if self._grid is not None:
+            grid = self._grid.patched(
+                remove=drop,
+                add=[(float(store.lat[i]), float(store.lon[i])) for i in added_rows],
+            )
+
+        fuzzy = self._fuzzy
+        if fuzzy is not None:
+            # Removed keys become tombstones of the new index only; once
+            # they pile up, the next fuzzy query rebuilds from by_alias.
+            fuzzy = fuzzy.patched(add=added_aliases, remove=removed_aliases)
+            if fuzzy.dead > _FOLD_FRACTION * len(fuzzy):
+                fuzzy = None
+
+        state = _LocaleState(
+            store,
+            by_alias,
+            by_fold,
+            by_cid,
+            _codes_by_key(store.regions),
+            _codes_by_key(store.groups),
+            by_alias_region,
+            by_alias_group,
+            by_fold_region,
+            by_fold_group,
+            alive=alive,
+            grid=grid,
+            fuzzy=fuzzy,
+        )
+        delta = GazetteerDelta(
+            added_aliases=added_aliases,
+            removed_aliases=removed_aliases,
+            changed_aliases=changed_aliases,
+            added_cids=frozenset(added_cids),
+            removed_cids=frozenset(removed_cids),
+        )
+        return state, delta
+
+
+def _codes_by_key(vocab: Sequence[str]) -> Dict[str, List[int]]:
+    # normalized region / group key → vocab codes in the store
+    out: Dict[str, List[int]] = {}
+    for code, value in enumerate(vocab):
+        out.setdefault(normalize_location_key(value), []).append(code)
+    return out
+
+
 # ======================================================================
 # GazetteerIndex (rewritten)
 # ======================================================================
@@ -22,55 +499,109 @@ from sitrepc2.gazetteer.typedefs import (
 class GazetteerIndex:
     """
     In-memory gazetteer index providing:
-      • alias lookups
+      • alias lookups (exact, transliteration-folded fallback, and
+        bounded-edit-distance fuzzy)
       • region / group / direction resolution
-      • nearest-neighbor spatial search
+      • nearest-neighbor spatial search (grid-bucketed)
       • same-name disambiguation logic
+      • live locale patching (add / remove / replace)
+
+    This class receives *already parsed* dataclass lists (or a columnar
+    LocaleStore for locales). CSV loading is handled in gazetteer/io.py.
 
-    This class receives *already parsed* dataclass lists.
-    CSV loading is handled in gazetteer/io.py.
+    Locales are held column-wise in a LocaleStore; internal maps store row
+    indices, and LocaleEntry objects are only built for returned results.
+    All locale-derived state lives in one `_LocaleState` that patches
+    replace wholesale, so lookups running concurrently with a patch see
+    either the old gazetteer or the new one, never a mix.
     """
 
     def __init__(
         self,
-        locales: List[LocaleEntry],
+        locales: Sequence[LocaleEntry] | LocaleStore,
         regions: List[RegionEntry],
         groups: List[GroupEntry],
         directions: List[DirectionEntry],
     ):
-        self.locales = locales
+        if not isinstance(locales, LocaleStore):
+            locales = LocaleStore.from_entries(locales)
+        self._init(_LocaleState.build(locales), regions, groups, directions)
+
+    def _init(
+        self,
+        state: _LocaleState,
+        regions: List[RegionEntry],
+        groups: List[GroupEntry],
+        directions: List[DirectionEntry],
+    ) -> None:
+        self._state = state
+        self._patch_lock = threading.RLock()
         self.regions = regions
         self.groups = groups
         self.directions = directions
 
         # Build lookup maps ---------------------------------------------------
-        self._build_locale_maps()
         self._build_region_maps()
         self._build_group_maps()
         self._build_direction_maps()
 
+    @classmethod
+    def _from_state(
+        cls,
+        state: _LocaleState,
+        regions: List[RegionEntry],
+        groups: List[GroupEntry],
+        directions: List[DirectionEntry],
+    ) -> "GazetteerIndex":
+        gaz = cls.__new__(cls)
+        gaz._init(state, regions, groups, directions)
+        return gaz
+
     # ======================================================================
-    # Internal map builders
+    # Locale state accessors
     # ======================================================================
 
-    def _build_locale_maps(self):
-        self._locale_by_alias: Dict[str, List[LocaleEntry]] = {}
-        self._locale_by_region: Dict[str, List[LocaleEntry]] = {}
-        self._locale_by_cid: Dict[int, LocaleEntry] = {}
+    @property
+    def locales(self) -> LocaleStore:
+        """Row store. After removals it still holds the dead rows; see live_locales()."""
+        return self._state.store
 
-        for loc in self.locales:
-            # CID lookup
-            self._locale_by_cid[loc.cid] = loc
+    @property
+    def _locale_by_alias(self) -> Mapping[str, List[int]]:
+        return self._state.by_alias
 
-            # region → list
-            if loc.region:
-                region_key = normalize_location_key(loc.region)
-                self._locale_by_region.setdefault(region_key, []).append(loc)
+    @property
+    def _locale_by_fold(self) -> Mapping[str, List[int]]:
+        return self._state.by_fold
 
-            # aliases & name → list
-            for alias in loc.aliases + [loc.name]:
-                key = normalize_location_key(alias)
-                self._locale_by_alias.setdefault(key, []).append(loc)
+    @property
+    def _locale_by_cid(self) -> Mapping[int, int]:
+        return self._state.by_cid
+
+    @property
+    def _region_codes_by_key(self) -> Dict[str, List[int]]:
+        return self._state.region_codes_by_key
+
+    @property
+    def _group_codes_by_key(self) -> Dict[str, List[int]]:
+        return self._state.group_codes_by_key
+
+    @property
+    def has_dead_rows(self) -> bool:
+        alive = self._state.alive
+        return alive is not None and not bool(alive.all())
+
+    def live_locales(self) -> List[LocaleEntry]:
+        st = self._state
+        return st.entries(st.live_rows(np.arange(len(st.store))))
+
+    def compacted(self) -> "GazetteerIndex":
+        """Fresh index over the live rows only (rows renumbered)."""
+        return GazetteerIndex(self.live_locales(), self.regions, self.groups, self.directions)
+
+    # ======================================================================
+    # Internal map builders
+    # ======================================================================
 
     def _build_region_maps(self):
         self._region_by_alias: Dict[str, RegionEntry] = {}
@@ -96,6 +627,59 @@ class GazetteerIndex:
                 key = normalize_location_key(alias)
                 self._direction_by_alias[key] = d
 
+    # ======================================================================
+    # Live patching
+    # ======================================================================
+
+    def apply_patch(
+        self,
+        *,
+        add: Sequence[LocaleEntry] = (),
+        remove: Iterable[int] = (),
+        replace: Sequence[LocaleEntry] = (),
+    ) -> GazetteerDelta:
+        """
+        Add new locales, remove locales by cid, and replace locales
+        (matched by cid) in a running index.
+
+        The alias, folded-alias, cid and region/group maps, the spatial grid
+        and the fuzzy index are updated for the touched rows only. The new
+        state is published with a single reference swap; concurrent patches
+        are serialized.
+
+        Raises ValueError (and changes nothing) if an added cid already
+        exists or a removed/replaced cid does not.
+
+        The returned delta lists the alias keys that appeared or vanished;
+        pass it to `lss.ruler.apply_gazetteer_delta` to update the pipeline.
+        """
+        with self._patch_lock:
+            st = self._state
+            remove_rows: List[int] = []
+
+            for cid in list(remove) + [e.cid for e in replace]:
+                i = st.by_cid.get(int(cid))
+                if i is None:
+                    raise ValueError(f"Locale CID {cid} not found in gazetteer")
+                remove_rows.append(i)
+
+            for e in add:
+                if e.cid in st.by_cid:
+                    raise ValueError(f"Locale CID {e.cid} already in gazetteer")
+
+            new_state, delta = st.patched(remove_rows, list(add) + list(replace))
+            self._state = new_state
+            return delta
+
+    def upsert_locales(self, entries: Sequence[LocaleEntry]) -> GazetteerDelta:
+        """Apply patch rows (e.g. from io.load_patch): replace by cid, else add."""
+        with self._patch_lock:
+            by_cid = self._state.by_cid
+            return self.apply_patch(
+                add=[e for e in entries if e.cid not in by_cid],
+                replace=[e for e in entries if e.cid in by_cid],
+            )
+
     # ======================================================================
     # Lookup API
     # ======================================================================
@@ -128,14 +712,44 @@ class GazetteerIndex:
     # ---------------------- Locale -----------------------------------------
 
     def search_locale(self, text: str) -> List[LocaleEntry]:
+        st = self._state
+        return st.entries(st.alias_rows(text))
+
+    def search_locale_fuzzy(
+        self,
+        text: str,
+        max_distance: int = 2,
+        limit: int = 10,
+    ) -> List[Tuple[int, LocaleEntry]]:
+        """
+        Locales whose alias is within `max_distance` edits (insert, delete,
+        substitute, adjacent transpose) of `text`, as (distance, entry)
+        pairs ranked closest first. Exact matches come back at distance 0.
+
+        Each locale appears once, at its best distance; at most `limit`
+        entries are returned.
+        """
+        st = self._state
         key = normalize_location_key(text)
-        return list(self._locale_by_alias.get(key, []))
+        out: List[Tuple[int, LocaleEntry]] = []
+        seen = set()
+        for d, alias in st.fuzzy.lookup(key, max_distance):
+            for i in st.by_alias.get(alias, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                out.append((d, st.store.entry(i)))
+                if len(out) >= limit:
+                    return out
+        return out
 
     def get_locale_by_cid(self, cid: int) -> Optional[LocaleEntry]:
-        return self._locale_by_cid.get(cid)
+        st = self._state
+        i = st.by_cid.get(cid)
+        return None if i is None else st.store.entry(i)
 
     def has_locale(self, text: str) -> bool:
-        return bool(self.search_locale(text))
+        return bool(self._state.alias_rows(text))
 
     # ---------------------- Region -----------------------------------------
 
@@ -161,19 +775,26 @@ class GazetteerIndex:
     # ---------------------- Locale+Region combined -----------------------------------------
 
     def locales_in_region(self, region_text: str) -> List[LocaleEntry]:
-        region_key = normalize_location_key(region_text)
-        return list(self._locale_by_region.get(region_key, []))
+        st = self._state
+        codes = st.region_codes_by_key.get(normalize_location_key(region_text), ())
+        return st.entries(st.live_rows(st.store.rows_with_codes(st.store.region_code, codes)))
+
+    def locales_in_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+    ) -> List[LocaleEntry]:
+        st = self._state
+        return st.entries(st.live_rows(st.store.rows_in_bbox(min_lat, min_lon, max_lat, max_lon)))
 
     def search_locale_in_region(self, text: str, region_text: Optional[str]):
         if region_text is None:
             return self.search_locale(text)
 
-        region_key = normalize_location_key(region_text)
-        candidates = self.search_locale(text)
-        return [
-            loc for loc in candidates
-            if loc.region and normalize_location_key(loc.region) == region_key
-        ]
+        st = self._state
+        return st.entries(st.constrained_rows(text, "region", region_text))
 
     # ---------------------- Locale + RU Group -----------------------------------------------
 
@@ -181,67 +802,49 @@ class GazetteerIndex:
         if ru_group is None:
             return self.search_locale(text)
 
-        ru_group = normalize_location_key(ru_group)
-        return [
-            loc for loc in self.search_locale(text)
-            if loc.ru_group and normalize_location_key(loc.ru_group) == ru_group
-        ]
+        st = self._state
+        return st.entries(st.constrained_rows(text, "group", ru_group))
 
     # ======================================================================
     # Nearest-neighbor functions
     # ======================================================================
 
-    @staticmethod
-    def _haversine_km(lat1, lon1, lat2, lon2) -> float:
-        R = 6371.0
-        lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = (
-            math.sin(dlat / 2) ** 2
-            + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-        )
-        return R * 2 * math.asin(math.sqrt(a))
+    _haversine_km = staticmethod(_haversine_km)
 
     def nearest_locale(self, lat: float, lon: float):
-        best = None
-        best_dist = float("inf")
-
-        for loc in self.locales:
-            d = self._haversine_km(lat, lon, loc.lat, loc.lon)
-            if d < best_dist:
-                best = loc
-                best_dist = d
+        st = self._state
+        hits = st.grid.nearest(lat, lon, 1)
+        if not hits:
+            return None, float("inf")
 
-        return best, best_dist
+        d, i = hits[0]
+        return st.store.entry(i), d
 
     def nearest_locale_by_cid(self, cid: int):
         lat, lon = decode_coord_u64(cid)
         return self.nearest_locale(lat, lon)
 
     def nearest_locales(self, lat: float, lon: float, n: int = 5):
-        scored = [
-            (self._haversine_km(lat, lon, loc.lat, loc.lon), loc)
-            for loc in self.locales
+        st = self._state
+        return [
+            (d, st.store.entry(i))
+            for d, i in st.grid.nearest(lat, lon, n)
         ]
-        scored.sort(key=lambda x: x[0])
-        return scored[:n]
 
     def nearest_locales_within(self, lat: float, lon: float, km: float):
-        out = []
-        for loc in self.locales:
-            d = self._haversine_km(lat, lon, loc.lat, loc.lon)
-            if d <= km:
-                out.append((d, loc))
-        return sorted(out, key=lambda x: x[0])
+        st = self._state
+        return [
+            (d, st.store.entry(i))
+            for d, i in st.grid.within(lat, lon, km)
+        ]
 
     # ======================================================================
     # Name-based disambiguation
     # ======================================================================
 
     def get_locales_by_name(self, name: str) -> List[LocaleEntry]:
-        key = normalize_location_key(name)
-        return list(self._locale_by_alias.get(key, []))
+        st = self._state
+        return st.entries(st.alias_rows(name))
 
     def nearest_locale_with_name(self, name: str, lat: float, lon: float):
         candidates = self.get_locales_by_name(name)
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import csv
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 from sitrepc2.gazetteer.typedefs import (
     LocaleEntry,
@@ -11,6 +11,7 @@ from sitrepc2.gazetteer.typedefs import (
     GroupEntry,
     DirectionEntry,
 )
+from sitrepc2.gazetteer.store import LocaleStore, _as_int
 from sitrepc2.util.serialization import serialize, deserialize
 from sitrepc2.util.encoding import decode_coord_u64
 
@@ -46,6 +47,33 @@ def load_locales(path: Path) -> List[LocaleEntry]:
     return out
 
 
+def load_locale_store(path: Path) -> LocaleStore:
+    """
+    Columnar variant of load_locales: rows go straight into a LocaleStore
+    without materializing a LocaleEntry per row.
+    """
+    cols = {
+        "names": [], "aliases": [], "lat": [], "lon": [], "cid": [],
+        "region": [], "ru_group": [], "place": [], "wikidata": [],
+        "usage": [], "source": [],
+    }
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            cols["names"].append(row["name"])
+            cols["aliases"].append(unpack_aliases(row.get("aliases")))
+            cols["lat"].append(float(row["lat"]))
+            cols["lon"].append(float(row["lon"]))
+            cols["cid"].append(int(row["cid"]))
+            cols["region"].append(row.get("region") or None)
+            cols["ru_group"].append(row.get("ru_group") or None)
+            cols["place"].append(row.get("place") or None)
+            cols["wikidata"].append(row.get("wikidata") or None)
+            cols["usage"].append(_as_int(row.get("usage")))
+            cols["source"].append(row.get("source") or "base")
+    return LocaleStore.from_columns(**cols)
+
+
 # ------------------------------
 # Region Loader
 # ------------------------------
@@ -82,18 +110,20 @@ def load_groups(path: Path) -> List[GroupEntry]:
 # Direction Loader
 # ------------------------------
 
-def load_directions(path: Path, locales: List[LocaleEntry]) -> List[DirectionEntry]:
+def load_directions(path: Path, locales: Sequence[LocaleEntry]) -> List[DirectionEntry]:
     out: List[DirectionEntry] = []
     locale_by_cid = {loc.cid: loc for loc in locales}
 
     with path.open("r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            anchor_cid = int(row["anchor"])
+            # direction_lookup.csv ships as `direction,cid[,name,aliases]`
+            anchor_cid = int(row.get("anchor") or row["cid"])
             anchor = locale_by_cid.get(anchor_cid)
             if anchor is None:
                 raise ValueError(f"Direction anchor CID {anchor_cid} not found in locales")
 
+            row["name"] = row.get("name") or row.get("direction")
             row["aliases"] = unpack_aliases(row.get("aliases"))
             row["anchor"] = anchor
             out.append(deserialize(row, DirectionEntry))
@@ -0,0 +1,354 @@
+# src/sitrepc2/gazetteer/snapshot.py
+"""
+Compiled, memory-mappable gazetteer snapshot.
+
+Layout of a snapshot directory (default `.sitrepc2/gazetteer.snapshot/`):
+
+    manifest.json        format version, source CSV hashes, small tables
+                         (regions, groups, directions, code vocabularies)
+    <column>.npy         one file per LocaleStore column
+    alias_*.npy          prebuilt alias → rows map (hashed keys + CSR rows)
+    fold_*.npy           prebuilt folded alias → rows map, same layout
+    {alias,fold}_{region,group}_*.npy
+                         prebuilt (alias, region/group code) → rows maps
+    cid_*.npy            prebuilt cid → row map (sorted cids)
+
+Every .npy file is opened with `mmap_mode="r"`, so worker processes that
+load the same snapshot share its pages through the OS page cache instead
+of each holding a private copy. The snapshot is keyed by the SHA-256 of
+every source CSV and rebuilt automatically when any of them changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from sitrepc2.gazetteer.index import GazetteerIndex, _LocaleState
+from sitrepc2.gazetteer.io import (
+    load_directions,
+    load_groups,
+    load_locale_store,
+    load_regions,
+)
+from sitrepc2.gazetteer.store import LocaleStore, StringTable
+from sitrepc2.gazetteer.typedefs import DirectionEntry, GroupEntry, LocaleEntry, RegionEntry
+from sitrepc2.util.atomic_dir import discard_dir, publish_dir, resolve_dir, stage_dir
+from sitrepc2.util.serialization import serialize, deserialize
+
+SNAPSHOT_FORMAT = 4
+MANIFEST = "manifest.json"
+
+_STORE_ARRAYS = (
+    "lat", "lon", "cid", "usage",
+    "region_code", "group_code", "place_code", "source_code",
+    "alias_offsets",
+)
+_STORE_TABLES = ("names", "wikidata", "aliases")
+_STORE_VOCABS = ("regions", "groups", "places", "sources")
+_COMPOSITES = ("alias_region", "alias_group", "fold_region", "fold_group")
+
+
+# ======================================================================
+# Hashing
+# ======================================================================
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_hashes(paths: Sequence[Path]) -> List[str]:
+    return [file_sha256(Path(p)) for p in paths]
+
+
+def _key_hash(key: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+# ======================================================================
+# Array-backed read-only maps
+# ======================================================================
+
+class HashedRowsMap(Mapping):
+    """
+    Read-only `str → List[int]` map stored as flat arrays:
+
+        hashes[k]            uint64, sorted
+        keys[k]              StringTable, parallel to hashes
+        offsets[k], rows     CSR postings: rows[offsets[k]:offsets[k + 1]]
+
+    Lookup is one binary search over `hashes` plus one key comparison.
+    """
+
+    def __init__(self, hashes: np.ndarray, keys: StringTable,
+                 offsets: np.ndarray, rows: np.ndarray):
+        self.hashes = hashes
+        self.keys = keys
+        self.offsets = offsets
+        self.rows = rows
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, List[int]]) -> "HashedRowsMap":
+        items = sorted(d.items(), key=lambda kv: (_key_hash(kv[0]), kv[0]))
+        hashes = np.asarray([_key_hash(k) for k, _ in items], dtype=np.uint64)
+        offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        if items:
+            np.cumsum([len(v) for _, v in items], out=offsets[1:])
+        rows = np.asarray([r for _, v in items for r in v], dtype=np.int32)
+        return cls(hashes, StringTable.from_strings(k for k, _ in items), offsets, rows)
+
+    def _find(self, key: str) -> int:
+        h = np.uint64(_key_hash(key))
+        k = int(np.searchsorted(self.hashes, h))
+        n = len(self.hashes)
+        while k < n and self.hashes[k] == h:
+            if self.keys[k] == key:
+                return k
+            k += 1
+        return -1
+
+    def __getitem__(self, key: str) -> List[int]:
+        k = self._find(key) if isinstance(key, str) else -1
+        if k < 0:
+            raise KeyError(key)
+        return self.rows[int(self.offsets[k]):int(self.offsets[k + 1])].tolist()
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+
+class SortedIntMap(Mapping):
+    """Read-only `int → int` map over a sorted key array."""
+
+    def __init__(self, keys: np.ndarray, values: np.ndarray):
+        self.keys = keys
+        self.values = values
+
+    @classmethod
+    def from_dict(cls, d: Dict[int, int]) -> "SortedIntMap":
+        items = sorted(d.items())
+        return cls(
+            np.asarray([k for k, _ in items], dtype=np.uint64),
+            np.asarray([v for _, v in items], dtype=np.int32),
+        )
+
+    def __getitem__(self, key: int) -> int:
+        try:
+            k = np.uint64(key)
+        except (OverflowError, TypeError, ValueError):
+            raise KeyError(key)
+        i = int(np.searchsorted(self.keys, k))
+        if i < len(self.keys) and self.keys[i] == k:
+            return int(self.values[i])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(k) for k in self.keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+# ======================================================================
+# Save
+# ======================================================================
+
+def _save(dirpath: Path, name: str, arr: np.ndarray) -> None:
+    np.save(dirpath / f"{name}.npy", np.ascontiguousarray(arr), allow_pickle=False)
+
+
+def _save_rows_map(dirpath: Path, prefix: str, m: HashedRowsMap) -> None:
+    _save(dirpath, f"{prefix}_hashes", m.hashes)
+    _save(dirpath, f"{prefix}_keys_blob", m.keys.blob)
+    _save(dirpath, f"{prefix}_keys_offsets", m.keys.offsets)
+    _save(dirpath, f"{prefix}_offsets_csr", m.offsets)
+    _save(dirpath, f"{prefix}_rows", m.rows)
+
+
+def save_snapshot(gaz: GazetteerIndex, dirpath: Path, hashes: Sequence[str]) -> None:
+    """
+    Write `gaz` to `dirpath`. The snapshot is assembled in a staging
+    directory and published as a new version behind the `dirpath` symlink
+    (see util.atomic_dir), so readers that resolve it once never see a
+    half-written snapshot. Indexes carrying removed (patched-out) rows are
+    compacted first.
+    """
+    if gaz.has_dead_rows:
+        gaz = gaz.compacted()
+
+    tmp = stage_dir(dirpath)
+    try:
+        _write_snapshot(gaz, tmp, hashes)
+    except BaseException:
+        discard_dir(tmp)
+        raise
+    publish_dir(tmp, dirpath)
+
+
+def _write_snapshot(gaz: GazetteerIndex, tmp: Path, hashes: Sequence[str]) -> None:
+    st = gaz.locales
+    for name in _STORE_ARRAYS:
+        _save(tmp, name, getattr(st, name))
+    for name in _STORE_TABLES:
+        table: StringTable = getattr(st, name)
+        _save(tmp, f"{name}_blob", table.blob)
+        _save(tmp, f"{name}_offsets", table.offsets)
+
+    _save_rows_map(tmp, "alias", HashedRowsMap.from_dict(dict(gaz._locale_by_alias)))
+    _save_rows_map(tmp, "fold", HashedRowsMap.from_dict(dict(gaz._locale_by_fold)))
+    for prefix in _COMPOSITES:
+        _save_rows_map(tmp, prefix, HashedRowsMap.from_dict(dict(getattr(gaz._state, f"by_{prefix}"))))
+
+    cid_map = SortedIntMap.from_dict(dict(gaz._locale_by_cid))
+    _save(tmp, "cid_keys", cid_map.keys)
+    _save(tmp, "cid_rows", cid_map.values)
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "sources": list(hashes),
+        "vocabs": {name: list(getattr(st, name)) for name in _STORE_VOCABS},
+        "region_codes_by_key": gaz._region_codes_by_key,
+        "group_codes_by_key": gaz._group_codes_by_key,
+        "regions": serialize(gaz.regions),
+        "groups": serialize(gaz.groups),
+        "directions": [
+            # Anchors are stored whole: a patch may have removed the locale
+            # a direction was built from.
+            {"name": d.name, "aliases": list(d.aliases), "anchor": serialize(d.anchor)}
+            for d in gaz.directions
+        ],
+    }
+    with (tmp / MANIFEST).open("w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+
+# ======================================================================
+# Load
+# ======================================================================
+
+def read_manifest(dirpath: Path) -> Optional[dict]:
+    try:
+        with (Path(dirpath) / MANIFEST).open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_snapshot(dirpath: Path) -> GazetteerIndex:
+    """Open a snapshot directory as a GazetteerIndex (arrays memory-mapped)."""
+    # One version throughout, even if a writer swaps the link meanwhile.
+    dirpath = resolve_dir(dirpath)
+    manifest = read_manifest(dirpath)
+    if manifest is None or manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Not a gazetteer snapshot (format {SNAPSHOT_FORMAT}): {dirpath}")
+
+    def arr(name: str) -> np.ndarray:
+        return np.load(dirpath / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+
+    def table(name: str) -> StringTable:
+        return StringTable(arr(f"{name}_blob"), arr(f"{name}_offsets"))
+
+    vocabs = manifest["vocabs"]
+    store = LocaleStore(
+        **{name: arr(name) for name in _STORE_ARRAYS},
+        **{name: table(name) for name in _STORE_TABLES},
+        **{name: vocabs[name] for name in _STORE_VOCABS},
+    )
+
+    cid_map = SortedIntMap(arr("cid_keys"), arr("cid_rows"))
+
+    def rows_map(prefix: str) -> HashedRowsMap:
+        return HashedRowsMap(
+            arr(f"{prefix}_hashes"),
+            table(f"{prefix}_keys"),
+            arr(f"{prefix}_offsets_csr"),
+            arr(f"{prefix}_rows"),
+        )
+
+    state = _LocaleState(
+        store,
+        rows_map("alias"),
+        rows_map("fold"),
+        cid_map,
+        manifest["region_codes_by_key"],
+        manifest["group_codes_by_key"],
+        *(rows_map(prefix) for prefix in _COMPOSITES),
+    )
+
+    gaz = GazetteerIndex._from_state(
+        state,
+        [deserialize(r, RegionEntry) for r in manifest["regions"]],
+        [deserialize(g, GroupEntry) for g in manifest["groups"]],
+        [
+            DirectionEntry(
+                name=d["name"],
+                anchor=deserialize(d["anchor"], LocaleEntry),
+                aliases=d["aliases"],
+            )
+            for d in manifest["directions"]
+        ],
+    )
+    return gaz
+
+
+# ======================================================================
+# Cached entry point
+# ======================================================================
+
+def load_gazetteer(
+    locale_path: Path,
+    region_path: Path,
+    group_path: Path,
+    direction_path: Path,
+    snapshot_dir: Optional[Path] = None,
+) -> GazetteerIndex:
+    """
+    Load a GazetteerIndex, preferring a compiled snapshot in `snapshot_dir`.
+
+    The snapshot is reused only if it was built from byte-identical source
+    CSVs; otherwise the CSVs are parsed, the index is built, and a fresh
+    snapshot is written for the next process.
+    """
+    sources = [Path(p) for p in (locale_path, region_path, group_path, direction_path)]
+    hashes = source_hashes(sources)
+
+    if snapshot_dir is not None:
+        current = resolve_dir(snapshot_dir)
+        manifest = read_manifest(current)
+        if (
+            manifest is not None
+            and manifest.get("format") == SNAPSHOT_FORMAT
+            and manifest.get("sources") == hashes
+        ):
+            return load_snapshot(current)
+
+    store = load_locale_store(sources[0])
+    gaz = GazetteerIndex(
+        store,
+        load_regions(sources[1]),
+        load_groups(sources[2]),
+        load_directions(sources[3], store),
+    )
+
+    if snapshot_dir is not None:
+        save_snapshot(gaz, snapshot_dir, hashes)
+        return load_snapshot(snapshot_dir)
+
+    return gaz
@@ -0,0 +1,369 @@
+# src/sitrepc2/gazetteer/store.py
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, overload
+
+import numpy as np
+
+from sitrepc2.gazetteer.typedefs import LocaleEntry
+
+
+# ======================================================================
+# StringTable
+# ======================================================================
+
+class StringTable(Sequence[str]):
+    """
+    Immutable list of strings packed into one UTF-8 byte buffer plus an
+    offsets array. Strings are decoded on access, so the table costs one
+    contiguous allocation instead of one Python object per string.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob          # uint8[nbytes]
+        self.offsets = offsets    # int64[n + 1]
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringTable":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+    @overload
+    def __getitem__(self, i: slice) -> List[str]: ...
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step == 1:
+                return self.range(start, stop)
+            return [self[j] for j in range(start, stop, step)]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.blob[a:b].tobytes().decode("utf-8")
+
+    def extended(self, strings: Iterable[str]) -> "StringTable":
+        """New table holding these strings followed by `strings`."""
+        tail = StringTable.from_strings(strings)
+        if not len(tail):
+            return self
+        return StringTable(
+            np.concatenate([self.blob, tail.blob]),
+            np.concatenate([self.offsets, tail.offsets[1:] + self.offsets[-1]]),
+        )
+
+    def range(self, start: int, stop: int) -> List[str]:
+        """Strings [start, stop) with a single buffer copy."""
+        if stop <= start:
+            return []
+        offs = self.offsets[start:stop + 1].tolist()
+        base = offs[0]
+        raw = self.blob[base:offs[-1]].tobytes()
+        return [
+            raw[a - base:b - base].decode("utf-8")
+            for a, b in zip(offs, offs[1:])
+        ]
+
+
+def _as_int(v, default: int = 0) -> int:
+    # load_locales passes CSV cells through untyped, e.g. usage="0"
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return default
+
+
+def _encode_codes(values: Iterable[Optional[str]]) -> tuple[np.ndarray, List[str]]:
+    """Dictionary-encode optional strings; None → -1."""
+    vocab: List[str] = []
+    code_of: Dict[str, int] = {}
+    codes: List[int] = []
+    for v in values:
+        if not v:
+            codes.append(-1)
+            continue
+        c = code_of.get(v)
+        if c is None:
+            c = code_of[v] = len(vocab)
+            vocab.append(v)
+        codes.append(c)
+    dtype = np.int16 if len(vocab) < np.iinfo(np.int16).max else np.int32
+    return np.asarray(codes, dtype=dtype), vocab
+
+
+def _extend_codes(
+    codes: np.ndarray,
+    vocab: List[str],
+    values: Iterable[Optional[str]],
+) -> tuple[np.ndarray, List[str]]:
+    """Append dictionary-encoded `values` to `codes`, growing a copy of `vocab`."""
+    vocab = list(vocab)
+    code_of = {v: i for i, v in enumerate(vocab)}
+    new: List[int] = []
+    for v in values:
+        if not v:
+            new.append(-1)
+            continue
+        c = code_of.get(v)
+        if c is None:
+            c = code_of[v] = len(vocab)
+            vocab.append(v)
+        new.append(c)
+    dtype = codes.dtype if len(vocab) < np.iinfo(codes.dtype).max else np.int32
+    return np.concatenate([codes.astype(dtype, copy=False), np.asarray(new, dtype=dtype)]), vocab
+
+
+# ======================================================================
+# LocaleStore
+# ======================================================================
+
+class LocaleStore(Sequence[LocaleEntry]):
+    """
+    Struct-of-arrays backing store for gazetteer locales.
+
+    Columns:
+      • lat, lon           float64
+      • cid                uint64
+      • region/group/place small-int codes into vocab lists (-1 = None)
+      • usage              int32
+      • names, wikidata    StringTable ("" = None for wikidata)
+      • aliases            flat StringTable, row i owns
+                           aliases[alias_offsets[i]:alias_offsets[i + 1]]
+
+    Indexing yields a freshly built LocaleEntry; nothing per-row is kept
+    alive, so hold on to the entry if you need it more than once.
+    """
+
+    def __init__(
+        self,
+        *,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        cid: np.ndarray,
+        usage: np.ndarray,
+        region_code: np.ndarray,
+        group_code: np.ndarray,
+        place_code: np.ndarray,
+        source_code: np.ndarray,
+        regions: List[str],
+        groups: List[str],
+        places: List[str],
+        sources: List[str],
+        names: StringTable,
+        wikidata: StringTable,
+        aliases: StringTable,
+        alias_offsets: np.ndarray,
+    ):
+        self.lat = lat
+        self.lon = lon
+        self.cid = cid
+        self.usage = usage
+        self.region_code = region_code
+        self.group_code = group_code
+        self.place_code = place_code
+        self.source_code = source_code
+        self.regions = regions
+        self.groups = groups
+        self.places = places
+        self.sources = sources
+        self.names = names
+        self.wikidata = wikidata
+        self.aliases = aliases
+        self.alias_offsets = alias_offsets
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_columns(
+        cls,
+        *,
+        names: Sequence[str],
+        aliases: Sequence[List[str]],
+        lat: Sequence[float],
+        lon: Sequence[float],
+        cid: Sequence[int],
+        region: Sequence[Optional[str]],
+        ru_group: Sequence[Optional[str]],
+        place: Sequence[Optional[str]],
+        wikidata: Sequence[Optional[str]],
+        usage: Sequence[int],
+        source: Sequence[str],
+    ) -> "LocaleStore":
+        region_code, regions = _encode_codes(region)
+        group_code, groups = _encode_codes(ru_group)
+        place_code, places = _encode_codes(place)
+        source_code, sources = _encode_codes(source)
+
+        alias_offsets = np.zeros(len(aliases) + 1, dtype=np.int64)
+        if len(aliases):
+            np.cumsum([len(a) for a in aliases], out=alias_offsets[1:])
+
+        return cls(
+            lat=np.asarray(lat, dtype=np.float64),
+            lon=np.asarray(lon, dtype=np.float64),
+            cid=np.asarray(cid, dtype=np.uint64),
+            usage=np.asarray(usage, dtype=np.int32),
+            region_code=region_code,
+            group_code=group_code,
+            place_code=place_code,
+            source_code=source_code,
+            regions=regions,
+            groups=groups,
+            places=places,
+            sources=sources,
+            names=StringTable.from_strings(names),
+            wikidata=StringTable.from_strings(w or "" for w in wikidata),
+            aliases=StringTable.from_strings(a for row in aliases for a in row),
+            alias_offsets=alias_offsets,
+        )
+
+    @classmethod
+    def from_entries(cls, entries: Sequence[LocaleEntry]) -> "LocaleStore":
+        return cls.from_columns(
+            names=[e.name for e in entries],
+            aliases=[list(e.aliases or []) for e in entries],
+            lat=[e.lat for e in entries],
+            lon=[e.lon for e in entries],
+            cid=[e.cid for e in entries],
+            region=[e.region for e in entries],
+            ru_group=[e.ru_group for e in entries],
+            place=[e.place for e in entries],
+            wikidata=[e.wikidata for e in entries],
+            usage=[_as_int(e.usage) for e in entries],
+            source=[e.source or "base" for e in entries],
+        )
+
+    def appended(self, entries: Sequence[LocaleEntry]) -> "LocaleStore":
+        """
+        New store with `entries` appended as rows len(self) … len(self) + n - 1.
+        Existing rows keep their indices; `self` is left untouched.
+        """
+        if not entries:
+            return self
+
+        region_code, regions = _extend_codes(self.region_code, self.regions, (e.region for e in entries))
+        group_code, groups = _extend_codes(self.group_code, self.groups, (e.ru_group for e in entries))
+        place_code, places = _extend_codes(self.place_code, self.places, (e.place for e in entries))
+        source_code, sources = _extend_codes(
+            self.source_code, self.sources, (e.source or "base" for e in entries)
+        )
+
+        counts = np.asarray([len(e.aliases or []) for e in entries], dtype=np.int64)
+        alias_offsets = np.concatenate([self.alias_offsets, self.alias_offsets[-1] + np.cumsum(counts)])
+
+        return LocaleStore(
+            lat=np.concatenate([self.lat, np.asarray([e.lat for e in entries], dtype=np.float64)]),
+            lon=np.concatenate([self.lon, np.asarray([e.lon for e in entries], dtype=np.float64)]),
+            cid=np.concatenate([self.cid, np.asarray([e.cid for e in entries], dtype=np.uint64)]),
+            usage=np.concatenate([self.usage, np.asarray([_as_int(e.usage) for e in entries], dtype=np.int32)]),
+            region_code=region_code,
+            group_code=group_code,
+            place_code=place_code,
+            source_code=source_code,
+            regions=regions,
+            groups=groups,
+            places=places,
+            sources=sources,
+            names=self.names.extended(e.name for e in entries),
+            wikidata=self.wikidata.extended(e.wikidata or "" for e in entries),
+            aliases=self.aliases.extended(a for e in entries for a in (e.aliases or [])),
+            alias_offsets=alias_offsets,
+        )
+
+    # ------------------------------------------------------------------
+    # Row access
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @staticmethod
+    def _decode(vocab: List[str], code) -> Optional[str]:
+        code = int(code)
+        return None if code < 0 else vocab[code]
+
+    def aliases_of(self, i: int) -> List[str]:
+        a, b = self.alias_offsets[i:i + 2].tolist()
+        return self.aliases.range(a, b)
+
+    def region_of(self, i: int) -> Optional[str]:
+        return self._decode(self.regions, self.region_code[i])
+
+    def ru_group_of(self, i: int) -> Optional[str]:
+        return self._decode(self.groups, self.group_code[i])
+
+    def entry(self, i: int) -> LocaleEntry:
+        a, b = self.alias_offsets[i:i + 2].tolist()
+        place = int(self.place_code[i])
+        source = int(self.source_code[i])
+        return LocaleEntry(
+            cid=int(self.cid[i]),
+            name=self.names[i],
+            aliases=self.aliases.range(a, b),
+            lon=float(self.lon[i]),
+            lat=float(self.lat[i]),
+            region=self.region_of(i),
+            ru_group=self.ru_group_of(i),
+            place=None if place < 0 else self.places[place],
+            wikidata=self.wikidata[i] or None,
+            usage=int(self.usage[i]),
+            source="base" if source < 0 else self.sources[source],
+        )
+
+    @overload
+    def __getitem__(self, i: int) -> LocaleEntry: ...
+    @overload
+    def __getitem__(self, i: slice) -> List[LocaleEntry]: ...
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.entry(j) for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return self.entry(i)
+
+    def __iter__(self) -> Iterator[LocaleEntry]:
+        for i in range(len(self)):
+            yield self.entry(i)
+
+    # ------------------------------------------------------------------
+    # Vectorized operations
+    # ------------------------------------------------------------------
+
+    def rows_with_codes(self, column: np.ndarray, codes: Iterable[int]) -> np.ndarray:
+        """Ascending row indices whose `column` code is one of `codes`."""
+        codes = list(codes)
+        if not codes:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(np.isin(column, codes))
+
+    def rows_in_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+    ) -> np.ndarray:
+        """Ascending row indices inside the (inclusive) lat/lon box."""
+        mask = (
+            (self.lat >= min_lat) & (self.lat <= max_lat)
+            & (self.lon >= min_lon) & (self.lon <= max_lon)
+        )
+        return np.flatnonzero(mask)
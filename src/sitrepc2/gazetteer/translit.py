@@ -0,0 +1,73 @@
+# src/sitrepc2/gazetteer/translit.py
+"""
+Transliteration-folded secondary keys for gazetteer aliases.
+
+Ukrainian and Russian romanizations of the same place differ in regular
+ways (Stepanivka / Stepanovka, Kropyvnytske / Kropivnitskoe, Rudnia /
+Rudnya). `fold_location_key` maps a normalized key onto a coarser key
+shared by those variants:
+
+  1. Ukrainian → Russian-style exonym rules from `reference/exonyms.py`
+     (full-name map, WORD_EXONYM_MAP, -ivka/-ivska/-ivske suffixes)
+  2. digraph / letter folds:  kh→h, g→h, y/j→i, e→i, ts→c, yo/io→i;
+     zh/ch/sh/shch kept distinct from plain h
+  3. doubled letters collapsed:  Cherkassy → Cherkasy, iy/yi/ii → i
+  4. ending folds:  -oye/-oe → -e, -ovo → -ove, -aya → -a,
+     -ivka/-evka/-ovka → -ovka, -iv → -ov, -pil → -pol
+
+The fold is deliberately lossy; it is only consulted after an exact alias
+lookup misses.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Tuple
+
+from sitrepc2.reference.exonyms import uk_roman_to_ru_exonym
+
+# Placeholders keep sibilant digraphs from collapsing into plain "h".
+_DIGRAPHS: Tuple[Tuple[str, str], ...] = (
+    ("shch", "4"),
+    ("zh", "1"),
+    ("ch", "2"),
+    ("sh", "3"),
+    ("kh", "h"),
+    ("ts", "c"),
+)
+
+_LETTERS = str.maketrans({"g": "h", "y": "i", "j": "i", "e": "i"})
+
+# After letter folds: ё/yo/io → i, then doubled letters collapse.
+_IO = re.compile(r"io")
+_REPEATS = re.compile(r"(.)\1+")
+
+# Applied in order, first match wins; stems must keep >= 2 characters.
+_ENDINGS: Tuple[Tuple[str, str], ...] = (
+    ("ivka", "ovka"),   # -ivka / -evka / -yevka  → -ovka
+    ("ovo", "ovi"),     # -ovo / -evo             → -ove
+    ("oi", "i"),        # -oye / -oe / -oy        → -e / -yi
+    ("aia", "a"),       # -aya                    → -a
+    ("pil", "pol"),
+    ("iv", "ov"),
+)
+
+
+def _fold_word(word: str) -> str:
+    for a, b in _DIGRAPHS:
+        word = word.replace(a, b)
+    word = _REPEATS.sub(r"\1", _IO.sub("i", word.translate(_LETTERS)))
+    for suffix, repl in _ENDINGS:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            return word[: -len(suffix)] + repl
+    return word
+
+
+def fold_location_key(key: str) -> str:
+    """
+    Fold a `normalize_location_key` result into its transliteration class.
+    """
+    if not key:
+        return ""
+    ru = uk_roman_to_ru_exonym(key).split(";", 1)[0]
+    return " ".join(_fold_word(w) for w in ru.split())
@@ -1,4 +1,4 @@
 # src/sitrepc2/nlp/__init__.py
-from .ruler import add_gazetteer_ruler, OtherEntitySpec
+from .ruler import add_entity_rulers, add_alias_scanner, apply_gazetteer_delta
 
-__all__ = ["add_gazetteer_ruler", "OtherEntitySpec"]
+__all__ = ["add_entity_rulers", "add_alias_scanner", "apply_gazetteer_delta"]
@@ -0,0 +1,275 @@
+# src/sitrepc2/lss/alias_index.py
+"""
+Gazetteer alias → post / event index, for reprocessing after a gazetteer
+edit.
+
+A run with an AliasIndex (SQLite, default `.sitrepc2/alias_index.sqlite`)
+records, per post,
+
+    • every gazetteer span the ruler tagged (LOCALE / REGION / GROUP /
+      DIRECTION), by normalized alias key — post-wide, and for LOCALE
+      spans also per event, from the Location objects LSS built,
+    • the normalized terms of the post text, so an alias that is not
+      tagged anywhere yet can still be traced to the posts that contain
+      its words.
+
+`affected_posts(delta)` turns a GazetteerDelta (GazetteerIndex.apply_patch)
+into the posts whose tagging can change:
+
+    • posts where a changed or removed alias was tagged,
+    • posts holding every term of an added alias.
+
+`pipeline.reprocess_gazetteer_delta` re-tags and rebuilds only those.
+Term candidates over-approximate: a candidate whose re-tagging comes out
+the same is rebuilt for nothing, never missed.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sitrepc2.config.paths import alias_index_path
+from sitrepc2.gazetteer.index import GazetteerDelta
+from sitrepc2.util.normalize import normalize_location_key
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+    from sitrepc2.dom.typedefs import Post
+
+ALIAS_INDEX_LABELS = frozenset({"LOCALE", "REGION", "GROUP", "DIRECTION"})
+
+# Post-wide rows carry no event id.
+POST_WIDE = ""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS aliases (
+    alias    TEXT NOT NULL,
+    post_id  TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    PRIMARY KEY (alias, post_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS aliases_post ON aliases (post_id);
+CREATE TABLE IF NOT EXISTS terms (
+    term    TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    PRIMARY KEY (term, post_id)
+);
+CREATE INDEX IF NOT EXISTS terms_post ON terms (post_id);
+CREATE TABLE IF NOT EXISTS posts (
+    post_id TEXT PRIMARY KEY
+);
+"""
+
+_SQL_CHUNK = 500
+
+
+# ===========================================================================
+# Keys
+# ===========================================================================
+
+# Clitics spaCy's English tokenizer splits off a word: "Kupiansk's".
+_CLITIC_RE = re.compile(r"^(.+?)(?:['’](?:s|re|ve|ll|d|m)|n['’]t|['’])$")
+_TERM_PUNCT = "\"“”«»()[]{}.,;:!?/\\"
+
+
+def alias_terms(text: str) -> List[str]:
+    """
+    Normalized words of `text`, stripped of surrounding punctuation; a word
+    ending in a clitic ('s, n't, a bare apostrophe, ...) also yields its
+    stem, as the ruler's tokenizer would see it ("Kupiansk's outskirts" →
+    kupiansks, kupiansk, outskirts). Applied alike to post texts and alias
+    keys, so an alias's terms are a subset of the terms of every post that
+    spells it out.
+    """
+    out = []
+    for raw in text.lower().split():
+        raw = raw.strip(_TERM_PUNCT)
+        forms = [raw]
+        m = _CLITIC_RE.match(raw)
+        if m:
+            forms.append(m.group(1))
+        for form in forms:
+            for word in normalize_location_key(form).split():
+                word = word.strip(_TERM_PUNCT)
+                if word:
+                    out.append(word)
+    return out
+
+
+def post_alias_rows(post: Post, doc: Doc) -> Set[Tuple[str, str]]:
+    """
+    (alias key, event id) pairs for one built post: every gazetteer span of
+    the Doc post-wide, and each event's LOCALE spans under its event id.
+    """
+    rows: Set[Tuple[str, str]] = set()
+    for ent in doc.ents:
+        if ent.label_ in ALIAS_INDEX_LABELS:
+            key = normalize_location_key(ent.text)
+            if key:
+                rows.add((key, POST_WIDE))
+    for event in post.events:
+        for loc in event.locations:
+            key = normalize_location_key(loc.span.text if loc.span is not None else loc.text)
+            if key:
+                rows.add((key, event.event_id))
+    return rows
+
+
+# ===========================================================================
+# Index
+# ===========================================================================
+
+class AliasIndex:
+    """
+    Normalized alias → post_ids / event_ids, plus normalized term → post_ids.
+    Shareable between threads and, through SQLite locking, processes.
+
+    `last_run` holds the counts of the most recent reprocessing it drove.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.last_run: Dict[str, int] = {}
+
+    @classmethod
+    def for_workspace(cls, root: Path) -> "AliasIndex":
+        return cls(alias_index_path(root))
+
+    # Connections are per process; a pickled index reopens on first use.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def put_many(self, items: Iterable[Tuple[Post, Doc]]) -> None:
+        """Index built (post, Doc) pairs, replacing what was held for them."""
+        alias_rows: List[Tuple[str, str, str]] = []
+        term_rows: List[Tuple[str, str]] = []
+        post_ids: List[str] = []
+        for post, doc in items:
+            post_ids.append(post.post_id)
+            alias_rows.extend(
+                (alias, post.post_id, event_id) for alias, event_id in post_alias_rows(post, doc)
+            )
+            term_rows.extend((term, post.post_id) for term in set(alias_terms(post.text)))
+        if not post_ids:
+            return
+
+        with self._lock:
+            db = self._db()
+            self._delete(db, post_ids)
+            db.executemany("INSERT OR IGNORE INTO posts (post_id) VALUES (?)", [(p,) for p in post_ids])
+            db.executemany(
+                "INSERT OR IGNORE INTO aliases (alias, post_id, event_id) VALUES (?, ?, ?)", alias_rows
+            )
+            db.executemany("INSERT OR IGNORE INTO terms (term, post_id) VALUES (?, ?)", term_rows)
+            db.commit()
+
+    def discard(self, post_ids: Sequence[str]) -> None:
+        with self._lock:
+            db = self._db()
+            self._delete(db, list(post_ids))
+            db.commit()
+
+    @staticmethod
+    def _delete(db: sqlite3.Connection, post_ids: List[str]) -> None:
+        for i in range(0, len(post_ids), _SQL_CHUNK):
+            chunk = post_ids[i:i + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for table in ("aliases", "terms", "posts"):
+                db.execute(f"DELETE FROM {table} WHERE post_id IN ({marks})", chunk)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def indexed(self, post_ids: Sequence[str]) -> Set[str]:
+        """Which of `post_ids` the index holds."""
+        wanted = list(dict.fromkeys(post_ids))
+        out: Set[str] = set()
+        with self._lock:
+            db = self._db()
+            for i in range(0, len(wanted), _SQL_CHUNK):
+                chunk = wanted[i:i + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = db.execute(f"SELECT post_id FROM posts WHERE post_id IN ({marks})", chunk)
+                out.update(post_id for (post_id,) in rows)
+        return out
+
+    def postings(self, alias: str) -> Dict[str, Set[str]]:
+        """post_id → ids of the events tagged with `alias` ("" = post-wide)."""
+        out: Dict[str, Set[str]] = {}
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT post_id, event_id FROM aliases WHERE alias = ?",
+                (normalize_location_key(alias),),
+            )
+            for post_id, event_id in rows:
+                ids = out.setdefault(post_id, set())
+                if event_id != POST_WIDE:
+                    ids.add(event_id)
+        return out
+
+    def posts_with_terms(self, terms: Sequence[str]) -> Set[str]:
+        """Posts whose text holds every one of `terms`."""
+        terms = list(dict.fromkeys(terms))
+        if not terms:
+            return set()
+        marks = ",".join("?" * len(terms))
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT post_id FROM terms WHERE term IN ({marks}) "
+                "GROUP BY post_id HAVING COUNT(*) = ?",
+                (*terms, len(terms)),
+            )
+            return {post_id for (post_id,) in rows}
+
+    def affected_posts(self, delta: GazetteerDelta) -> Dict[str, str]:
+        """
+        post_id → why its tagging can change under `delta`:
+
+          - "tagged":    a changed or removed alias was tagged in it
+          - "candidate": it holds every term of an added alias
+        """
+        out: Dict[str, str] = {}
+        for alias in sorted(delta.added_aliases):
+            for post_id in self.posts_with_terms(alias_terms(alias)):
+                out[post_id] = "candidate"
+        for alias in sorted(delta.changed_aliases | delta.removed_aliases):
+            for post_id in self.postings(alias):
+                out[post_id] = "tagged"
+        return out
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,176 @@
+# src/sitrepc2/lss/alias_scanner.py
+"""
+Single-pass gazetteer alias scanner.
+
+A drop-in alternative to the EntityRuler installed by
+`lss.ruler.add_entity_rulers`. Aliases are compiled into token tries once;
+each doc is then scanned left to right, walking the trie from every token,
+which costs O(tokens × longest alias) regardless of gazetteer size.
+
+Matching semantics mirror the EntityRuler exactly:
+    • simple aliases (LOCALE / REGION / GROUP) match on token ORTH, as the
+      ruler's phrase patterns do
+    • token patterns match on the attribute named in each pattern dict
+    • DIRECTION cue phrases come from an embedded DirectionSpotter and
+      compete with the trie candidates
+    • overlapping candidates are resolved longest-first, then leftmost,
+      and never overwrite entities already on the doc
+    • two labels on the exact same span are ordered the way the ruler's
+      own dedup set orders them
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from spacy.language import Language
+from spacy.tokens import Doc, Span
+
+from sitrepc2.lss.directions import DirectionSpotter
+
+# Trie node: token text → child node; the `None` key holds terminal labels.
+TrieNode = Dict[Optional[str], object]
+
+_TOKEN_ATTRS = {
+    "ORTH": lambda t: t.text,
+    "TEXT": lambda t: t.text,
+    "LOWER": lambda t: t.lower_,
+    "NORM": lambda t: t.norm_,
+}
+
+
+def _trie_insert(root: TrieNode, keys: Sequence[str], label: str) -> None:
+    node = root
+    for k in keys:
+        node = node.setdefault(k, {})  # type: ignore[assignment]
+    labels = node.setdefault(None, [])  # type: ignore[assignment]
+    if label not in labels:
+        labels.append(label)
+
+
+# ===========================================================================
+# Component
+# ===========================================================================
+
+class AliasScanner:
+    """
+    spaCy pipeline component holding one token trie per match attribute.
+    """
+
+    def __init__(self, nlp: Language, name: str = "alias_scanner"):
+        self.nlp = nlp
+        self.name = name
+        self.tries: Dict[str, TrieNode] = {}
+        self.max_len = 0
+        self.directions = DirectionSpotter(nlp, f"{name}.directions")
+
+    # ------------------------------------------------------------------
+    # Pattern loading
+    # ------------------------------------------------------------------
+
+    def add_phrases(self, phrases: Iterable[str], label: str) -> None:
+        """Add exact-match phrases; tokenized with the pipeline tokenizer."""
+        root = self.tries.setdefault("ORTH", {})
+        for doc in self.nlp.tokenizer.pipe(phrases):
+            keys = [t.text for t in doc]
+            if not keys:
+                continue
+            _trie_insert(root, keys, label)
+            self.max_len = max(self.max_len, len(keys))
+
+    def remove_phrases(self, phrases: Iterable[str], label: str) -> None:
+        """
+        Drop `label` from exact-match phrases. Terminal label lists are
+        replaced, not mutated, so a doc being scanned concurrently sees
+        either the old or the new labels.
+        """
+        root = self.tries.get("ORTH")
+        if not root:
+            return
+        for doc in self.nlp.tokenizer.pipe(phrases):
+            node = root
+            for t in doc:
+                node = node.get(t.text)  # type: ignore[assignment]
+                if node is None:
+                    break
+            if node is None or not len(doc):
+                continue
+            labels = node.get(None)
+            if labels and label in labels:
+                node[None] = [lab for lab in labels if lab != label]
+
+    def add_token_patterns(self, patterns: Iterable[dict]) -> None:
+        """
+        Add EntityRuler-style token patterns whose every token is a single
+        exact attribute test, e.g. [{"LOWER": "towards"}, {"LOWER": "x"}].
+        """
+        for entry in patterns:
+            pattern = entry["pattern"]
+            attrs = {next(iter(tok)) for tok in pattern}
+            if len(attrs) != 1 or any(len(tok) != 1 for tok in pattern):
+                raise ValueError(f"Unsupported token pattern for AliasScanner: {pattern!r}")
+            attr = attrs.pop().upper()
+            if attr not in _TOKEN_ATTRS:
+                raise ValueError(f"Unsupported token attribute: {attr}")
+            keys = [next(iter(tok.values())) for tok in pattern]
+            _trie_insert(self.tries.setdefault(attr, {}), keys, entry["label"])
+            self.max_len = max(self.max_len, len(keys))
+
+    def add_direction_aliases(self, aliases: Iterable[str]) -> None:
+        """Add direction aliases; cue phrases are spotted around them."""
+        self.directions.add_aliases(aliases)
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def match(self, doc: Doc) -> List[Tuple[int, int, int]]:
+        """
+        All (label_id, start, end) candidates, sorted in the order the
+        EntityRuler would try to apply them.
+        """
+        strings = self.nlp.vocab.strings
+        found: List[Tuple[int, int, int]] = []
+        n = len(doc)
+
+        for attr, root in self.tries.items():
+            getter = _TOKEN_ATTRS[attr]
+            keys = [getter(t) for t in doc]
+
+            for i in range(n):
+                node = root.get(keys[i])
+                j = i
+                while node is not None:
+                    j += 1
+                    for label in node.get(None, ()):
+                        found.append((strings.add(label), i, j))
+                    if j >= n:
+                        break
+                    node = node.get(keys[j])
+
+        found.extend(self.directions.match(doc))
+
+        # Same dedup + sort as EntityRuler.match, so that two labels
+        # claiming one span resolve identically.
+        return sorted(set(found), key=lambda m: (m[2] - m[1], -m[1]), reverse=True)
+
+    def set_annotations(self, doc: Doc, matches: List[Tuple[int, int, int]]) -> None:
+        taken = [t.ent_type != 0 for t in doc]
+        new_entities: List[Span] = []
+
+        for label, start, end in matches:
+            if any(taken[start:end]):
+                continue
+            new_entities.append(Span(doc, start, end, label=label))
+            for k in range(start, end):
+                taken[k] = True
+
+        if new_entities:
+            doc.ents = list(doc.ents) + new_entities
+
+    def __call__(self, doc: Doc) -> Doc:
+        self.set_annotations(doc, self.match(doc))
+        return doc
+
+
+@Language.factory("alias_scanner")
+def make_alias_scanner(nlp: Language, name: str) -> AliasScanner:
+    return AliasScanner(nlp, name)
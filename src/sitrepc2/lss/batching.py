@@ -0,0 +1,134 @@
+# src/sitrepc2/lss/batching.py
+"""
+Character-budgeted batching and chunking of oversize posts.
+
+`nlp.pipe(batch_size=n)` batches by post count, so one 20k-character
+General Staff summary stalls its batch while a batch of one-line posts
+leaves the parser idle. With a character budget, batches are cut from the
+input in order once the next text would take them past `batch_chars`
+characters (a text over budget forms a batch of its own), so work and
+peak memory per batch stay roughly constant.
+
+Posts longer than `chunk_chars` are parsed in chunks cut at section
+boundaries (lss.sectioning, run over a light doc of the post). Chunks are
+contiguous slices of the post text, so the chunk Docs concatenate back
+into one Doc whose text is the post text: every token and character offset
+LSS reads is valid for the parent Post. Holmes matches each chunk as a
+document of its own; chunk_offsets gives the token offset that maps its
+matches back onto the merged Doc. A single section longer than the budget
+stays whole.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from sitrepc2.lss.doc_index import DocIndex
+from sitrepc2.lss.sectioning import split_into_sections
+
+
+# ===========================================================================
+# Budgeted nlp.pipe
+# ===========================================================================
+
+def budget_batches(lengths: Sequence[int], batch_chars: int) -> List[List[int]]:
+    """
+    Indices of `lengths` grouped, in order, into batches of at most
+    `batch_chars` characters.
+    """
+    if batch_chars < 1:
+        raise ValueError("batch_chars must be a positive integer")
+    batches: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+    for i, n in enumerate(lengths):
+        if current and size + n > batch_chars:
+            batches.append(current)
+            current, size = [], 0
+        current.append(i)
+        size += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+def pipe_texts(
+    nlp: Language,
+    texts: Sequence[str],
+    *,
+    batch_size: int = 8,
+    batch_chars: Optional[int] = None,
+) -> Iterator[Doc]:
+    """
+    `nlp.pipe(texts)`, batched by `batch_chars` characters if given,
+    else by `batch_size` texts.
+    """
+    if batch_chars is None:
+        yield from nlp.pipe(texts, batch_size=batch_size)
+        return
+    texts = list(texts)
+    for batch in budget_batches([len(t) for t in texts], batch_chars):
+        yield from nlp.pipe((texts[i] for i in batch), batch_size=len(batch))
+
+
+# ===========================================================================
+# Chunking at section boundaries
+# ===========================================================================
+
+def section_starts(text: str, doc: Doc) -> List[int]:
+    """Character offsets in `text` where the sectioner starts a section."""
+    index = DocIndex(doc)
+    index.set_sections(text, split_into_sections(text, doc, index))
+    return sorted({start for start, _ in index.section_bounds if start > 0})
+
+
+def chunk_bounds(text: str, cuts: Sequence[int], chunk_chars: int) -> List[Tuple[int, int]]:
+    """
+    Contiguous (start, end) slices covering `text`, cut only at `cuts`
+    (sorted character offsets), each as long as fits in `chunk_chars`.
+    """
+    if chunk_chars < 1:
+        raise ValueError("chunk_chars must be a positive integer")
+    bounds: List[Tuple[int, int]] = []
+    start = 0
+    last = 0
+    for cut in cuts:
+        if cut <= start or cut >= len(text):
+            continue
+        if cut - start > chunk_chars and last > start:
+            bounds.append((start, last))
+            start = last
+        if cut - start > chunk_chars:
+            # One section over budget: it becomes a chunk of its own.
+            bounds.append((start, cut))
+            start = cut
+        last = cut
+    if len(text) - start > chunk_chars and start < last < len(text):
+        bounds.append((start, last))
+        start = last
+    bounds.append((start, len(text)))
+    return bounds
+
+
+def chunk_offsets(chunks: Sequence[Doc]) -> List[int]:
+    """Token offset of each chunk Doc within their concatenation."""
+    offsets: List[int] = []
+    n = 0
+    for chunk in chunks:
+        offsets.append(n)
+        n += len(chunk)
+    return offsets
+
+
+def merge_chunks(chunks: Sequence[Doc]) -> Doc:
+    """
+    One Doc over the post text from its chunk Docs: tokens, tags, heads,
+    entities and sentence starts are kept. User data is dropped, since
+    pipeline extensions (Holmes, coreferee) hold chunk token indices.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    return Doc.from_docs(list(chunks), ensure_whitespace=False, exclude=["user_data"])
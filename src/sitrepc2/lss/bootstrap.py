@@ -1,7 +1,22 @@
 # holmes/bootstrap.py
-import holmes_extractor as holmes
+from __future__ import annotations
+
+import weakref
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from sitrepc2.lss.coref_gate import DEFAULT_WINDOW, install_coref_gate
+from sitrepc2.lss.dependency_backend import DependencyManager
+
+if TYPE_CHECKING:
+    import holmes_extractor as holmes
+
+# Holmes keeps one pipeline per model for the whole process
+# (holmes_extractor.manager.get_nlp), so every Manager of a model shares
+# it, and a coreference gate installed for one Manager runs for all of
+# them. The gating (coreference_gating, coreference_window) each shared
+# pipeline was set up with; Managers wanting another one are refused.
+_PIPELINE_GATING: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
 
 @dataclass
@@ -11,16 +26,59 @@ class HolmesSettings:
     embedding_based_matching_on_root_words: bool = False
     ontology: Any = None
     perform_coreference_resolution: bool | None = None
+    # Run coreferee only on sections with an anaphor near a LOCALE span
+    # (lss.coref_gate); implies coreference resolution in matching.
+    coreference_gating: bool = False
+    coreference_window: int = DEFAULT_WINDOW
     debug: bool = False
+    # Holmes matching processes per Manager; None = one per core.
+    number_of_workers: int | None = None
+    # "holmes", or "dependency" for the spaCy DependencyMatcher backend
+    # (lss.dependency_backend): lemma matching only, no coreference.
+    backend: str = "holmes"
 
 
-def build_manager(settings: HolmesSettings | None = None) -> holmes.Manager:
+def build_manager(settings: HolmesSettings | None = None) -> holmes.Manager | DependencyManager:
     s = settings or HolmesSettings()
-    return holmes.Manager(
+    if s.backend == "dependency":
+        if (
+            s.ontology is not None
+            or s.overall_similarity_threshold < 1.0
+            or s.embedding_based_matching_on_root_words
+        ):
+            raise ValueError(
+                "the dependency backend matches lemmas only; ontology and "
+                "embedding settings need backend='holmes'"
+            )
+        if s.coreference_gating:
+            raise ValueError(
+                "the dependency backend does not resolve coreference; "
+                "coreference_gating needs backend='holmes'"
+            )
+        return DependencyManager(model=s.model)
+    if s.backend != "holmes":
+        raise ValueError(f"unknown matching backend: {s.backend!r}")
+    # Imported here so the dependency backend runs without Holmes installed.
+    import holmes_extractor as holmes
+
+    manager = holmes.Manager(
         model=s.model,
         ontology=s.ontology,
         overall_similarity_threshold=s.overall_similarity_threshold,
         embedding_based_matching_on_root_words=s.embedding_based_matching_on_root_words,
-        perform_coreference_resolution=s.perform_coreference_resolution,
+        perform_coreference_resolution=True if s.coreference_gating else s.perform_coreference_resolution,
         debug=s.debug,
+        number_of_workers=s.number_of_workers,
     )
+    gating = (s.coreference_gating, s.coreference_window if s.coreference_gating else None)
+    shared = _PIPELINE_GATING.setdefault(manager.nlp, gating)
+    if shared != gating:
+        manager.close()
+        raise ValueError(
+            f"Holmes shares the {s.model!r} pipeline between the Managers of a process, "
+            f"and it is set up with (coreference_gating, coreference_window) = {shared}; "
+            f"build every Manager of this model with those settings"
+        )
+    if s.coreference_gating:
+        install_coref_gate(manager.nlp, window=s.coreference_window)
+    return manager
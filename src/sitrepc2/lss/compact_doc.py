@@ -0,0 +1,242 @@
+# src/sitrepc2/lss/compact_doc.py
+"""
+Array-backed stand-in for a parsed Doc, for everything after matching.
+
+Once Holmes has matched a post, sectioning, context extraction, LSS
+scoping, event placement and event_locations read only token offsets,
+lemmas, heads, sentence starts and entity spans. A spaCy Doc carries far
+more (the vocab-backed token structs, Holmes' semantic dictionaries,
+coreferee chains), and every Location span built from it keeps the whole
+Doc alive for as long as its Post lives.
+
+CompactDoc keeps what those steps read in a few NumPy arrays (lemmas as
+ids into one StringTable) and offers the slice of the Doc / Span / Token
+interface they use: `len`, indexing and slicing, `text`, `ents`, `sents`
+and strict `char_span`. CompactSpans and CompactTokens are views holding
+the CompactDoc and their offsets; all three pickle.
+
+`run_nlp_pipeline(compact_docs=True)` converts each Doc right after
+matching, so the Doc can be freed before the post structure is built.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+from spacy.tokens import Doc
+
+from sitrepc2.gazetteer.store import StringTable
+
+
+class CompactDoc:
+    """Token offsets, lemmas, heads, sentence starts and entities of a Doc."""
+
+    __slots__ = (
+        "text", "idx", "ends", "heads", "lemma_ids", "lemmas", "sent_starts",
+        "ent_starts", "ent_ends", "ent_label_ids", "labels", "_ents",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        idx: np.ndarray,
+        ends: np.ndarray,
+        heads: np.ndarray,
+        lemma_ids: np.ndarray,
+        lemmas: StringTable,
+        sent_starts: np.ndarray,
+        ent_starts: np.ndarray,
+        ent_ends: np.ndarray,
+        ent_label_ids: np.ndarray,
+        labels: Tuple[str, ...],
+    ):
+        self.text = text
+        self.idx = idx                      # int32[n] token start chars
+        self.ends = ends                    # int32[n] token end chars
+        self.heads = heads                  # int32[n] head token indices
+        self.lemma_ids = lemma_ids          # int32[n] into `lemmas`
+        self.lemmas = lemmas
+        self.sent_starts = sent_starts      # int32[s] sentence start tokens
+        self.ent_starts = ent_starts        # int32[e]
+        self.ent_ends = ent_ends            # int32[e]
+        self.ent_label_ids = ent_label_ids  # int32[e] into `labels`
+        self.labels = labels
+        self._ents: Optional[Tuple[CompactSpan, ...]] = None
+
+    @classmethod
+    def from_doc(cls, doc: Doc) -> "CompactDoc":
+        n = len(doc)
+        idx = np.fromiter((t.idx for t in doc), dtype=np.int32, count=n)
+        ends = idx + np.fromiter((len(t) for t in doc), dtype=np.int32, count=n)
+        heads = np.fromiter((t.head.i for t in doc), dtype=np.int32, count=n)
+
+        lemma_index: dict = {}
+        lemma_ids = np.fromiter(
+            (lemma_index.setdefault(t.lemma_, len(lemma_index)) for t in doc), dtype=np.int32, count=n
+        )
+
+        # A Doc with no sentence boundaries set reads as one sentence.
+        sent_starts = [t.i for t in doc if t.i == 0 or t.is_sent_start]
+
+        label_index: dict = {}
+        ents = doc.ents
+        return cls(
+            doc.text,
+            idx,
+            ends,
+            heads,
+            lemma_ids,
+            StringTable.from_strings(lemma_index),
+            np.asarray(sent_starts, dtype=np.int32),
+            np.fromiter((e.start for e in ents), dtype=np.int32, count=len(ents)),
+            np.fromiter((e.end for e in ents), dtype=np.int32, count=len(ents)),
+            np.fromiter(
+                (label_index.setdefault(e.label_, len(label_index)) for e in ents),
+                dtype=np.int32,
+                count=len(ents),
+            ),
+            tuple(label_index),
+        )
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != "_ents"}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._ents = None
+
+    # ------------------------------------------------------------------
+    # Doc interface
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.idx)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union["CompactToken", "CompactSpan"]:
+        n = len(self)
+        if isinstance(i, slice):
+            start, end, step = i.indices(n)
+            if step != 1:
+                raise ValueError("CompactDoc slices must be contiguous")
+            return CompactSpan(self, start, max(start, end))
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return CompactToken(self, i)
+
+    def __iter__(self) -> Iterator["CompactToken"]:
+        for i in range(len(self)):
+            yield CompactToken(self, i)
+
+    @property
+    def ents(self) -> Tuple["CompactSpan", ...]:
+        if self._ents is None:
+            self._ents = tuple(
+                CompactSpan(self, int(s), int(e), self.labels[int(l)])
+                for s, e, l in zip(self.ent_starts, self.ent_ends, self.ent_label_ids)
+            )
+        return self._ents
+
+    @property
+    def sents(self) -> Iterator["CompactSpan"]:
+        bounds = [int(s) for s in self.sent_starts] + [len(self)]
+        for start, end in zip(bounds, bounds[1:]):
+            yield CompactSpan(self, start, end)
+
+    def char_span(self, start_idx: int, end_idx: int, label: str = "") -> Optional["CompactSpan"]:
+        """Tokens from character start_idx to end_idx, None unless both fall on token boundaries."""
+        start = int(np.searchsorted(self.idx, start_idx))
+        end = int(np.searchsorted(self.ends, end_idx)) + 1
+        if start >= len(self) or int(self.idx[start]) != start_idx:
+            return None
+        if end > len(self) or int(self.ends[end - 1]) != end_idx or end <= start:
+            return None
+        return CompactSpan(self, start, end, label)
+
+
+class CompactSpan:
+    """Tokens [start, end) of a CompactDoc, with an optional entity label."""
+
+    __slots__ = ("doc", "start", "end", "label_")
+
+    def __init__(self, doc: CompactDoc, start: int, end: int, label: str = ""):
+        self.doc = doc
+        self.start = start
+        self.end = end
+        self.label_ = label
+
+    @property
+    def start_char(self) -> int:
+        return int(self.doc.idx[self.start]) if self.start < len(self.doc) else len(self.doc.text)
+
+    @property
+    def end_char(self) -> int:
+        return int(self.doc.ends[self.end - 1]) if self.end > self.start else self.start_char
+
+    @property
+    def text(self) -> str:
+        return self.doc.text[self.start_char:self.end_char]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __iter__(self) -> Iterator["CompactToken"]:
+        for i in range(self.start, self.end):
+            yield CompactToken(self.doc, i)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union["CompactToken", "CompactSpan"]:
+        n = len(self)
+        if isinstance(i, slice):
+            start, end, step = i.indices(n)
+            if step != 1:
+                raise ValueError("CompactSpan slices must be contiguous")
+            return CompactSpan(self.doc, self.start + start, self.start + max(start, end))
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return CompactToken(self.doc, self.start + i)
+
+    def __repr__(self) -> str:
+        return self.text
+
+
+class CompactToken:
+    """Token `i` of a CompactDoc."""
+
+    __slots__ = ("doc", "i")
+
+    def __init__(self, doc: CompactDoc, i: int):
+        self.doc = doc
+        self.i = i
+
+    @property
+    def idx(self) -> int:
+        return int(self.doc.idx[self.i])
+
+    @property
+    def text(self) -> str:
+        return self.doc.text[self.idx:int(self.doc.ends[self.i])]
+
+    @property
+    def lemma_(self) -> str:
+        return self.doc.lemmas[int(self.doc.lemma_ids[self.i])]
+
+    @property
+    def head(self) -> "CompactToken":
+        return CompactToken(self.doc, int(self.doc.heads[self.i]))
+
+    @property
+    def is_sent_start(self) -> bool:
+        starts = self.doc.sent_starts
+        j = int(np.searchsorted(starts, self.i))
+        return j < len(starts) and int(starts[j]) == self.i
+
+    def __len__(self) -> int:
+        return int(self.doc.ends[self.i]) - self.idx
+
+    def __repr__(self) -> str:
+        return self.text
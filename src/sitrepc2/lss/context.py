@@ -1,16 +1,23 @@
-def extract_post_contexts(post: Post, doc: Doc):
+from typing import Optional
+
+from spacy.tokens import Doc
+
+from sitrepc2.dom.typedefs import Post, Section, SitRepContext
+from sitrepc2.lss.doc_index import DocIndex
+from sitrepc2.lss.lss_scoping import _ctx_kind_for_label
+
+
+def extract_post_contexts(post: Post, doc: Doc, index: Optional[DocIndex] = None):
     """
     Minimal deterministic detection of preposed post-wide context.
     """
+    if index is None:
+        index = DocIndex(doc)
 
-    ents = doc.ents
     seen_context = False
 
-    for ent in ents:
-        if ent.start > 12:
-            # heuristic: context phrases always come early
-            break
-
+    # heuristic: context phrases always come early
+    for ent in index.ents_starting_before(12):
         if ent.label_ in {"REGION", "GROUP", "DIRECTION"}:
             ctx = SitRepContext(
                 kind=_ctx_kind_for_label(ent.label_),
@@ -24,21 +31,22 @@ def extract_post_contexts(post: Post, doc: Doc):
     return post.contexts
 
 
-def extract_section_contexts(section: Section, doc: Doc):
+def extract_section_contexts(section: Section, doc: Doc, index: Optional[DocIndex] = None):
     """
     Extracts section-wide context using same rules as post,
     but scoped to the doc span corresponding to the section's text.
-    """
 
-    text = section.text
-    start = doc.text.find(text)
-    end = start + len(text)
-    span = doc.char_span(start, end)
+    The section's offsets and entities come from `index` (built from `doc`
+    if not given; see DocIndex.set_sections).
+    """
+    if index is None:
+        index = DocIndex(doc)
 
-    if span is None:
+    start, end = index.section_span(section)
+    if start < 0 or doc.char_span(start, end) is None:
         return
 
-    ents = [ent for ent in doc.ents if ent.start_char >= start and ent.end_char <= end]
+    ents = index.ents_in_chars(start, end)
 
     for ent in ents:
         if ent.start_char - start > 40:
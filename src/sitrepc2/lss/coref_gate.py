@@ -0,0 +1,255 @@
+# src/sitrepc2/lss/coref_gate.py
+"""
+Coreference resolution only where it can move an event.
+
+Holmes adds coreferee to its pipeline, and coreferee roughly doubles the
+cost of parsing a post. The coreference it finds only changes an event's
+location when an anaphor — "it", "they", "the village", "this
+settlement" — stands near a LOCALE span it may refer back to. Most
+sections of a report have no such anaphor.
+
+CorefGate replaces the "coreferee" pipe. Per Doc it splits the text into
+sections (lss.sectioning; the gazetteer ruler has already run) and
+
+    • gives every token an empty coreference chain holder, as coreferee
+      does for tokens it links nowhere, so Holmes' semantic analysis and
+      matching run unchanged,
+    • runs coreferee only on the sections holding an anaphora candidate
+      that follows a LOCALE span within `window` tokens, each section as
+      a Doc of its own, and maps the chains found back onto the post.
+
+Chains therefore never cross a section boundary. `last_run` reports how
+many sections (and tokens) paid for coreference in the most recent
+pipeline run.
+
+Enable it with `HolmesSettings(coreference_gating=True)`.
+"""
+
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from spacy.language import Language
+from spacy.tokens import Doc, Span, Token
+
+from sitrepc2.lss.doc_index import DocIndex
+from sitrepc2.lss.phrases import load_war_lexicon
+from sitrepc2.lss.sectioning import split_into_sections
+
+DEFAULT_WINDOW = 40
+
+ANAPHORIC_PRONOUNS: FrozenSet[str] = frozenset({
+    "it", "its", "itself", "they", "them", "their", "theirs", "themselves",
+    "he", "him", "his", "she", "her",
+})
+ANAPHORIC_DETERMINERS: FrozenSet[str] = frozenset({"the", "this", "that", "these", "those"})
+# Used alongside locations.generic_loc_nouns from the lexicon.
+DEFAULT_PLACE_NOUNS: FrozenSet[str] = frozenset({
+    "settlement", "village", "town", "city", "locality", "hamlet", "area", "position",
+})
+
+
+def lexicon_place_nouns(lexicon: Optional[dict] = None) -> FrozenSet[str]:
+    if lexicon is None:
+        try:
+            lexicon = load_war_lexicon()
+        except FileNotFoundError:
+            lexicon = {}
+    nouns = lexicon.get("locations", {}).get("generic_loc_nouns", [])
+    return DEFAULT_PLACE_NOUNS | {n.strip().lower() for n in nouns if n.strip()}
+
+
+def _empty_holder():
+    from coreferee.data_model import ChainHolder
+
+    holder = ChainHolder()
+    for name in [n for n in holder.__dict__ if n.startswith("temp_")]:
+        delattr(holder, name)
+    return holder
+
+
+def _shift_chains(section: Doc, offset: int, doc: Doc, first_index: int) -> list:
+    """
+    Copy the chains coreferee found in a section Doc onto the post Doc,
+    token indexes moved by `offset`; returns the new chains.
+    """
+    from coreferee.data_model import Chain, Mention
+
+    new: Dict[int, Chain] = {}
+    for token in section:
+        holder = doc[token.i + offset]._.coref_chains
+        for chain in token._.coref_chains or ():
+            copy = new.get(id(chain))
+            if copy is None:
+                mentions = []
+                for mention in chain.mentions:
+                    m = Mention()
+                    m.token_indexes = [i + offset for i in mention.token_indexes]
+                    m.root_index = mention.root_index + offset
+                    m.pretty_representation = (
+                        "[" + "; ".join(f"{doc[i].text}({i})" for i in m.token_indexes) + "]"
+                        if len(m.token_indexes) > 1
+                        else f"{doc[m.root_index].text}({m.root_index})"
+                    )
+                    mentions.append(m)
+                copy = Chain(mentions, chain.most_specific_mention_index)
+                copy.index = first_index + len(new)
+                new[id(chain)] = copy
+            holder.chains.append(copy)
+    return list(new.values())
+
+
+class CorefGate:
+    """
+    Pipeline component running `coreferee` (the wrapped coreferee pipe)
+    on the sections that need it. See install_coref_gate.
+    """
+
+    def __init__(
+        self,
+        nlp: Language,
+        name: str = "coref_gate",
+        window: int = DEFAULT_WINDOW,
+        place_nouns: Iterable[str] = DEFAULT_PLACE_NOUNS,
+    ):
+        self.name = name
+        self.window = window
+        self.place_nouns: FrozenSet[str] = frozenset(place_nouns)
+        self.coreferee = None
+        self.counts: Counter = Counter()
+        self.last_run: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # Gating
+    # ------------------------------------------------------------------
+
+    def is_candidate(self, token: Token) -> bool:
+        """An anaphoric pronoun, or a place noun with a definite determiner."""
+        if token.lower_ in ANAPHORIC_PRONOUNS:
+            return True
+        if token.lemma_.lower() in self.place_nouns or token.lower_ in self.place_nouns:
+            return any(c.dep_ == "det" and c.lower_ in ANAPHORIC_DETERMINERS for c in token.children) or (
+                token.i > 0 and token.doc[token.i - 1].lower_ in ANAPHORIC_DETERMINERS
+            )
+        return False
+
+    def needs_coreference(self, span: Span, index: DocIndex) -> bool:
+        """
+        True if some candidate in `span` follows a LOCALE span of `span`
+        by at most `window` tokens.
+        """
+        locale_ends = [
+            e.end for e in index.ents_in_tokens(span.start, span.end) if e.label_ == "LOCALE"
+        ]
+        if not locale_ends:
+            return False
+        for token in span:
+            if token.ent_type_ or not self.is_candidate(token):
+                continue
+            if any(0 <= token.i - end < self.window for end in locale_ends):
+                return True
+        return False
+
+    def section_spans(self, doc: Doc, index: DocIndex) -> List[Span]:
+        sections = split_into_sections(doc.text, doc, index)
+        index.set_sections(doc.text, sections)
+        spans = []
+        for section in sections:
+            start, end = index.section_span(section)
+            if start < 0:
+                continue
+            span = doc.char_span(start, end, alignment_mode="expand")
+            if span is not None and len(span):
+                spans.append(span)
+        return spans
+
+    # ------------------------------------------------------------------
+    # Component
+    # ------------------------------------------------------------------
+
+    def __call__(self, doc: Doc) -> Doc:
+        doc._.coref_chains = _empty_holder()
+        for token in doc:
+            token._.coref_chains = _empty_holder()
+
+        index = DocIndex(doc)
+        spans = self.section_spans(doc, index)
+        self.counts["docs"] += 1
+        self.counts["sections"] += len(spans)
+        self.counts["tokens"] += len(doc)
+        for span in spans:
+            if self.coreferee is None or not self.needs_coreference(span, index):
+                continue
+            section = span.as_doc()
+            self.coreferee(section)
+            chains = _shift_chains(section, span.start, doc, len(doc._.coref_chains.chains))
+            doc._.coref_chains.chains.extend(chains)
+            self.counts["coref_sections"] += 1
+            self.counts["coref_tokens"] += len(span)
+        return doc
+
+    # ------------------------------------------------------------------
+    # Run reports
+    # ------------------------------------------------------------------
+
+    def start_run(self) -> None:
+        self.counts = Counter()
+
+    def record_run(self) -> None:
+        c = self.counts
+        self.last_run = {
+            "docs": c["docs"],
+            "sections": c["sections"],
+            "coref_sections": c["coref_sections"],
+            "coref_section_rate": c["coref_sections"] / c["sections"] if c["sections"] else 0.0,
+            "tokens": c["tokens"],
+            "coref_tokens": c["coref_tokens"],
+            "coref_token_rate": c["coref_tokens"] / c["tokens"] if c["tokens"] else 0.0,
+        }
+
+
+@Language.factory(
+    "coref_gate",
+    assigns=["doc._.coref_chains", "token._.coref_chains"],
+    default_config={"window": DEFAULT_WINDOW, "place_nouns": sorted(DEFAULT_PLACE_NOUNS)},
+)
+def make_coref_gate(nlp: Language, name: str, window: int, place_nouns: List[str]) -> CorefGate:
+    return CorefGate(nlp, name, window=window, place_nouns=place_nouns)
+
+
+def install_coref_gate(
+    nlp: Language,
+    *,
+    window: int = DEFAULT_WINDOW,
+    place_nouns: Optional[Iterable[str]] = None,
+) -> CorefGate:
+    """
+    Put a CorefGate in place of the pipeline's "coreferee" pipe, wrapping
+    it; a pipeline that already has a gate keeps it.
+
+    Holmes shares a model's pipeline between Managers and adds "coreferee"
+    back (after "holmes") for each one that resolves coreference, so a
+    "coreferee" pipe found next to the gate is removed again: the gate
+    already wraps one.
+    """
+    if nlp.has_pipe("coref_gate"):
+        if nlp.has_pipe("coreferee"):
+            nlp.remove_pipe("coreferee")
+        return nlp.get_pipe("coref_gate")
+    if not nlp.has_pipe("coreferee"):
+        raise ValueError("coreference gating needs a pipeline with a 'coreferee' pipe")
+    if place_nouns is None:
+        place_nouns = lexicon_place_nouns()
+    coreferee = nlp.get_pipe("coreferee")
+    gate = nlp.add_pipe(
+        "coref_gate",
+        before="coreferee",
+        config={"window": window, "place_nouns": sorted(place_nouns)},
+    )
+    gate.coreferee = coreferee
+    nlp.remove_pipe("coreferee")
+    return gate
+
+
+def coref_gate(nlp: Language) -> Optional[CorefGate]:
+    """The pipeline's CorefGate, if it has one."""
+    return nlp.get_pipe("coref_gate") if nlp.has_pipe("coref_gate") else None
@@ -0,0 +1,445 @@
+# src/sitrepc2/lss/dependency_backend.py
+"""
+spaCy DependencyMatcher backend standing in for the Holmes Manager.
+
+Every search phrase register_search_phrases builds has one of a few
+shapes — "Somebody VERB something", "NOUN in something", "Air defence
+units VERB something" — and Holmes treats the generic pronouns
+("somebody", "something") as unmatchable. What is left to match is one
+trigger word or a small dependency tree of them, which a DependencyMatcher
+pattern expresses directly. DependencyManager compiles each phrase that
+way:
+
+    • matchable words are those Holmes would match (content and
+      preposition POS, not a generic pronoun); each matches a document
+      token by lemma or lower-case form, as Holmes' direct matching does,
+    • edges between them keep the phrase's dependency label, widened
+      where Holmes normalizes the parse: an object may be a passive
+      subject, a preposition may hang anywhere below its head, and a
+      noun may be reached through a conjunction ("attacks and strikes"),
+    • a phrase with one matchable word is a single-node pattern.
+
+It exposes the part of the Holmes Manager API the pipeline uses
+(`nlp`, `search_phrases`, register / remove / match) and returns match
+dicts of the same shape, so build_word_matches,
+compute_doc_span_from_raw_word_matches and the caches take them
+unchanged. There is no coreference, ontology, embedding or derivational
+matching, and documents are registered as Docs, without the to_bytes
+round trip (register_documents).
+
+Select it with `HolmesSettings(backend="dependency")`;
+`python -m sitrepc2.bench.matcher` reports its parity with and throughput
+against Holmes.
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import spacy
+from spacy.language import Language
+from spacy.matcher import DependencyMatcher
+from spacy.tokens import Doc, Token
+
+# Holmes' English matchable parts of speech and generic pronouns.
+MATCHABLE_POS = frozenset({"ADJ", "ADP", "ADV", "NOUN", "NUM", "PROPN", "VERB", "AUX", "X", "INTJ"})
+GENERIC_PRONOUNS = frozenset({"something", "somebody", "someone"})
+
+# Phrase dependency label → document labels accepted in its place.
+_DEP_EQUIVALENTS: Dict[str, Tuple[str, ...]] = {
+    "dobj": ("dobj", "nsubjpass"),
+    "nsubj": ("nsubj", "nsubjpass"),
+    "compound": ("compound", "amod", "nmod"),
+    "amod": ("amod", "compound", "nmod"),
+    "prt": ("prt", "advmod", "prep"),
+}
+_PREPOSITION_DEPS = ("prep", "agent", "dative")
+# Labels under which a noun may be one conjunct of several.
+_CONJOINABLE_DEPS = frozenset({"dobj", "pobj", "nsubj", "nsubjpass"})
+
+_NOUN_POS = ("NOUN", "PROPN")
+_NOUN_KERNEL_DEPS = ("nmod", "compound", "appos", "nummod")
+
+# (DependencyMatcher pattern, phrase token index per pattern node; None
+# for helper nodes that only carry structure)
+PhrasePattern = Tuple[List[dict], Tuple[Optional[int], ...]]
+
+
+# ===========================================================================
+# Compiling search phrases
+# ===========================================================================
+
+def is_matchable(token: Token) -> bool:
+    return (
+        token.pos_ in MATCHABLE_POS
+        and not token.is_punct
+        and token.lemma_.lower() not in GENERIC_PRONOUNS
+        and token.lower_ not in GENERIC_PRONOUNS
+    )
+
+
+def _representations(token: Token) -> List[str]:
+    return list(dict.fromkeys(r for r in (token.lemma_.lower(), token.lower_) if r))
+
+
+@dataclass
+class _Node:
+    slot: Optional[int]
+    attrs: Dict[str, Any]
+    parent: Optional[str] = None
+    op: str = ">"
+
+
+def _phrase_tree(phrase: Doc) -> Tuple[str, Dict[str, _Node]]:
+    """(root id, nodes) for the matchable words of a parsed phrase."""
+    matchable = [t for t in phrase if is_matchable(t)]
+    if not matchable:
+        raise ValueError(f"search phrase has no matchable words: {phrase.text!r}")
+    if len(matchable) == 1:
+        tok = matchable[0]
+        return f"w{tok.i}", {f"w{tok.i}": _Node(tok.i, {"LEMMA": {"IN": _representations(tok)}})}
+
+    wanted = {t.i for t in matchable}
+    root = next(t for t in phrase if t.head.i == t.i)
+    nodes: Dict[str, _Node] = {}
+    if root.i not in wanted:
+        # Structure only, e.g. a generic pronoun at the root.
+        nodes[f"w{root.i}"] = _Node(None, {})
+
+    # Nearest kept ancestor of each word, and whether it is the direct head.
+    anchors: Dict[int, Tuple[Token, bool]] = {}
+    for tok in matchable:
+        if tok.i == root.i:
+            continue
+        head, direct = tok.head, True
+        while head.i not in wanted and head.i != root.i:
+            head, direct = head.head, False
+        anchors[tok.i] = (head, direct)
+
+    for tok in matchable:
+        attrs: Dict[str, Any] = {"LEMMA": {"IN": _representations(tok)}}
+        if tok.i == root.i:
+            nodes[f"w{tok.i}"] = _Node(tok.i, attrs)
+            continue
+        head, direct = anchors[tok.i]
+        if tok.dep_ in _PREPOSITION_DEPS:
+            # "launched an attack in X": the parser may hang "in" on the
+            # verb or on its object; look below the verb for it.
+            if head.pos_ in _NOUN_POS and head.i in anchors:
+                head = anchors[head.i][0]
+            attrs["DEP"] = {"IN": list(_PREPOSITION_DEPS)}
+            op = ">>"
+        else:
+            attrs["DEP"] = {"IN": list(_DEP_EQUIVALENTS.get(tok.dep_, (tok.dep_,)))}
+            op = ">" if direct else ">>"
+        nodes[f"w{tok.i}"] = _Node(tok.i, attrs, f"w{head.i}", op)
+    return f"w{root.i}", nodes
+
+
+def _conjunct_variant(nodes: Dict[str, _Node], key: str) -> Dict[str, _Node]:
+    """
+    Copy of `nodes` where the word at `key` is matched as a later conjunct
+    of whatever token holds its position ("attacks and *strikes*").
+    """
+    out = copy.deepcopy(nodes)
+    node = out[key]
+    helper = f"{key}_head"
+    out[helper] = _Node(None, {"DEP": node.attrs["DEP"]}, node.parent, node.op)
+    attrs = {k: v for k, v in node.attrs.items() if k != "DEP"}
+    attrs["DEP"] = "conj"
+    out[key] = _Node(node.slot, attrs, helper, ">>")
+    return out
+
+
+def _emit(root: str, nodes: Dict[str, _Node]) -> PhrasePattern:
+    """Nodes in an order DependencyMatcher accepts: every parent first."""
+    order = [root]
+    i = 0
+    while i < len(order):
+        order.extend(k for k, n in nodes.items() if n.parent == order[i])
+        i += 1
+    pattern: List[dict] = []
+    for key in order:
+        node = nodes[key]
+        if node.parent is None:
+            pattern.append({"RIGHT_ID": key, "RIGHT_ATTRS": node.attrs})
+        else:
+            pattern.append({
+                "LEFT_ID": node.parent,
+                "REL_OP": node.op,
+                "RIGHT_ID": key,
+                "RIGHT_ATTRS": node.attrs,
+            })
+    return pattern, tuple(nodes[k].slot for k in order)
+
+
+def compile_search_phrase(phrase: Doc) -> List[PhrasePattern]:
+    """DependencyMatcher patterns for one parsed search phrase."""
+    root, nodes = _phrase_tree(phrase)
+    patterns = [_emit(root, nodes)]
+    for key, node in nodes.items():
+        if node.parent is None or node.slot is None:
+            continue
+        if phrase[node.slot].dep_ in _CONJOINABLE_DEPS and phrase[node.slot].pos_ in _NOUN_POS:
+            patterns.append(_emit(root, _conjunct_variant(nodes, key)))
+    return patterns
+
+
+@dataclass
+class DependencySearchPhrase:
+    """A compiled search phrase; `label` / `doc_text` as on a Holmes SearchPhrase."""
+    label: str
+    doc_text: str
+    doc: Doc
+    patterns: List[PhrasePattern] = field(default_factory=list)
+
+
+# ===========================================================================
+# Match dicts
+# ===========================================================================
+
+def _dependent_phrase(token: Token) -> str:
+    """The phrase Holmes reports for a matched word (its noun kernel)."""
+    if token.pos_ not in _NOUN_POS:
+        return token.text
+    words: List[str] = []
+    for t in token.doc[token.left_edge.i:token.right_edge.i + 1]:
+        if t.i > token.i and t.pos_ not in _NOUN_POS and t.dep_ not in _NOUN_KERNEL_DEPS:
+            break
+        words.append(t.text)
+    return " ".join(words)
+
+
+def _is_negated(token: Token) -> bool:
+    return any(c.dep_ == "neg" for t in (token, token.head) for c in t.children)
+
+
+def _is_uncertain(token: Token) -> bool:
+    return any(
+        c.dep_ == "aux" and c.tag_ == "MD"
+        for t in (token, token.head) for c in t.children
+    )
+
+
+def _sentences(doc: Doc, indices: Sequence[int]) -> str:
+    if not doc.has_annotation("SENT_START"):
+        return doc.text.strip()
+    starts = [doc[i].sent.start for i in indices]
+    lo, hi = min(starts), max(starts)
+    return " ".join(s.text.strip() for s in doc.sents if lo <= s.start <= hi)
+
+
+def build_match_dict(
+    phrase: DependencySearchPhrase,
+    document: str,
+    doc: Doc,
+    slots: Sequence[Tuple[int, int]],
+) -> dict:
+    """
+    Holmes-shaped match dict for (phrase token index, document token index)
+    pairs, in phrase order.
+    """
+    root_slot = phrase.doc[:].root.i
+    word_matches: List[dict] = []
+    negated = uncertain = False
+    index_within_document = slots[0][1]
+    for slot, i in slots:
+        sp_token, token = phrase.doc[slot], doc[i]
+        reprs = _representations(sp_token)
+        word = token.lemma_.lower() if token.lemma_.lower() in reprs else token.lower_
+        tok_negated, tok_uncertain = _is_negated(token), _is_uncertain(token)
+        negated = negated or tok_negated
+        uncertain = uncertain or tok_uncertain
+        if slot == root_slot:
+            index_within_document = i
+        word_matches.append({
+            "search_phrase_token_index": slot,
+            "search_phrase_word": word,
+            "document_token_index": i,
+            "first_document_token_index": i,
+            "last_document_token_index": i,
+            "structurally_matched_document_token_index": i,
+            "document_subword_index": None,
+            "document_subword_containing_token_index": None,
+            "document_word": word,
+            "document_phrase": _dependent_phrase(token),
+            "match_type": "direct",
+            "negated": tok_negated,
+            "uncertain": tok_uncertain,
+            "similarity_measure": 1.0,
+            "involves_coreference": False,
+            "extracted_word": word,
+            "depth": 0,
+            "explanation": f"Matches {sp_token.lemma_.upper()} directly.",
+        })
+    return {
+        "search_phrase_label": phrase.label,
+        "search_phrase_text": phrase.doc_text,
+        "document": document,
+        "index_within_document": index_within_document,
+        "sentences_within_document": _sentences(doc, [i for _, i in slots]),
+        "negated": negated,
+        "uncertain": uncertain,
+        "involves_coreference": False,
+        "overall_similarity_measure": 1.0,
+        "word_matches": word_matches,
+    }
+
+
+# ===========================================================================
+# Manager
+# ===========================================================================
+
+class DuplicateDocumentError(ValueError):
+    """A document label is already registered (as Holmes' error of that name)."""
+
+class DependencyManager:
+    """
+    Holmes Manager stand-in matching compiled search phrases with one
+    DependencyMatcher. Phrases and documents are held in this process;
+    there are no worker processes to start or feed.
+    """
+
+    backend = "dependency"
+
+    def __init__(self, model: str = "en_core_web_lg", *, nlp: Language | None = None):
+        self.nlp = nlp if nlp is not None else spacy.load(model)
+        self.search_phrases: List[DependencySearchPhrase] = []
+        self._matcher = DependencyMatcher(self.nlp.vocab)
+        # matcher key → (phrase, phrase token index per pattern node)
+        self._keys: Dict[int, Tuple[DependencySearchPhrase, Tuple[Optional[int], ...]]] = {}
+        self._next_key = 0
+        self._docs: Dict[str, Doc] = {}
+
+    # ------------------------------------------------------------------
+    # Search phrases
+    # ------------------------------------------------------------------
+
+    def parse_search_phrase(self, text: str, label: str | None = None) -> DependencySearchPhrase:
+        doc = self.nlp(text)
+        return DependencySearchPhrase(
+            label=label if label is not None else text,
+            doc_text=text,
+            doc=doc,
+            patterns=compile_search_phrase(doc),
+        )
+
+    def register_search_phrase(self, search_phrase: str, label: str | None = None) -> DependencySearchPhrase:
+        phrase = self.parse_search_phrase(search_phrase, label)
+        self.register_compiled_search_phrases([phrase])
+        return phrase
+
+    def register_compiled_search_phrases(self, phrases: Iterable[DependencySearchPhrase]) -> None:
+        """Register phrases already compiled, e.g. survivors of a label removal."""
+        for phrase in phrases:
+            for pattern, slots in phrase.patterns:
+                key = f"sp{self._next_key}"
+                self._next_key += 1
+                self._matcher.add(key, [pattern])
+                self._keys[self.nlp.vocab.strings[key]] = (phrase, slots)
+            self.search_phrases.append(phrase)
+
+    def remove_all_search_phrases_with_label(self, label: str) -> None:
+        for key_id, (phrase, _) in list(self._keys.items()):
+            if phrase.label == label:
+                self._matcher.remove(self.nlp.vocab.strings[key_id])
+                del self._keys[key_id]
+        self.search_phrases = [sp for sp in self.search_phrases if sp.label != label]
+
+    def remove_all_search_phrases(self) -> None:
+        for key_id in list(self._keys):
+            self._matcher.remove(self.nlp.vocab.strings[key_id])
+        self._keys.clear()
+        self.search_phrases = []
+
+    # ------------------------------------------------------------------
+    # Documents
+    # ------------------------------------------------------------------
+
+    def register_docs(self, docs: Dict[str, Doc]) -> None:
+        """
+        Register Docs under their labels. Like Holmes, a label already
+        registered raises DuplicateDocumentError; remove it first.
+        """
+        for label in docs:
+            if label in self._docs:
+                raise DuplicateDocumentError(label)
+        self._docs.update(docs)
+
+    def register_serialized_documents(self, document_dictionary: Dict[str, bytes]) -> None:
+        self.register_docs({
+            label: Doc(self.nlp.vocab).from_bytes(data)
+            for label, data in document_dictionary.items()
+        })
+
+    def remove_document(self, label: str) -> None:
+        self._docs.pop(label, None)
+
+    def remove_all_documents(self, labels_starting: str | None = None) -> None:
+        if labels_starting is None:
+            self._docs.clear()
+        else:
+            for label in [l for l in self._docs if l.startswith(labels_starting)]:
+                del self._docs[label]
+
+    def list_document_labels(self) -> List[str]:
+        return list(self._docs)
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def match(self, search_phrase_text: str | None = None) -> List[dict]:
+        """
+        Match every registered phrase (or only `search_phrase_text`, parsed
+        ad hoc and labelled with its own text) against every registered
+        document. Ordered by document registration, then, as Holmes orders
+        them, by the token matched by the phrase root (index_within_document),
+        then by phrase registration.
+        """
+        if search_phrase_text is None:
+            matcher, keys = self._matcher, self._keys
+        else:
+            phrase = self.parse_search_phrase(search_phrase_text)
+            matcher, keys = DependencyMatcher(self.nlp.vocab), {}
+            for n, (pattern, slots) in enumerate(phrase.patterns):
+                key = f"adhoc{n}"
+                matcher.add(key, [pattern])
+                keys[self.nlp.vocab.strings[key]] = (phrase, slots)
+        order = {id(sp): n for n, sp in enumerate(self.search_phrases)}
+
+        out: List[dict] = []
+        for label, doc in self._docs.items():
+            seen = set()
+            found = []
+            for key_id, token_ids in matcher(doc):
+                phrase, slots = keys[key_id]
+                pairs = tuple(sorted((s, i) for s, i in zip(slots, token_ids) if s is not None))
+                if len({i for _, i in pairs}) < len(pairs) or (id(phrase), pairs) in seen:
+                    continue
+                seen.add((id(phrase), pairs))
+                found.append((phrase, pairs))
+            built = [
+                (build_match_dict(phrase, label, doc, pairs), order.get(id(phrase), -1))
+                for phrase, pairs in found
+            ]
+            # Holmes' order within a document: the search phrase root's token.
+            built.sort(key=lambda b: (b[0]["index_within_document"], b[1]))
+            out.extend(m for m, _ in built)
+        return out
+
+    def close(self) -> None:
+        self._docs.clear()
+
+
+def register_documents(manager, docs: Dict[str, Doc]) -> None:
+    """
+    Register parsed Docs under their labels: handed over as they are to a
+    DependencyManager, serialized for a Holmes Manager.
+    """
+    if isinstance(manager, DependencyManager):
+        manager.register_docs(docs)
+    else:
+        manager.register_serialized_documents({label: d.to_bytes() for label, d in docs.items()})
@@ -0,0 +1,220 @@
+# src/sitrepc2/lss/directions.py
+"""
+DIRECTION phrase spotting.
+
+The EntityRuler route expands every direction alias into six token
+patterns (see `ruler._direction_phrase_patterns`):
+
+    in the direction of X      towards X
+    X direction                X axis
+    X sector                   the X line
+
+DirectionSpotter produces exactly the same spans without any patterns:
+it looks each token's LOWER form up in a set of direction aliases once,
+then checks the cue words around every hit. Build cost is one set insert
+per alias; match cost is one set probe per token.
+
+Two ways to plug it in, both resolving overlaps jointly with the other
+gazetteer labels (longest first, then leftmost), just as the single
+EntityRuler did:
+    • GazetteerRuler — EntityRuler subclass, factory "gazetteer_ruler"
+    • AliasScanner.add_direction_aliases
+"""
+
+import warnings
+from typing import Callable, Iterable, List, Optional, Set, Tuple, Union
+
+from spacy.language import Language
+from spacy.pipeline import EntityRuler
+from spacy.pipeline.entityruler import DEFAULT_ENT_ID_SEP
+from spacy.tokens import Doc, Span
+
+from sitrepc2.util.normalize import normalize_location_key
+
+DIRECTION_LABEL = "DIRECTION"
+
+# Suffix cues: "X direction", "X axis", "X sector"
+_SUFFIX_CUES = frozenset({"direction", "axis", "sector"})
+# Prefix cue: "in the direction of X"
+_LONG_PREFIX = ("in", "the", "direction", "of")
+
+
+# ===========================================================================
+# Spotter
+# ===========================================================================
+
+class DirectionSpotter:
+    """
+    Alias-first DIRECTION matcher. Holds only the set of alias keys.
+    """
+
+    def __init__(self, nlp: Language, name: str = "direction_spotter", label: str = DIRECTION_LABEL):
+        self.nlp = nlp
+        self.name = name
+        self.label = label
+        self.aliases: Set[str] = set()
+
+    def add_aliases(self, aliases: Iterable[str]) -> None:
+        """
+        Register direction aliases. Keys are normalized the way
+        `_direction_phrase_patterns` normalizes them; as there, an alias
+        is compared to a single token's LOWER, so multi-word aliases never
+        match and are not stored.
+        """
+        for alias in aliases:
+            key = normalize_location_key(alias)
+            if key and " " not in key:
+                self.aliases.add(key)
+
+    def __len__(self) -> int:
+        return len(self.aliases)
+
+    def match(self, doc: Doc) -> List[Tuple[int, int, int]]:
+        """(label_id, start, end) for every cue phrase around an alias."""
+        if not self.aliases:
+            return []
+
+        label_id = self.nlp.vocab.strings.add(self.label)
+        lowers = [t.lower_ for t in doc]
+        n = len(lowers)
+        aliases = self.aliases
+        found: List[Tuple[int, int, int]] = []
+
+        for i, low in enumerate(lowers):
+            if low not in aliases:
+                continue
+            prev = lowers[i - 1] if i > 0 else None
+            nxt = lowers[i + 1] if i + 1 < n else None
+
+            if i >= 4 and tuple(lowers[i - 4:i]) == _LONG_PREFIX:
+                found.append((label_id, i - 4, i + 1))
+            if prev == "towards":
+                found.append((label_id, i - 1, i + 1))
+            if nxt in _SUFFIX_CUES:
+                found.append((label_id, i, i + 2))
+            if prev == "the" and nxt == "line":
+                found.append((label_id, i - 1, i + 2))
+
+        return found
+
+    def __call__(self, doc: Doc) -> Doc:
+        """Standalone use: add DIRECTION spans that don't clash with doc.ents."""
+        matches = sorted(set(self.match(doc)), key=lambda m: (m[2] - m[1], -m[1]), reverse=True)
+        taken = [t.ent_type != 0 for t in doc]
+        new_entities: List[Span] = []
+        for label, start, end in matches:
+            if any(taken[start:end]):
+                continue
+            new_entities.append(Span(doc, start, end, label=label))
+            for k in range(start, end):
+                taken[k] = True
+        if new_entities:
+            doc.ents = list(doc.ents) + new_entities
+        return doc
+
+
+@Language.factory("direction_spotter")
+def make_direction_spotter(nlp: Language, name: str) -> DirectionSpotter:
+    return DirectionSpotter(nlp, name)
+
+
+# ===========================================================================
+# EntityRuler with a built-in spotter
+# ===========================================================================
+
+class GazetteerRuler(EntityRuler):
+    """
+    EntityRuler whose candidate set also includes DirectionSpotter hits,
+    so DIRECTION spans compete with LOCALE / REGION / GROUP patterns exactly
+    as the expanded token patterns used to.
+    """
+
+    def __init__(self, nlp: Language, name: str = "entity_ruler", **kwargs):
+        super().__init__(nlp, name, **kwargs)
+        self.directions = DirectionSpotter(nlp, f"{name}.directions")
+
+    def __len__(self) -> int:
+        return super().__len__() + len(self.directions)
+
+    @property
+    def labels(self) -> Tuple[str, ...]:
+        # install_entity_ruler sets ent_id_sep to None, so keys are never
+        # split into label and id (EntityRuler.labels would fail on it,
+        # and with it nlp.meta and nlp.remove_pipe).
+        return tuple(sorted(set(self.token_patterns) | set(self.phrase_patterns)))
+
+    def remove_phrases(self, phrases: Iterable[str], label: str) -> None:
+        remove_phrase_patterns(self, phrases, label)
+
+    def match(self, doc: Doc):
+        if not len(self.directions):
+            return super().match(doc)
+
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="\\[W036")
+            matches = list(self.matcher(doc)) + list(self.phrase_matcher(doc))
+        matches.extend(self.directions.match(doc))
+
+        final_matches = set(
+            [(m_id, start, end) for m_id, start, end in matches if start != end]
+        )
+        get_sort_key = lambda m: (m[2] - m[1], -m[1])
+        return sorted(final_matches, key=get_sort_key, reverse=True)
+
+
+def remove_phrase_patterns(ruler: EntityRuler, phrases: Iterable[str], label: str) -> None:
+    """
+    Drop phrase patterns `phrases` under `label` from any EntityRuler,
+    rebuilding only that label's PhraseMatcher entry from the already
+    tokenized pattern docs.
+    """
+    drop = set(phrases)
+    current = ruler.phrase_patterns.get(label, [])
+    kept = [d for d in current if d.text not in drop]
+    if len(kept) == len(current):
+        return
+    ruler.phrase_patterns[label] = kept
+    if label in ruler.phrase_matcher:
+        ruler.phrase_matcher.remove(label)
+    if kept:
+        ruler.phrase_matcher.add(label, kept)
+
+
+@Language.factory(
+    "gazetteer_ruler",
+    assigns=["doc.ents", "token.ent_type", "token.ent_iob"],
+    default_config={
+        "phrase_matcher_attr": None,
+        "matcher_fuzzy_compare": {"@misc": "spacy.levenshtein_compare.v1"},
+        "validate": False,
+        "overwrite_ents": False,
+        "ent_id_sep": DEFAULT_ENT_ID_SEP,
+        "scorer": {"@scorers": "spacy.entity_ruler_scorer.v1"},
+    },
+    default_score_weights={
+        "ents_f": 1.0,
+        "ents_p": 0.0,
+        "ents_r": 0.0,
+        "ents_per_type": None,
+    },
+)
+def make_gazetteer_ruler(
+    nlp: Language,
+    name: str,
+    phrase_matcher_attr: Optional[Union[int, str]],
+    matcher_fuzzy_compare: Callable,
+    validate: bool,
+    overwrite_ents: bool,
+    ent_id_sep: str,
+    scorer: Optional[Callable],
+) -> GazetteerRuler:
+    return GazetteerRuler(
+        nlp,
+        name,
+        phrase_matcher_attr=phrase_matcher_attr,
+        matcher_fuzzy_compare=matcher_fuzzy_compare,
+        validate=validate,
+        overwrite_ents=overwrite_ents,
+        ent_id_sep=ent_id_sep,
+        scorer=scorer,
+    )
@@ -0,0 +1,311 @@
+# src/sitrepc2/lss/doc_cache.py
+"""
+On-disk cache of parsed spaCy Docs.
+
+Reruns over already-seen posts (after a DOM tweak, a lexicon change, a
+crash mid-batch) should not pay for spaCy again. Parsed Docs are stored
+in a SQLite file under `.sitrepc2/doc_cache/` as DocBins (user data
+included, so Holmes' semantic annotations survive), one DocBin segment per
+stored batch plus a key → (segment, position) index. Deserializing a DocBin
+has a fixed cost of about a millisecond, so batches, not single docs, are
+the unit of storage, loading and eviction.
+
+Entries are keyed by
+
+    sha256(pipeline fingerprint, post text)
+
+where the fingerprint covers the model name/version, the pipe names and a
+hash of every gazetteer pattern loaded into the pipeline. Changing any of
+those simply stops old entries from being hit; they age out through LRU
+eviction of whole segments once the cache exceeds `max_bytes`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from spacy.language import Language
+from spacy.pipeline import EntityRuler
+from spacy.tokens import Doc, DocBin
+
+from sitrepc2.config.paths import doc_cache_path
+from sitrepc2.lss.alias_scanner import AliasScanner
+from sitrepc2.lss.batching import pipe_texts
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id         INTEGER PRIMARY KEY,
+    data       BLOB NOT NULL,
+    size       INTEGER NOT NULL,
+    last_used  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_last_used ON segments (last_used);
+CREATE TABLE IF NOT EXISTS docs (
+    key        TEXT PRIMARY KEY,
+    segment    INTEGER NOT NULL,
+    pos        INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_segment ON docs (segment);
+"""
+
+# SQLite caps the number of bound parameters per statement.
+_SQL_CHUNK = 500
+
+
+# ===========================================================================
+# Pipeline fingerprint
+# ===========================================================================
+
+def _update_trie(h, node) -> None:
+    labels = node.get(None, ())
+    h.update(("[" + "|".join(sorted(labels)) + "]").encode("utf-8"))
+    for key in sorted(k for k in node if k is not None):
+        h.update(key.encode("utf-8") + b"\x00")
+        _update_trie(h, node[key])
+        h.update(b"\x01")
+
+
+def ruler_pattern_hash(nlp: Language) -> str:
+    """
+    Order-independent hash of every EntityRuler / AliasScanner pattern and
+    direction alias in `nlp`.
+    """
+    h = hashlib.sha256()
+    for name, pipe in nlp.pipeline:
+        h.update(name.encode("utf-8") + b"\x00")
+        if isinstance(pipe, EntityRuler):
+            # Read the pattern stores directly: `EntityRuler.patterns` rebuilds
+            # dicts and splits labels on ent_id_sep, which the gazetteer
+            # rulers leave unset.
+            for label in sorted(pipe.phrase_patterns):
+                h.update(label.encode("utf-8") + b"\x00")
+                for text in sorted(d.text for d in pipe.phrase_patterns[label]):
+                    h.update(text.encode("utf-8") + b"\x00")
+            for label in sorted(pipe.token_patterns):
+                h.update(label.encode("utf-8") + b"\x00")
+                for p in sorted(repr(p) for p in pipe.token_patterns[label]):
+                    h.update(p.encode("utf-8") + b"\x00")
+        elif isinstance(pipe, AliasScanner):
+            for attr in sorted(pipe.tries):
+                h.update(attr.encode("utf-8"))
+                _update_trie(h, pipe.tries[attr])
+        directions = getattr(pipe, "directions", None)
+        if directions is not None:
+            for alias in sorted(directions.aliases):
+                h.update(alias.encode("utf-8") + b"\x00")
+    return h.hexdigest()
+
+
+def pipeline_fingerprint(nlp: Language) -> str:
+    # The raw meta dict: `nlp.meta` also recomputes every pipe's labels.
+    meta = nlp._meta
+    return "|".join((
+        f"{meta.get('lang', '')}_{meta.get('name', '')}",
+        str(meta.get("version", "")),
+        ",".join(nlp.pipe_names),
+        ruler_pattern_hash(nlp),
+    ))
+
+
+def doc_key(fingerprint: str, text: str) -> str:
+    h = hashlib.sha256(fingerprint.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+# ===========================================================================
+# Cache
+# ===========================================================================
+
+class DocCache:
+    """
+    Size-bounded LRU store of parsed Docs, safe to share between threads
+    and (through SQLite locking) between processes.
+
+    `hits`, `misses`, `writes` and `evictions` (docs dropped with their
+    segment) count this instance's activity; `stats()` adds the current
+    entry count and byte size.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_workspace(cls, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> "DocCache":
+        return cls(doc_cache_path(root) / "docs.sqlite", max_bytes)
+
+    # Connections are per process; a pickled cache reopens on first use.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get_many(self, nlp: Language, keys: Sequence[str]) -> Dict[str, Doc]:
+        """Cached Docs for whichever of `keys` are present."""
+        wanted = list(dict.fromkeys(keys))
+        out: Dict[str, Doc] = {}
+        with self._lock:
+            db = self._db()
+            by_segment: Dict[int, List[tuple[str, int]]] = {}
+            for i in range(0, len(wanted), _SQL_CHUNK):
+                chunk = wanted[i:i + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = db.execute(f"SELECT key, segment, pos FROM docs WHERE key IN ({marks})", chunk)
+                for key, segment, pos in rows:
+                    by_segment.setdefault(segment, []).append((key, pos))
+
+            for segment, members in by_segment.items():
+                (data,) = db.execute("SELECT data FROM segments WHERE id = ?", (segment,)).fetchone()
+                docs = list(DocBin().from_bytes(data).get_docs(nlp.vocab))
+                for key, pos in members:
+                    out[key] = docs[pos]
+
+            if by_segment:
+                now = time.time_ns()
+                db.executemany(
+                    "UPDATE segments SET last_used = ? WHERE id = ?",
+                    [(now, s) for s in by_segment],
+                )
+                db.commit()
+            self.hits += sum(1 for k in keys if k in out)
+            self.misses += sum(1 for k in keys if k not in out)
+        return out
+
+    def put_many(self, items: Iterable[tuple[str, Doc]]) -> None:
+        """Store `items` as one segment; keys already present are repointed."""
+        items = list(items)
+        if not items:
+            return
+        data = DocBin(docs=[doc for _, doc in items], store_user_data=True).to_bytes()
+        with self._lock:
+            db = self._db()
+            cur = db.execute(
+                "INSERT INTO segments (data, size, last_used) VALUES (?, ?, ?)",
+                (data, len(data), time.time_ns()),
+            )
+            segment = cur.lastrowid
+            db.executemany(
+                "INSERT OR REPLACE INTO docs (key, segment, pos) VALUES (?, ?, ?)",
+                [(key, segment, pos) for pos, (key, _) in enumerate(items)],
+            )
+            db.commit()
+            self.writes += len(items)
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM segments").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims: List[int] = []
+        for segment, size in db.execute("SELECT id, size FROM segments ORDER BY last_used ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append(segment)
+            total -= size
+        for i in range(0, len(victims), _SQL_CHUNK):
+            chunk = victims[i:i + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            self.evictions += db.execute(
+                f"SELECT COUNT(*) FROM docs WHERE segment IN ({marks})", chunk
+            ).fetchone()[0]
+            db.execute(f"DELETE FROM docs WHERE segment IN ({marks})", chunk)
+            db.execute(f"DELETE FROM segments WHERE id IN ({marks})", chunk)
+        db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM docs")
+            db.execute("DELETE FROM segments")
+            db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            db = self._db()
+            (n,) = db.execute("SELECT COUNT(*) FROM docs").fetchone()
+            (size,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM segments").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": n,
+            "bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ===========================================================================
+# Cached nlp.pipe
+# ===========================================================================
+
+def parse_with_cache(
+    nlp: Language,
+    texts: Sequence[str],
+    cache: Optional[DocCache],
+    *,
+    batch_size: int = 8,
+    batch_chars: Optional[int] = None,
+) -> List[Doc]:
+    """
+    `list(nlp.pipe(texts))`, served from `cache` where possible. Only the
+    misses are sent through spaCy; if every text is cached, spaCy is not
+    run at all. With `batch_chars`, batches are cut by character budget
+    instead of `batch_size` (see lss.batching).
+    """
+    if cache is None:
+        return list(pipe_texts(nlp, texts, batch_size=batch_size, batch_chars=batch_chars))
+
+    fingerprint = pipeline_fingerprint(nlp)
+    keys = [doc_key(fingerprint, t) for t in texts]
+    cached = cache.get_many(nlp, keys)
+
+    todo = [i for i, k in enumerate(keys) if k not in cached]
+    fresh: Dict[str, Doc] = {}
+    if todo:
+        parsed = pipe_texts(
+            nlp, [texts[i] for i in todo], batch_size=batch_size, batch_chars=batch_chars
+        )
+        for i, doc in zip(todo, parsed):
+            fresh[keys[i]] = doc
+        cache.put_many(fresh.items())
+
+    return [cached[k] if k in cached else fresh[k] for k in keys]
@@ -0,0 +1,139 @@
+# src/sitrepc2/lss/doc_index.py
+"""
+Per-Doc offset index shared by sectioning, context extraction, LSS scoping
+and event placement.
+
+`doc.ents` are sorted and never overlap, so their token starts, token ends
+and character starts / ends are each sorted too. DocIndex keeps those four
+arrays, built once per parsed Doc, and answers "which entities lie inside
+this token / character range" with two bisects instead of a pass over
+every entity.
+
+Once the post is split, `set_sections` records each section's character
+offsets in the post text, and `section_at` finds the section holding a
+character the same way.
+
+A CompactDoc (lss.compact_doc) can be indexed in place of a Doc.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from spacy.tokens import Doc, Span
+
+
+class DocIndex:
+    """
+    Sorted entity offsets and section offsets of one Doc. Build it after
+    the Doc's entities are final; it does not follow later changes.
+    """
+
+    def __init__(self, doc: Doc):
+        self.doc = doc
+        self.ents: Tuple[Span, ...] = tuple(doc.ents)
+        self.starts: List[int] = [e.start for e in self.ents]
+        self.ends: List[int] = [e.end for e in self.ents]
+        self.start_chars: List[int] = [e.start_char for e in self.ents]
+        self.end_chars: List[int] = [e.end_char for e in self.ents]
+        # (start, end) character offsets per section, -1 if not found
+        self.section_bounds: List[Tuple[int, int]] = []
+        self._section_starts: List[int] = []
+        self._section_order: List[int] = []
+        # Largest section end among the first j + 1 sections by start.
+        self._section_max_ends: List[int] = []
+        self._bounds_by_id: Dict[str, Tuple[int, int]] = {}
+
+    # ------------------------------------------------------------------
+    # Entities
+    # ------------------------------------------------------------------
+
+    def ents_in_tokens(self, start: int, end: int) -> Tuple[Span, ...]:
+        """Entities lying wholly inside tokens [start, end)."""
+        lo = bisect_left(self.starts, start)
+        hi = bisect_right(self.ends, end)
+        return self.ents[lo:hi] if lo < hi else ()
+
+    def ents_in_chars(self, start: int, end: int) -> Tuple[Span, ...]:
+        """Entities lying wholly inside characters [start, end)."""
+        lo = bisect_left(self.start_chars, start)
+        hi = bisect_right(self.end_chars, end)
+        return self.ents[lo:hi] if lo < hi else ()
+
+    def ents_starting_in_chars(self, start: int, end: int) -> Tuple[Span, ...]:
+        """Entities whose first character lies in [start, end)."""
+        return self.ents[bisect_left(self.start_chars, start):bisect_left(self.start_chars, end)]
+
+    def ents_starting_before(self, token: int) -> Tuple[Span, ...]:
+        """Entities starting at or before token index `token`."""
+        return self.ents[:bisect_right(self.starts, token)]
+
+    # ------------------------------------------------------------------
+    # Sections
+    # ------------------------------------------------------------------
+
+    def set_sections(self, text: str, sections: Sequence) -> None:
+        """
+        Locate each section's text in `text` (the post text the Doc was
+        parsed from). Sections come in reading order, so each is searched
+        for after the previous one; one that cannot be found there is
+        searched for from the start, and gets (-1, -1) if absent.
+        """
+        bounds: List[Tuple[int, int]] = []
+        cursor = 0
+        for section in sections:
+            start = text.find(section.text, cursor)
+            if start < 0:
+                start = text.find(section.text)
+            if start < 0:
+                bounds.append((-1, -1))
+                continue
+            end = start + len(section.text)
+            bounds.append((start, end))
+            cursor = max(cursor, end)
+
+        self.section_bounds = bounds
+        found = sorted(
+            (start, i) for i, (start, _) in enumerate(bounds) if start >= 0
+        )
+        self._section_starts = [start for start, _ in found]
+        self._section_order = [i for _, i in found]
+        self._section_max_ends = []
+        max_end = -1
+        for _, i in found:
+            max_end = max(max_end, bounds[i][1])
+            self._section_max_ends.append(max_end)
+        self._bounds_by_id = {
+            section.section_id: b for section, b in zip(sections, bounds)
+        }
+
+    def section_span(self, section) -> Tuple[int, int]:
+        """
+        Character offsets of a section passed to set_sections; any other
+        section is looked up in the Doc text.
+        """
+        bounds = self._bounds_by_id.get(section.section_id)
+        if bounds is not None and (bounds[0] < 0 or self.doc.text[bounds[0]:bounds[1]] == section.text):
+            return bounds
+        start = self.doc.text.find(section.text)
+        return (start, start + len(section.text)) if start >= 0 else (-1, -1)
+
+    def section_at(self, char: int) -> Optional[int]:
+        """
+        Position of the first section (in section order) whose span
+        [start, end] (end inclusive) holds `char`, or None.
+
+        Spans need not be disjoint or in order (a section found by the
+        fallback search can overlap an earlier one), so every section
+        starting at or before `char` is a candidate; the scan back stops
+        once no earlier section reaches `char`.
+        """
+        best: Optional[int] = None
+        for j in range(bisect_right(self._section_starts, char) - 1, -1, -1):
+            if self._section_max_ends[j] < char:
+                break
+            i = self._section_order[j]
+            if char <= self.section_bounds[i][1] and (best is None or i < best):
+                best = i
+        return best
@@ -4,8 +4,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Iterable, List
 
-import holmes_extractor as holmes
-
 from .typedefs import WordMatch
 
 
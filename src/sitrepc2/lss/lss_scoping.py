@@ -18,10 +18,10 @@ from __future__ import annotations
 from typing import List, Optional, Tuple
 
 from spacy.tokens import Doc, Span
-from holmes_extractor import Manager
 
 from sitrepc2.lss.typedefs import EventMatch
-from sitrepc2.events.typedefs import (
+from sitrepc2.lss.doc_index import DocIndex
+from sitrepc2.dom.typedefs import (
     Location,
     LocaleCandidate,
     SitRepContext,
@@ -37,6 +37,7 @@ from sitrepc2.events.typedefs import (
 def lss_scope_event(
     doc: Doc,
     hem: EventMatch,
+    index: Optional[DocIndex] = None,
 ) -> Tuple[List[Location], List[SitRepContext], Optional[Actor], Optional[Action]]:
     """
     Main entry point for LSS scoping.
@@ -52,10 +53,12 @@ def lss_scope_event(
         - create Location objects for LOCALE spans
         - determine which contexts scope which locations
         - assign event-wide contexts
+
+    Pass the post's DocIndex when scoping several events of one Doc.
     """
 
     event_tokens = doc[hem.doc_start_token_index: hem.doc_end_token_index]
-    spans = _extract_relevant_spans(event_tokens)
+    spans = _extract_relevant_spans(event_tokens, index)
 
     # Build preliminary structures
     location_objs = _build_location_objects(spans)
@@ -79,7 +82,7 @@ def lss_scope_event(
 # Span Extraction
 # ---------------------------------------------------------------------------
 
-def _extract_relevant_spans(tokens: Span) -> List[Span]:
+def _extract_relevant_spans(tokens: Span, index: Optional[DocIndex] = None) -> List[Span]:
     """
     Extract only the spans created by the entity-ruler:
         LOCALE
@@ -89,12 +92,13 @@ def _extract_relevant_spans(tokens: Span) -> List[Span]:
         PROXIMITY
     Ignore all others — LSS only cares about location-aware context.
     """
-    relevant = []
-    for ent in tokens.doc.ents:
-        if ent.start >= tokens.start and ent.end <= tokens.end:
-            if ent.label_ in {"LOCALE", "REGION", "GROUP", "DIRECTION", "PROXIMITY"}:
-                relevant.append(ent)
-    return sorted(relevant, key=lambda s: s.start)
+    if index is None:
+        index = DocIndex(tokens.doc)
+    # DocIndex returns entities in document order.
+    return [
+        ent for ent in index.ents_in_tokens(tokens.start, tokens.end)
+        if ent.label_ in {"LOCALE", "REGION", "GROUP", "DIRECTION", "PROXIMITY"}
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -1,11 +1,22 @@
 # src/sitrepc2/holmes/search_phrases.py
 from __future__ import annotations
 
+import hashlib
+import logging
+import os
+import pickle
+import time
 from collections.abc import Iterable
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, List, Optional
 
 from sitrepc2.config.paths import source_lexicon_path, lexicon_path
+from sitrepc2.lss.dependency_backend import DependencyManager
+from sitrepc2.lss.doc_cache import pipeline_fingerprint
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PHRASE_CACHE_FORMAT = 1
 
 
 def load_war_lexicon() -> dict[str, Any]:
@@ -36,62 +47,227 @@ def _iter_triggers(values: Iterable[str]) -> Iterable[str]:
         yield trigger
 
 
-def register_search_phrases(
-    manager: holmes.Manager,
-) -> None:
-    lexicon = load_war_lexicon()
-    actions = lexicon["actions"]
-    outcomes = lexicon["outcomes"]
-    casualties = lexicon.get("casualties", {})
-    air_defence = lexicon.get("air_defence", {})
-    missile_troops = lexicon.get("missile_troops", {})
+# (lexicon section, key, search phrase template, label), in registration
+# order. `{}` is replaced by each trigger listed under section/key.
+SEARCH_PHRASE_TEMPLATES: tuple[tuple[str, str, str, str], ...] = (
+    ("actions", "kinetic_verbs", "Somebody {} something", "KINETIC_EVENT"),
+    ("actions", "maneuver_verbs", "Somebody {} something", "MANEUVER_EVENT"),
+    ("actions", "defensive_verbs", "Somebody {} something", "DEFENSIVE_EVENT"),
+    ("actions", "interdiction_verbs", "Somebody {} something", "INTERDICTION_EVENT"),
+    ("actions", "support_verbs", "Somebody {} something", "SUPPORT_EVENT"),
+    ("actions", "action_phrases", "Somebody {} in something", "ACTION_PHRASE_EVENT"),
+    ("outcomes", "outcome_verbs", "Somebody {} something", "OUTCOME_EVENT"),
+    ("outcomes", "outcome_nouns", "{} in something", "OUTCOME_EVENT"),
+    ("outcomes", "outcome_phrases", "Somebody {} in something", "OUTCOME_EVENT"),
+    ("casualties", "casualty_verbs", "Somebody {} somebody", "CASUALTY_EVENT"),
+    ("casualties", "casualty_nouns", "{} among somebody", "CASUALTY_EVENT"),
+    ("casualties", "casualty_phrases", "Somebody {} near something", "CASUALTY_EVENT"),
+    ("air_defence", "air_defence_verbs", "Air defence units {} something", "AIR_DEFENCE_EVENT"),
+    ("air_defence", "air_defence_phrases", "Somebody {} over something", "AIR_DEFENCE_EVENT"),
+    ("missile_troops", "missile_verbs", "Missile troops {} something", "MISSILE_EVENT"),
+    ("missile_troops", "missile_phrases", "Somebody {} on something", "MISSILE_EVENT"),
+)
+
+# Sections every lexicon must provide; the others are optional.
+_REQUIRED_SECTIONS = ("actions", "outcomes")
+
+
+def iter_search_phrase_groups(
+    lexicon: dict[str, Any],
+) -> Iterable[tuple[str, list[tuple[str, str, str]]]]:
+    """
+    ("section.key" category, [(trigger, search phrase text, label), ...])
+    per SEARCH_PHRASE_TEMPLATES row.
+    """
+    for section, key, template, label in SEARCH_PHRASE_TEMPLATES:
+        if section in _REQUIRED_SECTIONS:
+            values = lexicon[section][key]
+        else:
+            values = lexicon.get(section, {}).get(key, [])
+        yield f"{section}.{key}", [
+            (trigger, template.format(trigger), label) for trigger in _iter_triggers(values)
+        ]
+
+
+def iter_search_phrases(lexicon: dict[str, Any]) -> Iterable[tuple[str, str, str]]:
+    """(trigger, search phrase text, label) for every phrase to register."""
+    for _, phrases in iter_search_phrase_groups(lexicon):
+        yield from phrases
+
+
+def trigger_terms(lexicon: dict[str, Any] | None = None) -> list[str]:
+    """Every trigger register_search_phrases would register, deduplicated."""
+    if lexicon is None:
+        lexicon = load_war_lexicon()
+    return list(dict.fromkeys(t for t, _, _ in iter_search_phrases(lexicon)))
 
-    reg = manager.register_search_phrase
 
-    for verb in _iter_triggers(actions["kinetic_verbs"]):
-        reg(f"Somebody {verb} something", label="KINETIC_EVENT")
+# ---------------------------------------------------------------------------
+# Registration, with an optional cache of built search phrases
+# ---------------------------------------------------------------------------
 
-    for verb in _iter_triggers(actions["maneuver_verbs"]):
-        reg(f"Somebody {verb} something", label="MANEUVER_EVENT")
+def search_phrase_key(manager: holmes.Manager, groups: list[tuple[str, list]]) -> str:
+    """
+    Hash of everything a built SearchPhrase depends on: the phrase texts
+    and labels (i.e. the lexicon as the templates read it), the spaCy
+    pipeline and the Holmes version and settings. An ontology is not
+    covered; don't cache phrases for a Manager built with one.
+    """
+    import holmes_extractor
 
-    for verb in _iter_triggers(actions["defensive_verbs"]):
-        reg(f"Somebody {verb} something", label="DEFENSIVE_EVENT")
+    h = hashlib.sha256()
+    for part in (
+        str(SEARCH_PHRASE_CACHE_FORMAT),
+        holmes_extractor.__version__,
+        pipeline_fingerprint(manager.nlp),
+        repr(getattr(manager, "analyze_derivational_morphology", None)),
+        repr(getattr(manager, "perform_coreference_resolution", None)),
+        repr(getattr(manager, "overall_similarity_threshold", None)),
+    ):
+        h.update(part.encode("utf-8") + b"\x00")
+    for category, phrases in groups:
+        h.update(category.encode("utf-8") + b"\x00")
+        for _, text, label in phrases:
+            h.update(f"{label}\x00{text}\x00".encode("utf-8"))
+    return h.hexdigest()
 
-    for verb in _iter_triggers(actions["interdiction_verbs"]):
-        reg(f"Somebody {verb} something", label="INTERDICTION_EVENT")
 
-    for verb in _iter_triggers(actions["support_verbs"]):
-        reg(f"Somebody {verb} something", label="SUPPORT_EVENT")
+def _read_phrase_cache(path: Path, key: str) -> Optional[Dict[str, list]]:
+    try:
+        with Path(path).open("rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != key:
+        return None
+    return data["phrases"]
+
+
+def _write_phrase_cache(path: Path, key: str, phrases: Dict[str, list]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    with tmp.open("wb") as f:
+        pickle.dump({"key": key, "phrases": phrases}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+# Holmes Manager internals register_packed_search_phrases relies on;
+# they are not public API (checked against holmes-extractor 4.2).
+_PACKED_REGISTRATION_ATTRS = (
+    "multiprocessing_manager",
+    "input_queues",
+    "worker",
+    "lock",
+    "_handle_response",
+    "number_of_workers",
+    "search_phrases",
+)
+
 
-    for core in _iter_triggers(actions["action_phrases"]):
-        reg(f"Somebody {core} in something", label="ACTION_PHRASE_EVENT")
+def _supports_packed_registration(manager: holmes.Manager) -> bool:
+    if not all(hasattr(manager, name) for name in _PACKED_REGISTRATION_ATTRS):
+        return False
+    if not hasattr(manager.worker, "register_search_phrase"):
+        return False
+    try:
+        import holmes_extractor.manager
+    except ImportError:
+        return False
+    return hasattr(holmes_extractor.manager, "TIMEOUT_SECONDS")
+
+
+def register_packed_search_phrases(manager: holmes.Manager, search_phrases: list) -> None:
+    """
+    Manager.register_search_phrase for already built (packed) phrases:
+    hand them to every worker and record them, without parsing anything.
+    A DependencyManager takes its compiled phrases back directly.
 
-    for verb in _iter_triggers(outcomes["outcome_verbs"]):
-        reg(f"Somebody {verb} something", label="OUTCOME_EVENT")
+    This goes through Holmes Manager internals; a Holmes version without
+    them gets each phrase re-registered from its text and label instead.
+    """
+    if not search_phrases:
+        return
+    if isinstance(manager, DependencyManager):
+        manager.register_compiled_search_phrases(search_phrases)
+        return
+    if not _supports_packed_registration(manager):
+        logger.warning(
+            "Holmes Manager internals not found; registering %d cached search phrases from text",
+            len(search_phrases),
+        )
+        for search_phrase in search_phrases:
+            manager.register_search_phrase(search_phrase.doc_text, label=search_phrase.label)
+        return
 
-    for noun in _iter_triggers(outcomes["outcome_nouns"]):
-        reg(f"{noun} in something", label="OUTCOME_EVENT")
+    from holmes_extractor.manager import TIMEOUT_SECONDS
 
-    for core in _iter_triggers(outcomes["outcome_phrases"]):
-        reg(f"Somebody {core} in something", label="OUTCOME_EVENT")
+    reply_queue = manager.multiprocessing_manager.Queue()
+    with manager.lock:
+        for search_phrase in search_phrases:
+            for queue in manager.input_queues:
+                queue.put(
+                    (manager.worker.register_search_phrase, (search_phrase,), reply_queue),
+                    timeout=TIMEOUT_SECONDS,
+                )
+            manager.search_phrases.append(search_phrase)
+    manager._handle_response(
+        reply_queue,
+        len(search_phrases) * manager.number_of_workers,
+        "register_search_phrase",
+    )
 
-    for verb in _iter_triggers(casualties.get("casualty_verbs", [])):
-        reg(f"Somebody {verb} somebody", label="CASUALTY_EVENT")
 
-    for noun in _iter_triggers(casualties.get("casualty_nouns", [])):
-        reg(f"{noun} among somebody", label="CASUALTY_EVENT")
+def register_search_phrases(
+    manager: holmes.Manager,
+    *,
+    cache_path: Path | None = None,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Register one search phrase per lexicon trigger (see
+    SEARCH_PHRASE_TEMPLATES).
 
-    for core in _iter_triggers(casualties.get("casualty_phrases", [])):
-        reg(f"Somebody {core} near something", label="CASUALTY_EVENT")
+    With a `cache_path` (e.g. `config.search_phrase_cache_path(root)`),
+    the built phrases are pickled there and, while the phrase set, model
+    and Holmes settings are unchanged (search_phrase_key), reloaded on the
+    next start instead of being parsed again.
 
-    for verb in _iter_triggers(air_defence.get("air_defence_verbs", [])):
-        reg(f"Air defence units {verb} something", label="AIR_DEFENCE_EVENT")
+    Returns per-category {"phrases", "seconds", "cached"}, in registration
+    order; the same figures are logged.
+    """
+    lexicon = load_war_lexicon()
+    groups = list(iter_search_phrase_groups(lexicon))
+    timings: Dict[str, Dict[str, float]] = {}
 
-    for core in _iter_triggers(air_defence.get("air_defence_phrases", [])):
-        reg(f"Somebody {core} over something", label="AIR_DEFENCE_EVENT")
+    key = search_phrase_key(manager, groups) if cache_path is not None else None
+    cached = _read_phrase_cache(cache_path, key) if cache_path is not None else None
 
-    for verb in _iter_triggers(missile_troops.get("missile_verbs", [])):
-        reg(f"Missile troops {verb} something", label="MISSILE_EVENT")
+    if cached is not None and all(category in cached for category, _ in groups):
+        for category, _ in groups:
+            t0 = time.perf_counter()
+            register_packed_search_phrases(manager, cached[category])
+            timings[category] = {
+                "phrases": len(cached[category]),
+                "seconds": time.perf_counter() - t0,
+                "cached": True,
+            }
+    else:
+        built: Dict[str, List[Any]] = {}
+        reg = manager.register_search_phrase
+        for category, phrases in groups:
+            t0 = time.perf_counter()
+            built[category] = [reg(text, label=label) for _, text, label in phrases]
+            timings[category] = {
+                "phrases": len(phrases),
+                "seconds": time.perf_counter() - t0,
+                "cached": False,
+            }
+        if cache_path is not None:
+            _write_phrase_cache(cache_path, key, built)
 
-    for core in _iter_triggers(missile_troops.get("missile_phrases", [])):
-        reg(f"Somebody {core} on something", label="MISSILE_EVENT")
+    for category, t in timings.items():
+        logger.info(
+            "search phrases %s: %d in %.3fs%s",
+            category, t["phrases"], t["seconds"], " (cached)" if t["cached"] else "",
+        )
+    return timings
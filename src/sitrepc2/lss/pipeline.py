@@ -4,16 +4,28 @@
 
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Sequence, Dict, List
+import math
+import multiprocessing
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence, Dict, List, Tuple
 from typing import TYPE_CHECKING
 
+from spacy.language import Language
+from spacy.tokens import Doc, Span
+from spacy.vocab import Vocab
+
 if TYPE_CHECKING:
-    from spacy.tokens import Doc
     from holmes_extractor import Manager
  
+from spacy.pipeline import Sentencizer
+
 from sitrepc2.dom.typedefs import Post, Section, Event
-from sitrepc2.lss.typedefs import EventMatch
+from sitrepc2.lss.typedefs import EventMatch, PipelineOptions
 from sitrepc2.lss.sectioning import split_into_sections
 from sitrepc2.lss.context import (   
     extract_post_contexts,
@@ -23,9 +35,37 @@ from sitrepc2.lss.events import (
     build_word_matches,
     compute_doc_span_from_raw_word_matches,
 )
-from sitrepc2.lss.ruler import add_entity_ruler
+from sitrepc2.config.paths import source_ruler_gazetteer_paths
+from sitrepc2.gazetteer.index import GazetteerDelta
+from sitrepc2.lss.ruler import apply_gazetteer_delta
+from sitrepc2.lss.ruler_cache import load_entity_rulers
 from sitrepc2.lss.lss_scoping import lss_scope_event
-from sitrepc2.lss.bootstrap import build_manager
+from sitrepc2.lss.bootstrap import HolmesSettings, build_manager
+from sitrepc2.lss.coref_gate import coref_gate
+from sitrepc2.lss.dependency_backend import register_documents
+from sitrepc2.lss.batching import chunk_bounds, chunk_offsets, merge_chunks, section_starts
+from sitrepc2.lss.compact_doc import CompactDoc
+from sitrepc2.lss.doc_cache import parse_with_cache
+from sitrepc2.lss.doc_index import DocIndex
+from sitrepc2.lss.sentence_cache import (
+    light_doc,
+    match_posts_by_sentence,
+    match_token_indices,
+    remap_match,
+)
+from sitrepc2.lss.prefilter import TriggerPrefilter
+from sitrepc2.lss.templates import ResidualFilter, TemplateExtractor
+from sitrepc2.lss.rematch import (
+    MatchStore,
+    apply_search_phrase_delta,
+    diff_search_phrases,
+    lexicon_search_phrases,
+    match_order_key,
+    match_phrase_key,
+    registered_search_phrases,
+    text_hash,
+)
+from sitrepc2.lss.alias_index import AliasIndex
 from sitrepc2.lss.phrases import register_search_phrases
 
 
@@ -33,13 +73,40 @@ from sitrepc2.lss.phrases import register_search_phrases
 # MANAGER + NLP INITIALIZATION
 # ===========================================================================
 
-def build_holmes_and_nlp() -> Manager:
+def build_holmes_and_nlp(
+    settings: HolmesSettings | None = None,
+    *,
+    gazetteer_paths: Sequence[Path] | None = None,
+    ruler_cache_dir: Path | None = None,
+    search_phrase_cache: Path | None = None,
+) -> Manager:
     """
     Constructs the Holmes Manager with entity ruler and search phrases.
+
+    The ruler is built from `gazetteer_paths` (locale, region, group,
+    direction CSVs; default: the reference gazetteer shipped with the
+    package), and with a `ruler_cache_dir` (e.g.
+    `config.ruler_cache_path(root)`) its compiled patterns are reused
+    across starts while the CSVs are unchanged (see lss.ruler_cache).
+
+    With a `search_phrase_cache` (e.g. `config.search_phrase_cache_path(root)`)
+    built search phrases are reused while the lexicon is unchanged; it is
+    ignored when the settings carry an ontology, and for the dependency
+    backend, whose phrases compile faster than they unpickle. Per-category
+    registration timings are kept on `manager.search_phrase_timings`.
+
+    `settings.backend` picks the matcher: the Holmes Manager, or a
+    DependencyManager (lss.dependency_backend) with the same interface.
     """
-    manager = build_manager()
-    manager.nlp = add_entity_ruler(manager.nlp)
-    register_search_phrases(manager)
+    manager = build_manager(settings)
+    if gazetteer_paths is None:
+        gazetteer_paths = source_ruler_gazetteer_paths()
+    manager.nlp = load_entity_rulers(manager.nlp, *gazetteer_paths, cache_dir=ruler_cache_dir)
+    if settings is not None and (settings.ontology is not None or settings.backend != "holmes"):
+        search_phrase_cache = None
+    manager.search_phrase_timings = register_search_phrases(
+        manager, cache_path=search_phrase_cache
+    )
     return manager
 
 
@@ -50,9 +117,11 @@ def build_holmes_and_nlp() -> Manager:
 def run_nlp_pipeline(
     posts: Sequence[Post],
     manager: Manager | None = None,
+    options: PipelineOptions | None = None,
     *,
-    batch_size: int = 8,
-    min_similarity: float = 0.0,
+    workers: int = 1,
+    settings: HolmesSettings | None = None,
+    **overrides: Any,
 ) -> Dict[str, Post]:
     """
     Full NLP pipeline.
@@ -65,32 +134,819 @@ def run_nlp_pipeline(
             • post.sections[]
                 • section.contexts
                 • section.events[]
+
+    Options come from `options` (lss.typedefs.PipelineOptions); any of its
+    fields passed as a keyword argument takes precedence, e.g.
+    `run_nlp_pipeline(posts, manager, batch_size=16)`.
+
+    With workers > 1 the posts are split into shards and processed by a
+    ShardedPipeline (one warm Manager per worker process, built from
+    `settings`); the result is identical to the serial path.
+
+    With a `doc_cache`, posts whose text was already parsed by the same
+    model and gazetteer patterns are loaded from it instead of re-running
+    spaCy.
+
+    With a `sentence_cache`, sentences seen before reuse their Holmes
+    matches and only new sentences are parsed and matched (see
+    lss.sentence_cache); `sentence_cache.last_run` reports the hit rate.
+    Not available in sharded mode.
+
+    With a `prefilter`, only sentences holding a lexicon trigger and a
+    gazetteer span are parsed and matched (see lss.prefilter); measure
+    what that costs in recall with audit_prefilter.
+
+    With a `match_store`, every post's raw matches and the registered
+    search phrases are recorded, so a later lexicon edit can be applied
+    with rematch_lexicon_changes instead of a full run.
+
+    With an `alias_index`, every post's gazetteer spans and event
+    locations are indexed by alias, so a later gazetteer edit can be
+    applied with reprocess_gazetteer_delta instead of a full run.
+
+    With `templates`, posts from the template channels are read by the
+    rule-based extractor first (see lss.templates); only the sentences it
+    does not cover are parsed and matched, on the sentence-level path.
+    `templates.last_run` reports coverage; check agreement with the
+    Holmes path with audit_templates.
+
+    With `batch_chars`, spaCy batches are cut by character budget instead
+    of `batch_size`; with `chunk_chars`, longer posts are parsed and
+    matched in chunks cut at section boundaries, their matches and Doc
+    mapped back onto the whole post (see lss.batching).
+
+    Posts are registered under labels of their own and removed again once
+    matched; documents the caller registered are left alone.
+
+    With a Manager built with `coreference_gating` (see lss.coref_gate),
+    `coref_gate(manager.nlp).last_run` reports how many of the sections
+    parsed in this run paid for coreference resolution.
+
+    With `compact_docs`, every Doc is replaced by a CompactDoc as soon as
+    its post is matched; location spans are then CompactSpans (see
+    lss.compact_doc).
     """
+    options = _options(options, overrides)
+
+    if workers > 1:
+        if manager is not None:
+            raise ValueError("Sharded mode builds its own managers; pass settings, not manager")
+        if options.sentence_cache is not None:
+            raise ValueError("sentence_cache is only supported with workers=1")
+        with ShardedPipeline(workers, settings) as sharded:
+            return sharded.run(posts, options)
 
     # Initialize manager
     if manager is None:
         manager = build_holmes_and_nlp()
 
+    gate = coref_gate(manager.nlp)
+    if gate is not None:
+        gate.start_run()
+
+    docs_by_post_id, matches_by_post = _match_posts(manager, posts, options)
+    if gate is not None:
+        gate.record_run()
+    if options.compact_docs:
+        _compact_docs(docs_by_post_id)
+
+    if options.match_store is not None:
+        _record_matches(options.match_store, manager, posts, matches_by_post)
+
+    # Build Post → Section → Event structure
+    out: Dict[str, Post] = {}
+
+    for post in posts:
+        post_id = post.post_id
+        _build_post_structure(
+            post,
+            docs_by_post_id[post_id],
+            matches_by_post.get(post_id, []),
+            options.min_similarity,
+        )
+        out[post_id] = post
+
+    if options.alias_index is not None:
+        options.alias_index.put_many((p, docs_by_post_id[p.post_id]) for p in posts)
+
+    return out
+
+
+def _options(options: PipelineOptions | None, overrides: Dict[str, Any]) -> PipelineOptions:
+    """`options` (default PipelineOptions()) with keyword overrides applied."""
+    options = options or PipelineOptions()
+    return replace(options, **overrides) if overrides else options
+
+
+# ===========================================================================
+# STREAMING (BOUNDED-MEMORY) EXECUTION
+# ===========================================================================
+
+def iter_nlp_pipeline(
+    posts: Iterable[Post],
+    manager: Manager | None = None,
+    options: PipelineOptions | None = None,
+    *,
+    window: int = 64,
+    **overrides: Any,
+) -> Iterator[Post]:
+    """
+    Streaming variant of run_nlp_pipeline.
+
+    Posts are consumed `window` at a time: the window is parsed,
+    registered in Holmes, matched, and its finished Post objects are
+    yielded in input order; the window's documents are then removed from
+    the Manager before the next window is read. Only one window of Docs
+    and serialized Docs is alive at a time, so memory stays flat however
+    many posts the input yields.
+
+    Options and keyword overrides, event ids and structure per post are
+    the same as run_nlp_pipeline's. A coreference gate's `last_run` covers
+    the windows yielded so far.
+    """
+    if window < 1:
+        raise ValueError("window must be a positive integer")
+    options = _options(options, overrides)
+
+    if manager is None:
+        manager = build_holmes_and_nlp()
+
+    gate = coref_gate(manager.nlp)
+    if gate is not None:
+        gate.start_run()
+
+    it = iter(posts)
+    while True:
+        chunk = list(islice(it, window))
+        if not chunk:
+            return
+
+        docs_by_post_id, matches_by_post = _match_posts(manager, chunk, options)
+        if gate is not None:
+            gate.record_run()
+        if options.compact_docs:
+            _compact_docs(docs_by_post_id)
+
+        if options.match_store is not None:
+            _record_matches(options.match_store, manager, chunk, matches_by_post)
+
+        for post in chunk:
+            _build_post_structure(
+                post,
+                docs_by_post_id[post.post_id],
+                matches_by_post.pop(post.post_id, []),
+                options.min_similarity,
+            )
+
+        if options.alias_index is not None:
+            options.alias_index.put_many((p, docs_by_post_id[p.post_id]) for p in chunk)
+        del docs_by_post_id
+
+        yield from chunk
+
+
+# ===========================================================================
+# INCREMENTAL RE-MATCHING AFTER A LEXICON EDIT
+# ===========================================================================
+
+def rematch_lexicon_changes(
+    posts: Sequence[Post],
+    manager: Manager,
+    match_store: MatchStore,
+    options: PipelineOptions | None = None,
+    **overrides: Any,
+) -> Dict[str, Post]:
+    """
+    Bring `posts` in line with the current war_lexicon.json without a full
+    run (see lss.rematch).
+
+    The Manager's search phrases are updated to the lexicon's. For each
+    stored post, only the phrases added since its matches were made are
+    matched, against its Doc, and matches of removed phrases are dropped.
+    Posts the store has no matches for, or whose text changed, get a full
+    match. Only posts whose match set changed are rebuilt and returned,
+    keyed by post_id (and re-indexed in the options' `alias_index`, if
+    given).
+
+    Of `options` (and keyword overrides, as for run_nlp_pipeline) only
+    `batch_size`, `batch_chars`, `chunk_chars`, `min_similarity`,
+    `doc_cache`, `alias_index` and `compact_docs` apply.
+    """
+    options = _options(options, overrides)
     nlp = manager.nlp
+    wanted = lexicon_search_phrases()
+    apply_search_phrase_delta(
+        manager, diff_search_phrases(registered_search_phrases(manager), wanted)
+    )
+    wanted_hash = match_store.add_phrase_set(wanted)
+
+    stored = match_store.get_many([p.post_id for p in posts])
+    unknown: List[Post] = []
+    # stored phrase set hash → posts matched with it
+    outdated: Dict[str, List[Post]] = defaultdict(list)
+    for p in posts:
+        entry = stored.get(p.post_id)
+        if entry is None or entry[0] != text_hash(p.text):
+            unknown.append(p)
+        elif entry[1] != wanted_hash:
+            outdated[entry[1]].append(p)
+
+    docs_by_post_id: Dict[str, Doc] = {}
+    matches_by_post: Dict[str, List[dict]] = {}
+
+    # --------------------------------------------------------------
+    # New / edited posts: all phrases
+    # --------------------------------------------------------------
+    if unknown:
+        docs, matches = _parse_and_match(manager, unknown, options)
+        docs_by_post_id.update(docs)
+        for p in unknown:
+            matches_by_post[p.post_id] = matches.get(p.post_id, [])
+
+    # --------------------------------------------------------------
+    # Outdated posts: added phrases only, removed phrases dropped
+    # --------------------------------------------------------------
+    for set_hash, group in outdated.items():
+        delta = diff_search_phrases(match_store.phrase_set(set_hash), wanted)
+        added_by_post: Dict[str, List[dict]] = defaultdict(list)
+        if delta.added:
+            docs, chunks = _parse_posts(nlp, group, options)
+            docs_by_post_id.update(docs)
+            labels = _register_posts(manager, docs, chunks)
+            try:
+                for label, text in sorted(delta.added):
+                    # Ad-hoc matching against the registered documents: only
+                    # this phrase is tried, but it comes back unlabelled.
+                    for m in manager.match(search_phrase_text=text):
+                        m["search_phrase_label"] = label
+                        found = _to_post(m, m.get("document"), labels)
+                        if found is not None:
+                            added_by_post[found[0]].append(found[1])
+            finally:
+                for label in labels:
+                    manager.remove_document(label)
+
+        for p in group:
+            old = stored[p.post_id][2]
+            merged = [m for m in old if match_phrase_key(m) not in delta.removed]
+            merged.extend(added_by_post.get(p.post_id, ()))
+            merged.sort(key=match_order_key)
+            matches_by_post[p.post_id] = merged
+
+    # Outdated posts whose matches did not change are restamped, not rebuilt.
+    updated = [p for p in posts if p.post_id in matches_by_post]
+    match_store.put_many(
+        ((p.post_id, p.text, matches_by_post[p.post_id]) for p in updated), wanted_hash
+    )
+    changed = [
+        p for p in updated
+        if p.post_id not in stored or matches_by_post[p.post_id] != stored[p.post_id][2]
+        or stored[p.post_id][0] != text_hash(p.text)
+    ]
 
     # --------------------------------------------------------------
-    # Run spaCy on all posts
+    # Rebuild changed posts
     # --------------------------------------------------------------
+    missing = [p for p in changed if p.post_id not in docs_by_post_id]
+    if missing:
+        docs_by_post_id.update(_parse_posts(nlp, missing, options)[0])
+    if options.compact_docs:
+        _compact_docs(docs_by_post_id)
+
+    out: Dict[str, Post] = {}
+    for post in changed:
+        post.contexts = []
+        post.sections = []
+        post.events = []
+        _build_post_structure(
+            post,
+            docs_by_post_id[post.post_id],
+            matches_by_post[post.post_id],
+            options.min_similarity,
+        )
+        out[post.post_id] = post
+
+    if options.alias_index is not None:
+        options.alias_index.put_many((p, docs_by_post_id[p.post_id]) for p in changed)
+    return out
+
+
+# ===========================================================================
+# INCREMENTAL REPROCESSING AFTER A GAZETTEER EDIT
+# ===========================================================================
+
+def reprocess_gazetteer_delta(
+    posts: Sequence[Post],
+    manager: Manager,
+    delta: GazetteerDelta,
+    alias_index: AliasIndex,
+    options: PipelineOptions | None = None,
+    **overrides: Any,
+) -> Dict[str, Post]:
+    """
+    Apply a gazetteer edit to `posts` without a full run (see
+    lss.alias_index).
+
+    `delta` (from GazetteerIndex.apply_patch) is applied to the Manager's
+    ruler; it must not have been applied already. Posts the index holds a
+    changed or removed alias for, or that contain an added alias, are
+    re-tagged, re-matched and rebuilt; so are posts the index has never
+    seen. All other posts are left as they are. The rebuilt posts are
+    returned keyed by post_id and re-indexed.
+
+    `alias_index.last_run` reports posts, invalidated and skipped, and the
+    invalidated posts by reason (tagged / candidate / unindexed).
+
+    Of `options` (and keyword overrides, as for run_nlp_pipeline) only
+    `batch_size`, `batch_chars`, `chunk_chars`, `min_similarity`,
+    `doc_cache`, `match_store` and `compact_docs` apply.
+    """
+    options = _options(options, overrides)
+    if delta:
+        apply_gazetteer_delta(manager.nlp, delta)
 
     post_ids = [p.post_id for p in posts]
-    texts = [p.text for p in posts]
+    affected = alias_index.affected_posts(delta) if delta else {}
+    indexed = alias_index.indexed(post_ids)
+    reasons: Dict[str, str] = {}
+    for post_id in post_ids:
+        if post_id not in indexed:
+            reasons[post_id] = "unindexed"
+        elif post_id in affected:
+            reasons[post_id] = affected[post_id]
+
+    invalidated = [p for p in posts if p.post_id in reasons]
+    alias_index.last_run = {
+        "posts": len(posts),
+        "invalidated": len(invalidated),
+        "skipped": len(posts) - len(invalidated),
+        **{f"invalidated_{k}": v for k, v in sorted(Counter(reasons.values()).items())},
+    }
+    if not invalidated:
+        return {}
+
+    docs_by_post_id, matches_by_post = _parse_and_match(manager, invalidated, options)
+    if options.compact_docs:
+        _compact_docs(docs_by_post_id)
+    if options.match_store is not None:
+        _record_matches(options.match_store, manager, invalidated, matches_by_post)
+
+    out: Dict[str, Post] = {}
+    for post in invalidated:
+        post.contexts = []
+        post.sections = []
+        post.events = []
+        _build_post_structure(
+            post,
+            docs_by_post_id[post.post_id],
+            matches_by_post.get(post.post_id, []),
+            options.min_similarity,
+        )
+        out[post.post_id] = post
+
+    alias_index.put_many((p, docs_by_post_id[p.post_id]) for p in invalidated)
+    return out
+
+
+def _compact_docs(docs_by_post_id: Dict[str, Doc]) -> None:
+    """Replace each Doc by its CompactDoc, in place, so the Doc can be freed."""
+    for post_id, doc in docs_by_post_id.items():
+        docs_by_post_id[post_id] = CompactDoc.from_doc(doc)
+
+
+def _record_matches(
+    match_store: MatchStore,
+    manager: Manager,
+    posts: Sequence[Post],
+    matches_by_post: Dict[str, List[dict]],
+) -> None:
+    phrase_set = match_store.add_phrase_set(registered_search_phrases(manager))
+    match_store.put_many(
+        ((p.post_id, p.text, matches_by_post.get(p.post_id, [])) for p in posts), phrase_set
+    )
+
+
+# ===========================================================================
+# PREFILTER RECALL AUDIT
+# ===========================================================================
+
+def audit_prefilter(
+    posts: Sequence[Post],
+    manager: Manager | None = None,
+    prefilter: TriggerPrefilter | None = None,
+    *,
+    batch_size: int = 8,
+    min_similarity: float = 0.0,
+    max_examples: int = 50,
+) -> dict:
+    """
+    Recall audit for the trigger prefilter.
+
+    Matches `posts` twice — whole posts, as run_nlp_pipeline does without
+    a prefilter, and through `prefilter` — and compares the two by search
+    phrase and matched character offsets. Posts are left untouched and no
+    doc cache is used, so both timings include parsing.
+
+    Every full match the prefiltered run does not reproduce is counted as
+    lost, with the reason taken from the sentence it starts in:
+        no_trigger  no trigger form in the sentence
+        no_anchor   no LOCALE / REGION / DIRECTION span in the sentence
+        context     the sentence was kept, but matched differently out of
+                    its post (coreference, cross-sentence structure)
+    Up to `max_examples` lost matches are listed under "missed".
+    """
+    if manager is None:
+        manager = build_holmes_and_nlp()
+    if prefilter is None:
+        prefilter = TriggerPrefilter.from_lexicon()
+
+    t0 = time.perf_counter()
+    full_docs, full_matches = _parse_and_match(manager, posts, PipelineOptions(batch_size=batch_size))
+    full_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    light_docs, kept_matches = match_posts_by_sentence(
+        manager, posts, PipelineOptions(batch_size=batch_size, prefilter=prefilter)
+    )
+    prefiltered_s = time.perf_counter() - t0
+
+    def similar_enough(m: dict) -> bool:
+        return float(m.get("overall_similarity_measure", 1.0)) >= min_similarity
+
+    by_label: Dict[str, Dict[str, float]] = defaultdict(lambda: {"full": 0, "recovered": 0})
+    lost_by_reason: Counter = Counter()
+    missed: List[dict] = []
+    n_full = n_recovered = n_prefiltered = 0
+
+    for post in posts:
+        post_id = post.post_id
+        full_doc, light = full_docs[post_id], light_docs[post_id]
+
+        remaining = Counter(
+            _match_signature(light, m)
+            for m in kept_matches.get(post_id, ())
+            if similar_enough(m)
+        )
+        n_prefiltered += sum(remaining.values())
+
+        for m in full_matches.get(post_id, ()):
+            if not similar_enough(m):
+                continue
+            label = m.get("search_phrase_label", "")
+            by_label[label]["full"] += 1
+            n_full += 1
+
+            key = _match_signature(full_doc, m)
+            if remaining[key] > 0:
+                remaining[key] -= 1
+                by_label[label]["recovered"] += 1
+                n_recovered += 1
+                continue
+
+            char = min(key[2]) if key[2] else 0
+            sent = next((s for s in light.sents if s.start_char <= char < s.end_char), None)
+            if sent is None or prefilter.accepts(sent):
+                reason = "context"
+            elif not prefilter.has_trigger(sent):
+                reason = "no_trigger"
+            else:
+                reason = "no_anchor"
+            lost_by_reason[reason] += 1
+            if len(missed) < max_examples:
+                missed.append({
+                    "post_id": post_id,
+                    "label": label,
+                    "search_phrase_text": key[1],
+                    "reason": reason,
+                    "sentence": sent.text if sent is not None else "",
+                })
+
+    for counts in by_label.values():
+        counts["recall"] = counts["recovered"] / counts["full"] if counts["full"] else 1.0
+
+    return {
+        "posts": len(posts),
+        "sentences": prefilter.last_run.get("sentences", 0),
+        "sentences_kept": prefilter.last_run.get("kept", 0),
+        "kept_rate": prefilter.last_run.get("kept_rate", 0.0),
+        "full_matches": n_full,
+        "prefiltered_matches": n_prefiltered,
+        "recovered": n_recovered,
+        # Matches only the prefiltered run produced.
+        "spurious": n_prefiltered - n_recovered,
+        "recall": n_recovered / n_full if n_full else 1.0,
+        "by_label": dict(by_label),
+        "lost_by_reason": dict(lost_by_reason),
+        "missed": missed,
+        "full_s": full_s,
+        "prefiltered_s": prefiltered_s,
+    }
+
+
+def _match_signature(doc: Doc, m: dict) -> tuple:
+    """Tokenization-independent identity of a match within its post."""
+    chars = tuple(sorted({doc[i].idx for i in match_token_indices(m)}))
+    return (m.get("search_phrase_label", ""), str(m.get("search_phrase_text", "") or ""), chars)
+
+
+# ===========================================================================
+# TEMPLATE AGREEMENT AUDIT
+# ===========================================================================
+
+def audit_templates(
+    posts: Sequence[Post],
+    manager: Manager | None = None,
+    templates: TemplateExtractor | None = None,
+    *,
+    batch_size: int = 8,
+    min_similarity: float = 0.0,
+    max_examples: int = 50,
+) -> dict:
+    """
+    Agreement audit for the template fast path, on a held-out set.
+
+    The template-channel posts among `posts` are matched whole by Holmes,
+    as run_nlp_pipeline does without templates, and read by `templates`.
+    In every sentence the templates cover, the located events of both are
+    compared as LSS scoping sees them — the LOCALE spans inside each
+    match's span, by character offset, with the match's label:
+
+        location_recall     Holmes-path locations the templates also place
+        location_precision  template locations the Holmes path also places
+        label_agreement     shared locations where the template label is
+                            among the Holmes labels for that place
+        sentence_agreement  covered sentences where both place the same
+                            locations, with agreeing labels
+
+    Posts are left untouched and no doc cache is used. Up to
+    `max_examples` disagreeing sentences are listed under "disagreements".
+    """
+    if manager is None:
+        manager = build_holmes_and_nlp()
+    if templates is None:
+        templates = TemplateExtractor.from_lexicon()
+    posts = [p for p in posts if templates.applies_to(p)]
+
+    t0 = time.perf_counter()
+    full_docs, full_matches = _parse_and_match(manager, posts, PipelineOptions(batch_size=batch_size))
+    full_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    sentencizer = Sentencizer()
+    light_docs = {p.post_id: light_doc(manager.nlp, p.text, sentencizer) for p in posts}
+    results = {p.post_id: templates.read_post(p, light_docs[p.post_id]) for p in posts}
+    template_s = time.perf_counter() - t0
+    templates.record_run(len(posts), list(results.values()))
+
+    # LOCALE start char → its text, for the examples
+    names: Dict[int, str] = {}
+
+    def located(doc: Doc, matches) -> Dict[int, set]:
+        # LOCALE start char → labels of the matches whose span holds it
+        out: Dict[int, set] = defaultdict(set)
+        index = DocIndex(doc)
+        for m in matches:
+            if float(m.get("overall_similarity_measure", 1.0)) < min_similarity:
+                continue
+            start, end = compute_doc_span_from_raw_word_matches(m)
+            for ent in index.ents_in_tokens(start, end):
+                if ent.label_ == "LOCALE":
+                    out[ent.start_char].add(m.get("search_phrase_label", ""))
+                    names[ent.start_char] = ent.text
+        return out
+
+    n_full = n_template = n_shared = n_labels_agree = 0
+    n_sentences = n_agree = 0
+    disagreements: List[dict] = []
+
+    for post in posts:
+        post_id = post.post_id
+        light, result = light_docs[post_id], results[post_id]
+        names.clear()
+        full = located(full_docs[post_id], full_matches.get(post_id, ()))
+        fast = located(light, result.matches)
+
+        for sent in light.sents:
+            if sent.start_char not in result.covered:
+                continue
+            n_sentences += 1
+            h = {c: v for c, v in full.items() if sent.start_char <= c < sent.end_char}
+            t = {c: v for c, v in fast.items() if sent.start_char <= c < sent.end_char}
+            shared = h.keys() & t.keys()
+            agree = sum(1 for c in shared if t[c] <= h[c])
+
+            n_full += len(h)
+            n_template += len(t)
+            n_shared += len(shared)
+            n_labels_agree += agree
+            if h.keys() == t.keys() and agree == len(shared):
+                n_agree += 1
+            elif len(disagreements) < max_examples:
+                disagreements.append({
+                    "post_id": post_id,
+                    "sentence": sent.text,
+                    "holmes": {names[c]: sorted(v) for c, v in sorted(h.items())},
+                    "template": {names[c]: sorted(v) for c, v in sorted(t.items())},
+                })
+
+    return {
+        **templates.last_run,
+        "audited_sentences": n_sentences,
+        "holmes_locations": n_full,
+        "template_locations": n_template,
+        "location_recall": n_shared / n_full if n_full else 1.0,
+        "location_precision": n_shared / n_template if n_template else 1.0,
+        "label_agreement": n_labels_agree / n_shared if n_shared else 1.0,
+        "sentence_agreement": n_agree / n_sentences if n_sentences else 1.0,
+        "disagreements": disagreements,
+        "full_s": full_s,
+        "template_s": template_s,
+    }
+
+
+# ===========================================================================
+# POST STRUCTURE
+# ===========================================================================
+
+def _build_post_structure(
+    post: Post,
+    doc: Doc,
+    raw_for_post: List[dict],
+    min_similarity: float,
+) -> None:
+    """Fill post.sections / contexts / events from its Doc and Holmes matches."""
+    post_id = post.post_id
+
+    # Extract EventMatch dataclasses
+    holmes_events: List[EventMatch] = []
+    for idx, m in enumerate(raw_for_post):
+        overall_similarity = float(m.get("overall_similarity_measure", 1.0))
+        if overall_similarity < min_similarity:
+            continue
+
+        start_idx, end_idx = compute_doc_span_from_raw_word_matches(m)
+        word_matches = build_word_matches(m)
+
+        hem = EventMatch(
+            event_id=f"{post_id}:{idx}",
+            post_id=post_id,
+            label=m.get("search_phrase_label", ""),
+            search_phrase_text=str(m.get("search_phrase_text", "") or ""),
+            sentences_within_document=str(m.get("sentences_within_document", "") or ""),
+            overall_similarity=overall_similarity,
+            negated=bool(m.get("negated", False)),
+            uncertain=bool(m.get("uncertain", False)),
+            involves_coreference=bool(m.get("involves_coreference", False)),
+            doc_start_token_index=start_idx,
+            doc_end_token_index=end_idx,
+            word_matches=word_matches,
+            raw_match=m,
+        )
+        holmes_events.append(hem)
+
+    # Entity offsets, then section offsets, indexed once for all steps
+    index = DocIndex(doc)
+
+    # ===================================================================
+    # 1. SECTION SPLITTING
+    # ===================================================================
+    sections = split_into_sections(post.text, doc, index)
+    post.sections = sections
+    index.set_sections(post.text, sections)
+
+    # ===================================================================
+    # 2. POST-LEVEL CONTEXT EXTRACTION
+    # ===================================================================
+    extract_post_contexts(post, doc, index)
+
+    # ===================================================================
+    # 3. SECTION-LEVEL CONTEXT EXTRACTION
+    # ===================================================================
+    for section in post.sections:
+        extract_section_contexts(section, doc, index)
+
+    # ===================================================================
+    # 4. EVENT EXTRACTION + LSS SCOPING
+    # ===================================================================
+    for hem in holmes_events:
+        _place_event_into_structure(doc, post, hem, index)
+
+
+# ===========================================================================
+# PATH SELECTION
+# ===========================================================================
+
+def _match_posts(
+    manager: Manager,
+    posts: Sequence[Post],
+    options: PipelineOptions,
+) -> tuple[dict[str, Doc], dict[str, list[dict]]]:
+    """
+    Docs and raw matches per post_id, by whichever path the options pick.
+    Every path removes the documents it registers.
+    """
+    docs_by_post_id: dict[str, Doc] = {}
+    matches_by_post: dict[str, list[dict]] = {}
+    templates = options.templates
+
+    rest = list(posts)
+    if templates is not None:
+        templated: list[Post] = []
+        rest = []
+        for p in posts:
+            (templated if templates.applies_to(p) else rest).append(p)
+        docs, matches = _match_with_templates(manager, templated, options, n_posts=len(posts))
+        docs_by_post_id.update(docs)
+        matches_by_post.update(matches)
+        if not rest:
+            return docs_by_post_id, matches_by_post
+
+    if options.sentence_cache is not None or options.prefilter is not None:
+        docs, matches = match_posts_by_sentence(manager, rest, options)
+    else:
+        docs, matches = _parse_and_match(manager, rest, options)
+    docs_by_post_id.update(docs)
+    matches_by_post.update(matches)
+    return docs_by_post_id, matches_by_post
+
+
+def _match_with_templates(
+    manager: Manager,
+    posts: Sequence[Post],
+    options: PipelineOptions,
+    *,
+    n_posts: int,
+) -> tuple[dict[str, Doc], dict[str, list[dict]]]:
+    """
+    Template-channel posts: the extractor reads every post's light doc;
+    sentences it leaves uncovered are matched on the sentence-level path
+    (through the options' `sentence_cache` and `prefilter`, if given) and
+    their matches merged in, in Holmes' order (match_order_key); a
+    template match's index_within_document is its trigger, the token the
+    phrase root would match.
+    """
+    templates = options.templates
+    nlp = manager.nlp
+    sentencizer = Sentencizer()
 
     docs_by_post_id: dict[str, Doc] = {}
+    matches_by_post: dict[str, list[dict]] = {}
+    results = []
+    partial: list[Post] = []
+    for post in posts:
+        doc = light_doc(nlp, post.text, sentencizer)
+        result = templates.read_post(post, doc)
+        results.append(result)
+        docs_by_post_id[post.post_id] = doc
+        matches_by_post[post.post_id] = list(result.matches)
+        if not result.complete:
+            partial.append(post)
+    templates.record_run(n_posts, results)
+
+    if partial:
+        residual = ResidualFilter(
+            {p.post_id: r.covered for p, r in zip(posts, results) if not r.complete}, options.prefilter
+        )
+        docs, matches = match_posts_by_sentence(manager, partial, replace(options, prefilter=residual))
+        for post in partial:
+            merged = matches_by_post[post.post_id] + matches.get(post.post_id, [])
+            merged.sort(key=match_order_key)
+            matches_by_post[post.post_id] = merged
+            docs_by_post_id[post.post_id] = docs[post.post_id]
 
-    for post_id, doc in zip(post_ids, nlp.pipe(texts, batch_size=batch_size)):
-        docs_by_post_id[post_id] = doc
+    return docs_by_post_id, matches_by_post
+
+
+# ===========================================================================
+# SPACY + HOLMES OVER WHOLE POSTS
+# ===========================================================================
+
+def _parse_and_match(
+    manager: Manager,
+    posts: Sequence[Post],
+    options: PipelineOptions,
+) -> tuple[dict[str, Doc], dict[str, list[dict]]]:
+    """
+    Docs and raw matches per post_id. Posts and chunks are registered
+    under labels of their own (_register_posts) and removed again, so
+    documents the caller registered, under post ids or otherwise, are
+    neither matched nor removed.
+    """
+    # --------------------------------------------------------------
+    # Run spaCy on all posts (cached docs skip it)
+    # --------------------------------------------------------------
+
+    docs_by_post_id, chunks_by_post = _parse_posts(manager.nlp, posts, options)
 
     # Register documents in Holmes
-    serialized_docs = {pid: doc.to_bytes() for pid, doc in docs_by_post_id.items()}
-    manager.register_serialized_documents(serialized_docs)
+    labels = _register_posts(manager, docs_by_post_id, chunks_by_post)
 
     # Run Holmes
-    raw_matches = manager.match()
+    try:
+        raw_matches = manager.match()
+    finally:
+        for label in labels:
+            manager.remove_document(label)
 
     # Bucket matches by post
     matches_by_post: dict[str, list[dict]] = defaultdict(list)
@@ -102,79 +958,259 @@ def run_nlp_pipeline(
         )
         if not doc_label:
             raise ValueError("Holmes match missing document label")
-        matches_by_post[doc_label].append(m)
+        found = _to_post(m, doc_label, labels)
+        if found is not None:
+            matches_by_post[found[0]].append(found[1])
+    # Chunks came back one document after another; restore Holmes' order
+    # for the whole post (match_order_key).
+    for post_id in chunks_by_post:
+        matches_by_post[post_id].sort(key=match_order_key)
 
-    # Build Post → Section → Event structure
-    out: Dict[str, Post] = {}
+    return docs_by_post_id, matches_by_post
 
-    for post in posts:
-        post_id = post.post_id
-        doc = docs_by_post_id[post_id]
-        raw_for_post = matches_by_post.get(post_id, [])
-
-        # Extract EventMatch dataclasses
-        holmes_events: List[EventMatch] = []
-        for idx, m in enumerate(raw_for_post):
-            overall_similarity = float(m.get("overall_similarity_measure", 1.0))
-            if overall_similarity < min_similarity:
-                continue
 
-            start_idx, end_idx = compute_doc_span_from_raw_word_matches(m)
-            word_matches = build_word_matches(m)
-
-            hem = EventMatch(
-                event_id=f"{post_id}:{idx}",
-                post_id=post_id,
-                label=m.get("search_phrase_label", ""),
-                search_phrase_text=str(m.get("search_phrase_text", "") or ""),
-                sentences_within_document=str(m.get("sentences_within_document", "") or ""),
-                overall_similarity=overall_similarity,
-                negated=bool(m.get("negated", False)),
-                uncertain=bool(m.get("uncertain", False)),
-                involves_coreference=bool(m.get("involves_coreference", False)),
-                doc_start_token_index=start_idx,
-                doc_end_token_index=end_idx,
-                word_matches=word_matches,
-                raw_match=m,
-            )
-            holmes_events.append(hem)
-
-        # ===================================================================
-        # 1. SECTION SPLITTING
-        # ===================================================================
-        sections = split_into_sections(post.text, doc)
-        post.sections = sections
-
-        # ===================================================================
-        # 2. POST-LEVEL CONTEXT EXTRACTION
-        # ===================================================================
-        extract_post_contexts(post, doc)
-
-        # ===================================================================
-        # 3. SECTION-LEVEL CONTEXT EXTRACTION
-        # ===================================================================
-        for section in post.sections:
-            extract_section_contexts(section, doc)
-
-        # ===================================================================
-        # 4. EVENT EXTRACTION + LSS SCOPING
-        # ===================================================================
-        for hem in holmes_events:
-            _place_event_into_structure(doc, post, hem)
+def _parse_posts(
+    nlp: Language,
+    posts: Sequence[Post],
+    options: PipelineOptions,
+) -> tuple[dict[str, Doc], dict[str, list[Doc]]]:
+    """
+    Doc per post_id, plus the chunk Docs of every post over
+    `options.chunk_chars`; a chunked post's Doc is its chunks merged.
+    Chunks go through the doc cache and batches like whole posts.
+    """
+    chunk_chars = options.chunk_chars
+    texts: list[str] = []
+    # post_id → its slice of `texts`
+    layout: dict[str, tuple[int, int]] = {}
+    sentencizer = Sentencizer()
+    for p in posts:
+        first = len(texts)
+        if chunk_chars is not None and len(p.text) > chunk_chars:
+            cuts = section_starts(p.text, light_doc(nlp, p.text, sentencizer))
+            texts.extend(p.text[a:b] for a, b in chunk_bounds(p.text, cuts, chunk_chars))
+        else:
+            texts.append(p.text)
+        layout[p.post_id] = (first, len(texts))
 
-        out[post_id] = post
+    docs = parse_with_cache(
+        nlp,
+        texts,
+        options.doc_cache,
+        batch_size=options.batch_size,
+        batch_chars=options.batch_chars,
+    )
 
-    return out
+    docs_by_post_id: dict[str, Doc] = {}
+    chunks_by_post: dict[str, list[Doc]] = {}
+    for post_id, (first, end) in layout.items():
+        if end - first == 1:
+            docs_by_post_id[post_id] = docs[first]
+        else:
+            chunks_by_post[post_id] = docs[first:end]
+            docs_by_post_id[post_id] = merge_chunks(docs[first:end])
+    return docs_by_post_id, chunks_by_post
+
+
+def _register_posts(
+    manager: Manager,
+    docs_by_post_id: dict[str, Doc],
+    chunks_by_post: dict[str, list[Doc]],
+) -> dict[str, tuple[str, int]]:
+    """
+    Register whole posts under `<post_id>#post` and chunks under
+    `<post_id>#chunk<k>`; returns registered label → (post_id, token
+    offset).
+
+    The labels are the pipeline's own, so documents the caller registered
+    under plain post ids are left alone. A Manager refuses a label it
+    already holds (Holmes raises DuplicateDocumentError), so one left
+    behind by an interrupted run is removed first.
+    """
+    labels: dict[str, tuple[str, int]] = {}
+    docs: dict[str, Doc] = {}
+    for post_id, doc in docs_by_post_id.items():
+        chunks = chunks_by_post.get(post_id)
+        if chunks is None:
+            docs[f"{post_id}#post"] = doc
+            labels[f"{post_id}#post"] = (post_id, 0)
+            continue
+        for k, (chunk, offset) in enumerate(zip(chunks, chunk_offsets(chunks))):
+            label = f"{post_id}#chunk{k}"
+            docs[label] = chunk
+            labels[label] = (post_id, offset)
+    for label in set(manager.list_document_labels()) & docs.keys():
+        manager.remove_document(label)
+    register_documents(manager, docs)
+    return labels
+
+
+def _to_post(m: dict, label: str, labels: dict[str, tuple[str, int]]) -> tuple[str, dict] | None:
+    """
+    The post_id a match belongs to, and the match in that post's Doc;
+    None for a document not in `labels`.
+    """
+    if label not in labels:
+        return None
+    post_id, offset = labels[label]
+    if offset == 0:
+        return post_id, {**m, "document": post_id}
+    return post_id, remap_match(m, lambda i: i + offset, post_id)
+
+
+# ===========================================================================
+# SHARDED (MULTI-PROCESS) EXECUTION
+# ===========================================================================
+
+# Per-process Manager, built once by _init_shard_worker.
+_SHARD_MANAGER: Manager | None = None
+
+
+def _init_shard_worker(settings: HolmesSettings) -> None:
+    global _SHARD_MANAGER
+    _SHARD_MANAGER = build_holmes_and_nlp(settings)
+
+
+@dataclass(frozen=True)
+class _SpanRef:
+    """A Location span in transit from a worker: offsets into the post's Doc."""
+    start: int
+    end: int
+    label: str
+
+
+def _post_locations(post: Post):
+    for section in post.sections:
+        for event in section.events:
+            yield from event.locations
+
+
+def _detach_spans(post: Post) -> bytes | None:
+    """
+    Replace the spaCy Spans on `post`'s locations (which do not pickle) by
+    _SpanRefs, and return the bytes of the Doc they point into.
+    """
+    doc = None
+    for loc in _post_locations(post):
+        if isinstance(loc.span, Span):
+            doc = loc.span.doc
+            loc.span = _SpanRef(loc.span.start, loc.span.end, loc.span.label_)
+    return None if doc is None else doc.to_bytes()
+
+
+def _attach_spans(post: Post, doc_bytes: bytes | None, vocab: Vocab) -> None:
+    """Inverse of _detach_spans, over a Doc rebuilt in this process."""
+    if doc_bytes is None:
+        return
+    doc = Doc(vocab).from_bytes(doc_bytes)
+    for loc in _post_locations(post):
+        if isinstance(loc.span, _SpanRef):
+            loc.span = Span(doc, loc.span.start, loc.span.end, label=loc.span.label)
+
+
+def _run_shard(posts: List[Post], options: PipelineOptions) -> List[Tuple[Post, bytes | None]]:
+    manager = _SHARD_MANAGER
+    manager.remove_all_documents()
+    out = run_nlp_pipeline(posts, manager, options)
+    return [(out[p.post_id], _detach_spans(out[p.post_id])) for p in posts]
+
+
+class ShardedPipeline:
+    """
+    Pool of worker processes, each owning a warm Holmes Manager.
+
+    `run` partitions posts into contiguous shards, runs the serial pipeline
+    on each shard in some worker, and merges the results back in input
+    order. Every post is parsed and matched on its own exactly as in the
+    serial path, so event ids and structure do not depend on the sharding.
+
+    Location spans come back as Spans over Docs rebuilt in this process
+    from the workers' Doc bytes, sharing one Vocab per ShardedPipeline.
+
+    Keep one instance alive across calls (e.g. for a backfill) to pay the
+    model / search-phrase start-up once per worker.
+    """
+
+    def __init__(self, workers: int, settings: HolmesSettings | None = None):
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        s = settings or HolmesSettings()
+        # Parallelism comes from the shards; one Holmes matcher each.
+        if s.number_of_workers is None:
+            s = replace(s, number_of_workers=1)
+        self.workers = workers
+        self.settings = s
+        self.vocab = Vocab()
+        # Holmes managers start their own processes and queue threads,
+        # which do not survive fork; start workers fresh instead.
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_shard_worker,
+            initargs=(s,),
+        )
+
+    def run(
+        self,
+        posts: Sequence[Post],
+        options: PipelineOptions | None = None,
+        *,
+        shard_size: int | None = None,
+        **overrides: Any,
+    ) -> Dict[str, Post]:
+        """
+        Same contract as run_nlp_pipeline (options, keyword overrides): the
+        input Post objects are filled in and returned keyed by post_id.
+        `shard_size` defaults to about four shards per worker to even out
+        uneven post lengths. A `doc_cache` is shared by all workers (each
+        opens its own connection); its counters in this process are not
+        updated, nor are `prefilter.last_run` and `templates.last_run`. A
+        `match_store` and an `alias_index` are written by the workers
+        directly. A `sentence_cache` is not supported.
+        """
+        options = _options(options, overrides)
+        if options.sentence_cache is not None:
+            raise ValueError("sentence_cache is only supported with workers=1")
+        posts = list(posts)
+        if not posts:
+            return {}
+        if shard_size is None:
+            shard_size = max(1, math.ceil(len(posts) / (self.workers * 4)))
+
+        shards = [posts[i:i + shard_size] for i in range(0, len(posts), shard_size)]
+        futures = [self._executor.submit(_run_shard, shard, options) for shard in shards]
+
+        out: Dict[str, Post] = {}
+        for shard, future in zip(shards, futures):
+            for post, (result, doc_bytes) in zip(shard, future.result()):
+                _attach_spans(result, doc_bytes, self.vocab)
+                post.contexts = result.contexts
+                post.sections = result.sections
+                post.events = result.events
+                out[post.post_id] = post
+        return out
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "ShardedPipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
 
 # ===========================================================================
 # EVENT → SECTION ASSIGNMENT
 # ===========================================================================
 
-def _place_event_into_structure(doc: Doc, post: Post, hem: EventMatch):
+def _place_event_into_structure(doc: Doc, post: Post, hem: EventMatch, index: DocIndex | None = None):
     """
     Uses LSS to build Event, then assigns it into the correct Section.
     """
+    if index is None:
+        index = DocIndex(doc)
+        index.set_sections(post.text, post.sections)
 
     # Determine readable text for Event
     if hem.sentences_within_document:
@@ -183,7 +1219,7 @@ def _place_event_into_structure(doc: Doc, post: Post, hem: EventMatch):
         text = doc[hem.doc_start_token_index : hem.doc_end_token_index].text
 
     # Call LSS Scoping
-    locations, event_contexts, actor, action = lss_scope_event(doc, hem)
+    locations, event_contexts, actor, action = lss_scope_event(doc, hem, index)
 
     # Build Event dataclass
     event = Event(
@@ -202,20 +1238,12 @@ def _place_event_into_structure(doc: Doc, post: Post, hem: EventMatch):
     event_start_char = doc[hem.doc_start_token_index].idx
 
     # Find correct Section
-    assigned = False
-    for section in post.sections:
-        sec_start = post.text.find(section.text)
-        sec_end = sec_start + len(section.text)
-
-        if sec_start <= event_start_char <= sec_end:
-            section.events.append(event)
-            assigned = True
-            break
-
-    if not assigned:
+    pos = index.section_at(event_start_char)
+    if pos is not None:
+        post.sections[pos].events.append(event)
+    elif post.sections:
         # fallback: put into first section
-        if post.sections:
-            post.sections[0].events.append(event)
+        post.sections[0].events.append(event)
 
     # Optionally push flat event list
     post.events.append(event)
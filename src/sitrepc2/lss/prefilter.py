@@ -0,0 +1,138 @@
+# src/sitrepc2/lss/prefilter.py
+"""
+Cheap sentence prefilter ahead of Holmes matching.
+
+Most sentences in a report carry no event a search phrase can match, or
+no place an event could be anchored to. The prefilter runs on the light
+pass (tokenizer, sentencizer, gazetteer ruler; see lss.sentence_cache)
+and keeps a sentence only if it contains
+
+    • at least one trigger form — an inflection of a content word of one
+      of the triggers register_search_phrases registers, and
+    • at least one LOCALE / REGION / DIRECTION span from the ruler.
+
+Only kept sentences are parsed by the full pipeline and registered with
+Holmes. The light pass has no lemmatizer, so trigger lemmas are expanded
+into surface forms up front ("shell" → shells, shelled, shelling) by
+regular English inflection plus a short table of irregular verbs.
+
+The filter trades recall for speed: Holmes can also match through
+ontology or embedding similarity, and a match whose location sits in a
+neighbouring sentence is lost. `pipeline.audit_prefilter` measures that
+loss against full matching.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+from spacy.lang.en.stop_words import STOP_WORDS
+from spacy.tokens import Span
+
+from sitrepc2.lss.phrases import load_war_lexicon, trigger_terms
+
+PREFILTER_ENTITY_LABELS: FrozenSet[str] = frozenset({"LOCALE", "REGION", "DIRECTION"})
+
+_VOWELS = frozenset("aeiou")
+
+# Irregular verb forms that occur in, or around, the lexicon's triggers.
+_IRREGULAR: Dict[str, tuple[str, ...]] = {
+    "shoot": ("shot",),
+    "strike": ("struck", "stricken"),
+    "hold": ("held",),
+    "lose": ("lost",),
+    "take": ("took", "taken"),
+    "withdraw": ("withdrew", "withdrawn"),
+    "fight": ("fought",),
+    "break": ("broke", "broken"),
+    "drive": ("drove", "driven"),
+    "win": ("won",),
+    "leave": ("left",),
+    "bring": ("brought",),
+    "make": ("made",),
+}
+# "took" in a trigger stands for "take" as well.
+_BASE_OF_IRREGULAR: Dict[str, str] = {f: base for base, fs in _IRREGULAR.items() for f in fs}
+
+
+def inflections(word: str) -> Set[str]:
+    """
+    Surface forms of `word` as a noun or verb: plural / 3rd person, past,
+    participles. Over-generates on purpose; a spurious form only lets an
+    extra sentence through.
+    """
+    w = word.lower()
+    base = _BASE_OF_IRREGULAR.get(w)
+    if base is not None:
+        return inflections(base)
+    if w.endswith("ed") and len(w) > 4:
+        # Past forms in the lexicon ("launched", "repelled") stand for the
+        # whole paradigm; every guess at the stem is kept.
+        stems = {w[:-2], w[:-1]}
+        if w[-3] == w[-4]:
+            stems.add(w[:-3])
+        forms = {w}
+        for stem in stems:
+            forms |= inflections(stem)
+        return forms
+
+    forms = {w, w + "s", w + "es", w + "ed", w + "ing"}
+    forms.update(_IRREGULAR.get(w, ()))
+    if w.endswith("e"):
+        forms.update({w + "d", w[:-1] + "ing"})
+    if len(w) > 2 and w.endswith("y") and w[-2] not in _VOWELS:
+        forms.update({w[:-1] + "ies", w[:-1] + "ied"})
+    if (
+        len(w) > 2
+        and w[-1] not in _VOWELS
+        and w[-1] not in "wxy"
+        and w[-2] in _VOWELS
+        and w[-3] not in _VOWELS
+    ):
+        # CVC doubling: hit → hitting, ship → shipped
+        forms.update({w + w[-1] + "ed", w + w[-1] + "ing"})
+    return forms
+
+
+class TriggerPrefilter:
+    """
+    Keeps sentences with a trigger form and a gazetteer span.
+
+    `last_run` holds the sentence counts of the most recent run it was
+    used in.
+    """
+
+    def __init__(
+        self,
+        triggers: Iterable[str],
+        entity_labels: Iterable[str] = PREFILTER_ENTITY_LABELS,
+        stop_words: Iterable[str] = STOP_WORDS,
+    ):
+        stop = frozenset(stop_words)
+        forms: Set[str] = set()
+        for trigger in triggers:
+            for word in trigger.lower().split():
+                if word in stop or not word.isalpha():
+                    continue
+                forms |= inflections(word)
+        self.forms: FrozenSet[str] = frozenset(forms)
+        self.entity_labels: FrozenSet[str] = frozenset(entity_labels)
+        self.last_run: Dict[str, float] = {}
+
+    @classmethod
+    def from_lexicon(cls, lexicon: Optional[dict] = None, **kwargs) -> "TriggerPrefilter":
+        if lexicon is None:
+            lexicon = load_war_lexicon()
+        return cls(trigger_terms(lexicon), **kwargs)
+
+    def has_anchor(self, sent: Span) -> bool:
+        return any(ent.label_ in self.entity_labels for ent in sent.ents)
+
+    def has_trigger(self, sent: Span) -> bool:
+        forms = self.forms
+        return any(t.lower_ in forms for t in sent)
+
+    def accepts(self, sent: Span) -> bool:
+        # Entity check first: sentences without a place are the majority
+        # and sent.ents is cheaper than a pass over every token.
+        return self.has_anchor(sent) and self.has_trigger(sent)
@@ -0,0 +1,261 @@
+# src/sitrepc2/lss/rematch.py
+"""
+Incremental re-matching after a lexicon change.
+
+A full run records, per post, the raw Holmes match dicts it produced and
+the set of search phrases (label, text) they were produced with, in a
+MatchStore (SQLite, default `.sitrepc2/match_store.sqlite`; phrase sets
+are stored once and referenced by hash). When `war_lexicon.json` changes,
+`pipeline.rematch_lexicon_changes`
+
+    • brings the Manager's registered phrases in line with the lexicon
+      (apply_search_phrase_delta),
+    • diffs, per stored phrase set, the phrases it had against the ones
+      the lexicon now yields (SearchPhraseDelta),
+    • matches only the added phrases against the posts' Docs (from the
+      doc cache where possible) and drops stored matches of removed
+      phrases,
+    • rebuilds sections / contexts / events only for posts whose match
+      set changed.
+
+Stored matches are raw and unfiltered; `min_similarity` is applied when
+posts are rebuilt, exactly as in a full run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sitrepc2.config.paths import match_store_path
+from sitrepc2.lss.phrases import iter_search_phrases, load_war_lexicon, register_packed_search_phrases
+
+if TYPE_CHECKING:
+    from holmes_extractor import Manager
+
+# (label, search phrase text)
+PhraseKey = Tuple[str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS phrase_sets (
+    set_hash   TEXT NOT NULL,
+    label      TEXT NOT NULL,
+    text       TEXT NOT NULL,
+    PRIMARY KEY (set_hash, label, text)
+);
+CREATE TABLE IF NOT EXISTS posts (
+    post_id    TEXT PRIMARY KEY,
+    text_hash  TEXT NOT NULL,
+    phrase_set TEXT NOT NULL,
+    matches    TEXT NOT NULL
+);
+"""
+
+_SQL_CHUNK = 500
+
+
+# ===========================================================================
+# Phrase sets
+# ===========================================================================
+
+@dataclass(frozen=True)
+class SearchPhraseDelta:
+    """
+    What a lexicon edit changed, as (label, search phrase text) pairs.
+
+      - added:   phrases the lexicon yields now and did not before
+      - removed: phrases it no longer yields
+    """
+    added: FrozenSet[PhraseKey] = frozenset()
+    removed: FrozenSet[PhraseKey] = frozenset()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def lexicon_search_phrases(lexicon: Optional[dict] = None) -> List[PhraseKey]:
+    """(label, text) of every phrase register_search_phrases registers."""
+    if lexicon is None:
+        lexicon = load_war_lexicon()
+    return list(dict.fromkeys((label, text) for _, text, label in iter_search_phrases(lexicon)))
+
+
+def registered_search_phrases(manager: Manager) -> Set[PhraseKey]:
+    return {(sp.label, sp.doc_text) for sp in manager.search_phrases}
+
+
+def diff_search_phrases(old: Iterable[PhraseKey], new: Iterable[PhraseKey]) -> SearchPhraseDelta:
+    old, new = set(old), set(new)
+    return SearchPhraseDelta(added=frozenset(new - old), removed=frozenset(old - new))
+
+
+def match_phrase_key(m: dict) -> PhraseKey:
+    return (m.get("search_phrase_label", ""), str(m.get("search_phrase_text", "") or ""))
+
+
+def match_order_key(m: dict) -> Tuple[float, int]:
+    """
+    Holmes' order of the matches within one document: decreasing
+    similarity, then the document token matched by the search phrase
+    root (`index_within_document`). Sorting matches Holmes returned with
+    it leaves them in place.
+    """
+    return (1 - float(m.get("overall_similarity_measure", 1.0)), int(m.get("index_within_document", 0)))
+
+
+def apply_search_phrase_delta(manager: Manager, delta: SearchPhraseDelta) -> None:
+    """
+    Register `delta.added` and drop `delta.removed` from the Manager;
+    phrases already in the wanted state are left alone.
+
+    Holmes removes phrases by label only, so a label losing some phrases
+    is cleared and its surviving phrases are re-registered as built,
+    without parsing them again.
+    """
+    registered = registered_search_phrases(manager)
+
+    for label in sorted({label for label, text in delta.removed if (label, text) in registered}):
+        survivors = [
+            sp for sp in manager.search_phrases
+            if sp.label == label and (label, sp.doc_text) not in delta.removed
+        ]
+        manager.remove_all_search_phrases_with_label(label)
+        register_packed_search_phrases(manager, survivors)
+
+    for label, text in sorted(delta.added - registered):
+        manager.register_search_phrase(text, label=label)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def phrase_set_hash(phrases: Iterable[PhraseKey]) -> str:
+    h = hashlib.sha256()
+    for label, text in sorted(set(phrases)):
+        h.update(f"{label}\x00{text}\x00".encode("utf-8"))
+    return h.hexdigest()
+
+
+# ===========================================================================
+# Store
+# ===========================================================================
+
+class MatchStore:
+    """
+    Raw Holmes matches per post plus the phrase set they were made with.
+    Shareable between threads and, through SQLite locking, processes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_workspace(cls, root: Path) -> "MatchStore":
+        return cls(match_store_path(root))
+
+    # Connections are per process; a pickled store reopens on first use.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Phrase sets
+    # ------------------------------------------------------------------
+
+    def add_phrase_set(self, phrases: Iterable[PhraseKey]) -> str:
+        """Store a phrase set (if new) and return its hash."""
+        rows = sorted(set(phrases))
+        set_hash = phrase_set_hash(rows)
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR IGNORE INTO phrase_sets (set_hash, label, text) VALUES (?, ?, ?)",
+                [(set_hash, label, text) for label, text in rows],
+            )
+            db.commit()
+        return set_hash
+
+    def phrase_set(self, set_hash: str) -> Set[PhraseKey]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT label, text FROM phrase_sets WHERE set_hash = ?", (set_hash,)
+            )
+            return {(label, text) for label, text in rows}
+
+    # ------------------------------------------------------------------
+    # Matches
+    # ------------------------------------------------------------------
+
+    def get_many(self, post_ids: Sequence[str]) -> Dict[str, Tuple[str, str, List[dict]]]:
+        """
+        post_id → (text hash, phrase set hash, raw matches) for whichever
+        ids are stored.
+        """
+        wanted = list(dict.fromkeys(post_ids))
+        out: Dict[str, Tuple[str, str, List[dict]]] = {}
+        with self._lock:
+            db = self._db()
+            for i in range(0, len(wanted), _SQL_CHUNK):
+                chunk = wanted[i:i + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = db.execute(
+                    "SELECT post_id, text_hash, phrase_set, matches FROM posts "
+                    f"WHERE post_id IN ({marks})",
+                    chunk,
+                )
+                for post_id, h, set_hash, matches in rows:
+                    out[post_id] = (h, set_hash, json.loads(matches))
+        return out
+
+    def put_many(self, items: Iterable[Tuple[str, str, List[dict]]], phrase_set: str) -> None:
+        """
+        Store (post_id, post text, raw matches) triples, made with the phrase
+        set `phrase_set` (a hash from add_phrase_set).
+        """
+        rows = [
+            (post_id, text_hash(text), phrase_set, json.dumps(matches, default=str))
+            for post_id, text, matches in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO posts (post_id, text_hash, phrase_set, matches) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
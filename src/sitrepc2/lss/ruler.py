@@ -7,10 +7,12 @@ import csv
 from spacy.language import Language
 from spacy.pipeline import EntityRuler
 
-from sitrepc2.config.paths import gazetteer_paths
 from sitrepc2.util.normalize import normalize_location_key
 from sitrepc2.gazetteer.aliases import gather_aliases
 from sitrepc2.gazetteer.typedefs import LocaleEntry, RegionEntry, GroupEntry, DirectionEntry
+from sitrepc2.gazetteer.index import GazetteerDelta
+from sitrepc2.lss.alias_scanner import AliasScanner
+from sitrepc2.lss.directions import GazetteerRuler, remove_phrase_patterns
 
 
 # -----------------------------
@@ -34,6 +36,9 @@ def _direction_phrase_patterns(aliases: Set[str]) -> List[dict]:
         - X axis
         - X sector
         - the X line
+
+    Only used when the pipeline already holds a plain EntityRuler;
+    GazetteerRuler and AliasScanner spot these phrases directly.
     """
     patterns = []
 
@@ -103,6 +108,24 @@ def _direction_phrase_patterns(aliases: Set[str]) -> List[dict]:
 # Main entry point
 # -----------------------------
 
+def install_entity_ruler(nlp: Language) -> EntityRuler:
+    """
+    Return the pipeline's "entity_ruler", adding an empty GazetteerRuler
+    (before "ner", if present) when there is none.
+    """
+    if "entity_ruler" in nlp.pipe_names:
+        ruler = nlp.get_pipe("entity_ruler")
+    else:
+        if "ner" in nlp.pipe_names:
+            ruler = nlp.add_pipe("gazetteer_ruler", name="entity_ruler", before="ner")
+        else:
+            ruler = nlp.add_pipe("gazetteer_ruler", name="entity_ruler")
+
+    assert isinstance(ruler, EntityRuler)
+    ruler.ent_id_sep = None
+    return ruler
+
+
 def add_entity_rulers(
     nlp: Language,
     *,
@@ -112,24 +135,15 @@ def add_entity_rulers(
     directions: List[DirectionEntry],
 ) -> Language:
     """
-    Install EntityRuler and populate it from:
+    Install a GazetteerRuler (named "entity_ruler") and populate it from:
         - locale aliases
         - region aliases
         - group aliases
-        - direction aliases + direction phrase patterns
+        - direction aliases (cue phrases spotted, not expanded to patterns)
     """
 
-    if "entity_ruler" in nlp.pipe_names:
-        ruler = nlp.get_pipe("entity_ruler")
-    else:
-        if "ner" in nlp.pipe_names:
-            ruler = nlp.add_pipe("entity_ruler", before="ner")
-        else:
-            ruler = nlp.add_pipe("entity_ruler")
-
-    assert isinstance(ruler, EntityRuler)
+    ruler = install_entity_ruler(nlp)
     ruler.validate = True
-    ruler.ent_id_sep = None
 
     # ---- Collect aliases from all gazetteer sources ----
     locale_aliases, region_aliases, group_aliases, direction_aliases = gather_aliases(
@@ -141,7 +155,73 @@ def add_entity_rulers(
     ruler.add_patterns(_simple_alias_patterns(set(region_aliases), "REGION"))
     ruler.add_patterns(_simple_alias_patterns(set(group_aliases), "GROUP"))
 
-    # ---- DIRECTION patterns (token-based, case-insensitive) ----
-    ruler.add_patterns(_direction_phrase_patterns(set(direction_aliases)))
+    # ---- DIRECTION cue phrases (case-insensitive) ----
+    if isinstance(ruler, GazetteerRuler):
+        ruler.directions.add_aliases(direction_aliases)
+    else:
+        ruler.add_patterns(_direction_phrase_patterns(set(direction_aliases)))
+
+    return nlp
+
+
+def add_alias_scanner(
+    nlp: Language,
+    *,
+    locales: List[LocaleEntry],
+    regions: List[RegionEntry],
+    groups: List[GroupEntry],
+    directions: List[DirectionEntry],
+) -> Language:
+    """
+    Install the trie-based AliasScanner in place of the EntityRuler.
+
+    Same aliases, same labels, same spans as add_entity_rulers; the scanner
+    just builds faster and matches in a single pass per doc.
+    """
+
+    if "alias_scanner" in nlp.pipe_names:
+        scanner = nlp.get_pipe("alias_scanner")
+    else:
+        if "ner" in nlp.pipe_names:
+            scanner = nlp.add_pipe("alias_scanner", before="ner")
+        else:
+            scanner = nlp.add_pipe("alias_scanner")
+
+    assert isinstance(scanner, AliasScanner)
+
+    locale_aliases, region_aliases, group_aliases, direction_aliases = gather_aliases(
+        locales, regions, groups, directions
+    )
+
+    scanner.add_phrases(locale_aliases, "LOCALE")
+    scanner.add_phrases(region_aliases, "REGION")
+    scanner.add_phrases(group_aliases, "GROUP")
+    scanner.add_direction_aliases(direction_aliases)
+
+    return nlp
+
+
+def apply_gazetteer_delta(nlp: Language, delta: GazetteerDelta) -> Language:
+    """
+    Bring the LOCALE patterns of an installed gazetteer component in line
+    with a patched GazetteerIndex (see GazetteerIndex.apply_patch), without
+    rebuilding the ruler.
+    """
+    added = sorted(delta.added_aliases)
+    removed = sorted(delta.removed_aliases)
+
+    if "alias_scanner" in nlp.pipe_names:
+        scanner = nlp.get_pipe("alias_scanner")
+        assert isinstance(scanner, AliasScanner)
+        scanner.remove_phrases(removed, "LOCALE")
+        scanner.add_phrases(added, "LOCALE")
+
+    if "entity_ruler" in nlp.pipe_names:
+        ruler = nlp.get_pipe("entity_ruler")
+        assert isinstance(ruler, EntityRuler)
+        if removed:
+            remove_phrase_patterns(ruler, removed, "LOCALE")
+        if added:
+            ruler.add_patterns(_simple_alias_patterns(set(added), "LOCALE"))
 
     return nlp
@@ -0,0 +1,174 @@
+# src/sitrepc2/lss/ruler_cache.py
+"""
+Warm start for the gazetteer entity ruler.
+
+Building the ruler from the CSVs means parsing them, gathering and
+normalizing every alias, generating pattern dicts, validating them and
+tokenizing each phrase pattern — the tokenizer alone is most of the cost.
+The compiled state is written once to a cache directory (default
+`.sitrepc2/ruler_cache/`):
+
+    manifest.json        format version, source CSV hashes, tokenizer key,
+                         token patterns and direction aliases
+    phrase_<n>.spacy     one DocBin of tokenized phrase patterns per label
+
+Later starts with byte-identical CSVs and the same tokenizer read the
+pattern Docs back and hand them straight to the PhraseMatcher, skipping
+CSV parsing, pattern generation, validation and tokenization.
+
+EntityRuler.to_disk is not used: it cannot write a ruler without an
+ent_id_sep, and EntityRuler.from_disk re-runs add_patterns, tokenizer
+included.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import spacy
+from spacy.language import Language
+from spacy.pipeline import EntityRuler
+from spacy.tokens import DocBin
+
+from sitrepc2.gazetteer.io import load_directions, load_groups, load_locales, load_regions
+from sitrepc2.gazetteer.snapshot import MANIFEST, read_manifest, source_hashes
+from sitrepc2.lss.directions import GazetteerRuler
+from sitrepc2.lss.ruler import add_entity_rulers, install_entity_ruler
+from sitrepc2.util.atomic_dir import discard_dir, publish_dir, resolve_dir, stage_dir
+
+RULER_CACHE_FORMAT = 1
+
+
+def tokenizer_key(nlp: Language, ruler: EntityRuler) -> str:
+    """Everything the stored pattern Docs depend on besides the CSVs."""
+    meta = nlp._meta
+    return "|".join((
+        spacy.__version__,
+        f"{meta.get('lang', '')}_{meta.get('name', '')}",
+        str(meta.get("version", "")),
+        type(ruler).__name__,
+        str(ruler.phrase_matcher_attr),
+    ))
+
+
+# ======================================================================
+# Save / load
+# ======================================================================
+
+def save_ruler_cache(ruler: EntityRuler, dirpath: Path, hashes: Sequence[str], key: str) -> None:
+    """
+    Write the ruler's patterns to `dirpath`, published as a new version
+    behind the `dirpath` symlink (see util.atomic_dir).
+    """
+    tmp = stage_dir(dirpath)
+    try:
+        _write_ruler_cache(ruler, tmp, hashes, key)
+    except BaseException:
+        discard_dir(tmp)
+        raise
+    publish_dir(tmp, dirpath)
+
+
+def _write_ruler_cache(ruler: EntityRuler, tmp: Path, hashes: Sequence[str], key: str) -> None:
+    labels: List[List[str]] = []
+    for n, (label, docs) in enumerate(sorted(ruler.phrase_patterns.items())):
+        if not docs:
+            continue
+        # The gazetteer ruler phrase-matches on ORTH; lexical attributes
+        # come back with the vocab, so nothing else needs storing.
+        DocBin(attrs=["ORTH"], docs=docs).to_disk(tmp / f"phrase_{n}.spacy")
+        labels.append([label, f"phrase_{n}.spacy"])
+
+    directions = ruler.directions if isinstance(ruler, GazetteerRuler) else None
+    manifest = {
+        "format": RULER_CACHE_FORMAT,
+        "sources": list(hashes),
+        "tokenizer": key,
+        "phrase_patterns": labels,
+        "token_patterns": [
+            {"label": label, "pattern": pattern}
+            for label, patterns in sorted(ruler.token_patterns.items())
+            for pattern in patterns
+        ],
+        "direction_aliases": sorted(directions.aliases) if directions is not None else [],
+    }
+    with (tmp / MANIFEST).open("w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+
+def load_ruler_cache(nlp: Language, ruler: EntityRuler, dirpath: Path, manifest: dict) -> None:
+    """Add the patterns stored in `dirpath` to `ruler` without re-tokenizing."""
+    dirpath = Path(dirpath)
+    for label, filename in manifest["phrase_patterns"]:
+        docs = list(DocBin().from_disk(dirpath / filename).get_docs(nlp.vocab))
+        ruler.phrase_patterns[label].extend(docs)
+        ruler.phrase_matcher.add(label, docs)
+
+    if manifest["token_patterns"]:
+        validate, ruler.validate = ruler.validate, False
+        try:
+            ruler.add_patterns(manifest["token_patterns"])
+        finally:
+            ruler.validate = validate
+
+    if manifest["direction_aliases"]:
+        # Stored already normalized; add_aliases leaves them unchanged.
+        ruler.directions.add_aliases(manifest["direction_aliases"])
+
+
+# ======================================================================
+# Cached entry point
+# ======================================================================
+
+def load_entity_rulers(
+    nlp: Language,
+    locale_path: Path,
+    region_path: Path,
+    group_path: Path,
+    direction_path: Path,
+    cache_dir: Optional[Path] = None,
+) -> Language:
+    """
+    add_entity_rulers from the gazetteer CSVs, preferring compiled patterns
+    in `cache_dir`.
+
+    The cache is used only if it was written from byte-identical CSVs by
+    the same tokenizer; otherwise the ruler is built from the CSVs and the
+    cache rewritten for the next process.
+    """
+    sources = [Path(p) for p in (locale_path, region_path, group_path, direction_path)]
+    hashes = source_hashes(sources)
+    ruler = install_entity_ruler(nlp)
+    key = tokenizer_key(nlp, ruler)
+    # The cache holds a build into an empty ruler; a ruler that already has
+    # patterns is built on directly and not cached.
+    use_cache = cache_dir is not None and not len(ruler)
+
+    if use_cache:
+        # Manifest and pattern files from one version, even mid-rewrite.
+        current = resolve_dir(cache_dir)
+        manifest = read_manifest(current)
+        if (
+            manifest is not None
+            and manifest.get("format") == RULER_CACHE_FORMAT
+            and manifest.get("sources") == hashes
+            and manifest.get("tokenizer") == key
+        ):
+            load_ruler_cache(nlp, ruler, current, manifest)
+            return nlp
+
+    locales = load_locales(sources[0])
+    add_entity_rulers(
+        nlp,
+        locales=locales,
+        regions=load_regions(sources[1]),
+        groups=load_groups(sources[2]),
+        directions=load_directions(sources[3], locales),
+    )
+
+    if use_cache:
+        save_ruler_cache(ruler, cache_dir, hashes, key)
+
+    return nlp
@@ -1,22 +1,27 @@
 # sitrepc2/nlp/sectioning.py
 
 import re
-from typing import List
+from typing import List, Optional
 from spacy.tokens import Doc
-from sitrepc2.lss.typedefs import Section, SitRepContext, CtxKind
+from sitrepc2.dom.typedefs import Section
+from sitrepc2.lss.doc_index import DocIndex
 
 SECTION_HEADING_RE = re.compile(
     r"^\s*(?:[-•*]|#+|\*)\s*[A-ZА-ЯЁІЇЄҐ][^:]{2,}:?$"
 )
 
-def split_into_sections(post_text: str, doc: Doc) -> List[Section]:
+def split_into_sections(post_text: str, doc: Doc, index: Optional[DocIndex] = None) -> List[Section]:
     """
     Deterministic section splitter.
     Uses:
         • entity-ruler detected DIRECTION/GROUP/REGION at line start
         • formatting cues
         • fallback multi-paragraph splitting
+
+    Line entities are looked up in `index` (built from `doc` if not given).
     """
+    if index is None:
+        index = DocIndex(doc)
 
     lines = post_text.split("\n")
     sections: List[Section] = []
@@ -35,8 +40,11 @@ def split_into_sections(post_text: str, doc: Doc) -> List[Section]:
         current_lines = []
 
     # Pass 1: split by headings & entity cues
-    for i, line in enumerate(lines):
+    offset = 0
+    for line in lines:
         stripped = line.strip()
+        line_start = offset
+        offset += len(line) + 1
 
         # Heading-style boundaries
         if SECTION_HEADING_RE.match(stripped):
@@ -45,7 +53,7 @@ def split_into_sections(post_text: str, doc: Doc) -> List[Section]:
             continue
 
         # Entity-based boundaries
-        ents = [ent for ent in doc.ents if ent.start_char >= doc.char_span(i) and ent.start_char < doc.char_span(i+1)]
+        ents = index.ents_starting_in_chars(line_start, offset)
         if any(ent.label_ in {"DIRECTION", "GROUP", "REGION"} for ent in ents):
             flush_section()
             current_lines.append(line)
@@ -0,0 +1,440 @@
+# src/sitrepc2/lss/sentence_cache.py
+"""
+Sentence-level reuse of Holmes matches for formulaic report text.
+
+MoD and General Staff reports repeat whole sentences day after day
+("Units of the Battlegroup Vostok continued to advance…", fixed headers).
+In sentence-cache mode each post is first run through a light pass only
+(tokenizer, sentencizer, gazetteer ruler), which is enough for sectioning,
+context extraction and LSS scoping. Every sentence is then looked up by
+
+    sha256(matcher fingerprint, sentence text)
+
+    • hit  → the stored Holmes match dicts are reused, token indices
+             shifted to the sentence's position in the post
+    • miss → the post's missed sentences are parsed and matched together
+             by the full pipeline, their matches are mapped back onto the
+             light doc by character offset, and stored per sentence
+
+Matches that span several sentences or involve coreference depend on
+their surroundings; sentences producing them are never stored. LSS
+scoping is not cached: it runs on the remapped matches, and costs a few
+span comparisons per event.
+
+The matcher fingerprint covers the spaCy pipeline (see
+`doc_cache.pipeline_fingerprint`) and every registered search phrase.
+
+The same sentence-level path serves the trigger prefilter (see
+lss.prefilter), with or without a cache: sentences the prefilter rejects
+get no matches and are never parsed or registered.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import logging
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+from spacy.language import Language
+from spacy.pipeline import Sentencizer
+from spacy.tokens import Doc
+
+from sitrepc2.config.paths import sentence_cache_path
+from sitrepc2.lss.dependency_backend import register_documents
+from sitrepc2.lss.doc_cache import parse_with_cache, pipeline_fingerprint
+from sitrepc2.lss.typedefs import PipelineOptions
+
+if TYPE_CHECKING:
+    from holmes_extractor import Manager
+    from sitrepc2.dom.typedefs import Post
+
+logger = logging.getLogger(__name__)
+
+# Pipes run in the light pass, in pipeline order, if present.
+LIGHT_PIPES = ("alias_scanner", "entity_ruler")
+
+# Token-index fields of a Holmes word-match dict.
+_WORD_MATCH_INDEX_KEYS = (
+    "document_token_index",
+    "first_document_token_index",
+    "last_document_token_index",
+    "structurally_matched_document_token_index",
+    "document_subword_containing_token_index",
+)
+
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+# ===========================================================================
+# Keys and match remapping
+# ===========================================================================
+
+def matcher_fingerprint(manager: Manager) -> str:
+    h = hashlib.sha256(pipeline_fingerprint(manager.nlp).encode("utf-8"))
+    for label, text in sorted((sp.label, sp.doc_text) for sp in manager.search_phrases):
+        h.update(f"{label}\x00{text}\x00".encode("utf-8"))
+    # A Holmes Manager has no `backend`, so its keys are unchanged; other
+    # backends get keys of their own.
+    backend = getattr(manager, "backend", None)
+    if backend is not None:
+        h.update(f"backend\x00{backend}\x00".encode("utf-8"))
+    return h.hexdigest()
+
+
+def sentence_key(fingerprint: str, text: str) -> str:
+    h = hashlib.sha256(fingerprint.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+def remap_match(m: dict, index_map: Callable[[int], int], document: Optional[str]) -> dict:
+    """Copy of a Holmes match dict with every token index passed through index_map."""
+    out = dict(m)
+    if document is None:
+        out.pop("document", None)
+    else:
+        out["document"] = document
+    if out.get("index_within_document") is not None:
+        out["index_within_document"] = index_map(int(out["index_within_document"]))
+    word_matches = []
+    for wm in m.get("word_matches") or []:
+        wm = dict(wm)
+        for k in _WORD_MATCH_INDEX_KEYS:
+            if wm.get(k) is not None:
+                wm[k] = index_map(int(wm[k]))
+        word_matches.append(wm)
+    out["word_matches"] = word_matches
+    return out
+
+
+def match_token_indices(m: dict) -> List[int]:
+    out = []
+    for wm in m.get("word_matches") or []:
+        for k in _WORD_MATCH_INDEX_KEYS:
+            if wm.get(k) is not None:
+                out.append(int(wm[k]))
+    return out
+
+
+# ===========================================================================
+# Cache
+# ===========================================================================
+
+class SentenceCache:
+    """
+    In-memory LRU map sentence key → Holmes match dicts (token indices
+    relative to the sentence start), optionally saved to / loaded from the
+    workspace between runs.
+
+    `hits` / `misses` count sentences over the instance's lifetime;
+    `last_run` holds the counts and hit rate of the most recent run.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[dict, ...]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.last_run: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Tuple[dict, ...]]:
+        matches = self._entries.get(key)
+        if matches is not None:
+            self._entries.move_to_end(key)
+        return matches
+
+    def put(self, key: str, matches: Sequence[dict]) -> None:
+        self._entries[key] = tuple(matches)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Persistence (JSON lines, oldest first so LRU order survives)
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def for_workspace(cls, root: Path, max_entries: int = DEFAULT_MAX_ENTRIES) -> "SentenceCache":
+        cache = cls(max_entries)
+        path = sentence_cache_path(root)
+        if path.exists():
+            cache.load(path)
+        return cache
+
+    def load(self, path: Path) -> None:
+        with Path(path).open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    self.put(row["key"], row["matches"])
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for key, matches in self._entries.items():
+                f.write(json.dumps({"key": key, "matches": list(matches)}, default=str) + "\n")
+        tmp.replace(path)
+
+
+# ===========================================================================
+# Light pass
+# ===========================================================================
+
+def light_doc(nlp: Language, text: str, sentencizer: Sentencizer) -> Doc:
+    """Tokenize, split sentences and apply the gazetteer ruler(s) only."""
+    doc = nlp.make_doc(text)
+    sentencizer(doc)
+    for name, pipe in nlp.pipeline:
+        if name in LIGHT_PIPES:
+            doc = pipe(doc)
+    return doc
+
+
+class _CharToToken:
+    def __init__(self, doc: Doc):
+        self._starts = [t.idx for t in doc]
+
+    def __call__(self, char: int) -> int:
+        return max(0, bisect.bisect_right(self._starts, char) - 1)
+
+
+# ===========================================================================
+# Sentence-level matching
+# ===========================================================================
+
+def match_posts_by_sentence(
+    manager: Manager,
+    posts: Sequence[Post],
+    options: PipelineOptions | None = None,
+) -> Tuple[Dict[str, Doc], Dict[str, List[dict]]]:
+    """
+    Returns (light doc per post_id, Holmes match dicts per post_id) with
+    token indices referring to the light docs. Per post, matches are
+    ordered as Manager.match orders them: by decreasing similarity, then
+    in sentence order.
+
+    Reads `sentence_cache`, `prefilter`, `doc_cache` and `batch_size` from
+    `options`. With a sentence cache, a sentence repeated within the run is
+    parsed once: later occurrences wait for the first one's result (another
+    round runs only for repeats whose first occurrence turned out not to be
+    cacheable). With a prefilter, rejected sentences are resolved to no
+    matches up front; `prefilter.last_run` reports how many were kept.
+    """
+    options = options or PipelineOptions()
+    cache = options.sentence_cache
+    prefilter = options.prefilter
+    nlp = manager.nlp
+    # Hashing every gazetteer pattern is only worth it when keys are stored.
+    fingerprint = matcher_fingerprint(manager) if cache is not None else ""
+    sentencizer = Sentencizer()
+
+    docs_by_post_id: Dict[str, Doc] = {}
+    sents_by_post: Dict[str, list] = {}
+    keys_by_post: Dict[str, List[str]] = {}
+    # post_id → per-sentence match lists, None until resolved
+    slots_by_post: Dict[str, List[Optional[List[dict]]]] = {}
+
+    for post in posts:
+        doc = light_doc(nlp, post.text, sentencizer)
+        # Lets a sentence filter tell posts with the same text apart.
+        doc.user_data["post_id"] = post.post_id
+        sents = list(doc.sents)
+        docs_by_post_id[post.post_id] = doc
+        sents_by_post[post.post_id] = sents
+        keys_by_post[post.post_id] = [sentence_key(fingerprint, s.text) for s in sents]
+        slots = [None] * len(sents)
+        if prefilter is not None:
+            for si, sent in enumerate(sents):
+                if not prefilter.accepts(sent):
+                    slots[si] = []
+        slots_by_post[post.post_id] = slots
+
+    n_sentences = sum(len(v) for v in sents_by_post.values())
+    n_filtered = sum(
+        1 for slots in slots_by_post.values() for slot in slots if slot is not None
+    )
+    hits = 0
+    pending = list(docs_by_post_id)
+
+    while pending:
+        claimed: set = set()
+        # post_id → [(residual char start, sentence index)]
+        residual_layout: Dict[str, List[Tuple[int, int]]] = {}
+        residual_texts: Dict[str, str] = {}
+        deferred: List[str] = []
+
+        for post_id in pending:
+            sents = sents_by_post[post_id]
+            slots = slots_by_post[post_id]
+            parts: List[str] = []
+            layout: List[Tuple[int, int]] = []
+            pos = 0
+            waiting = False
+
+            for si, key in enumerate(keys_by_post[post_id]):
+                if slots[si] is not None:
+                    continue
+                if cache is not None:
+                    cached = cache.get(key)
+                    if cached is not None:
+                        hits += 1
+                        offset = sents[si].start
+                        slots[si] = [remap_match(m, lambda i: i + offset, post_id) for m in cached]
+                        continue
+                    if key in claimed:
+                        waiting = True
+                        continue
+                    claimed.add(key)
+                layout.append((pos, si))
+                parts.append(sents[si].text)
+                pos += len(sents[si].text) + 1
+
+            if parts:
+                residual_layout[post_id] = layout
+                residual_texts[post_id] = " ".join(parts)
+            if waiting:
+                deferred.append(post_id)
+
+        if residual_texts:
+            _match_residuals(
+                manager,
+                cache,
+                fingerprint,
+                residual_texts,
+                residual_layout,
+                docs_by_post_id,
+                sents_by_post,
+                slots_by_post,
+                options,
+            )
+        pending = deferred
+
+    # ------------------------------------------------------------------
+    # Assemble, ordered like Manager.match
+    # ------------------------------------------------------------------
+    matches_by_post: Dict[str, List[dict]] = {}
+    for post_id, slots in slots_by_post.items():
+        flat = [m for slot in slots for m in (slot or ())]
+        flat.sort(key=lambda m: 1 - float(m.get("overall_similarity_measure", 1.0)))
+        matches_by_post[post_id] = flat
+
+    if prefilter is not None:
+        kept = n_sentences - n_filtered
+        prefilter.last_run = {
+            "posts": len(posts),
+            "sentences": n_sentences,
+            "kept": kept,
+            "filtered": n_filtered,
+            "kept_rate": kept / n_sentences if n_sentences else 0.0,
+        }
+        logger.info(
+            "prefilter: %d/%d sentences kept (%.1f%%)",
+            kept, n_sentences, 100.0 * prefilter.last_run["kept_rate"],
+        )
+
+    if cache is not None:
+        # Sentences the prefilter rejected were never looked up.
+        looked_up = n_sentences - n_filtered
+        cache.hits += hits
+        cache.misses += looked_up - hits
+        cache.last_run = {
+            "posts": len(posts),
+            "sentences": looked_up,
+            "hits": hits,
+            "misses": looked_up - hits,
+            "hit_rate": hits / looked_up if looked_up else 0.0,
+        }
+        logger.info(
+            "sentence cache: %d/%d sentences reused (%.1f%%)",
+            hits, looked_up, 100.0 * cache.last_run["hit_rate"],
+        )
+    return docs_by_post_id, matches_by_post
+
+
+def _match_residuals(
+    manager: Manager,
+    cache: SentenceCache | None,
+    fingerprint: str,
+    residual_texts: Dict[str, str],
+    residual_layout: Dict[str, List[Tuple[int, int]]],
+    docs_by_post_id: Dict[str, Doc],
+    sents_by_post: Dict[str, list],
+    slots_by_post: Dict[str, List[Optional[List[dict]]]],
+    options: PipelineOptions,
+) -> None:
+    """
+    Parse and match each post's unresolved sentences as one document, fill
+    their slots and store every cacheable sentence.
+    """
+    nlp = manager.nlp
+    pids = list(residual_texts)
+    parsed = parse_with_cache(
+        nlp,
+        [residual_texts[p] for p in pids],
+        options.doc_cache,
+        batch_size=options.batch_size,
+        batch_chars=options.batch_chars,
+    )
+    residual_docs = dict(zip(pids, parsed))
+
+    # Own labels, removed again below, so documents the caller registered
+    # under the plain post ids are left alone.
+    labels = {p: f"{p}#sentences" for p in pids}
+    by_label = {labels[p]: p for p in pids}
+    register_documents(manager, {labels[p]: d for p, d in residual_docs.items()})
+
+    fresh_by_post: Dict[str, List[dict]] = defaultdict(list)
+    for m in manager.match():
+        post_id = by_label.get(m.get("document"))
+        if post_id is not None:
+            fresh_by_post[post_id].append(m)
+    for label in by_label:
+        manager.remove_document(label)
+
+    for post_id, rdoc in residual_docs.items():
+        doc = docs_by_post_id[post_id]
+        sents = sents_by_post[post_id]
+        sent_starts = [s.start for s in sents]
+        layout = residual_layout[post_id]
+        res_starts = [start for start, _ in layout]
+        to_light = _CharToToken(doc)
+
+        def index_map(i: int) -> int:
+            char = rdoc[i].idx
+            k = bisect.bisect_right(res_starts, char) - 1
+            res_start, si = layout[k]
+            return to_light(sents[si].start_char + char - res_start)
+
+        fresh: Dict[int, List[dict]] = defaultdict(list)
+        uncacheable = set()
+        for m in fresh_by_post.get(post_id, ()):
+            mapped = remap_match(m, index_map, post_id)
+            touched = {
+                bisect.bisect_right(sent_starts, i) - 1
+                for i in match_token_indices(mapped)
+            } or {0}
+            fresh[min(touched)].append(mapped)
+            if len(touched) > 1 or m.get("involves_coreference"):
+                uncacheable |= touched
+
+        slots = slots_by_post[post_id]
+        for _, si in layout:
+            found = fresh.get(si, [])
+            slots[si] = found
+            if cache is None or si in uncacheable:
+                continue
+            offset = sents[si].start
+            cache.put(
+                sentence_key(fingerprint, sents[si].text),
+                [remap_match(m, lambda i: i - offset, None) for m in found],
+            )
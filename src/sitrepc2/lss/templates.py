@@ -0,0 +1,384 @@
+# src/sitrepc2/lss/templates.py
+"""
+Template fast path for the formulaic MoD and General Staff reports.
+
+`mod_russia_en` and `GeneralStaffZSU` write nearly every report from the
+same few sentence shapes:
+
+    In the Kupiansk direction, the enemy carried out 6 attacks in the
+    areas of Kyslivka, Ivanivka and Tabaivka of the Kharkiv region.
+
+    • Units of the Battlegroup Zapad improved the tactical situation and
+    inflicted losses on the AFU close to Sinkovka (Kharkov region),
+    Stelmakhovka and Terny (Lugansk People's Republic).
+
+plus headers, day counters and loss tallies. TemplateExtractor reads such
+sentences off the light pass (tokenizer, sentencizer, gazetteer ruler; see
+lss.sentence_cache) and emits one Holmes-shaped match dict per event
+sentence, so sectioning, context extraction, LSS scoping and event
+placement run on it unchanged. A sentence is covered when
+
+    • it is boilerplate (header, day counter, loss tally, "situation
+      unchanged") and holds no trigger form (see lss.prefilter) and no
+      LOCALE span — no event, or
+    • it holds exactly one lexicon trigger, for one search phrase, opens
+      with a direction, battlegroup or actor formula, and every LOCALE
+      span in it sits in a place list introduced by a locative ("near",
+      "close to", "in the areas of", …) — an event for that phrase.
+
+Anything else goes to the matcher: a sentence with several triggers (or
+a trigger shared by several phrases) holds several events, and one
+without a trigger form may still be matched through a form the trigger
+table does not list.
+
+Only the uncovered sentences of a post go through spaCy + Holmes
+(`pipeline.run_nlp_pipeline(templates=...)`). `last_run` reports
+coverage by post, section and sentence; `pipeline.audit_templates`
+measures agreement with the Holmes path.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from spacy.lang.en.stop_words import STOP_WORDS
+from spacy.tokens import Doc, Span
+
+from sitrepc2.lss.doc_index import DocIndex
+from sitrepc2.lss.phrases import iter_search_phrases, load_war_lexicon
+from sitrepc2.lss.prefilter import inflections
+from sitrepc2.lss.sectioning import split_into_sections
+
+if TYPE_CHECKING:
+    from sitrepc2.dom.typedefs import Post
+    from sitrepc2.lss.prefilter import TriggerPrefilter
+
+TEMPLATE_CHANNELS: FrozenSet[str] = frozenset({"mod_russia_en", "GeneralStaffZSU"})
+
+# Sentence openings the reports build their event sentences from.
+OPENINGS: Tuple[Tuple[str, re.Pattern], ...] = (
+    ("direction", re.compile(r"^(?:in|on) the [^,.;:]{2,60}? directions?\b", re.I)),
+    ("battlegroup", re.compile(
+        r"^(?:units|troops|formations) of the (?:battlegroup \w+|[\w-]+ group of forces)\b", re.I
+    )),
+    ("actor", re.compile(
+        r"^(?:the )?(?:enemy|invaders|occupiers|our defenders|defen[cs]e forces|"
+        r"ukrainian (?:troops|units|defenders)|russian (?:troops|units)|"
+        r"air defen[cs]e (?:units|forces|systems|means)|operational-tactical aviation|"
+        r"missile troops|aviation|artillery)\b",
+        re.I,
+    )),
+    ("area", re.compile(r"^(?:in|near|close to) (?:the )?(?:areas?|vicinity|districts?) of\b", re.I)),
+)
+
+# Sentences that carry no event.
+BOILERPLATE: Tuple[re.Pattern, ...] = tuple(re.compile(p, re.I) for p in (
+    r"^operational information as of\b",
+    r"\breport on the progress of (?:the )?special military operation\b",
+    r"^the \d+(?:st|nd|rd|th)? day of\b",
+    r"\blosses amounted to\b",
+    r"^(?:in total|since the beginning of the special military operation)\b",
+    r"^(?:the )?situation (?:in|on|at) .{0,80}\b(?:remains|has not (?:significantly )?changed|unchanged)\b",
+    r"^no signs of\b",
+    r"^(?:the )?(?:battle|combat)(?:s)? (?:is|are) (?:ongoing|continuing)\.?$",
+))
+
+# What the text before a place list may end with.
+LOCATIVES: Tuple[str, ...] = (
+    "near", "close to", "in the area of", "in the areas of", "in the vicinity of",
+    "in the district of", "in the districts of", "in the direction of", "towards",
+    "in", "at", "of", "settlement of", "settlements of", "village of", "villages of",
+    "town of", "city of", "control of", "liberated", "liberated the", "from",
+)
+
+# What may separate two places of one list.
+_LIST_SEPARATOR = re.compile(
+    r"^(?:\s*\([^()]*\))?"
+    r"(?:\s*(?:of|in) the [\w'’ -]+? (?:region|oblast|people[’']s republic))?"
+    r"\s*(?:,|and|, and|as well as)?\s*$",
+    re.I,
+)
+_LOCATIVE_TAIL = re.compile(
+    r"(?:^|\W)(?:" + "|".join(sorted((re.escape(p) for p in LOCATIVES), key=len, reverse=True)) + r")\s*$",
+    re.I,
+)
+_NEGATIONS = frozenset({"not", "n't", "never", "no"})
+
+
+@dataclass(frozen=True)
+class TemplateResult:
+    """
+    What the templates made of one post's light doc.
+
+      - matches:  Holmes-shaped match dicts, token indices into the doc
+      - covered:  start characters of the sentences the templates cover
+      - sentences / sections, covered_sections: counts for `last_run`
+    """
+    matches: Tuple[dict, ...]
+    covered: FrozenSet[int]
+    sentences: int
+    sections: int
+    covered_sections: int
+
+    @property
+    def complete(self) -> bool:
+        return len(self.covered) == self.sentences
+
+
+class TemplateExtractor:
+    """
+    Rule-based matcher for the template channels. `last_run` holds the
+    coverage counts of the most recent run it was used in.
+    """
+
+    def __init__(
+        self,
+        phrases: Iterable[Tuple[str, str, str]],
+        channels: Iterable[str] = TEMPLATE_CHANNELS,
+        stop_words: Iterable[str] = STOP_WORDS,
+    ):
+        # first word form → [(trigger words as form sets, phrase text, label)]
+        # in registration order. Triggers of stop words only ("up to", "over") are left out, as
+        # the prefilter leaves them out.
+        stop = frozenset(stop_words)
+        self._triggers: Dict[str, List[Tuple[Tuple[FrozenSet[str], ...], str, str]]] = {}
+        for trigger, text, label in phrases:
+            split = trigger.lower().split()
+            if all(w in stop for w in split):
+                continue
+            words = tuple(frozenset(inflections(w)) for w in split)
+            for form in words[0]:
+                self._triggers.setdefault(form, []).append((words, text, label))
+        self.channels: FrozenSet[str] = frozenset(channels)
+        self.last_run: Dict[str, float] = {}
+
+    @classmethod
+    def from_lexicon(cls, lexicon: Optional[dict] = None, **kwargs) -> "TemplateExtractor":
+        if lexicon is None:
+            lexicon = load_war_lexicon()
+        return cls(iter_search_phrases(lexicon), **kwargs)
+
+    def applies_to(self, post: Post) -> bool:
+        return getattr(post, "channel", None) in self.channels
+
+    # ------------------------------------------------------------------
+    # Sentences
+    # ------------------------------------------------------------------
+
+    def find_triggers(self, sent: Span) -> List[Tuple[int, int, str, str]]:
+        """
+        (first token, end token, phrase text, label) of every trigger in the
+        sentence, one per search phrase it triggers; overlapping triggers
+        ("repelled attacks", "repelled", "attacks") are all listed.
+        """
+        tokens = list(sent)
+        found: List[Tuple[int, int, str, str]] = []
+        for k, tok in enumerate(tokens):
+            for words, text, label in self._triggers.get(tok.lower_, ()):
+                n = len(words)
+                if k + n > len(tokens):
+                    continue
+                if all(tokens[k + j].lower_ in words[j] for j in range(1, n)):
+                    found.append((tok.i, tok.i + n, text, label))
+        return found
+
+    def place_lists_ok(self, sent: Span, locales: Sequence[Span]) -> bool:
+        """Every LOCALE span sits in a list introduced by a locative."""
+        text = sent.doc.text
+        prev: Optional[Span] = None
+        for ent in locales:
+            if prev is not None and _LIST_SEPARATOR.match(text[prev.end_char:ent.start_char]):
+                prev = ent
+                continue
+            lead = text[max(sent.start_char, ent.start_char - 40):ent.start_char]
+            if not _LOCATIVE_TAIL.search(lead):
+                return False
+            prev = ent
+        return True
+
+    def read_sentence(self, sent: Span, index: DocIndex) -> Tuple[bool, Optional[dict]]:
+        """(covered, match dict or None) for one sentence of a light doc."""
+        text = sent.text.strip().lstrip("•-–*· ").strip()
+        locales = [e for e in index.ents_in_tokens(sent.start, sent.end) if e.label_ == "LOCALE"]
+        triggers = self.find_triggers(sent)
+
+        if not triggers:
+            return not locales and any(p.search(text) for p in BOILERPLATE), None
+        if len(triggers) > 1:
+            return False, None
+
+        opening = next((name for name, p in OPENINGS if p.match(text)), None)
+        if opening is None or not self.place_lists_ok(sent, locales):
+            return False, None
+        return True, self._match(sent, locales, triggers[0], opening)
+
+    def _match(self, sent: Span, locales: Sequence[Span], trigger, opening: str) -> dict:
+        start, end, phrase_text, label = trigger
+        doc = sent.doc
+        first = sent.start
+        while first < start and doc[first].is_space:
+            first += 1
+        # Sentence end, without its final punctuation.
+        last = sent.end - 1
+        while last > start and doc[last].is_punct:
+            last -= 1
+        negated = any(doc[i].lower_ in _NEGATIONS for i in range(max(first, start - 3), start))
+
+        word_matches = [{
+            "search_phrase_token_index": 1,
+            "search_phrase_word": phrase_text.split()[1] if len(phrase_text.split()) > 1 else phrase_text,
+            "document_token_index": start,
+            "first_document_token_index": start,
+            "last_document_token_index": end - 1,
+            "structurally_matched_document_token_index": start,
+            "document_subword_containing_token_index": None,
+            "document_word": doc[start:end].text,
+            "match_type": "template",
+            "negated": negated,
+        }]
+        if start > first:
+            word_matches.insert(0, {
+                "search_phrase_token_index": 0,
+                "search_phrase_word": "somebody",
+                "document_token_index": start - 1,
+                "first_document_token_index": first,
+                "last_document_token_index": start - 1,
+                "structurally_matched_document_token_index": start - 1,
+                "document_subword_containing_token_index": None,
+                "document_word": doc[first:start].text,
+                "match_type": "template",
+            })
+        if last >= end:
+            anchor = next((loc.start for loc in locales if loc.start >= end), end)
+            word_matches.append({
+                "search_phrase_token_index": 2,
+                "search_phrase_word": "something",
+                "document_token_index": anchor,
+                "first_document_token_index": end,
+                "last_document_token_index": last,
+                "structurally_matched_document_token_index": anchor,
+                "document_subword_containing_token_index": None,
+                "document_word": doc[end:last + 1].text,
+                "match_type": "template",
+            })
+
+        return {
+            "search_phrase_label": label,
+            "search_phrase_text": phrase_text,
+            "sentences_within_document": sent.text,
+            "overall_similarity_measure": 1.0,
+            "negated": negated,
+            "uncertain": False,
+            "involves_coreference": False,
+            "index_within_document": start,
+            "word_matches": word_matches,
+            "template": opening,
+        }
+
+    # ------------------------------------------------------------------
+    # Posts
+    # ------------------------------------------------------------------
+
+    def read_post(self, post: Post, doc: Doc) -> TemplateResult:
+        """
+        Read one post's light doc (sentences and gazetteer spans set).
+
+        The reports are laid out in lines, and the sentencizer does not
+        split at line breaks, so each sentence is read line by line; it is
+        covered if all its lines are. Coverage is kept per sentence, the
+        unit the sentence-level Holmes path works in.
+        """
+        index = DocIndex(doc)
+        matches: List[dict] = []
+        covered: List[int] = []
+        sents = list(doc.sents)
+        for sent in sents:
+            found: List[dict] = []
+            for line in _lines(sent):
+                ok, m = self.read_sentence(line, index)
+                if not ok:
+                    break
+                if m is not None:
+                    found.append(m)
+            else:
+                covered.append(sent.start_char)
+                for m in found:
+                    m["document"] = post.post_id
+                    matches.append(m)
+
+        sections = split_into_sections(post.text, doc, index)
+        index.set_sections(post.text, sections)
+        covered_set = frozenset(covered)
+        n_covered_sections = 0
+        for start, end in index.section_bounds:
+            overlapping = [s.start_char for s in sents if s.start_char < end and s.end_char > start]
+            if start >= 0 and all(c in covered_set for c in overlapping):
+                n_covered_sections += 1
+
+        return TemplateResult(
+            matches=tuple(matches),
+            covered=covered_set,
+            sentences=len(sents),
+            sections=len(sections),
+            covered_sections=n_covered_sections,
+        )
+
+    def record_run(self, n_posts: int, results: Sequence[TemplateResult]) -> None:
+        sentences = sum(r.sentences for r in results)
+        covered = sum(len(r.covered) for r in results)
+        sections = sum(r.sections for r in results)
+        covered_sections = sum(r.covered_sections for r in results)
+        complete = sum(1 for r in results if r.complete)
+        self.last_run = {
+            "posts": n_posts,
+            "template_posts": len(results),
+            "covered_posts": complete,
+            "partial_posts": sum(1 for r in results if r.covered and not r.complete),
+            "sections": sections,
+            "covered_sections": covered_sections,
+            "sentences": sentences,
+            "covered_sentences": covered,
+            "post_coverage": complete / n_posts if n_posts else 0.0,
+            "sentence_coverage": covered / sentences if sentences else 0.0,
+        }
+
+
+def _lines(sent: Span) -> List[Span]:
+    """The sentence cut at line breaks, blank stretches dropped."""
+    doc = sent.doc
+    out: List[Span] = []
+    start = sent.start
+    for tok in sent:
+        if tok.is_space and "\n" in tok.text:
+            if any(not t.is_space for t in doc[start:tok.i]):
+                out.append(doc[start:tok.i])
+            start = tok.i + 1
+    if any(not t.is_space for t in doc[start:sent.end]):
+        out.append(doc[start:sent.end])
+    return out
+
+
+class ResidualFilter:
+    """
+    Sentence filter for match_posts_by_sentence that passes only the
+    sentences the templates did not cover (and, with a `prefilter`, that
+    it accepts as well). Sentences are told apart by their post's id
+    (match_posts_by_sentence records it in the light doc's user_data) and
+    start character, which the light passes of both runs share.
+    """
+
+    def __init__(
+        self,
+        covered: Dict[str, FrozenSet[int]],
+        prefilter: Optional[TriggerPrefilter] = None,
+    ):
+        self.covered = covered
+        self.prefilter = prefilter
+        self.last_run: Dict[str, float] = {}
+
+    def accepts(self, sent: Span) -> bool:
+        if sent.start_char in self.covered.get(sent.doc.user_data.get("post_id"), ()):
+            return False
+        return self.prefilter is None or self.prefilter.accepts(sent)
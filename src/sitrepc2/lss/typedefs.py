@@ -1,4 +1,15 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable
+
+if TYPE_CHECKING:
+    from sitrepc2.lss.alias_index import AliasIndex
+    from sitrepc2.lss.doc_cache import DocCache
+    from sitrepc2.lss.prefilter import TriggerPrefilter
+    from sitrepc2.lss.rematch import MatchStore
+    from sitrepc2.lss.sentence_cache import SentenceCache
+    from sitrepc2.lss.templates import TemplateExtractor
 
 @dataclass(frozen=True, slots=True)
 class WordMatch:
@@ -73,4 +84,29 @@ class EventMatch:
         for wm in self.word_matches:
             if wm.document_word.lower() in {"somebody", "something"}:
                 continue
-            yield wm
\ No newline at end of file
+            yield wm
+
+@dataclass(frozen=True)
+class PipelineOptions:
+    """
+    Per-run options of lss.pipeline. Every optional stage is off by
+    default; see run_nlp_pipeline for what each one does. The pipeline
+    entry points also take these fields as keyword arguments, overriding
+    an `options` passed alongside.
+    """
+
+    batch_size: int = 8
+    # nlp.pipe batches by character budget instead of post count, and
+    # posts longer than chunk_chars are parsed in section-aligned chunks
+    # (see lss.batching).
+    batch_chars: int | None = None
+    chunk_chars: int | None = None
+    min_similarity: float = 0.0
+    doc_cache: DocCache | None = None
+    sentence_cache: SentenceCache | None = None
+    prefilter: TriggerPrefilter | None = None
+    match_store: MatchStore | None = None
+    alias_index: AliasIndex | None = None
+    templates: TemplateExtractor | None = None
+    # Convert Docs to CompactDocs right after matching (see lss.compact_doc).
+    compact_docs: bool = False
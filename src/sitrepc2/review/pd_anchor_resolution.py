@@ -68,12 +68,12 @@ def _resolve_single_anchor(ctx: Context, gaz: GazetteerIndex) -> Optional[Resolv
     # 1) Try direction lookup
     d = gaz.search_direction(txt)
     if d:
-        anchor = gaz._locale_by_cid.get(d.anchor)
+        anchor = gaz.get_locale_by_cid(d.anchor.cid)
         if anchor is None:
             # stale or missing CID
             return ResolvedAnchor(ctx, [], None, mismatch=True)
 
-        cand = AnchorCandidate(cid=d.anchor, locale=anchor, score=1.0)
+        cand = AnchorCandidate(cid=anchor.cid, locale=anchor, score=1.0)
         return ResolvedAnchor(ctx=ctx, candidates=[cand])
 
     # 2) Fallback: treat text as locale name
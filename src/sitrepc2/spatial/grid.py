@@ -0,0 +1,262 @@
+# src/sitrepc2/spatial/grid.py
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+DistanceFn = Callable[[float, float, float, float], float]
+
+
+# ===============================================================
+# LAT/LON BUCKET GRID
+# ===============================================================
+
+class LatLonGrid:
+    """
+    Fixed-size lat/lon bucket grid over a list of points.
+
+    Points are addressed by their position in the input sequence. Queries
+    only visit cells that can possibly contain a hit, then refine with the
+    exact distance function supplied by the caller, so results are the same
+    as a linear scan using that function.
+
+    Cell pruning relies on two haversine lower bounds (sphere radius R):
+      • latitude gap Δφ      → d ≥ R·Δφ
+      • longitude gap Δλ     → hav(d/R) ≥ cosφ1·cosφ2·hav(Δλ)
+
+    Results are (distance, position) pairs ordered by distance, ties broken
+    by position — i.e. the order a stable sort over the input would give.
+    """
+
+    def __init__(
+        self,
+        points: Sequence[Tuple[float, float]],
+        dist: DistanceFn,
+        *,
+        cell_deg: float = 0.1,
+        earth_radius_km: float = 6371.0,
+    ):
+        self.cell_deg = cell_deg
+        self.R = earth_radius_km
+        self._dist = dist
+
+        self._lats: List[float] = [float(p[0]) for p in points]
+        self._lons: List[float] = [float(p[1]) for p in points]
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+
+        for idx, (lat, lon) in enumerate(zip(self._lats, self._lons)):
+            self._cells.setdefault(self._cell_of(lat, lon), []).append(idx)
+
+        self._size = len(self._lats)
+        self._update_extent()
+
+    def _update_extent(self) -> None:
+        live = [i for bucket in self._cells.values() for i in bucket]
+        if live:
+            rows = [c[0] for c in self._cells]
+            cols = [c[1] for c in self._cells]
+            self._row_range = (min(rows), max(rows))
+            self._col_range = (min(cols), max(cols))
+            self._max_abs_lat = max(abs(self._lats[i]) for i in live)
+            self._lon_extent = (min(self._lons[i] for i in live), max(self._lons[i] for i in live))
+        else:
+            self._row_range = (0, -1)
+            self._col_range = (0, -1)
+            self._max_abs_lat = 0.0
+            self._lon_extent = (0.0, 0.0)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def patched(
+        self,
+        remove: Iterable[int] = (),
+        add: Sequence[Tuple[float, float]] = (),
+    ) -> "LatLonGrid":
+        """
+        Copy of this grid with positions in `remove` dropped and `add`
+        appended as positions len(positions) … Untouched buckets are shared
+        with `self`, which is never modified.
+        """
+        new = LatLonGrid.__new__(LatLonGrid)
+        new.cell_deg = self.cell_deg
+        new.R = self.R
+        new._dist = self._dist
+        new._lats = self._lats + [float(p[0]) for p in add]
+        new._lons = self._lons + [float(p[1]) for p in add]
+        new._cells = dict(self._cells)
+
+        size = self._size
+        copied = set()
+
+        def bucket(cell):
+            if cell not in copied:
+                new._cells[cell] = list(new._cells.get(cell, ()))
+                copied.add(cell)
+            return new._cells[cell]
+
+        for pos in set(remove):
+            cell = self._cell_of(self._lats[pos], self._lons[pos])
+            b = bucket(cell)
+            if pos in b:
+                b.remove(pos)
+                size -= 1
+
+        base = len(self._lats)
+        for k, (lat, lon) in enumerate(add):
+            bucket(new._cell_of(float(lat), float(lon))).append(base + k)
+            size += 1
+
+        for cell in copied:
+            if not new._cells[cell]:
+                del new._cells[cell]
+
+        new._size = size
+        new._update_extent()
+        return new
+
+    # ----------------------------------------------------------- #
+    # Cell helpers
+    # ----------------------------------------------------------- #
+
+    def _cell_of(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (
+            math.floor(lat / self.cell_deg),
+            math.floor(lon / self.cell_deg),
+        )
+
+    def _refine(self, lat: float, lon: float, idxs: Sequence[int]) -> List[Tuple[float, int]]:
+        d = self._dist
+        lats, lons = self._lats, self._lons
+        return [(d(lat, lon, lats[i], lons[i]), i) for i in idxs]
+
+    def _all(self, lat: float, lon: float) -> List[Tuple[float, int]]:
+        if self._size == len(self._lats):
+            return self._refine(lat, lon, range(len(self._lats)))
+        return self._refine(lat, lon, [i for b in self._cells.values() for i in b])
+
+    def _lon_window_deg(self, km: float, lat: float, lat_span_deg: float) -> float | None:
+        """
+        Half-width (degrees) of the longitude window that can hold points
+        within `km` of a query at `lat`. None means "no useful bound".
+        """
+        max_lat = min(90.0, max(abs(lat - lat_span_deg), abs(lat + lat_span_deg)))
+        c = math.cos(math.radians(max_lat))
+        if c <= 0.0:
+            return None
+        s = math.sin(km / (2.0 * self.R)) / c
+        if s >= 1.0:
+            return None
+        return math.degrees(2.0 * math.asin(s))
+
+    def _lower_bound_km(self, lat: float, lon: float, r: int, qi: int, qj: int) -> float:
+        """
+        Smallest possible distance from (lat, lon) to any point lying outside
+        the square block of cells with Chebyshev radius `r` around (qi, qj).
+        """
+        cell = self.cell_deg
+        lat_gap = min(lat - (qi - r) * cell, (qi + r + 1) * cell - lat)
+        lon_gap = min(lon - (qj - r) * cell, (qj + r + 1) * cell - lon)
+
+        lat_bound = self.R * math.radians(max(lat_gap, 0.0))
+
+        # Going the other way round the antimeridian can be shorter.
+        span = max(self._lon_extent[1], lon) - min(self._lon_extent[0], lon)
+        lon_gap = min(lon_gap, 360.0 - span)
+
+        if lon_gap >= 180.0:
+            return lat_bound
+        cos_q = math.cos(math.radians(lat))
+        cos_p = math.cos(math.radians(self._max_abs_lat))
+        k = math.sqrt(max(cos_q * cos_p, 0.0)) * math.sin(math.radians(max(lon_gap, 0.0)) / 2.0)
+        lon_bound = 2.0 * self.R * math.asin(min(k, 1.0))
+
+        return min(lat_bound, lon_bound)
+
+    # ----------------------------------------------------------- #
+    # Queries
+    # ----------------------------------------------------------- #
+
+    def within(self, lat: float, lon: float, km: float) -> List[Tuple[float, int]]:
+        """All points with dist(query, point) <= km, nearest first."""
+        if not self._size or km < 0:
+            return []
+
+        lat_span = math.degrees(km / self.R) + 1e-9
+        lon_span = self._lon_window_deg(km, lat, lat_span)
+
+        if (
+            lon_span is None
+            or lat - lat_span < -90.0
+            or lat + lat_span > 90.0
+            or lon - lon_span < -180.0
+            or lon + lon_span > 180.0
+        ):
+            # Polar cap or antimeridian wrap: not worth special-casing.
+            scored = [t for t in self._all(lat, lon) if t[0] <= km]
+            scored.sort()
+            return scored
+
+        lon_span += 1e-9
+        i0, j0 = self._cell_of(lat - lat_span, lon - lon_span)
+        i1, j1 = self._cell_of(lat + lat_span, lon + lon_span)
+        i0, i1 = max(i0, self._row_range[0]), min(i1, self._row_range[1])
+        j0, j1 = max(j0, self._col_range[0]), min(j1, self._col_range[1])
+
+        idxs: List[int] = []
+        cells = self._cells
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                bucket = cells.get((i, j))
+                if bucket:
+                    idxs.extend(bucket)
+
+        scored = [t for t in self._refine(lat, lon, idxs) if t[0] <= km]
+        scored.sort()
+        return scored
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[float, int]]:
+        """The `k` nearest points, nearest first."""
+        if not self._size or k <= 0:
+            return []
+        if k >= self._size:
+            return sorted(self._all(lat, lon))
+
+        qi, qj = self._cell_of(lat, lon)
+        max_r = max(
+            abs(qi - self._row_range[0]),
+            abs(qi - self._row_range[1]),
+            abs(qj - self._col_range[0]),
+            abs(qj - self._col_range[1]),
+        )
+
+        cells = self._cells
+        r0, r1 = self._row_range
+        c0, c1 = self._col_range
+        scored: List[Tuple[float, int]] = []
+
+        for r in range(max_r + 1):
+            ring: List[int] = []
+            if r == 0:
+                ring.extend(cells.get((qi, qj), ()))
+            else:
+                cols = range(max(qj - r, c0), min(qj + r, c1) + 1)
+                for i in (qi - r, qi + r):
+                    if r0 <= i <= r1:
+                        for j in cols:
+                            ring.extend(cells.get((i, j), ()))
+                rows = range(max(qi - r + 1, r0), min(qi + r - 1, r1) + 1)
+                for j in (qj - r, qj + r):
+                    if c0 <= j <= c1:
+                        for i in rows:
+                            ring.extend(cells.get((i, j), ()))
+            scored.extend(self._refine(lat, lon, ring))
+
+            if len(scored) >= k:
+                kth = heapq.nsmallest(k, scored)[-1][0]
+                if kth < self._lower_bound_km(lat, lon, r, qi, qj):
+                    break
+
+        return heapq.nsmallest(k, scored)
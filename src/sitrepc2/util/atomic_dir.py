@@ -0,0 +1,123 @@
+# src/sitrepc2/util/atomic_dir.py
+"""
+Directories replaced by an atomic pointer swap.
+
+A cache directory such as `.sitrepc2/gazetteer.snapshot` is a symlink to
+a versioned sibling (`gazetteer.snapshot.v-<stamp>`). A writer fills a
+private staging directory, then, holding `<name>.lock`, renames it to a
+new version and swaps the symlink with os.replace. Readers that resolve
+the link once (`resolve_dir`) read one complete version throughout;
+concurrent writers each publish a complete version and the last swap
+wins.
+
+On publish, versions replaced more than `grace` seconds ago are removed,
+except the one the new version replaces: a reader that resolved the link
+just before a swap has that long to open its files. Staging directories
+and links left by writers that are no longer running are swept at the
+same time.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import shutil
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX
+    fcntl = None
+
+GRACE_SECONDS = 300.0
+
+
+def stage_dir(dirpath: Path) -> Path:
+    """A fresh, empty staging directory next to `dirpath`."""
+    dirpath = Path(dirpath)
+    staged = dirpath.with_name(f"{dirpath.name}.tmp-{os.getpid()}-{secrets.token_hex(4)}")
+    staged.mkdir(parents=True)
+    return staged
+
+
+def discard_dir(staged: Path) -> None:
+    shutil.rmtree(staged, ignore_errors=True)
+
+
+def resolve_dir(dirpath: Path) -> Path:
+    """The version `dirpath` points to now (or `dirpath` itself)."""
+    return Path(dirpath).resolve()
+
+
+def _stamp(version: Path) -> int:
+    """Publish time (ns) in a version's name, 0 if unreadable."""
+    try:
+        return int(version.name.rsplit(".v-", 1)[1].split("-", 1)[0], 16)
+    except (IndexError, ValueError):
+        return 0
+
+
+def _writer_running(leftover: Path, marker: str) -> bool:
+    """Whether the process named in `<name><marker><pid>[-token]` is alive."""
+    try:
+        pid = int(leftover.name.rsplit(marker, 1)[1].split("-", 1)[0])
+    except (IndexError, ValueError):
+        return True
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _sweep_leftovers(dirpath: Path) -> None:
+    """Remove staging dirs and links of writers that died mid-publish."""
+    if fcntl is None:  # pragma: no cover - no process check off POSIX
+        return
+    for marker in (".tmp-", ".link-"):
+        for leftover in dirpath.parent.glob(f"{dirpath.name}{marker}*"):
+            if _writer_running(leftover, marker):
+                continue
+            if leftover.is_symlink() or not leftover.is_dir():
+                leftover.unlink(missing_ok=True)
+            else:
+                shutil.rmtree(leftover, ignore_errors=True)
+
+
+def publish_dir(staged: Path, dirpath: Path, *, grace: float = GRACE_SECONDS) -> None:
+    """Make the complete directory `staged` the content of `dirpath`."""
+    dirpath = Path(dirpath)
+    with dirpath.with_name(f"{dirpath.name}.lock").open("a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+        now = time.time_ns()
+        version = dirpath.with_name(f"{dirpath.name}.v-{now:016x}-{secrets.token_hex(4)}")
+        os.rename(staged, version)
+
+        previous = os.readlink(dirpath) if dirpath.is_symlink() else None
+        if previous is None and dirpath.exists():
+            # A plain directory, written before versioning: it cannot be
+            # swapped atomically, so it is removed once.
+            shutil.rmtree(dirpath)
+
+        link = dirpath.with_name(f"{dirpath.name}.link-{os.getpid()}")
+        if link.is_symlink():
+            link.unlink()
+        os.symlink(version.name, link)
+        os.replace(link, dirpath)
+
+        # Each version was current until the next one was published.
+        versions = sorted(dirpath.parent.glob(f"{dirpath.name}.v-*"), key=_stamp)
+        for old, successor in zip(versions, versions[1:]):
+            if old.name in (version.name, previous):
+                continue
+            if now - _stamp(successor) > grace * 1e9:
+                shutil.rmtree(old, ignore_errors=True)
+
+        _sweep_leftovers(dirpath)
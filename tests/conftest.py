@@ -0,0 +1,21 @@
+"""
+Shared pipeline fixtures. The pipeline tests run on the rule-based toy
+pipeline (tests/toy_pipeline.py) with the DependencyManager backend, so
+no trained model or Holmes is needed.
+"""
+
+import pytest
+
+from sitrepc2.lss.pipeline import build_holmes_and_nlp
+
+from toy_pipeline import ToySettings, save_toy_model
+
+
+@pytest.fixture(scope="session")
+def settings(tmp_path_factory):
+    return ToySettings(model=str(save_toy_model(tmp_path_factory.mktemp("toy") / "model")))
+
+
+@pytest.fixture(scope="session")
+def manager(settings):
+    return build_holmes_and_nlp(settings)
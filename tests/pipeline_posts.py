@@ -0,0 +1,27 @@
+"""Sample posts for the pipeline tests, and a comparable view of their events."""
+
+from sitrepc2.dom.typedefs import Post
+
+TEXTS = [
+    "Russian forces attacked near bakhmut and shelled avdiivka.",
+    "In the kupiansk direction, units repelled attacks near synkivka.\n\n"
+    "The enemy lost up to 40 servicemen.",
+    "Ukrainian troops struck positions near robotyne. Fighting continued near vuhledar.",
+]
+
+
+def make_posts(texts=TEXTS, repeat=3):
+    # Odd posts come from a template channel, even ones do not.
+    return [
+        Post("tg", "mod_russia_en" if i % 2 else "news", "en", f"p{i}", "", "", text)
+        for i, text in enumerate(list(texts) * repeat)
+    ]
+
+
+def signature(posts):
+    return sorted(
+        (e.event_id, e.text, tuple(loc.text for loc in e.locations))
+        for post in posts
+        for section in post.sections
+        for e in section.events
+    )
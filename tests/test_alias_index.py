@@ -0,0 +1,121 @@
+import dataclasses
+import pickle
+from importlib.resources import files
+
+import pytest
+import spacy
+
+from sitrepc2.dom.typedefs import Post
+from sitrepc2.gazetteer.index import GazetteerDelta, GazetteerIndex
+from sitrepc2.gazetteer.snapshot import load_gazetteer
+from sitrepc2.gazetteer.typedefs import LocaleEntry
+from sitrepc2.lss.alias_index import AliasIndex, alias_terms
+from sitrepc2.lss.bootstrap import build_manager
+from sitrepc2.lss.phrases import register_search_phrases
+from sitrepc2.lss.pipeline import reprocess_gazetteer_delta, run_nlp_pipeline
+from sitrepc2.lss.ruler import add_entity_rulers
+from sitrepc2.util.encoding import encode_coord_u64
+
+from pipeline_posts import TEXTS, make_posts, signature
+
+REFERENCE = files("sitrepc2") / "reference"
+SOURCES = tuple(
+    REFERENCE / name
+    for name in ("locale_lookup.csv", "region_lookup.csv", "group_lookup.csv", "direction_lookup.csv")
+)
+
+
+def test_alias_terms_split_clitics_and_punctuation():
+    assert alias_terms("Kupiansk's outskirts, (Synkivka).") == ["kupiansks", "kupiansk", "outskirts", "synkivka"]
+    assert set(alias_terms("Kupiansk")) <= set(alias_terms("Near Kupiansk's outskirts"))
+
+
+@pytest.fixture
+def nlp():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [
+            {"label": "LOCALE", "pattern": "bakhmut"},
+            {"label": "LOCALE", "pattern": "synkivka"},
+            {"label": "REGION", "pattern": "donetsk"},
+        ]
+    )
+    return nlp
+
+
+def _post(post_id, text):
+    return Post("tg", "news", "en", post_id, "", "", text)
+
+
+def test_affected_posts_by_tag_and_by_terms(nlp, tmp_path):
+    index = AliasIndex(tmp_path / "aliases.sqlite")
+    posts = [
+        _post("p0", "Shelling of bakhmut, donetsk region."),
+        _post("p1", "Attacks near synkivka and novo yehorivka."),
+        _post("p2", "Quiet day near yehorivka."),
+    ]
+    index.put_many((p, nlp(p.text)) for p in posts)
+    assert len(index) == 3 and index.indexed(["p0", "p3"]) == {"p0"}
+    assert set(index.postings("Bakhmut")) == {"p0"}
+
+    delta = GazetteerDelta(
+        added_aliases=frozenset({"novo yehorivka"}),
+        removed_aliases=frozenset({"synkivka"}),
+        changed_aliases=frozenset({"novo yehorivka", "synkivka", "donetsk"}),
+    )
+    assert index.affected_posts(delta) == {"p0": "tagged", "p1": "tagged"}
+    delta = dataclasses.replace(delta, removed_aliases=frozenset(), changed_aliases=frozenset())
+    assert index.affected_posts(delta) == {"p1": "candidate"}
+
+    # Re-indexing replaces what was held; a pickled index reopens.
+    index.put_many([(posts[0], nlp("No places."))])
+    clone = pickle.loads(pickle.dumps(index))
+    assert clone.postings("bakhmut") == {}
+    clone.discard(["p1"])
+    assert clone.indexed(["p0", "p1", "p2"]) == {"p0", "p2"}
+    clone.close()
+    index.close()
+
+
+NEW_LOCALE = LocaleEntry(encode_coord_u64(48.31, 37.95), "Zaliznychne Druhe", ["zaliznychne druhe"], 37.95, 48.31)
+TEXTS_WITH_NEW = TEXTS + ["Assault groups attacked near zaliznychne druhe and synkivka."]
+
+
+def _manager_over(settings, gazetteer):
+    manager = build_manager(settings)
+    manager.nlp = add_entity_rulers(
+        manager.nlp,
+        locales=gazetteer.live_locales(),
+        regions=gazetteer.regions,
+        groups=gazetteer.groups,
+        directions=gazetteer.directions,
+    )
+    register_search_phrases(manager)
+    return manager
+
+
+def test_reprocess_equals_a_full_rerun_on_the_patched_gazetteer(settings, tmp_path):
+    reference = load_gazetteer(*SOURCES)
+    gaz = GazetteerIndex(reference.live_locales(), reference.regions, reference.groups, reference.directions)
+    manager = _manager_over(settings, gaz)
+    index = AliasIndex(tmp_path / "aliases.sqlite")
+    before = run_nlp_pipeline(make_posts(TEXTS_WITH_NEW), manager, alias_index=index)
+    assert manager.list_document_labels() == []
+
+    # Documents the Manager holds whenever it matches.
+    matched_labels = []
+    match = manager.match
+    manager.match = lambda *a, **kw: (matched_labels.append(set(manager.list_document_labels())), match(*a, **kw))[1]
+
+    delta = gaz.apply_patch(add=[NEW_LOCALE], remove=[e.cid for e in gaz.search_locale("synkivka")])
+    assert "zaliznychne druhe" in delta.added_aliases and "synkivka" in delta.removed_aliases
+    changed = reprocess_gazetteer_delta(make_posts(TEXTS_WITH_NEW), manager, delta, index)
+    assert changed and index.last_run["skipped"] > 0
+    # Only the invalidated posts are matched, and none is left registered.
+    assert matched_labels == [{f"{post_id}#post" for post_id in changed}]
+    assert manager.list_document_labels() == []
+
+    full = run_nlp_pipeline(make_posts(TEXTS_WITH_NEW), _manager_over(settings, gaz))
+    assert signature({**before, **changed}.values()) == signature(full.values())
+    index.close()
@@ -0,0 +1,117 @@
+import random
+from importlib.resources import files
+
+import pytest
+import spacy
+
+from sitrepc2.gazetteer.aliases import gather_aliases
+from sitrepc2.gazetteer.snapshot import load_gazetteer
+from sitrepc2.lss.ruler import add_alias_scanner, add_entity_rulers
+
+REFERENCE = files("sitrepc2") / "reference"
+SOURCES = tuple(
+    REFERENCE / name
+    for name in ("locale_lookup.csv", "region_lookup.csv", "group_lookup.csv", "direction_lookup.csv")
+)
+
+CUES = (
+    "in the direction of {}",
+    "towards {}",
+    "{} direction",
+    "{} axis",
+    "{} sector",
+    "the {} line",
+)
+
+
+def _expanded_direction_patterns(aliases):
+    """The six per-alias token patterns the ruler originally generated."""
+    shapes = (
+        ["in", "the", "direction", "of", None],
+        ["towards", None],
+        [None, "direction"],
+        [None, "axis"],
+        [None, "sector"],
+        ["the", None, "line"],
+    )
+    return [
+        {"label": "DIRECTION", "pattern": [{"LOWER": alias if w is None else w} for w in shape]}
+        for alias in sorted(aliases)
+        for shape in shapes
+    ]
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return load_gazetteer(*SOURCES)
+
+
+@pytest.fixture(scope="module")
+def aliases(gazetteer):
+    return gather_aliases(list(gazetteer.locales), gazetteer.regions, gazetteer.groups, gazetteer.directions)
+
+
+@pytest.fixture(scope="module")
+def reference_nlp(aliases):
+    """A plain EntityRuler over every alias plus the expanded direction patterns."""
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    for label, group in zip(("LOCALE", "REGION", "GROUP"), aliases[:3]):
+        ruler.add_patterns([{"label": label, "pattern": a} for a in sorted(set(group))])
+    ruler.add_patterns(_expanded_direction_patterns(set(aliases[3])))
+    return nlp
+
+
+@pytest.fixture(scope="module")
+def texts(aliases):
+    locale, region, group, direction = aliases
+    out = [
+        # LOCALE and REGION on one span ("luhansk"), plus a longer REGION
+        # alias overlapping a LOCALE one.
+        "Strikes on luhansk and donetsk, then luhansk peoples republic and kharkiv.",
+        # A GROUP alias swallowing the LOCALE alias inside it.
+        "The dnipro group of forces held near dnipro while the vostok group advanced.",
+        # Direction cues competing with the LOCALE alias they contain.
+        "Fighting towards bakhmut and on the avdiivka line, bakhmut itself quiet.",
+    ]
+    # Every direction alias in all six cue shapes.
+    for alias in direction:
+        out.append(". ".join(cue.format(alias) for cue in CUES) + ".")
+    # Random mixes across all labels, including back-to-back aliases.
+    rng = random.Random(5)
+    pool = locale + region + group + direction
+    for _ in range(200):
+        words = []
+        for _ in range(8):
+            words.append(rng.choice(pool))
+            if rng.random() < 0.5:
+                words.append(rng.choice(["near", "the", "and", "towards", "direction", "line", ","]))
+        out.append(" ".join(words))
+    return out
+
+
+def _ents(doc):
+    return [(e.start, e.end, e.label_) for e in doc.ents]
+
+
+@pytest.mark.parametrize("install", [add_entity_rulers, add_alias_scanner])
+def test_installed_rulers_match_plain_entity_ruler(install, gazetteer, reference_nlp, texts):
+    nlp = install(
+        spacy.blank("en"),
+        locales=list(gazetteer.locales),
+        regions=gazetteer.regions,
+        groups=gazetteer.groups,
+        directions=gazetteer.directions,
+    )
+    for text in texts:
+        assert _ents(nlp(text)) == _ents(reference_nlp(text)), text
+
+
+def test_reference_texts_cover_ties_overlaps_and_cues(reference_nlp, texts):
+    ents = _ents(reference_nlp(texts[0]))
+    # "luhansk" is both a LOCALE and a REGION alias; one label wins.
+    assert len([e for e in ents if e[:2] == (2, 3)]) == 1
+    assert (7, 10, "REGION") in ents
+    assert (1, 5, "GROUP") in _ents(reference_nlp(texts[1]))
+    labels = [e[2] for e in _ents(reference_nlp(texts[2]))]
+    assert labels[:2] == ["DIRECTION", "DIRECTION"]
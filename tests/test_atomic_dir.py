@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+from sitrepc2.util.atomic_dir import publish_dir, resolve_dir, stage_dir
+
+
+def _publish(path, text, **kwargs):
+    staged = stage_dir(path)
+    (staged / "data.txt").write_text(text)
+    publish_dir(staged, path, **kwargs)
+
+
+def _versions(path):
+    return sorted(p.name for p in path.parent.glob(f"{path.name}.v-*"))
+
+
+def test_publish_swaps_versions_and_keeps_the_replaced_one(tmp_path):
+    path = tmp_path / "cache"
+    _publish(path, "one")
+    first = resolve_dir(path)
+    assert path.is_symlink() and (path / "data.txt").read_text() == "one"
+
+    _publish(path, "two")
+    # A reader that resolved the link before the swap still reads its version.
+    assert (first / "data.txt").read_text() == "one"
+    assert (path / "data.txt").read_text() == "two"
+    assert len(_versions(path)) == 2
+
+    _publish(path, "three", grace=0)
+    assert not first.exists() and len(_versions(path)) == 2
+    assert not [p for p in tmp_path.iterdir() if ".tmp-" in p.name or ".link-" in p.name]
+
+
+def test_replaced_versions_outlive_the_grace_period(tmp_path):
+    path = tmp_path / "cache"
+    _publish(path, "one")
+    first = resolve_dir(path)
+    # Two publishes between a reader's resolve and its reads.
+    _publish(path, "two")
+    _publish(path, "three")
+    assert (first / "data.txt").read_text() == "one"
+    assert len(_versions(path)) == 3
+    _publish(path, "four", grace=0)
+    assert not first.exists() and len(_versions(path)) == 2
+
+
+def test_publish_sweeps_leftovers_of_dead_writers(tmp_path):
+    path = tmp_path / "cache"
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    dead_pid = int(dead.stdout)
+    (tmp_path / f"cache.tmp-{dead_pid}-0000").mkdir()
+    os.symlink("nowhere", tmp_path / f"cache.link-{dead_pid}")
+    live = stage_dir(path)
+
+    _publish(path, "one")
+    leftovers = sorted(p.name for p in tmp_path.iterdir() if ".tmp-" in p.name or ".link-" in p.name)
+    assert leftovers == [live.name]
+
+
+def test_publish_replaces_a_plain_directory(tmp_path):
+    path = tmp_path / "cache"
+    path.mkdir()
+    (path / "data.txt").write_text("old")
+    _publish(path, "new")
+    assert path.is_symlink() and (path / "data.txt").read_text() == "new"
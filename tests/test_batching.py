@@ -0,0 +1,85 @@
+import pytest
+import spacy
+
+from sitrepc2.lss.batching import budget_batches, chunk_bounds, chunk_offsets, merge_chunks, pipe_texts
+from sitrepc2.lss.pipeline import _match_posts, run_nlp_pipeline
+from sitrepc2.lss.typedefs import PipelineOptions
+
+from pipeline_posts import TEXTS, make_posts, signature
+
+SECTIONED = (
+    "Kupiansk direction: units repelled attacks near synkivka.\n"
+    "Lyman direction: Russian forces attacked near bakhmut and shelled avdiivka.\n"
+    "Bakhmut direction: Ukrainian troops struck positions near robotyne."
+)
+
+
+def test_budget_batches_keep_order_and_budget():
+    assert budget_batches([3, 4, 2, 9, 1, 1], 7) == [[0, 1], [2], [3], [4, 5]]
+    assert budget_batches([], 5) == []
+    with pytest.raises(ValueError):
+        budget_batches([1], 0)
+
+
+def test_pipe_texts_by_budget_matches_pipe():
+    nlp = spacy.blank("en")
+    texts = ["short", "a much longer text than the others", "x", "y z"]
+    budgeted = [d.text for d in pipe_texts(nlp, texts, batch_chars=10)]
+    assert budgeted == [d.text for d in nlp.pipe(texts)]
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 20, 45, 1000])
+def test_chunk_bounds_cover_the_text_at_cuts(chunk_chars):
+    text = "a" * 30 + "b" * 10 + "c" * 25 + "d" * 5
+    cuts = [30, 40, 65]
+    bounds = chunk_bounds(text, cuts, chunk_chars)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(text)
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
+    assert all(a in cuts for a, _ in bounds[1:])
+    # Only a chunk without an inner cut may exceed the budget.
+    for a, b in bounds:
+        assert b - a <= chunk_chars or not any(a < c < b for c in cuts)
+    # Each chunk is as long as fits: the next cut would overflow it.
+    for (a, b), _ in zip(bounds, bounds[1:]):
+        nxt = [c for c in cuts if c > b] + [len(text)]
+        assert b - a > chunk_chars or nxt[0] - a > chunk_chars
+
+
+def test_merged_chunks_keep_text_and_offsets():
+    nlp = spacy.blank("en")
+    text = "Attacks near bakhmut.\n\n  Shelling of avdiivka continued.\nQuiet."
+    bounds = chunk_bounds(text, [text.index("Shelling"), text.index("Quiet")], 1)
+    chunks = [nlp(text[a:b]) for a, b in bounds]
+    doc = merge_chunks(chunks)
+    assert doc.text == text
+    for chunk, offset, (a, _) in zip(chunks, chunk_offsets(chunks), bounds):
+        for token in chunk:
+            assert doc[token.i + offset].idx == a + token.idx
+
+
+@pytest.mark.parametrize("chunk_chars", [10, 130])
+def test_chunking_does_not_change_events(manager, chunk_chars):
+    posts = lambda: make_posts(TEXTS + [SECTIONED], repeat=2)
+    serial = signature(run_nlp_pipeline(posts(), manager).values())
+    options = PipelineOptions(batch_chars=100, chunk_chars=chunk_chars)
+    out = run_nlp_pipeline(posts(), manager, options)
+    assert signature(out.values()) == serial
+    assert all(post.sections for post in out.values())
+
+
+def _match_order(manager, posts, options):
+    _, matches_by_post = _match_posts(manager, posts, options)
+    return {
+        post_id: [(m["search_phrase_label"], m["index_within_document"]) for m in matches]
+        for post_id, matches in matches_by_post.items()
+    }
+
+
+def test_chunked_matches_keep_holmes_order(manager):
+    posts = make_posts([SECTIONED], repeat=1)
+    whole = _match_order(manager, posts, PipelineOptions())
+    chunked = _match_order(manager, posts, PipelineOptions(chunk_chars=10))
+    assert chunked == whole
+    # Holmes' key within a document (all similarities here are 1.0).
+    roots = [root for _, root in chunked["p0"]]
+    assert len(roots) > 1 and roots == sorted(roots)
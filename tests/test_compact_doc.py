@@ -0,0 +1,58 @@
+import pickle
+
+import pytest
+import spacy
+from spacy.tokens import Span
+
+from sitrepc2.lss.compact_doc import CompactDoc, CompactSpan
+from sitrepc2.lss.pipeline import iter_nlp_pipeline, run_nlp_pipeline
+
+from pipeline_posts import make_posts, signature
+
+TEXT = "In the kupiansk direction, units repelled attacks near synkivka.\n\nThe enemy lost up to 40 servicemen."
+
+
+@pytest.fixture(scope="module")
+def doc():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    doc = nlp(TEXT)
+    doc.ents = [Span(doc, 2, 4, label="DIRECTION"), Span(doc, 9, 10, label="LOCALE")]
+    return doc
+
+
+def test_compact_doc_reads_like_the_doc(doc):
+    compact = CompactDoc.from_doc(doc)
+    assert compact.text == doc.text and len(compact) == len(doc)
+    assert [(t.i, t.idx, t.text, t.lemma_, t.head.i, t.is_sent_start) for t in compact] == [
+        (t.i, t.idx, t.text, t.lemma_, t.head.i, bool(t.is_sent_start)) for t in doc
+    ]
+    assert [(e.start, e.end, e.start_char, e.end_char, e.text, e.label_) for e in compact.ents] == [
+        (e.start, e.end, e.start_char, e.end_char, e.text, e.label_) for e in doc.ents
+    ]
+    assert [s.text for s in compact.sents] == [s.text for s in doc.sents]
+    assert compact[3:8].text == doc[3:8].text and compact[-1].text == doc[-1].text
+
+
+@pytest.mark.parametrize("start,end", [(0, 2), (3, 15), (4, 15), (3, 14), (7, 64), (0, len(TEXT)), (10, 5)])
+def test_char_span_is_strict_like_spacy(doc, start, end):
+    expected = doc.char_span(start, end)
+    got = CompactDoc.from_doc(doc).char_span(start, end)
+    assert (got is None) == (expected is None)
+    if got is not None:
+        assert (got.start, got.end, got.text) == (expected.start, expected.end, expected.text)
+
+
+def test_compact_doc_pickles(doc):
+    compact = pickle.loads(pickle.dumps(CompactDoc.from_doc(doc)))
+    assert [e.text for e in compact.ents] == [e.text for e in doc.ents]
+
+
+def test_compact_docs_do_not_change_events(manager):
+    serial = signature(run_nlp_pipeline(make_posts(), manager).values())
+    out = run_nlp_pipeline(make_posts(), manager, compact_docs=True)
+    assert signature(out.values()) == serial
+    streamed = list(iter_nlp_pipeline(make_posts(), manager, window=2, compact_docs=True))
+    assert signature(streamed) == serial
+    locations = [loc for post in out.values() for e in post.events for loc in e.locations]
+    assert all(isinstance(loc.span, CompactSpan) for loc in locations)
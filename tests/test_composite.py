@@ -0,0 +1,64 @@
+import dataclasses
+import random
+from importlib.resources import files
+
+import pytest
+
+from sitrepc2.gazetteer.index import GazetteerIndex
+from sitrepc2.gazetteer.snapshot import load_gazetteer
+
+REFERENCE = files("sitrepc2") / "reference"
+SOURCES = tuple(
+    REFERENCE / name
+    for name in ("locale_lookup.csv", "region_lookup.csv", "group_lookup.csv", "direction_lookup.csv")
+)
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return load_gazetteer(*SOURCES)
+
+
+def _filtered(gaz, text, kind, constraint):
+    """What the composite maps replace: every alias row, then a filter."""
+    st = gaz._state
+    vocab = st.store.regions if kind == "region" else st.store.groups
+    allowed = {vocab[c] for c in st.constraint_codes(kind, constraint)}
+    field = "region" if kind == "region" else "ru_group"
+    return [e.cid for e in gaz.search_locale(text) if getattr(e, field) in allowed]
+
+
+def _assert_composites_match_filter(gaz, rng):
+    entries = rng.sample(gaz.live_locales(), 300)
+    regions = sorted({e.region for e in entries if e.region})
+    regions += [a for r in gaz.regions for a in r.aliases[:1]]
+    groups = sorted({e.ru_group for e in entries if e.ru_group}) + [g.name for g in gaz.groups]
+    for e in entries:
+        for text in [e.name] + e.aliases[:2]:
+            for region in [e.region or "kharkiv"] + rng.sample(regions, 2):
+                assert [x.cid for x in gaz.search_locale_in_region(text, region)] == _filtered(
+                    gaz, text, "region", region
+                )
+            for group in rng.sample(groups, 2):
+                assert [x.cid for x in gaz.search_locale_in_ru_group(text, group)] == _filtered(
+                    gaz, text, "group", group
+                )
+
+
+def test_composite_lookups_match_filtered_alias_rows(gazetteer):
+    _assert_composites_match_filter(gazetteer, random.Random(7))
+
+
+def test_composite_lookups_follow_patches(gazetteer):
+    rng = random.Random(8)
+    gaz = GazetteerIndex(gazetteer.live_locales(), gazetteer.regions, gazetteer.groups, gazetteer.directions)
+    moved = [
+        dataclasses.replace(e, region=rng.choice(gazetteer.regions).name)
+        for e in rng.sample(gaz.live_locales(), 50)
+    ]
+    moved_cids = {e.cid for e in moved}
+    removed = [e.cid for e in rng.sample(gaz.live_locales(), 50) if e.cid not in moved_cids]
+    gaz.apply_patch(replace=moved, remove=removed)
+    _assert_composites_match_filter(gaz, rng)
+    for e in moved:
+        assert e.cid in [x.cid for x in gaz.search_locale_in_region(e.name, e.region)]
@@ -0,0 +1,268 @@
+"""
+CorefGate on the toy pipeline: coreference runs only on sections with an
+anaphor near a LOCALE span, and the chains it finds land on the post Doc.
+coreferee is stood in for by toy_coreferee (tests/toy_pipeline.py).
+"""
+
+import sys
+import types
+
+import pytest
+
+from sitrepc2.dom.typedefs import Post
+from sitrepc2.lss.bootstrap import HolmesSettings, build_manager
+from sitrepc2.lss.coref_gate import coref_gate, install_coref_gate
+from sitrepc2.lss.pipeline import (
+    build_holmes_and_nlp,
+    iter_nlp_pipeline,
+    load_entity_rulers,
+    run_nlp_pipeline,
+    source_ruler_gazetteer_paths,
+)
+
+from toy_pipeline import toy_nlp
+
+WINDOW = 5
+
+TWO_SECTIONS = (
+    "# North\nRussian forces shelled bakhmut. It was hit again.\n"
+    "# South\nUnits attacked near avdiivka and the village was taken."
+)
+
+
+def _gated(nlp):
+    nlp.add_pipe("toy_coreferee", name="coreferee")
+    gate = install_coref_gate(nlp, window=WINDOW)
+    return gate, gate.coreferee
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    return load_entity_rulers(toy_nlp(), *source_ruler_gazetteer_paths())
+
+
+@pytest.fixture(scope="module")
+def gated(nlp):
+    gate, coreferee = _gated(nlp)
+
+    def run(text):
+        gate.start_run()
+        coreferee.texts.clear()
+        doc = nlp(text)
+        gate.record_run()
+        return doc
+
+    return run, gate, coreferee
+
+
+def _chains(doc):
+    return [[m.token_indexes for m in chain.mentions] for chain in doc._.coref_chains.chains]
+
+
+def test_install_replaces_the_coreferee_pipe(nlp, gated):
+    assert "coreferee" not in nlp.pipe_names
+    assert nlp.pipe_names[-1] == "coref_gate"
+    _, gate, _ = gated
+    assert install_coref_gate(nlp) is gate
+
+
+def test_install_needs_a_coreferee_pipe():
+    with pytest.raises(ValueError):
+        install_coref_gate(toy_nlp())
+
+
+@pytest.mark.parametrize(
+    "text, anaphor",
+    [
+        ("Russian forces shelled bakhmut. It was hit again.", "It"),
+        ("Units attacked near avdiivka and the village was taken.", "village"),
+    ],
+)
+def test_an_anaphor_within_the_window_is_resolved(gated, text, anaphor):
+    run, gate, coreferee = gated
+    doc = run(text)
+    assert coreferee.texts == [text]
+    assert gate.last_run["coref_sections"] == 1
+    token = next(t for t in doc if t.text == anaphor)
+    [chain] = token._.coref_chains.chains
+    assert doc[chain.mentions[0].root_index].ent_type_ == "LOCALE"
+
+
+BEYOND_WINDOW = [
+    "Russian forces shelled bakhmut and then pulled back again before dawn. It was quiet.",
+    "Units attacked near avdiivka and then pulled back again before the village was taken.",
+]
+
+
+@pytest.mark.parametrize("text", BEYOND_WINDOW)
+def test_a_wider_window_reaches_a_farther_anaphor(gated, text):
+    run, gate, coreferee = gated
+    gate.window = 20
+    try:
+        doc = run(text)
+    finally:
+        gate.window = WINDOW
+    assert coreferee.texts == [text]
+    assert len(doc._.coref_chains.chains) == 1
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        *BEYOND_WINDOW,
+        # An anaphor before the LOCALE span cannot refer back to it.
+        "It was quiet near bakhmut.",
+        # A place noun without a definite determiner is no anaphor.
+        "Units attacked near avdiivka and a village was taken.",
+    ],
+)
+def test_other_sections_skip_coreference(gated, text):
+    run, gate, coreferee = gated
+    doc = run(text)
+    assert coreferee.texts == []
+    assert gate.last_run["coref_sections"] == 0
+    assert doc._.coref_chains.chains == []
+    assert all(t._.coref_chains.chains == [] for t in doc)
+    assert not any(name.startswith("temp_") for name in vars(doc[0]._.coref_chains))
+
+
+def test_chains_are_shifted_onto_the_post(gated):
+    run, gate, coreferee = gated
+    doc = run(TWO_SECTIONS)
+    # One coreferee call per gated section, each on the section alone.
+    assert coreferee.texts == [
+        "# North\nRussian forces shelled bakhmut. It was hit again.",
+        "# South\nUnits attacked near avdiivka and the village was taken.",
+    ]
+    # bakhmut(6) <- It(8); avdiivka(20) <- the village(22, 23)
+    assert _chains(doc) == [[[6], [8]], [[20], [22, 23]]]
+    assert [chain.index for chain in doc._.coref_chains.chains] == [0, 1]
+    second = doc._.coref_chains.chains[1]
+    assert doc[23]._.coref_chains.chains == [second] == doc[20]._.coref_chains.chains
+    assert [m.pretty_representation for m in second.mentions] == ["avdiivka(20)", "[the(22); village(23)]"]
+    assert second.mentions[1].root_index == 23
+
+
+def test_chains_do_not_cross_a_section_boundary(gated):
+    run, gate, coreferee = gated
+    # The pronoun's only antecedent is in the previous section.
+    doc = run("# North\nRussian forces shelled bakhmut.\n# South\nIt was hit again.")
+    assert coreferee.texts == []
+    assert doc._.coref_chains.chains == []
+
+    doc = run(TWO_SECTIONS)
+    sections = [(0, 13), (14, 27)]
+    for chain in doc._.coref_chains.chains:
+        indexes = [i for m in chain.mentions for i in m.token_indexes]
+        assert any(all(start <= i < end for i in indexes) for start, end in sections)
+
+
+# ---------------------------------------------------------------------------
+# Pipelines shared between Managers
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def holmes(monkeypatch):
+    """
+    holmes_extractor as far as pipelines go: one pipeline per model for
+    the process, with coreferee added back at the end when missing.
+    """
+    pipelines = {}
+
+    class Manager:
+        def __init__(self, model, perform_coreference_resolution=None, **kwargs):
+            nlp = pipelines.get(model)
+            if nlp is None:
+                nlp = pipelines[model] = load_entity_rulers(toy_nlp(), *source_ruler_gazetteer_paths())
+            if perform_coreference_resolution and not nlp.has_pipe("coreferee"):
+                nlp.add_pipe("toy_coreferee", name="coreferee")
+            self.nlp = nlp
+
+        def close(self):
+            pass
+
+    monkeypatch.setitem(sys.modules, "holmes_extractor", types.SimpleNamespace(Manager=Manager))
+    return Manager
+
+
+def test_managers_sharing_a_pipeline_share_its_gate(holmes):
+    settings = HolmesSettings(model="shared", coreference_gating=True, coreference_window=WINDOW)
+    first = build_manager(settings)
+    gate = coref_gate(first.nlp)
+    second = build_manager(settings)
+    assert second.nlp is first.nlp and coref_gate(second.nlp) is gate
+    # The coreferee pipe Holmes added back for the second Manager is gone.
+    assert "coreferee" not in second.nlp.pipe_names
+    doc = second.nlp(TWO_SECTIONS)
+    assert _chains(doc) == [[[6], [8]], [[20], [22, 23]]]
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        (dict(coreference_gating=True), dict(perform_coreference_resolution=True)),
+        (dict(perform_coreference_resolution=True), dict(coreference_gating=True)),
+        (dict(coreference_gating=True, coreference_window=5), dict(coreference_gating=True, coreference_window=9)),
+    ],
+)
+def test_a_shared_pipeline_keeps_its_gating(holmes, first, second):
+    build_manager(HolmesSettings(model="shared", **first))
+    with pytest.raises(ValueError):
+        build_manager(HolmesSettings(model="shared", **second))
+    # Another model has a pipeline of its own.
+    build_manager(HolmesSettings(model="other", **second))
+
+
+def test_the_dependency_backend_refuses_gating():
+    with pytest.raises(ValueError):
+        build_manager(HolmesSettings(backend="dependency", coreference_gating=True))
+
+
+# ---------------------------------------------------------------------------
+# Run reports
+# ---------------------------------------------------------------------------
+
+POSTS = [
+    TWO_SECTIONS,
+    "Russian forces shelled bakhmut. Fighting continued.",
+    "# North\nFighting continued near vuhledar.\n# South\nIt was quiet near robotyne.",
+]
+
+
+def _posts():
+    return [Post("tg", "news", "en", f"c{i}", "", "", text) for i, text in enumerate(POSTS)]
+
+
+@pytest.fixture(scope="module")
+def gated_manager(settings):
+    manager = build_holmes_and_nlp(settings)
+    _gated(manager.nlp)
+    return manager
+
+
+def _expected_run(nlp):
+    # Only the two sections of TWO_SECTIONS (13 tokens each) are gated.
+    tokens = sum(len(nlp.make_doc(text)) for text in POSTS)
+    return {
+        "docs": 3,
+        "sections": 5,
+        "coref_sections": 2,
+        "coref_section_rate": 2 / 5,
+        "tokens": tokens,
+        "coref_tokens": 26,
+        "coref_token_rate": 26 / tokens,
+    }
+
+
+def test_run_reports_the_sections_paying_for_coreference(gated_manager):
+    gate = gated_manager.nlp.get_pipe("coref_gate")
+    run_nlp_pipeline(_posts(), gated_manager)
+    assert gate.last_run == pytest.approx(_expected_run(gated_manager.nlp))
+    assert gated_manager.list_document_labels() == []
+
+
+def test_streaming_reports_the_whole_run(gated_manager):
+    gate = gated_manager.nlp.get_pipe("coref_gate")
+    posts = list(iter_nlp_pipeline(iter(_posts()), gated_manager, window=1))
+    assert len(posts) == 3
+    assert gate.last_run == pytest.approx(_expected_run(gated_manager.nlp))
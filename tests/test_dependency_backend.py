@@ -0,0 +1,185 @@
+"""
+Compiling search phrases for the DependencyManager: one test per way a
+pattern is widened beyond the phrase's own parse. Phrases and documents
+are hand-built parsed Docs, so no model is involved.
+"""
+
+import pytest
+import spacy
+from spacy.tokens import Doc
+
+from sitrepc2.lss.dependency_backend import (
+    DependencyManager,
+    DependencySearchPhrase,
+    DuplicateDocumentError,
+    compile_search_phrase,
+)
+
+
+def _doc(vocab, spec):
+    """Doc from "word/POS/lemma/head/dep" items; head is a token index."""
+    rows = [item.split("/") for item in spec.split()]
+    return Doc(
+        vocab,
+        words=[r[0] for r in rows],
+        pos=[r[1] for r in rows],
+        lemmas=[r[2] for r in rows],
+        heads=[int(r[3]) for r in rows],
+        deps=[r[4] for r in rows],
+    )
+
+
+def _manager(phrase_spec):
+    manager = DependencyManager(nlp=spacy.blank("en"))
+    doc = _doc(manager.nlp.vocab, phrase_spec)
+    phrase = DependencySearchPhrase("P", doc.text, doc, compile_search_phrase(doc))
+    manager.register_compiled_search_phrases([phrase])
+    return manager, phrase
+
+
+def _matched(manager, doc_spec):
+    """Matched document token indices, one sorted tuple per match."""
+    manager.remove_all_documents()
+    manager.register_docs({"d": _doc(manager.nlp.vocab, doc_spec)})
+    return [
+        tuple(sorted(w["document_token_index"] for w in m["word_matches"]))
+        for m in manager.match()
+    ]
+
+
+SOMEBODY_SHELLED_VILLAGE = (
+    "Somebody/PRON/somebody/1/nsubj shelled/VERB/shell/1/ROOT "
+    "a/DET/a/3/det village/NOUN/village/1/dobj"
+)
+
+
+def test_generic_pronouns_leave_a_single_node_pattern():
+    manager, phrase = _manager(
+        "Somebody/PRON/somebody/1/nsubj attacked/VERB/attack/1/ROOT something/PRON/something/1/dobj"
+    )
+    assert [len(pattern) for pattern, _ in phrase.patterns] == [1]
+    # Any "attack", whatever its place in the parse.
+    assert _matched(manager, "The/DET/the/1/det attack/NOUN/attack/1/ROOT failed/VERB/fail/1/conj") == [(1,)]
+
+
+def test_object_may_be_a_passive_subject():
+    manager, _ = _manager(SOMEBODY_SHELLED_VILLAGE)
+    assert _matched(
+        manager,
+        "Forces/NOUN/force/1/nsubj shelled/VERB/shell/1/ROOT the/DET/the/3/det village/NOUN/village/1/dobj",
+    ) == [(1, 3)]
+    assert _matched(
+        manager,
+        "The/DET/the/1/det village/NOUN/village/3/nsubjpass was/AUX/be/3/auxpass shelled/VERB/shell/3/ROOT",
+    ) == [(1, 3)]
+    # An active subject is not an object.
+    assert _matched(
+        manager,
+        "The/DET/the/1/det village/NOUN/village/2/nsubj shelled/VERB/shell/2/ROOT back/ADV/back/2/advmod",
+    ) == []
+
+
+def test_compound_and_adjectival_modifiers_are_interchangeable():
+    manager, _ = _manager(
+        "Artillery/NOUN/artillery/1/compound units/NOUN/unit/2/nsubj "
+        "fired/VERB/fire/2/ROOT something/PRON/something/2/dobj"
+    )
+    assert _matched(
+        manager,
+        "Artillery/ADJ/artillery/1/amod units/NOUN/unit/2/nsubj fired/VERB/fire/2/ROOT",
+    ) == [(0, 1, 2)]
+    assert _matched(
+        manager,
+        "Artillery/NOUN/artillery/3/nsubj and/CCONJ/and/0/cc units/NOUN/unit/0/conj fired/VERB/fire/3/ROOT",
+    ) == []
+
+
+def test_particle_may_be_parsed_as_adverb_or_preposition():
+    manager, _ = _manager(
+        "Somebody/PRON/somebody/1/nsubj blew/VERB/blow/1/ROOT up/ADP/up/1/prt "
+        "something/PRON/something/1/dobj"
+    )
+    for dep in ("prt", "advmod", "prep"):
+        doc = f"Sappers/NOUN/sapper/1/nsubj blew/VERB/blow/1/ROOT up/ADP/up/1/{dep} a/DET/a/4/det bridge/NOUN/bridge/1/dobj"
+        assert _matched(manager, doc) == [(1, 2)], dep
+
+
+def test_preposition_may_hang_on_the_verb_or_its_object():
+    manager, _ = _manager(
+        "Somebody/PRON/somebody/1/nsubj launched/VERB/launch/1/ROOT an/DET/an/3/det "
+        "attack/NOUN/attack/1/dobj in/ADP/in/3/prep something/PRON/something/4/pobj"
+    )
+    words = "Forces/NOUN/force/1/nsubj launched/VERB/launch/1/ROOT an/DET/an/3/det attack/NOUN/attack/1/dobj"
+    on_object = f"{words} in/ADP/in/3/prep Bakhmut/PROPN/bakhmut/4/pobj"
+    on_verb = f"{words} in/ADP/in/1/prep Bakhmut/PROPN/bakhmut/4/pobj"
+    as_agent = f"{words} in/ADP/in/1/agent Bakhmut/PROPN/bakhmut/4/pobj"
+    for doc in (on_object, on_verb, as_agent):
+        assert _matched(manager, doc) == [(1, 3, 4)], doc
+    # Not a preposition of the verb at all.
+    assert _matched(manager, f"{words} in/ADP/in/3/advmod Bakhmut/PROPN/bakhmut/4/pobj") == []
+
+
+def test_generic_root_is_a_structure_only_node():
+    manager, phrase = _manager(
+        "something/PRON/something/0/ROOT near/ADP/near/0/prep Bakhmut/PROPN/bakhmut/1/pobj"
+    )
+    pattern, slots = phrase.patterns[0]
+    assert pattern[0]["RIGHT_ATTRS"] == {} and slots[0] is None
+    assert _matched(
+        manager,
+        "Fighting/NOUN/fighting/1/nsubj continued/VERB/continue/1/ROOT "
+        "near/ADP/near/1/prep Bakhmut/PROPN/bakhmut/2/pobj",
+    ) == [(2, 3)]
+
+
+def test_object_may_be_a_later_conjunct():
+    manager, phrase = _manager(SOMEBODY_SHELLED_VILLAGE)
+    assert len(phrase.patterns) == 2
+    assert _matched(
+        manager,
+        "Forces/NOUN/force/1/nsubj shelled/VERB/shell/1/ROOT the/DET/the/3/det town/NOUN/town/1/dobj "
+        "and/CCONJ/and/3/cc village/NOUN/village/3/conj",
+    ) == [(1, 5)]
+    # A conjunct of something that is not the verb's object does not count.
+    assert _matched(
+        manager,
+        "Forces/NOUN/force/1/nsubj shelled/VERB/shell/1/ROOT near/ADP/near/1/prep town/NOUN/town/2/pobj "
+        "and/CCONJ/and/3/cc village/NOUN/village/3/conj",
+    ) == []
+
+
+def test_registering_a_label_twice_raises():
+    manager, _ = _manager(SOMEBODY_SHELLED_VILLAGE)
+    doc = _doc(manager.nlp.vocab, SOMEBODY_SHELLED_VILLAGE)
+    manager.register_docs({"d": doc})
+    with pytest.raises(DuplicateDocumentError):
+        manager.register_docs({"e": doc, "d": doc})
+    with pytest.raises(DuplicateDocumentError):
+        manager.register_serialized_documents({"d": doc.to_bytes()})
+    # Nothing of a rejected batch is registered.
+    assert manager.list_document_labels() == ["d"]
+    manager.remove_document("d")
+    manager.register_serialized_documents({"d": doc.to_bytes()})
+    assert manager.list_document_labels() == ["d"]
+
+
+def holmes_order_key(m):
+    # holmes_extractor.structural_matching sorts matches by this key.
+    return (1 - m["overall_similarity_measure"], m["document"], m["index_within_document"])
+
+
+def test_matches_come_in_holmes_order():
+    manager, _ = _manager(
+        "Forces/NOUN/force/1/nsubj shelled/VERB/shell/1/ROOT a/DET/a/3/det village/NOUN/village/1/dobj"
+    )
+    manager.register_docs({"d": _doc(
+        manager.nlp.vocab,
+        "Forces/NOUN/force/5/nsubj shelled/VERB/shell/1/ROOT villages/NOUN/village/1/dobj "
+        "and/CCONJ/and/1/cc forces/NOUN/force/1/nsubj shelled/VERB/shell/1/conj "
+        "villages/NOUN/village/5/dobj",
+    )})
+    matches = manager.match()
+    # The match rooted at the second verb starts first (Forces), as Holmes ignores.
+    assert [m["index_within_document"] for m in matches] == [1, 5]
+    assert [min(w["document_token_index"] for w in m["word_matches"]) for m in matches] == [1, 0]
+    assert matches == sorted(matches, key=holmes_order_key)
@@ -0,0 +1,90 @@
+import pytest
+import spacy
+from spacy.language import Language
+
+from sitrepc2.lss.doc_cache import DocCache, doc_key, parse_with_cache, pipeline_fingerprint
+
+TEXTS = [
+    "Russian forces attacked near bakhmut.",
+    "Units repelled attacks near synkivka.",
+    "Fighting continued near vuhledar.",
+]
+
+PARSED = []
+
+
+@Language.component("test_doc_cache_counter")
+def _count(doc):
+    PARSED.append(doc.text)
+    return doc
+
+
+def _nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("test_doc_cache_counter")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([{"label": "LOCALE", "pattern": t} for t in ("bakhmut", "synkivka", "vuhledar")])
+    return nlp
+
+
+def _view(docs):
+    return [(d.text, [t.text for t in d], [(e.start, e.end, e.label_) for e in d.ents]) for d in docs]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DocCache(tmp_path / "docs.sqlite")
+    yield cache
+    cache.close()
+
+
+def test_round_trip_and_counters(cache):
+    nlp = _nlp()
+    PARSED.clear()
+    first = parse_with_cache(nlp, TEXTS, cache)
+    assert _view(first) == _view(nlp.pipe(TEXTS))
+    assert (cache.hits, cache.misses, cache.writes) == (0, 3, 3)
+
+    PARSED.clear()
+    second = parse_with_cache(nlp, TEXTS[::-1] + ["Quiet day."], cache)
+    assert PARSED == ["Quiet day."]
+    assert _view(second) == _view(nlp.pipe(TEXTS[::-1] + ["Quiet day."]))
+    assert (cache.hits, cache.misses, cache.writes) == (3, 4, 4)
+    assert cache.stats()["entries"] == 4
+
+
+def test_pattern_change_changes_the_key(cache):
+    nlp = _nlp()
+    parse_with_cache(nlp, TEXTS, cache)
+    before = pipeline_fingerprint(nlp)
+    nlp.get_pipe("entity_ruler").add_patterns([{"label": "LOCALE", "pattern": "robotyne"}])
+    assert pipeline_fingerprint(nlp) != before
+
+    PARSED.clear()
+    parse_with_cache(nlp, TEXTS, cache)
+    assert PARSED == TEXTS
+
+
+def test_lru_eviction_at_max_bytes(tmp_path):
+    nlp = _nlp()
+    fp = pipeline_fingerprint(nlp)
+    docs = [nlp(f"Fighting near bakhmut, report {i}. " * 20) for i in range(4)]
+    keys = [doc_key(fp, d.text) for d in docs]
+
+    probe = DocCache(tmp_path / "probe.sqlite")
+    probe.put_many([(keys[0], docs[0])])
+    segment = probe.stats()["bytes"]
+    probe.close()
+
+    # Room for three one-doc segments.
+    cache = DocCache(tmp_path / "docs.sqlite", max_bytes=int(segment * 3.5))
+    for key, doc in zip(keys[:3], docs[:3]):
+        cache.put_many([(key, doc)])
+    # Touch the oldest segment so the second one is least recently used.
+    assert keys[0] in cache.get_many(nlp, keys[:1])
+
+    cache.put_many([(keys[3], docs[3])])
+    assert cache.evictions == 1
+    assert set(cache.get_many(nlp, keys)) == {keys[0], keys[2], keys[3]}
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    cache.close()
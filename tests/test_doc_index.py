@@ -0,0 +1,104 @@
+import random
+
+import pytest
+import spacy
+from spacy.tokens import Span
+
+from sitrepc2.dom.typedefs import Section
+from sitrepc2.lss.doc_index import DocIndex
+
+WORDS = ["bakhmut", "near", "the", "kupiansk", "direction", "attacked", "vostok", "group", ",", "."]
+LABELS = ["LOCALE", "REGION", "GROUP", "DIRECTION"]
+
+
+def _random_doc(nlp, rng):
+    doc = nlp(" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 40))))
+    ents, i = [], 0
+    while i < len(doc):
+        if rng.random() < 0.3:
+            end = min(len(doc), i + rng.randint(1, 3))
+            ents.append(Span(doc, i, end, label=rng.choice(LABELS)))
+            i = end
+        i += 1
+    doc.ents = ents
+    return doc
+
+
+@pytest.fixture(scope="module")
+def docs():
+    nlp = spacy.blank("en")
+    rng = random.Random(9)
+    return [_random_doc(nlp, rng) for _ in range(200)]
+
+
+def _key(ents):
+    return [(e.start, e.end, e.label_) for e in ents]
+
+
+def test_entity_lookups_match_a_scan(docs):
+    rng = random.Random(10)
+    for doc in docs:
+        index = DocIndex(doc)
+        n, chars = len(doc), len(doc.text)
+        for _ in range(10):
+            a, b = sorted(rng.randint(0, n) for _ in range(2))
+            assert _key(index.ents_in_tokens(a, b)) == _key(e for e in doc.ents if a <= e.start and e.end <= b)
+            assert _key(index.ents_starting_before(a)) == _key(e for e in doc.ents if e.start <= a)
+            a, b = sorted(rng.randint(0, chars) for _ in range(2))
+            assert _key(index.ents_in_chars(a, b)) == _key(
+                e for e in doc.ents if a <= e.start_char and e.end_char <= b
+            )
+            assert _key(index.ents_starting_in_chars(a, b)) == _key(
+                e for e in doc.ents if a <= e.start_char < b
+            )
+
+
+def _sections(*texts):
+    return [Section(f"s{i}", t) for i, t in enumerate(texts)]
+
+
+def test_sections_are_located_in_reading_order():
+    text = "Kupiansk direction:\nAttacks repelled.\n\nLyman direction:\nAttacks repelled."
+    nlp = spacy.blank("en")
+    index = DocIndex(nlp(text))
+    # The second section's body repeats the first one's.
+    sections = _sections("Kupiansk direction:", "Attacks repelled.", "Lyman direction:", "Attacks repelled.")
+    index.set_sections(text, sections)
+    assert index.section_bounds == [(0, 19), (20, 37), (39, 55), (56, 73)]
+    assert [index.section_span(s) for s in sections] == index.section_bounds
+    assert index.section_span(Section("other", "Lyman direction:")) == (39, 55)
+    assert [index.section_at(c) for c in (0, 19, 20, 38, 39, 60, 80)] == [0, 0, 1, None, 2, 3, None]
+
+
+def _baseline_section_at(bounds, char):
+    """The per-event loop section_at replaces, over the located bounds."""
+    for i, (start, end) in enumerate(bounds):
+        if start >= 0 and start <= char <= end:
+            return i
+    return None
+
+
+def test_section_at_matches_the_baseline_loop_on_repeated_texts():
+    nlp = spacy.blank("en")
+    rng = random.Random(11)
+    lines = ["Kupiansk direction:", "Attacks repelled.", "Lyman direction:", "Shelling continued.", ""]
+    for _ in range(300):
+        parts = [rng.choice(lines) for _ in range(rng.randint(1, 8))]
+        text = "\n".join(parts)
+        # Sections repeat texts, skip some, come out of order, or are absent.
+        texts = [rng.choice(parts + ["Attacks repelled.\nLyman direction:", "Not in the post."]) for _ in parts]
+        sections = _sections(*texts)
+        index = DocIndex(nlp(text))
+        index.set_sections(text, sections)
+        for char in range(-1, len(text) + 2):
+            assert index.section_at(char) == _baseline_section_at(index.section_bounds, char), (texts, char)
+
+
+def test_section_found_out_of_order_does_not_hide_an_earlier_one():
+    text = "Kupiansk direction:\nAttacks repelled.\n\nLyman direction:\nShelling continued."
+    index = DocIndex(spacy.blank("en")(text))
+    # The last section is only found by searching from the start again, and
+    # lies inside the first one.
+    index.set_sections(text, _sections("Kupiansk direction:\nAttacks repelled.", "Lyman direction:", "Attacks"))
+    assert index.section_bounds == [(0, 37), (39, 55), (20, 27)]
+    assert [index.section_at(c) for c in (10, 22, 30, 37, 45)] == [0, 0, 0, 0, 1]
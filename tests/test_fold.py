@@ -0,0 +1,46 @@
+import pytest
+
+from sitrepc2.gazetteer.index import GazetteerIndex
+from sitrepc2.gazetteer.translit import fold_location_key
+from sitrepc2.gazetteer.typedefs import LocaleEntry
+from sitrepc2.util.encoding import encode_coord_u64
+
+
+def _locale(name, lat, lon, aliases=(), region=None):
+    return LocaleEntry(encode_coord_u64(lat, lon), name, list(aliases), lon, lat, region)
+
+
+def _cids(entries):
+    return sorted(e.cid for e in entries)
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("stepanivka", "stepanovka"),
+        ("kropyvnytske", "kropivnitskoe"),
+        ("rudnia", "rudnya"),
+        ("cherkassy", "cherkasy"),
+        ("bakhmut", "artemivsk"),
+    ],
+)
+def test_fold_joins_romanizations(a, b):
+    assert fold_location_key(a) == fold_location_key(b)
+
+
+def test_fold_keeps_artemovsk_apart_from_bakhmut():
+    # Bakhmut goes through its first exonym, Artemivsk; the -ivsk / -ovsk
+    # ending is not folded.
+    assert fold_location_key("bakhmut") == "artimivsk"
+    assert fold_location_key("artemovsk") == "artimovsk"
+
+
+def test_search_locale_falls_back_to_fold():
+    bakhmut = _locale("Bakhmut", 48.59, 38.0, region="Donetsk")
+    stepanivka = _locale("Stepanivka", 48.10, 37.50, region="Donetsk")
+    gaz = GazetteerIndex([bakhmut, stepanivka], [], [], [])
+
+    assert _cids(gaz.search_locale("Stepanovka")) == [stepanivka.cid]
+    assert _cids(gaz.search_locale("Artemivsk")) == [bakhmut.cid]
+    assert _cids(gaz.get_locales_by_name("Stepanovka")) == [stepanivka.cid]
+    assert gaz.search_locale("Artemovsk") == []
@@ -0,0 +1,104 @@
+import random
+import string
+
+from sitrepc2.gazetteer.fuzzy import FuzzyAliasIndex, osa_distance
+from sitrepc2.gazetteer.index import GazetteerIndex
+from sitrepc2.gazetteer.typedefs import LocaleEntry
+from sitrepc2.util.encoding import encode_coord_u64
+
+
+def _osa(a, b):
+    """Textbook optimal-string-alignment distance."""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def _random_keys(rng, n):
+    letters = "abcdeiklmnorstuvy"
+    keys = set()
+    while len(keys) < n:
+        keys.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 12))))
+    return sorted(keys)
+
+
+def _mutate(rng, key):
+    chars = list(key)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.randrange(4)
+        i = rng.randrange(len(chars) + 1)
+        if op == 0:
+            chars.insert(i, rng.choice(string.ascii_lowercase))
+        elif op == 1 and i < len(chars) and len(chars) > 1:
+            del chars[i]
+        elif op == 2 and i < len(chars):
+            chars[i] = rng.choice(string.ascii_lowercase)
+        elif op == 3 and i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+
+def _brute_lookup(keys, query, cap):
+    scored = sorted((d, abs(len(k) - len(query)), k) for k in keys if (d := _osa(query, k)) <= cap)
+    return [(d, k) for d, _, k in scored]
+
+
+def test_osa_distance_matches_brute_force():
+    rng = random.Random(3)
+    keys = _random_keys(rng, 300)
+    for _ in range(2000):
+        a, b = rng.choice(keys), _mutate(rng, rng.choice(keys))
+        for cap in (0, 1, 2, 3):
+            assert osa_distance(a, b, cap) == min(_osa(a, b), cap + 1)
+
+
+def test_fuzzy_lookup_matches_brute_force():
+    rng = random.Random(4)
+    keys = _random_keys(rng, 600)
+    index = FuzzyAliasIndex(keys, max_candidates=10**6)
+
+    for _ in range(150):
+        query = _mutate(rng, rng.choice(keys))
+        for cap in (1, 2):
+            assert index.lookup(query, cap) == _brute_lookup(keys, query, cap)
+
+
+def test_search_locale_fuzzy():
+    def locale(name, lat, lon, aliases=()):
+        return LocaleEntry(encode_coord_u64(lat, lon), name, list(aliases), lon, lat)
+
+    kupiansk = locale("Kupiansk", 49.71, 37.61, ["kupyansk"])
+    stepanivka = locale("Stepanivka", 48.10, 37.50, ["stepanovka"])
+    gaz = GazetteerIndex([kupiansk, stepanivka], [], [], [])
+
+    assert gaz.search_locale_fuzzy("Kupiansk") == [(0, kupiansk)]
+    # One locale, once, at its best distance over all its aliases.
+    assert gaz.search_locale_fuzzy("Kupjansk") == [(1, kupiansk)]
+    assert gaz.search_locale_fuzzy("Stepnaovka") == [(1, stepanivka)]
+    assert gaz.search_locale_fuzzy("Stepnaovka", max_distance=0) == []
+    assert gaz.search_locale_fuzzy("Vovchansk") == []
+
+
+def test_removed_keys_do_not_spend_the_candidate_budget():
+    dead = [f"kupiansk{c}" for c in "abcdefgh"]
+    index = FuzzyAliasIndex(dead + ["kupianskz"], max_candidates=4)
+    # The removed keys come first in every bucket and use up the budget.
+    assert index.lookup("kupiansk", 1) == [(1, k) for k in dead[:4]]
+
+    patched = index.patched(remove=dead)
+    assert patched.lookup("kupiansk", 1) == [(1, "kupianskz")]
+    assert len(patched) == 1 and patched.dead == 8 and "kupianska" not in patched
+    # The original keeps its keys; re-adding a removed key revives it.
+    assert len(index) == 9 and "kupianska" in index
+    revived = patched.patched(add=["kupianska"])
+    assert revived.lookup("kupiansk", 1) == [(1, "kupianska"), (1, "kupianskz")]
+    assert patched.lookup("kupiansk", 1) == [(1, "kupianskz")]
@@ -0,0 +1,99 @@
+import math
+import random
+from importlib.resources import files
+
+import pytest
+
+from sitrepc2.gazetteer.index import GazetteerIndex
+from sitrepc2.gazetteer.io import load_locales
+from sitrepc2.spatial.grid import LatLonGrid
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def brute_force(points, lat, lon):
+    """Linear scan, nearest first, ties by position."""
+    return sorted((haversine_km(lat, lon, p[0], p[1]), i) for i, p in enumerate(points))
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = random.Random(1)
+    pts = [(rng.uniform(44, 53), rng.uniform(22, 41)) for _ in range(2000)]
+    # Duplicates: ties must break by position, like a stable sort.
+    return pts + pts[:50]
+
+
+@pytest.mark.parametrize("cell_deg", [0.1, 0.25, 2.0])
+def test_nearest_matches_brute_force(points, cell_deg):
+    rng = random.Random(2)
+    grid = LatLonGrid(points, haversine_km, cell_deg=cell_deg)
+    for _ in range(100):
+        # Queries inside and well outside the points' extent.
+        lat, lon = rng.uniform(40, 57), rng.uniform(18, 45)
+        expected = brute_force(points, lat, lon)
+        for k in (1, 5, 37):
+            assert grid.nearest(lat, lon, k) == expected[:k]
+
+
+@pytest.mark.parametrize("cell_deg", [0.1, 0.25, 2.0])
+def test_within_matches_brute_force(points, cell_deg):
+    rng = random.Random(3)
+    grid = LatLonGrid(points, haversine_km, cell_deg=cell_deg)
+    for _ in range(100):
+        lat, lon = rng.uniform(40, 57), rng.uniform(18, 45)
+        km = rng.uniform(0, 150)
+        assert grid.within(lat, lon, km) == [t for t in brute_force(points, lat, lon) if t[0] <= km]
+
+
+def test_edge_cases():
+    assert LatLonGrid([], haversine_km).nearest(48.0, 37.0, 3) == []
+    grid = LatLonGrid([(48.0, 37.0), (48.5, 37.5)], haversine_km)
+    assert [i for _, i in grid.nearest(48.0, 37.0, 10)] == [0, 1]
+    assert grid.nearest(48.0, 37.0, 0) == []
+    assert grid.within(48.0, 37.0, -1) == []
+    # Polar and antimeridian queries fall back to a full scan.
+    assert grid.within(89.9, 179.9, 20000) == brute_force([(48.0, 37.0), (48.5, 37.5)], 89.9, 179.9)
+
+
+def test_index_nearest_locales_match_linear_scan():
+    locales = load_locales(files("sitrepc2") / "reference" / "locale_lookup.csv")
+    gaz = GazetteerIndex(locales, [], [], [])
+    points = [(e.lat, e.lon) for e in locales]
+    rng = random.Random(4)
+    for _ in range(50):
+        lat, lon = rng.uniform(44, 52), rng.uniform(30, 40)
+        expected = brute_force(points, lat, lon)
+        assert [(round(d, 9), e.cid) for d, e in gaz.nearest_locales(lat, lon, 5)] == [
+            (round(d, 9), locales[i].cid) for d, i in expected[:5]
+        ]
+        assert [e.cid for _, e in gaz.nearest_locales_within(lat, lon, 15.0)] == [
+            locales[i].cid for d, i in expected if d <= 15.0
+        ]
+
+
+def test_patched_matches_rebuilt_grid():
+    rng = random.Random(5)
+    points = [(rng.uniform(47, 50), rng.uniform(35, 39)) for _ in range(500)]
+    grid = LatLonGrid(points, haversine_km)
+    alive = set(range(len(points)))
+
+    for _ in range(20):
+        removed = rng.sample(sorted(alive), 10)
+        # Some added points fall outside the original extent.
+        added = [(rng.uniform(45, 52), rng.uniform(33, 41)) for _ in range(10)]
+        grid = grid.patched(remove=removed, add=added)
+        alive -= set(removed)
+        alive |= set(range(len(points), len(points) + len(added)))
+        points += added
+
+    assert len(grid) == len(alive)
+    for _ in range(100):
+        lat, lon = rng.uniform(44, 53), rng.uniform(32, 42)
+        expected = [t for t in brute_force(points, lat, lon) if t[1] in alive]
+        assert grid.nearest(lat, lon, 8) == expected[:8]
+        assert grid.within(lat, lon, 40.0) == [t for t in expected if t[0] <= 40.0]
@@ -0,0 +1,78 @@
+from importlib.resources import files
+
+import pytest
+
+from sitrepc2.gazetteer.index import GazetteerIndex
+from sitrepc2.gazetteer.io import load_locale_store, load_locales
+from sitrepc2.gazetteer.store import LocaleStore, StringTable
+from sitrepc2.gazetteer.typedefs import LocaleEntry
+
+LOCALE_CSV = files("sitrepc2") / "reference" / "locale_lookup.csv"
+
+
+def key(e):
+    # load_locales leaves cells raw (usage="0", wikidata=""); compare the
+    # fields both loaders agree on.
+    return (e.cid, e.name, e.aliases, e.lat, e.lon, e.region or None, e.place or None, e.wikidata or None)
+
+
+@pytest.fixture(scope="module")
+def entries():
+    return load_locales(LOCALE_CSV)
+
+
+def test_string_table_round_trip():
+    strings = ["", "Kupiansk", "Куп'янськ", "", "Vuhledar"]
+    table = StringTable.from_strings(strings)
+    assert len(table) == len(strings)
+    assert list(table) == strings
+    assert table[-1] == "Vuhledar"
+    assert table[1:3] == strings[1:3]
+    with pytest.raises(IndexError):
+        table[len(strings)]
+    assert list(StringTable.from_strings([])) == []
+
+
+def test_store_round_trips_entries():
+    entries = [
+        LocaleEntry(1, "Kupiansk", ["kupyansk", "kupiansk-vuzlovyi"], 37.61, 49.71, "Kharkiv", "West", "city", "Q1", 3, "base"),
+        LocaleEntry(2, "Synkivka", [], 37.70, 49.80),
+        LocaleEntry(2**63 + 5, "Robotyne", ["rabotino"], 35.84, 47.45, "Zaporizhzhia", None, "village", None, 0, "patch"),
+    ]
+    store = LocaleStore.from_entries(entries)
+    assert len(store) == 3
+    assert list(store) == entries
+    assert store[1] == entries[1]
+    assert store.aliases_of(0) == ["kupyansk", "kupiansk-vuzlovyi"]
+    assert store.region_of(1) is None
+
+
+def test_columnar_loader_matches_entry_loader(entries):
+    store = load_locale_store(LOCALE_CSV)
+    assert len(store) == len(entries)
+    assert [key(e) for e in store] == [key(e) for e in entries]
+
+
+def test_index_over_store_matches_index_over_entries(entries):
+    by_store = GazetteerIndex(load_locale_store(LOCALE_CSV), [], [], [])
+    by_list = GazetteerIndex(entries, [], [], [])
+
+    for e in entries[::37]:
+        assert by_store.search_locale(e.name) == by_list.search_locale(e.name)
+        assert key(by_store.get_locale_by_cid(e.cid)) == key(e)
+        if e.region:
+            assert by_store.search_locale_in_region(e.name, e.region) == by_list.search_locale_in_region(
+                e.name, e.region
+            )
+    for region in {e.region for e in entries if e.region}:
+        assert [key(e) for e in by_store.locales_in_region(region)] == [
+            key(e) for e in entries if e.region == region
+        ]
+
+
+def test_locales_in_bbox_matches_filter(entries):
+    gaz = GazetteerIndex(entries, [], [], [])
+    box = (47.5, 36.0, 49.0, 38.5)
+    assert [key(e) for e in gaz.locales_in_bbox(*box)] == [
+        key(e) for e in entries if box[0] <= e.lat <= box[2] and box[1] <= e.lon <= box[3]
+    ]
@@ -0,0 +1,177 @@
+import dataclasses
+import random
+from importlib.resources import files
+
+import pytest
+
+from sitrepc2.gazetteer.index import GazetteerIndex
+from sitrepc2.gazetteer.snapshot import HashedRowsMap, load_gazetteer
+from sitrepc2.gazetteer.typedefs import LocaleEntry
+from sitrepc2.util.encoding import encode_coord_u64
+
+REFERENCE = files("sitrepc2") / "reference"
+SOURCES = tuple(
+    REFERENCE / name
+    for name in ("locale_lookup.csv", "region_lookup.csv", "group_lookup.csv", "direction_lookup.csv")
+)
+
+
+def _locale(cid_seed, name, lat, lon, aliases=(), region=None):
+    return LocaleEntry(
+        cid=encode_coord_u64(lat, lon) + cid_seed,
+        name=name,
+        aliases=list(aliases),
+        lon=lon,
+        lat=lat,
+        region=region,
+    )
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return load_gazetteer(*SOURCES)
+
+
+def _small_index():
+    locales = [
+        _locale(0, "Kupiansk", 49.71, 37.61, ["kupyansk"], region="Kharkiv"),
+        _locale(0, "Stepanivka", 48.10, 37.50, ["stepanovka"], region="Donetsk"),
+        _locale(0, "Stepanivka", 47.30, 35.10, [], region="Zaporizhzhia"),
+        _locale(0, "Vovchansk", 50.29, 36.94, ["volchansk"], region="Kharkiv"),
+    ]
+    return GazetteerIndex(locales, [], [], [])
+
+
+def _cids(entries):
+    return sorted(e.cid for e in entries)
+
+
+def test_apply_patch_add_remove_replace():
+    gaz = _small_index()
+    kupiansk = gaz.search_locale("Kupiansk")[0]
+    vovchansk = gaz.search_locale("Vovchansk")[0]
+    new = _locale(0, "Novoselivka", 49.80, 37.70, ["novoselovka"], region="Kharkiv")
+
+    delta = gaz.apply_patch(
+        add=[new],
+        remove=[vovchansk.cid],
+        replace=[dataclasses.replace(kupiansk, aliases=["kupyansk", "kupiansk-vuzlovyi"])],
+    )
+
+    assert delta.added_cids == {new.cid, kupiansk.cid}
+    assert delta.removed_cids == {vovchansk.cid, kupiansk.cid}
+    assert "novoselivka" in delta.added_aliases
+    assert {"vovchansk", "volchansk"} <= delta.removed_aliases
+    assert gaz.search_locale("Vovchansk") == []
+    assert gaz.get_locale_by_cid(vovchansk.cid) is None
+    assert _cids(gaz.search_locale("Novoselovka")) == [new.cid]
+    assert _cids(gaz.search_locale("kupiansk-vuzlovyi")) == [kupiansk.cid]
+    assert [e.cid for _, e in gaz.search_locale_fuzzy("Novoselivko")] == [new.cid]
+    assert gaz.nearest_locale(50.29, 36.94)[0].cid != vovchansk.cid
+    assert gaz.search_locale_in_region("Novoselivka", "Kharkiv")[0].cid == new.cid
+
+
+def test_apply_patch_rejects_bad_cids_without_changes():
+    gaz = _small_index()
+    kupiansk = gaz.search_locale("Kupiansk")[0]
+    with pytest.raises(ValueError):
+        gaz.apply_patch(add=[kupiansk])
+    with pytest.raises(ValueError):
+        gaz.apply_patch(remove=[kupiansk.cid, 12345])
+    assert _cids(gaz.search_locale("Kupiansk")) == [kupiansk.cid]
+
+
+def test_upsert_locales_replaces_by_cid_else_adds():
+    gaz = _small_index()
+    kupiansk = gaz.search_locale("Kupiansk")[0]
+    new = _locale(1, "Kivsharivka", 49.63, 37.68)
+
+    gaz.upsert_locales([dataclasses.replace(kupiansk, name="Kupiansk-Misto"), new])
+
+    assert [e.name for e in gaz.search_locale("Kupiansk-Misto")] == ["Kupiansk-Misto"]
+    assert gaz.get_locale_by_cid(kupiansk.cid).name == "Kupiansk-Misto"
+    assert _cids(gaz.search_locale("Kivsharivka")) == [new.cid]
+    assert len(gaz.live_locales()) == 5
+
+
+def test_dead_rows_and_compacted():
+    gaz = _small_index()
+    assert not gaz.has_dead_rows
+    vovchansk = gaz.search_locale("Vovchansk")[0]
+    gaz.apply_patch(remove=[vovchansk.cid])
+
+    assert gaz.has_dead_rows
+    assert vovchansk.cid not in {e.cid for e in gaz.live_locales()}
+    compact = gaz.compacted()
+    assert not compact.has_dead_rows
+    assert len(compact.locales) == 3
+    assert _cids(compact.live_locales()) == _cids(gaz.live_locales())
+    for name in ("Kupiansk", "Stepanivka", "Stepanovka", "Vovchansk"):
+        assert _cids(compact.search_locale(name)) == _cids(gaz.search_locale(name))
+
+
+def test_patched_index_matches_fresh_index(gazetteer):
+    rng = random.Random(6)
+    gaz = GazetteerIndex(gazetteer.live_locales(), gazetteer.regions, gazetteer.groups, gazetteer.directions)
+    top = max(e.cid for e in gaz.live_locales())
+
+    for step in range(25):
+        victims = rng.sample(gaz.live_locales(), 3)
+        gaz.apply_patch(
+            add=[dataclasses.replace(victims[0], cid=top + 1 + step, name=f"Novoselo{step}", aliases=[f"nova{step}"])],
+            remove=[victims[2].cid],
+            replace=[dataclasses.replace(victims[1], name=victims[1].name + "ka")],
+        )
+
+    fresh = GazetteerIndex(gaz.live_locales(), gaz.regions, gaz.groups, gaz.directions)
+    names = sorted({e.name for e in fresh.live_locales()})
+    for name in rng.sample(names, 500) + ["Nova5", "Novoselo7"]:
+        assert _cids(gaz.search_locale(name)) == _cids(fresh.search_locale(name))
+        query = name[:-1] + "x"
+        assert sorted((d, e.cid) for d, e in gaz.search_locale_fuzzy(query, limit=50)) == sorted(
+            (d, e.cid) for d, e in fresh.search_locale_fuzzy(query, limit=50)
+        )
+    for _ in range(100):
+        lat, lon = rng.uniform(44, 52), rng.uniform(30, 40)
+        assert [(round(d, 9), e.cid) for d, e in gaz.nearest_locales(lat, lon)] == [
+            (round(d, 9), e.cid) for d, e in fresh.nearest_locales(lat, lon)
+        ]
+
+
+def test_patches_layer_over_snapshot_maps(tmp_path):
+    load_gazetteer(*SOURCES, snapshot_dir=tmp_path)
+    gaz = load_gazetteer(*SOURCES, snapshot_dir=tmp_path)
+    base = gaz._state.by_alias
+    assert isinstance(base, HashedRowsMap)
+    victims = gaz.live_locales()[:20]
+
+    for step, victim in enumerate(victims):
+        gaz.apply_patch(replace=[dataclasses.replace(victim, aliases=[f"nova{step}"])])
+
+    # Twenty patches touch a few keys each; none of them copied the base.
+    by_alias = gaz._state.by_alias
+    assert by_alias.base is base
+    assert len(by_alias.overlay) + len(by_alias.removed) < 200
+    compact = gaz.compacted()
+    assert len(by_alias) == len(compact._state.by_alias)
+    for step, victim in enumerate(victims):
+        assert _cids(gaz.search_locale(f"nova{step}")) == _cids(compact.search_locale(f"nova{step}"))
+        assert _cids(gaz.search_locale(victim.name)) == _cids(compact.search_locale(victim.name))
+
+
+def test_removed_aliases_leave_the_fuzzy_index():
+    gaz = _small_index()
+    gaz.search_locale_fuzzy("Kupjansk")
+    kupiansk = gaz.search_locale("Kupiansk")[0]
+    stepanivka = gaz.search_locale("Stepanivka")[0]
+
+    gaz.apply_patch(replace=[dataclasses.replace(stepanivka, aliases=[])])
+    assert gaz._state._fuzzy.dead == 1
+    assert gaz.search_locale_fuzzy("Stepnaovka", max_distance=1) == []
+
+    # Dead keys past the threshold drop the index; the next query rebuilds it.
+    gaz.apply_patch(replace=[dataclasses.replace(kupiansk, name="Kivsharivka", aliases=[])])
+    assert gaz._state._fuzzy is None
+    assert gaz.search_locale_fuzzy("Kupjansk") == []
+    assert [e.cid for _, e in gaz.search_locale_fuzzy("Kivsharivko")] == [kupiansk.cid]
+    assert gaz._state.fuzzy.dead == 0
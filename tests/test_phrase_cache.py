@@ -0,0 +1,115 @@
+"""
+Search-phrase cache round trips against a recording stand-in for the
+Holmes Manager: it builds picklable phrase records, and lacks the Manager
+internals, so cached phrases go through the register-from-text fallback.
+Where Holmes and a small English model are installed, the packed handoff
+is also checked against a real Manager.
+"""
+
+import copy
+import importlib.util
+import sys
+import types
+from dataclasses import dataclass
+
+import pytest
+import spacy
+
+from sitrepc2.lss import phrases
+from sitrepc2.lss.phrases import load_war_lexicon, register_search_phrases
+from sitrepc2.lss.sentence_cache import match_token_indices
+
+
+@dataclass
+class Phrase:
+    doc_text: str
+    label: str
+
+
+class RecordingManager:
+    def __init__(self):
+        self.nlp = spacy.blank("en")
+        self.registered = []
+
+    def register_search_phrase(self, text, label=None):
+        self.registered.append((label, text))
+        return Phrase(text, label)
+
+
+@pytest.fixture(autouse=True)
+def holmes_version(monkeypatch):
+    # search_phrase_key reads the Holmes version only.
+    if importlib.util.find_spec("holmes_extractor") is None:
+        monkeypatch.setitem(sys.modules, "holmes_extractor", types.SimpleNamespace(__version__="test"))
+
+
+def _register(cache_path):
+    manager = RecordingManager()
+    timings = register_search_phrases(manager, cache_path=cache_path)
+    return manager.registered, timings
+
+
+def test_warm_start_registers_the_same_phrases(tmp_path):
+    cache_path = tmp_path / "phrases.pkl"
+    cold, cold_timings = _register(cache_path)
+    warm, warm_timings = _register(cache_path)
+    plain, _ = _register(None)
+
+    assert cold and warm == cold == plain
+    assert not any(t["cached"] for t in cold_timings.values())
+    assert all(t["cached"] for t in warm_timings.values())
+    assert [t["phrases"] for t in warm_timings.values()] == [t["phrases"] for t in cold_timings.values()]
+
+
+def test_lexicon_edit_invalidates_the_cache(tmp_path, monkeypatch):
+    cache_path = tmp_path / "phrases.pkl"
+    _register(cache_path)
+
+    lexicon = copy.deepcopy(load_war_lexicon())
+    lexicon["actions"]["kinetic_verbs"].append("pound")
+    monkeypatch.setattr(phrases, "load_war_lexicon", lambda: lexicon)
+    edited, timings = _register(cache_path)
+    assert ("KINETIC_EVENT", "Somebody pound something") in edited
+    assert not any(t["cached"] for t in timings.values())
+
+    again, timings = _register(cache_path)
+    assert again == edited
+    assert all(t["cached"] for t in timings.values())
+
+
+def test_model_change_invalidates_the_cache(tmp_path):
+    cache_path = tmp_path / "phrases.pkl"
+    _register(cache_path)
+    manager = RecordingManager()
+    manager.nlp.add_pipe("sentencizer")
+    timings = register_search_phrases(manager, cache_path=cache_path)
+    assert not any(t["cached"] for t in timings.values())
+
+
+def test_packed_phrases_match_like_a_cold_registration(tmp_path):
+    pytest.importorskip("holmes_extractor")
+    pytest.importorskip("en_core_web_sm")
+    from sitrepc2.lss.bootstrap import HolmesSettings, build_manager
+
+    settings = HolmesSettings(model="en_core_web_sm", perform_coreference_resolution=False, number_of_workers=1)
+    cache_path = tmp_path / "phrases.pkl"
+    text = "Russian forces shelled Avdiivka and attacked Ukrainian positions near Bakhmut."
+    runs = []
+    for _ in range(2):
+        manager = build_manager(settings)
+        try:
+            timings = register_search_phrases(manager, cache_path=cache_path)
+            manager.parse_and_register_document(text, "d")
+            matches = [
+                (m["search_phrase_label"], m["search_phrase_text"], sorted(match_token_indices(m)))
+                for m in manager.match()
+            ]
+            runs.append((timings, phrases._supports_packed_registration(manager), matches))
+        finally:
+            manager.close()
+
+    (cold_timings, _, cold), (warm_timings, packed, warm) = runs
+    assert not any(t["cached"] for t in cold_timings.values())
+    assert all(t["cached"] for t in warm_timings.values())
+    assert packed
+    assert cold and warm == cold
@@ -0,0 +1,81 @@
+import pytest
+
+from sitrepc2.lss.dependency_backend import register_documents
+from sitrepc2.lss.doc_cache import DocCache
+from sitrepc2.lss.pipeline import iter_nlp_pipeline, run_nlp_pipeline
+from sitrepc2.lss.prefilter import TriggerPrefilter
+from sitrepc2.lss.sentence_cache import SentenceCache
+from sitrepc2.lss.typedefs import PipelineOptions
+
+from pipeline_posts import make_posts, signature
+
+
+@pytest.fixture(scope="module")
+def serial(manager):
+    events = signature(run_nlp_pipeline(make_posts(), manager).values())
+    assert events
+    return events
+
+
+@pytest.mark.parametrize("batch_size", [1, 4, 64])
+def test_batch_size_does_not_change_events(manager, serial, batch_size):
+    out = run_nlp_pipeline(make_posts(), manager, PipelineOptions(batch_size=batch_size))
+    assert signature(out.values()) == serial
+
+
+def test_keyword_overrides_take_precedence(manager, serial):
+    options = PipelineOptions(batch_size=2, min_similarity=2.0)
+    assert signature(run_nlp_pipeline(make_posts(), manager, options).values()) == []
+    out = run_nlp_pipeline(make_posts(), manager, options, min_similarity=0.0)
+    assert signature(out.values()) == serial
+
+
+def test_doc_cache_does_not_change_events(manager, serial, tmp_path):
+    cache = DocCache(tmp_path / "docs.sqlite")
+    for _ in range(2):
+        assert signature(run_nlp_pipeline(make_posts(), manager, doc_cache=cache).values()) == serial
+    assert cache.hits > 0
+
+
+def test_sentence_cache_does_not_change_events(manager, serial):
+    cache = SentenceCache()
+    for _ in range(2):
+        assert signature(run_nlp_pipeline(make_posts(), manager, sentence_cache=cache).values()) == serial
+    assert cache.last_run["hit_rate"] == 1.0
+
+
+def test_sharded_rejects_a_sentence_cache(settings):
+    with pytest.raises(ValueError):
+        run_nlp_pipeline(make_posts(), workers=2, settings=settings, sentence_cache=SentenceCache())
+
+
+@pytest.mark.parametrize("window", [1, 4, 100])
+def test_streaming_matches_serial(manager, serial, window):
+    posts = make_posts()
+    streamed = list(iter_nlp_pipeline(iter(posts), manager, window=window))
+    assert [p.post_id for p in streamed] == [p.post_id for p in posts]
+    assert signature(streamed) == serial
+
+
+def test_streaming_rejects_an_empty_window():
+    with pytest.raises(ValueError):
+        next(iter_nlp_pipeline([], window=0))
+
+
+def test_prefilter_keeps_a_subset_of_events(manager, serial):
+    prefilter = TriggerPrefilter.from_lexicon()
+    out = run_nlp_pipeline(make_posts(), manager, prefilter=prefilter)
+    assert set(signature(out.values())) <= set(serial)
+    assert 0 < prefilter.last_run["kept"] <= prefilter.last_run["sentences"]
+
+
+def test_caller_documents_are_left_alone(manager, serial):
+    posts = make_posts()
+    # A document of the caller's under a post id, matching differently.
+    register_documents(manager, {"p0": manager.nlp(posts[1].text)})
+    try:
+        out = run_nlp_pipeline(posts, manager)
+        assert signature(out.values()) == serial
+        assert manager.list_document_labels() == ["p0"]
+    finally:
+        manager.remove_document("p0")
@@ -0,0 +1,53 @@
+import pytest
+import spacy
+
+from sitrepc2.lss.prefilter import TriggerPrefilter, inflections
+
+
+@pytest.mark.parametrize(
+    "word, forms",
+    [
+        ("shell", {"shells", "shelled", "shelling"}),
+        ("repelled", {"repel", "repels", "repelling"}),
+        ("capture", {"captured", "capturing"}),
+        ("hit", {"hitting"}),
+        ("took", {"take", "taken", "taking"}),
+        ("occupy", {"occupies", "occupied"}),
+    ],
+)
+def test_inflections_cover_the_paradigm(word, forms):
+    assert forms <= inflections(word)
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [
+            {"label": "LOCALE", "pattern": "bakhmut"},
+            {"label": "DIRECTION", "pattern": [{"LOWER": "kupiansk"}, {"LOWER": "direction"}]},
+            {"label": "GROUP", "pattern": "vostok"},
+        ]
+    )
+    return nlp
+
+
+def test_accepts_needs_a_trigger_and_an_anchor(nlp):
+    prefilter = TriggerPrefilter(["shell", "repel attack", "the launch of"])
+    assert "the" not in prefilter.forms and "launching" in prefilter.forms
+    doc = nlp(
+        "Russian forces shelled bakhmut. "
+        "Units repelled attacks in the kupiansk direction. "
+        "Bakhmut was quiet. "
+        "The vostok group repelled attacks. "
+        "Shelling continued."
+    )
+    assert [prefilter.accepts(s) for s in doc.sents] == [True, True, False, False, False]
+    assert [prefilter.has_trigger(s) for s in doc.sents] == [True, True, False, True, True]
+
+
+def test_from_lexicon_keeps_lexicon_triggers():
+    prefilter = TriggerPrefilter.from_lexicon()
+    assert {"attacked", "shelling", "repelled"} <= prefilter.forms
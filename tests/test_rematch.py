@@ -0,0 +1,125 @@
+import copy
+import pickle
+from dataclasses import dataclass
+
+import pytest
+
+from sitrepc2.lss import rematch
+from sitrepc2.lss.phrases import load_war_lexicon
+from sitrepc2.lss.pipeline import build_holmes_and_nlp, rematch_lexicon_changes, run_nlp_pipeline
+from sitrepc2.lss.rematch import (
+    MatchStore,
+    apply_search_phrase_delta,
+    diff_search_phrases,
+    lexicon_search_phrases,
+    match_order_key,
+    registered_search_phrases,
+    text_hash,
+)
+
+from pipeline_posts import make_posts, signature
+
+MATCH = {"search_phrase_label": "KINETIC_EVENT", "search_phrase_text": "Somebody attack something"}
+
+
+@dataclass
+class Phrase:
+    doc_text: str
+    label: str
+
+
+class PhraseManager:
+    """The search-phrase bookkeeping of a Holmes Manager, nothing else."""
+
+    def __init__(self, phrases=()):
+        self.search_phrases = [Phrase(text, label) for label, text in phrases]
+        self.registrations = 0
+
+    def register_search_phrase(self, text, label=None):
+        self.registrations += 1
+        self.search_phrases.append(Phrase(text, label))
+
+    def remove_all_search_phrases_with_label(self, label):
+        self.search_phrases = [sp for sp in self.search_phrases if sp.label != label]
+
+
+def test_store_round_trip(tmp_path):
+    store = MatchStore(tmp_path / "matches.sqlite")
+    phrases = [("A", "x"), ("B", "y"), ("A", "x")]
+    set_hash = store.add_phrase_set(phrases)
+    assert store.add_phrase_set(reversed(phrases)) == set_hash
+    assert store.phrase_set(set_hash) == {("A", "x"), ("B", "y")}
+
+    store.put_many([("p0", "text 0", [MATCH]), ("p1", "text 1", [])], set_hash)
+    store.put_many([("p1", "text 1b", [MATCH, MATCH])], set_hash)
+    assert len(store) == 2
+    got = store.get_many(["p1", "p0", "p9", "p0"])
+    assert got == {
+        "p0": (text_hash("text 0"), set_hash, [MATCH]),
+        "p1": (text_hash("text 1b"), set_hash, [MATCH, MATCH]),
+    }
+
+    # A pickled store (as sent to a worker) reopens its own connection.
+    clone = pickle.loads(pickle.dumps(store))
+    assert clone.get_many(["p0"]) == {"p0": got["p0"]}
+    clone.close()
+    store.close()
+
+
+def test_apply_delta_reaches_the_wanted_phrase_set():
+    old = [("A", "a1"), ("A", "a2"), ("B", "b1"), ("C", "c1")]
+    new = [("A", "a1"), ("B", "b1"), ("B", "b2"), ("D", "d1")]
+    manager = PhraseManager(old)
+    delta = diff_search_phrases(old, new)
+    assert delta.added == {("B", "b2"), ("D", "d1")}
+    assert delta.removed == {("A", "a2"), ("C", "c1")}
+
+    apply_search_phrase_delta(manager, delta)
+    assert registered_search_phrases(manager) == set(new)
+    assert not diff_search_phrases(new, new)
+
+
+def test_lexicon_search_phrases_are_unique():
+    phrases = lexicon_search_phrases()
+    assert phrases and len(phrases) == len(set(phrases))
+
+
+def test_match_order_key_is_holmes_order_within_a_document():
+    def match(sim, root, *tokens):
+        return {
+            "overall_similarity_measure": sim,
+            "index_within_document": root,
+            "word_matches": [{"document_token_index": t} for t in tokens],
+        }
+
+    # The first matched token comes before the root ("Air defence units shot down ...").
+    matches = [match(1.0, 9, 4, 9), match(0.8, 1, 1), match(1.0, 7, 2, 7), match(1.0, 3, 3)]
+    assert [match_order_key(m) for m in sorted(matches, key=match_order_key)] == [
+        (0.0, 3), (0.0, 7), (0.0, 9), (pytest.approx(0.2), 1),
+    ]
+
+
+def test_rematch_equals_a_full_run(settings, tmp_path, monkeypatch):
+    # Its own Manager: the phrase delta changes the registration order,
+    # which orders matches on the same root token.
+    manager = build_holmes_and_nlp(settings)
+    store = MatchStore(tmp_path / "matches.sqlite")
+    before = run_nlp_pipeline(make_posts(), manager, match_store=store)
+    # Posts are registered anew by the rematch; none may be left behind.
+    assert manager.list_document_labels() == []
+
+    lexicon = copy.deepcopy(load_war_lexicon())
+    lexicon["actions"]["kinetic_verbs"].remove("shell")
+    lexicon["actions"]["defensive_verbs"].append("strike")
+    monkeypatch.setattr(rematch, "load_war_lexicon", lambda: lexicon)
+    try:
+        changed = rematch_lexicon_changes(make_posts(), manager, store)
+        assert changed
+        assert manager.list_document_labels() == []
+        rematched = {**before, **changed}
+        full = run_nlp_pipeline(make_posts(), manager)
+        assert signature(rematched.values()) == signature(full.values())
+        # Nothing left to do for the same lexicon.
+        assert rematch_lexicon_changes(make_posts(), manager, store) == {}
+    finally:
+        store.close()
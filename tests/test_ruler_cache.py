@@ -0,0 +1,84 @@
+import random
+import shutil
+
+import pytest
+import spacy
+
+from sitrepc2.config.paths import source_ruler_gazetteer_paths
+from sitrepc2.gazetteer.snapshot import read_manifest
+from sitrepc2.lss import ruler_cache
+from sitrepc2.lss.ruler_cache import load_entity_rulers
+
+
+@pytest.fixture
+def sources(tmp_path):
+    out = []
+    for path in source_ruler_gazetteer_paths():
+        copy = tmp_path / path.name
+        shutil.copyfile(path, copy)
+        out.append(copy)
+    return out
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Counts rulers built from the CSVs rather than from the cache."""
+    calls = []
+    build = ruler_cache.add_entity_rulers
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(ruler_cache, "add_entity_rulers", counted)
+    return calls
+
+
+def _texts(sources):
+    names = [line.split(",", 1)[0] for line in sources[0].read_text(encoding="utf-8").splitlines()[1:]]
+    rng = random.Random(6)
+    out = ["Fighting towards bakhmut, on the avdiivka line and in the luhansk peoples republic."]
+    for _ in range(100):
+        out.append(" near ".join(rng.sample(names, 4)) + ", the vostok group in the kupiansk direction")
+    return out
+
+
+def _ents(nlp, texts):
+    return [[(e.start, e.end, e.label_) for e in nlp(text).ents] for text in texts]
+
+
+def _ruler(nlp):
+    return nlp.get_pipe("entity_ruler")
+
+
+def test_warm_start_matches_a_cold_build(sources, builds, tmp_path):
+    cache_dir = tmp_path / "ruler_cache"
+    cold = load_entity_rulers(spacy.blank("en"), *sources, cache_dir=cache_dir)
+    warm = load_entity_rulers(spacy.blank("en"), *sources, cache_dir=cache_dir)
+    plain = load_entity_rulers(spacy.blank("en"), *sources)
+    assert len(builds) == 2
+
+    texts = _texts(sources)
+    assert _ents(warm, texts) == _ents(cold, texts) == _ents(plain, texts)
+    assert len(_ruler(warm)) == len(_ruler(cold))
+    assert _ruler(warm).directions.aliases == _ruler(cold).directions.aliases
+
+
+def test_csv_edit_invalidates_the_cache(sources, builds, tmp_path):
+    cache_dir = tmp_path / "ruler_cache"
+    load_entity_rulers(spacy.blank("en"), *sources, cache_dir=cache_dir)
+    before = read_manifest(cache_dir)["sources"]
+
+    with sources[0].open("a", encoding="utf-8") as f:
+        f.write("zzyzxivka,zzyzxivka,village,,donetsk oblast,,0,37.5,48.1,1\n")
+    nlp = load_entity_rulers(spacy.blank("en"), *sources, cache_dir=cache_dir)
+    assert len(builds) == 2
+    assert read_manifest(cache_dir)["sources"] != before
+    assert cache_dir.is_symlink()
+    assert len(list(tmp_path.glob("ruler_cache.v-*"))) == 2
+    assert [e.label_ for e in nlp("Fighting near zzyzxivka.").ents] == ["LOCALE"]
+
+    # The rewritten cache serves the edited gazetteer.
+    warm = load_entity_rulers(spacy.blank("en"), *sources, cache_dir=cache_dir)
+    assert len(builds) == 2
+    assert [e.label_ for e in warm("Fighting near zzyzxivka.").ents] == ["LOCALE"]
@@ -0,0 +1,63 @@
+import spacy
+from spacy.language import Language
+from spacy.pipeline import Sentencizer
+
+from sitrepc2.lss.sentence_cache import SentenceCache, light_doc, remap_match
+
+MATCH = {
+    "document": "p0",
+    "index_within_document": 2,
+    "overall_similarity_measure": 1.0,
+    "word_matches": [
+        {"document_token_index": 2, "first_document_token_index": 2, "last_document_token_index": 3,
+         "structurally_matched_document_token_index": 2, "document_subword_containing_token_index": None,
+         "document_word": "attack"},
+    ],
+}
+
+
+def test_remap_match_shifts_every_token_index():
+    out = remap_match(MATCH, lambda i: i + 10, "p1")
+    wm = out["word_matches"][0]
+    assert out["document"] == "p1" and out["index_within_document"] == 12
+    assert (wm["document_token_index"], wm["first_document_token_index"], wm["last_document_token_index"]) == (
+        12, 12, 13,
+    )
+    assert wm["document_subword_containing_token_index"] is None
+    assert MATCH["word_matches"][0]["document_token_index"] == 2
+    assert "document" not in remap_match(MATCH, lambda i: i, None)
+
+
+def test_lru_bound_and_persistence_keep_order(tmp_path):
+    cache = SentenceCache(max_entries=3)
+    for key in "abcd":
+        cache.put(key, [dict(MATCH, document=key)])
+    assert len(cache) == 3 and cache.get("a") is None
+    assert cache.get("b") is not None  # b is now most recently used
+    cache.put("e", [])
+
+    cache.save(tmp_path / "sentences.jsonl")
+    loaded = SentenceCache(max_entries=3)
+    loaded.load(tmp_path / "sentences.jsonl")
+    assert list(loaded._entries) == ["d", "b", "e"]
+    assert loaded.get("d") == cache.get("d")
+
+
+PIPED = []
+
+
+@Language.component("test_sentence_cache_heavy")
+def _heavy(doc):
+    PIPED.append(doc.text)
+    return doc
+
+
+def test_light_doc_runs_only_tokenizer_sentences_and_ruler():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("test_sentence_cache_heavy")
+    nlp.add_pipe("entity_ruler").add_patterns([{"label": "LOCALE", "pattern": "synkivka"}])
+    PIPED.clear()
+    doc = light_doc(nlp, "Attacks near synkivka. The enemy lost 40 servicemen.", Sentencizer())
+    assert PIPED == []
+    assert [s.text for s in doc.sents] == ["Attacks near synkivka.", "The enemy lost 40 servicemen."]
+    assert [(e.text, e.label_) for e in doc.ents] == [("synkivka", "LOCALE")]
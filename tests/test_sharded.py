@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+import spacy
+from spacy.tokens import Span
+from spacy.vocab import Vocab
+
+from sitrepc2.dom.typedefs import Event, Location, Post, Section
+from sitrepc2.lss.pipeline import _attach_spans, _detach_spans, run_nlp_pipeline
+
+from pipeline_posts import make_posts, signature
+
+
+def test_location_spans_survive_the_worker_round_trip():
+    doc = spacy.blank("en")("Units repelled attacks near synkivka and kupiansk.")
+    doc.ents = [Span(doc, 4, 5, label="LOCALE"), Span(doc, 6, 7, label="LOCALE")]
+    event = Event(
+        "p0:0", "p0", doc.text, None, None,
+        locations=[Location(ent.text, [], span=ent) for ent in doc.ents] + [Location("x", [])],
+    )
+    post = Post("tg", "news", "en", "p0", "", "", doc.text, sections=[Section("s0", doc.text, events=[event])])
+    post.events.append(event)
+
+    # What a worker sends back, through pickle as the process pool does.
+    post, doc_bytes = pickle.loads(pickle.dumps((post, _detach_spans(post))))
+    _attach_spans(post, doc_bytes, Vocab())
+
+    locations = post.sections[0].events[0].locations
+    assert post.events[0] is post.sections[0].events[0]
+    assert [(s.start, s.end, s.label_, s.text) for s in (loc.span for loc in locations[:2])] == [
+        (4, 5, "LOCALE", "synkivka"),
+        (6, 7, "LOCALE", "kupiansk"),
+    ]
+    assert locations[0].span.doc is locations[1].span.doc
+    assert locations[0].span.doc.text == doc.text
+    assert locations[2].span is None
+
+
+def test_post_without_spans_sends_no_doc():
+    post = Post("tg", "news", "en", "p0", "", "", "quiet day", sections=[Section("s0", "quiet day")])
+    assert _detach_spans(post) is None
+    _attach_spans(post, None, Vocab())
+
+
+def test_sharded_matches_serial(settings, manager):
+    serial = signature(run_nlp_pipeline(make_posts(), manager).values())
+    assert serial
+    sharded = run_nlp_pipeline(make_posts(), workers=2, settings=settings)
+    assert signature(sharded.values()) == serial
+    spans = [loc.span for p in sharded.values() for s in p.sections for e in s.events for loc in e.locations]
+    assert all(isinstance(s, Span) for s in spans)
+
+
+def test_sharded_rejects_a_manager(manager):
+    with pytest.raises(ValueError):
+        run_nlp_pipeline(make_posts(), manager, workers=2)
@@ -0,0 +1,71 @@
+from importlib.resources import files
+
+import pytest
+
+import sitrepc2.gazetteer.snapshot as snapshot
+from sitrepc2.gazetteer.snapshot import MANIFEST, load_gazetteer, load_snapshot, read_manifest
+
+REFERENCE = files("sitrepc2") / "reference"
+SOURCES = tuple(
+    REFERENCE / name
+    for name in ("locale_lookup.csv", "region_lookup.csv", "group_lookup.csv", "direction_lookup.csv")
+)
+
+
+def _cids(entries):
+    return [e.cid for e in entries]
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return load_gazetteer(*SOURCES)
+
+
+def _assert_same_index(a, b):
+    assert len(a.locales) == len(b.locales)
+    for name in ("kupiansk", "stepanivka", "bakhmut", "robotyne", "vuhledar"):
+        assert _cids(a.search_locale(name)) == _cids(b.search_locale(name))
+    assert a.nearest_locale(48.6, 38.0)[0] == b.nearest_locale(48.6, 38.0)[0]
+    assert [r.name for r in a.regions] == [r.name for r in b.regions]
+    assert [g.name for g in a.groups] == [g.name for g in b.groups]
+    assert [(d.name, d.anchor.cid) for d in a.directions] == [(d.name, d.anchor.cid) for d in b.directions]
+
+
+def test_snapshot_round_trip(tmp_path, gazetteer):
+    path = tmp_path / "gazetteer.snapshot"
+    gaz = load_gazetteer(*SOURCES, snapshot_dir=path)
+    assert (path / MANIFEST).exists()
+    _assert_same_index(gaz, gazetteer)
+    _assert_same_index(load_snapshot(path), gazetteer)
+    for region in {e.region for e in gazetteer.locales if e.region}:
+        assert _cids(gaz.locales_in_region(region)) == _cids(gazetteer.locales_in_region(region))
+    assert not [p for p in tmp_path.iterdir() if ".tmp-" in p.name]
+
+
+def test_snapshot_invalidated_by_format_and_sources(tmp_path, monkeypatch):
+    saves = []
+    save_snapshot = snapshot.save_snapshot
+    monkeypatch.setattr(
+        snapshot, "save_snapshot", lambda *a: (saves.append(a[2]), save_snapshot(*a))
+    )
+    path = tmp_path / "gazetteer.snapshot"
+    load_gazetteer(*SOURCES, snapshot_dir=path)
+    assert len(saves) == 1
+
+    # Same sources and format: reused as is.
+    load_gazetteer(*SOURCES, snapshot_dir=path)
+    assert len(saves) == 1
+
+    monkeypatch.setattr(snapshot, "SNAPSHOT_FORMAT", snapshot.SNAPSHOT_FORMAT + 1)
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+    load_gazetteer(*SOURCES, snapshot_dir=path)
+    assert len(saves) == 2
+    assert read_manifest(path)["format"] == snapshot.SNAPSHOT_FORMAT
+
+    manifest = read_manifest(path)
+    manifest["sources"][0] = "0" * 64
+    (path / MANIFEST).write_text(snapshot.json.dumps(manifest), encoding="utf-8")
+    load_gazetteer(*SOURCES, snapshot_dir=path)
+    assert len(saves) == 3
+    assert read_manifest(path)["sources"] == snapshot.source_hashes(SOURCES)
@@ -0,0 +1,160 @@
+from collections import Counter
+
+import pytest
+import spacy
+from spacy.pipeline import Sentencizer
+
+from sitrepc2.dom.typedefs import Post
+from sitrepc2.lss.pipeline import _match_posts, run_nlp_pipeline
+from sitrepc2.lss.sentence_cache import light_doc
+from sitrepc2.lss.templates import ResidualFilter, TemplateExtractor
+from sitrepc2.lss.typedefs import PipelineOptions
+
+from pipeline_posts import make_posts, signature
+
+REPORT = (
+    "Operational information as of 06.00 on 12.02.2024.\n"
+    "In the Kupiansk direction, the enemy carried out 6 attacks in the areas of "
+    "Kyslivka, Ivanivka and Tabaivka of the Kharkiv region.\n"
+    "Units of the Battlegroup Zapad shelled positions close to Sinkovka and Terny. "
+    "Units of the Battlegroup Yug repelled attacks near Terny. "
+    "Bakhmut was shelled by the enemy. The weather was cold."
+)
+
+# Report sentences in both channels' styles; the toy pipeline's ruler
+# only knows lower-case place names.
+REPORTS = [
+    (
+        "GeneralStaffZSU",
+        "Operational information as of 06.00 on 12.02.2024 regarding the russian invasion.\n"
+        "In the kupiansk direction, the enemy carried out 6 attacks in the areas of "
+        "synkivka, ivanivka and tabaivka of the Kharkiv region.\n"
+        "In the bakhmut direction, our defenders repelled 9 attacks near klishchiivka and andriivka.\n"
+        "The situation in the Volyn and Polissia directions remains unchanged.\n"
+        "The enemy shelled vovchansk and attacked near robotyne.",
+    ),
+    (
+        "mod_russia_en",
+        "Units of the Battlegroup Zapad improved the tactical situation and inflicted losses "
+        "on the AFU close to sinkovka, stelmakhovka and terny.\n"
+        "Units of the Battlegroup Yug shelled positions near kleshcheevka.\n"
+        "The losses amounted to up to 40 servicemen. Bakhmut was shelled by the enemy.\n"
+        "Operational-tactical aviation struck manpower near robotyne.",
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [{"label": "LOCALE", "pattern": [{"LOWER": w}]} for w in
+         ("kyslivka", "ivanivka", "tabaivka", "sinkovka", "terny", "bakhmut")]
+        + [{"label": "REGION", "pattern": [{"LOWER": "kharkiv"}, {"LOWER": "region"}]}]
+    )
+    return nlp
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return TemplateExtractor.from_lexicon()
+
+
+def _post(text, channel="mod_russia_en", post_id="p0"):
+    return Post("tg", channel, "en", post_id, "", "", text)
+
+
+def test_applies_to_template_channels_only(templates):
+    assert templates.applies_to(_post(REPORT))
+    assert templates.applies_to(_post(REPORT, channel="GeneralStaffZSU"))
+    assert not templates.applies_to(_post(REPORT, channel="news"))
+
+
+def test_read_post_covers_formulaic_sentences(nlp, templates):
+    doc = light_doc(nlp, REPORT, Sentencizer())
+    sents = list(doc.sents)
+    result = templates.read_post(_post(REPORT), doc)
+
+    # Header, direction and battlegroup sentences are covered. The
+    # sentence with several triggers, the passive one and the one with no
+    # trigger at all are left to the matcher.
+    assert result.sentences == 6 and not result.complete
+    assert sorted(result.covered) == [s.start_char for s in sents[:3]]
+    assert [(m["search_phrase_label"], m["template"]) for m in result.matches] == [
+        ("KINETIC_EVENT", "direction"),
+        ("KINETIC_EVENT", "battlegroup"),
+    ]
+    first = result.matches[0]
+    assert first["document"] == "p0"
+    trigger = next(w for w in first["word_matches"] if w["search_phrase_token_index"] == 1)
+    anchor = next(w for w in first["word_matches"] if w["search_phrase_token_index"] == 2)
+    assert trigger["document_word"] == "attacks"
+    # The object word sits on the first LOCALE after the trigger.
+    assert doc[anchor["document_token_index"]].text == "Kyslivka"
+
+    templates.record_run(2, [result])
+    assert templates.last_run["template_posts"] == 1
+    assert templates.last_run["sentence_coverage"] == pytest.approx(3 / 6)
+
+
+def test_find_triggers_lists_every_phrase(nlp, templates):
+    doc = light_doc(nlp, "Units of the Battlegroup Yug repelled attacks near Terny.", Sentencizer())
+    triggers = templates.find_triggers(next(doc.sents))
+    assert sorted((doc[a:b].text, label) for a, b, _, label in triggers) == [
+        ("attacks", "KINETIC_EVENT"),
+        ("repelled", "DEFENSIVE_EVENT"),
+        ("repelled attacks", "ACTION_PHRASE_EVENT"),
+    ]
+
+
+def test_residual_filter_is_keyed_by_post(nlp, templates):
+    sentencizer = Sentencizer()
+    doc = light_doc(nlp, REPORT, sentencizer)
+    covered = templates.read_post(_post(REPORT), doc).covered
+    residual = ResidualFilter({"p0": covered})
+
+    doc.user_data["post_id"] = "p0"
+    assert [residual.accepts(s) for s in doc.sents] == [False, False, False, True, True, True]
+    # Another post with the same text is not covered by p0's templates.
+    other = light_doc(nlp, REPORT, sentencizer)
+    other.user_data["post_id"] = "p1"
+    assert all(residual.accepts(s) for s in other.sents)
+
+
+def test_templates_run_places_events(manager, templates):
+    out = run_nlp_pipeline(make_posts(), manager, templates=templates)
+    assert signature(out.values())
+    assert templates.last_run["template_posts"] > 0
+
+
+def _events(out):
+    return Counter(
+        (post.post_id, e.text, e.negated)
+        for post in out.values()
+        for section in post.sections
+        for e in section.events
+    )
+
+
+def test_templates_emit_the_matchers_events(manager, templates):
+    def posts():
+        return [Post("tg", channel, "en", f"r{i}", "", "", text) for i, (channel, text) in enumerate(REPORTS)]
+
+    full = _events(run_nlp_pipeline(posts(), manager))
+    fast = _events(run_nlp_pipeline(posts(), manager, templates=templates))
+    assert fast == full
+    # Some sentences of each report were read off the templates.
+    assert templates.last_run["covered_sentences"] >= 4
+    assert templates.last_run["covered_posts"] == 0
+
+
+def test_merged_template_matches_are_in_holmes_order(manager, templates):
+    posts = [Post("tg", channel, "en", f"r{i}", "", "", text) for i, (channel, text) in enumerate(REPORTS)]
+    _, matches_by_post = _match_posts(manager, posts, PipelineOptions(templates=templates))
+
+    merged = matches_by_post["r1"]
+    assert {"template" in m for m in merged} == {True, False}
+    # Holmes' key within a document: similarity, then the root's token.
+    keys = [(1 - m["overall_similarity_measure"], m["index_within_document"]) for m in merged]
+    assert keys == sorted(keys)
@@ -0,0 +1,284 @@
+# tests/toy_pipeline.py
+"""
+Rule-based stand-in for a trained English pipeline, so the LSS pipeline
+can run end to end without a model or Holmes.
+
+`toy_parser` assigns POS, lemma, head and dependency labels from a few
+word lists: lexicon verbs (and their inflections) are VERBs, the first
+verb of a sentence is its root, nouns before it are subjects, nouns after
+a preposition are its objects, later nouns are direct objects or
+conjuncts. It is deterministic, which is all the parity tests need.
+
+`save_toy_model(path)` writes a loadable pipeline; `ToySettings` (a
+HolmesSettings) carries its path to ShardedPipeline workers, and
+unpickling it there imports this module, which registers the factory.
+
+`toy_coreferee` stands in for coreferee's pipe (added under the name
+"coreferee") where coreferee is not installed: it links each anaphor
+("it", "they", "the village") to the closest LOCALE entity before it, and
+records the texts it ran on. A minimal `coreferee.data_model` is installed
+for it and for lss.coref_gate.
+"""
+
+import sys
+import types
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy
+import spacy
+from spacy.attrs import DEP, HEAD, LEMMA, POS
+from spacy.language import Language
+from spacy.tokens import Doc, Token
+
+from sitrepc2.lss.bootstrap import HolmesSettings
+from sitrepc2.lss.phrases import load_war_lexicon
+
+GENERIC = {"somebody", "something", "someone"}
+DETERMINERS = {"a", "an", "the"}
+ADPOSITIONS = {"in", "near", "on", "of", "at", "to", "from", "by", "with", "towards", "into", "up"}
+CONJUNCTIONS = {"and", "or"}
+NEGATIONS = {"not", "n't", "no"}
+IRREGULAR = {
+    "lost": "lose", "took": "take", "taken": "take", "shot": "shoot", "held": "hold",
+    "struck": "strike", "hit": "hit", "seized": "seize", "carried": "carry",
+}
+EXTRA_VERBS = {"launch", "carry", "take", "inflict", "suffer", "lose", "use", "continue"}
+
+
+def _lexicon_verbs() -> set:
+    verbs = set(EXTRA_VERBS)
+    for category in load_war_lexicon().values():
+        for key, words in category.items():
+            if key.endswith("_verbs"):
+                verbs.update(w for w in words if " " not in w)
+    return verbs
+
+
+def _verb_forms(verbs: set) -> dict:
+    forms = dict(IRREGULAR)
+    for v in verbs:
+        for f in (v, v + "s", v + "es", v + "ed", v + "d", v + "ing", v[:-1] + "ing", v + v[-1] + "ed"):
+            forms.setdefault(f, v)
+    return forms
+
+
+_FORMS = _verb_forms(_lexicon_verbs())
+
+
+def _tag(lower: str, token) -> tuple:
+    if token.is_space:
+        return "SPACE", lower
+    if token.is_punct:
+        return "PUNCT", lower
+    if lower in GENERIC:
+        return "PRON", lower
+    if lower in DETERMINERS:
+        return "DET", lower
+    if lower in ADPOSITIONS:
+        return "ADP", lower
+    if lower in CONJUNCTIONS:
+        return "CCONJ", lower
+    if lower in NEGATIONS:
+        return "PART", "not"
+    if lower in _FORMS:
+        return "VERB", _FORMS[lower]
+    if token.like_num:
+        return "NUM", lower
+    if lower.endswith("sses"):
+        return "NOUN", lower[:-2]
+    if len(lower) > 3 and lower.endswith("s") and not lower.endswith("ss"):
+        return "NOUN", lower[:-1]
+    return "NOUN", lower
+
+
+def _sentences(doc: Doc):
+    start = 0
+    for token in doc:
+        if token.text in {".", "!", "?"} or "\n" in token.text:
+            yield range(start, token.i + 1)
+            start = token.i + 1
+    if start < len(doc):
+        yield range(start, len(doc))
+
+
+def _parse_sentence(sent: range, pos: list, heads: list, deps: list) -> None:
+    content = [i for i in sent if pos[i] not in {"PUNCT", "SPACE"}] or list(sent)
+    verbs = [i for i in content if pos[i] == "VERB"]
+    nominal = [i for i in content if pos[i] in {"NOUN", "PRON", "NUM"}]
+    root = (verbs or nominal or content)[0]
+    heads[root], deps[root] = root, "ROOT"
+    for i in sent:
+        if i == root:
+            continue
+        prev = [j for j in range(sent.start, i) if pos[j] not in {"DET", "SPACE", "PUNCT"}]
+        before = prev[-1] if prev else None
+        if pos[i] == "DET":
+            nxt = [j for j in nominal if j > i]
+            heads[i], deps[i] = (nxt[0] if nxt else root), "det"
+        elif pos[i] == "ADP":
+            heads[i], deps[i] = root, "prep"
+        elif pos[i] in {"NOUN", "PRON", "NUM"}:
+            if before is not None and pos[before] == "ADP":
+                heads[i], deps[i] = before, "pobj"
+            elif before is not None and pos[before] == "CCONJ" and len(prev) > 1 and pos[prev[-2]] in {"NOUN", "PRON", "NUM"}:
+                heads[i], deps[i] = prev[-2], "conj"
+            elif i < root:
+                heads[i], deps[i] = root, "nsubj"
+            else:
+                heads[i], deps[i] = root, "dobj"
+        elif pos[i] == "VERB":
+            heads[i], deps[i] = root, "conj"
+        elif pos[i] == "PART":
+            heads[i], deps[i] = root, "neg"
+        elif pos[i] == "CCONJ":
+            heads[i], deps[i] = root, "cc"
+        elif pos[i] == "PUNCT":
+            heads[i], deps[i] = root, "punct"
+        else:
+            heads[i], deps[i] = root, "dep"
+
+
+@Language.component("toy_parser")
+def toy_parser(doc: Doc) -> Doc:
+    n = len(doc)
+    if not n:
+        return doc
+    tags = [_tag(t.lower_, t) for t in doc]
+    pos = [p for p, _ in tags]
+    heads = list(range(n))
+    deps = [""] * n
+    for sent in _sentences(doc):
+        _parse_sentence(sent, pos, heads, deps)
+
+    strings = doc.vocab.strings
+    values = numpy.zeros((n, 4), dtype="uint64")
+    for i, (p, lemma) in enumerate(tags):
+        values[i] = (
+            strings.add(p),
+            # HEAD is relative, stored as uint64
+            (heads[i] - i) % 2 ** 64,
+            strings.add(deps[i] or "dep"),
+            strings.add(lemma),
+        )
+    doc.from_array([POS, HEAD, DEP, LEMMA], values)
+    return doc
+
+
+# ---------------------------------------------------------------------------
+# Coreference stand-in
+# ---------------------------------------------------------------------------
+
+class _Mention:
+    def __init__(self):
+        self.token_indexes = []
+        self.root_index = None
+        self.pretty_representation = ""
+
+
+class _Chain:
+    def __init__(self, mentions, most_specific_mention_index):
+        self.mentions = mentions
+        self.most_specific_mention_index = most_specific_mention_index
+        self.index = None
+
+    @property
+    def pretty_representation(self):
+        return f"{self.index}: " + ", ".join(m.pretty_representation for m in self.mentions)
+
+
+class _ChainHolder:
+    def __init__(self):
+        self.chains = []
+        self.temp_dependent_siblings = []
+        self.temp_governing_sibling = None
+
+    def __iter__(self):
+        return iter(self.chains)
+
+    def __len__(self):
+        return len(self.chains)
+
+    def __getitem__(self, i):
+        return self.chains[i]
+
+
+def _data_model():
+    try:
+        import coreferee.data_model as data_model
+    except ImportError:
+        package = types.ModuleType("coreferee")
+        data_model = types.ModuleType("coreferee.data_model")
+        data_model.Mention, data_model.Chain, data_model.ChainHolder = _Mention, _Chain, _ChainHolder
+        package.data_model = data_model
+        sys.modules.update({"coreferee": package, "coreferee.data_model": data_model})
+    for cls in (Doc, Token):
+        if not cls.has_extension("coref_chains"):
+            cls.set_extension("coref_chains", default=None)
+    return data_model
+
+
+_COREF = _data_model()
+ANAPHORS = {"it", "its", "they", "them", "their"}
+PLACE_NOUNS = {"village", "town", "settlement"}
+
+
+class ToyCoreferee:
+    """Links each anaphor to the closest preceding LOCALE entity."""
+
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, doc: Doc) -> Doc:
+        self.texts.append(doc.text)
+        doc._.coref_chains = _COREF.ChainHolder()
+        for token in doc:
+            token._.coref_chains = _COREF.ChainHolder()
+        for token in doc:
+            definite = token.i > 0 and doc[token.i - 1].lower_ == "the"
+            if token.ent_type_ or not (token.lower_ in ANAPHORS or (definite and token.lower_ in PLACE_NOUNS)):
+                continue
+            antecedents = [e for e in doc.ents if e.label_ == "LOCALE" and e.end <= token.i]
+            if not antecedents:
+                continue
+            place = antecedents[-1].root
+            mentions = [self._mention(doc, [place.i]), self._mention(doc, [token.i - 1, token.i] if definite else [token.i])]
+            chain = _COREF.Chain(mentions, 0)
+            chain.index = len(doc._.coref_chains.chains)
+            doc._.coref_chains.chains.append(chain)
+            for i in (place.i, token.i):
+                doc[i]._.coref_chains.chains.append(chain)
+        return doc
+
+    @staticmethod
+    def _mention(doc: Doc, token_indexes: list):
+        m = _COREF.Mention()
+        m.token_indexes = token_indexes
+        m.root_index = token_indexes[-1]
+        m.pretty_representation = (
+            "[" + "; ".join(f"{doc[i].text}({i})" for i in token_indexes) + "]"
+            if len(token_indexes) > 1
+            else f"{doc[m.root_index].text}({m.root_index})"
+        )
+        return m
+
+
+@Language.factory("toy_coreferee")
+def make_toy_coreferee(nlp: Language, name: str) -> ToyCoreferee:
+    return ToyCoreferee()
+
+
+def toy_nlp() -> Language:
+    nlp = spacy.blank("en")
+    nlp.add_pipe("toy_parser")
+    return nlp
+
+
+def save_toy_model(path: Path) -> Path:
+    toy_nlp().to_disk(path)
+    return Path(path)
+
+
+@dataclass
+class ToySettings(HolmesSettings):
+    backend: str = "dependency"